@@ -14,6 +14,10 @@ class DeepgramAdapter(TranscriptionAdapter):
     def prefix(self) -> str:
         return "deepgram"
 
+    @property
+    def is_remote(self) -> bool:
+        return True
+
     @property
     def display_name(self) -> str:
         return "Deepgram API"
@@ -60,85 +64,63 @@ class DeepgramAdapter(TranscriptionAdapter):
 
         converted_audio = audio_file
         if not audio_file.lower().endswith('.wav'):
-            converted_audio = self._convert_to_wav(audio_file, write)
-
-        try:
-            with open(converted_audio, 'rb') as f:
-                audio_data = f.read()
-
-            write(f"Transcribing with Deepgram API using model: {model}")
-            response = requests.post(
-                url, params=params, headers=headers, data=audio_data, timeout=300,
-            )
-
-            if response.status_code != 200:
-                raise Exception(f"Deepgram API error: {response.status_code} - {response.text}")
-
-            result = response.json()
-            segments: List[Segment] = []
-            detected_lang = language
-
-            results = result.get('results', {})
-            channels = results.get('channels', [])
-            if channels:
-                channel = channels[0]
-                alternatives = channel.get('alternatives', [])
-                if alternatives:
-                    alt = alternatives[0]
-                    for word in alt.get('words', []):
-                        pass
-                    utterances = results.get('utterances', [])
-                    if utterances:
-                        for utt in utterances:
-                            segments.append(Segment(
-                                start=utt.get('start', 0.0),
-                                end=utt.get('end', 0.0),
-                                text=utt.get('transcript', ''),
-                            ))
-                    else:
-                        para_segments = alt.get('paragraphs', {}).get('paragraphs', [])
-                        if para_segments:
-                            for para in para_segments:
-                                for sent in para.get('sentences', []):
-                                    segments.append(Segment(
-                                        start=sent.get('start', 0.0),
-                                        end=sent.get('end', 0.0),
-                                        text=sent.get('text', ''),
-                                    ))
-                        else:
-                            text = alt.get('transcript', '')
-                            segments = [Segment(start=0.0, end=0.0, text=text)]
-
-                    detected_lang = channels[0].get('detected_language', language)
-
-            if not segments:
-                text = results.get('channels', [{}])[0].get('alternatives', [{}])[0].get('transcript', '')
-                segments = [Segment(start=0.0, end=0.0, text=text)]
-
-            info = type('Info', (), {
-                'duration': results.get('duration', 0.0),
-                'language': detected_lang,
-            })()
-            return segments, info
-
-        finally:
-            if converted_audio != audio_file and os.path.exists(converted_audio):
-                try:
-                    os.remove(converted_audio)
-                except OSError:
+            import pcm_store
+            converted_audio = pcm_store.get_wav(audio_file, write)
+
+        with open(converted_audio, 'rb') as f:
+            audio_data = f.read()
+
+        write(f"Transcribing with Deepgram API using model: {model}")
+        response = requests.post(
+            url, params=params, headers=headers, data=audio_data, timeout=300,
+        )
+
+        if response.status_code != 200:
+            raise Exception(f"Deepgram API error: {response.status_code} - {response.text}")
+
+        result = response.json()
+        segments: List[Segment] = []
+        detected_lang = language
+
+        results = result.get('results', {})
+        channels = results.get('channels', [])
+        if channels:
+            channel = channels[0]
+            alternatives = channel.get('alternatives', [])
+            if alternatives:
+                alt = alternatives[0]
+                for word in alt.get('words', []):
                     pass
+                utterances = results.get('utterances', [])
+                if utterances:
+                    for utt in utterances:
+                        segments.append(Segment(
+                            start=utt.get('start', 0.0),
+                            end=utt.get('end', 0.0),
+                            text=utt.get('transcript', ''),
+                        ))
+                else:
+                    para_segments = alt.get('paragraphs', {}).get('paragraphs', [])
+                    if para_segments:
+                        for para in para_segments:
+                            for sent in para.get('sentences', []):
+                                segments.append(Segment(
+                                    start=sent.get('start', 0.0),
+                                    end=sent.get('end', 0.0),
+                                    text=sent.get('text', ''),
+                                ))
+                    else:
+                        text = alt.get('transcript', '')
+                        segments = [Segment(start=0.0, end=0.0, text=text)]
+
+                detected_lang = channels[0].get('detected_language', language)
+
+        if not segments:
+            text = results.get('channels', [{}])[0].get('alternatives', [{}])[0].get('transcript', '')
+            segments = [Segment(start=0.0, end=0.0, text=text)]
 
-    @staticmethod
-    def _convert_to_wav(audio_file: str, write: Callable = print) -> str:
-        import subprocess
-        converted = audio_file + '.converted.wav'
-        write("Converting audio to WAV format for Deepgram API...")
-        cmd = [
-            'ffmpeg', '-y', '-i', audio_file,
-            '-acodec', 'pcm_s16le', '-ac', '1', '-ar', '16000',
-            converted,
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Audio conversion failed: {result.stderr}")
-        return converted
+        info = type('Info', (), {
+            'duration': results.get('duration', 0.0),
+            'language': detected_lang,
+        })()
+        return segments, info
@@ -1,15 +1,37 @@
 """FasterWhisperAdapter - Local faster-whisper transcription (default backend)."""
 import os
 import sys
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from model import Segment, TranscriptionAdapter, register_adapter
 
+# Parameter counts for GPU footprint estimates; CTranslate2 allocates outside torch
+_PARAMS = [
+    ('distil-large', 756e6), ('distil-medium', 394e6), ('distil-small', 166e6),
+    ('turbo', 809e6), ('large', 1550e6), ('medium', 769e6), ('small', 244e6),
+    ('base', 74e6), ('tiny', 39e6),
+]
+_BYTES_PER_PARAM = {'float32': 4, 'float16': 2, 'bfloat16': 2}
+
+
+def _gpu_size_estimate(model: str, compute_type: str) -> Optional[int]:
+    """Approximate VRAM for a model's weights, or None for unknown models."""
+    name = model.lower()
+    for fragment, params in _PARAMS:
+        if fragment in name:
+            # int8 variants keep 8-bit weights whatever the activation type
+            per_param = 1 if compute_type.startswith('int8') else _BYTES_PER_PARAM.get(compute_type, 2)
+            return int(params * per_param)
+    return None
+
 
 @register_adapter
 class FasterWhisperAdapter(TranscriptionAdapter):
     """Default local transcription using faster-whisper (CTranslate2)."""
 
+    # CTranslate2 models serve concurrent transcribe() calls
+    model_thread_safe = True
+
     @property
     def prefix(self) -> str:
         return ""
@@ -29,20 +51,20 @@ class FasterWhisperAdapter(TranscriptionAdapter):
         from model import MODEL_NAMES
         return list(MODEL_NAMES)
 
-    def transcribe(
+    def _prepare(
         self,
         audio_file: str,
         model: str,
-        language: Optional[str] = None,
-        write: Callable = print,
-        temperature: float = 0.0,
-        device: str = 'cpu',
-        compute_type: str = 'int8',
-        cpu_threads: Optional[int] = None,
-        vad_filter: bool = False,
-        vad_params: Optional[Dict[str, Any]] = None,
-        **kwargs,
-    ) -> Tuple[List[Segment], Any]:
+        language: Optional[str],
+        write: Callable,
+        temperature: float,
+        device: str,
+        compute_type: str,
+        cpu_threads: Optional[int],
+        vad_filter: bool,
+        vad_params: Optional[Dict[str, Any]],
+    ) -> Tuple[Tuple, Callable[[], Any], Dict[str, Any], Optional[int]]:
+        """Return (cache key, loader, transcribe params, size estimate) for a request."""
         import faster_whisper
 
         if device == 'cuda':
@@ -56,13 +78,16 @@ class FasterWhisperAdapter(TranscriptionAdapter):
                 device = 'cpu'
                 compute_type = 'int8'
 
-        whisper_model = faster_whisper.WhisperModel(
-            model,
-            device=device,
-            compute_type=compute_type,
-            device_index=0,
-            cpu_threads=cpu_threads if cpu_threads else os.cpu_count(),
-        )
+        cpu_threads = cpu_threads if cpu_threads else os.cpu_count()
+
+        def load():
+            return faster_whisper.WhisperModel(
+                model,
+                device=device,
+                compute_type=compute_type,
+                device_index=0,
+                cpu_threads=cpu_threads,
+            )
 
         is_distil = 'distil' in model.lower()
         transcribe_params: Dict[str, Any] = {
@@ -85,10 +110,55 @@ class FasterWhisperAdapter(TranscriptionAdapter):
         if temperature and temperature != 0.0:
             transcribe_params['temperature'] = temperature
 
-        result_segments, info = whisper_model.transcribe(**transcribe_params)
+        size_bytes = _gpu_size_estimate(model, compute_type) if device == 'cuda' else None
+        return (model, device, compute_type, cpu_threads), load, transcribe_params, size_bytes
 
+    def transcribe(
+        self,
+        audio_file: str,
+        model: str,
+        language: Optional[str] = None,
+        write: Callable = print,
+        temperature: float = 0.0,
+        device: str = 'cpu',
+        compute_type: str = 'int8',
+        cpu_threads: Optional[int] = None,
+        vad_filter: bool = False,
+        vad_params: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Tuple[List[Segment], Any]:
+        key, load, transcribe_params, size_bytes = self._prepare(
+            audio_file, model, language, write, temperature,
+            device, compute_type, cpu_threads, vad_filter, vad_params,
+        )
         segments: List[Segment] = []
-        for seg in result_segments:
-            segments.append(Segment(start=seg.start, end=seg.end, text=seg.text))
+        with self.cached_model(key, load, write, size_bytes) as whisper_model:
+            result_segments, info = whisper_model.transcribe(**transcribe_params)
+            for seg in result_segments:
+                segments.append(Segment(start=seg.start, end=seg.end, text=seg.text))
 
         return segments, info
+
+    def transcribe_stream(
+        self,
+        audio_file: str,
+        model: str,
+        language: Optional[str] = None,
+        write: Callable = print,
+        temperature: float = 0.0,
+        device: str = 'cpu',
+        compute_type: str = 'int8',
+        cpu_threads: Optional[int] = None,
+        vad_filter: bool = False,
+        vad_params: Optional[Dict[str, Any]] = None,
+        **kwargs,
+    ) -> Iterator[Segment]:
+        key, load, transcribe_params, size_bytes = self._prepare(
+            audio_file, model, language, write, temperature,
+            device, compute_type, cpu_threads, vad_filter, vad_params,
+        )
+        # faster-whisper decodes lazily; the model stays checked out until the generator ends
+        with self.cached_model(key, load, write, size_bytes) as whisper_model:
+            result_segments, _ = whisper_model.transcribe(**transcribe_params)
+            for seg in result_segments:
+                yield Segment(start=seg.start, end=seg.end, text=seg.text)
@@ -13,6 +13,10 @@ class GroqAdapter(TranscriptionAdapter):
     def prefix(self) -> str:
         return "groq"
 
+    @property
+    def is_remote(self) -> bool:
+        return True
+
     @property
     def display_name(self) -> str:
         return "Groq API"
@@ -47,65 +51,43 @@ class GroqAdapter(TranscriptionAdapter):
 
         converted_audio = audio_file
         if not audio_file.lower().endswith(('.wav', '.mp3', '.m4a')):
-            converted_audio = self._convert_to_wav(audio_file, write)
-
-        try:
-            with open(converted_audio, 'rb') as f:
-                files = {'file': (os.path.basename(converted_audio), f)}
-                data: Dict[str, Any] = {'model': model, 'response_format': 'verbose_json'}
-                if language and language != 'none':
-                    data['language'] = language
-                if temperature != 0.0:
-                    data['temperature'] = temperature
-
-            write(f"Transcribing with Groq API using model: {model}")
-            with open(converted_audio, 'rb') as f:
-                files = {'file': (os.path.basename(converted_audio), f)}
-                response = requests.post(
-                    url, headers=headers, files=files, data=data, timeout=300,
-                )
-
-            if response.status_code != 200:
-                raise Exception(f"Groq API error: {response.status_code} - {response.text}")
-
-            result = response.json()
-            segments: List[Segment] = []
-
-            if 'segments' in result and isinstance(result['segments'], list):
-                for seg_data in result['segments']:
-                    segments.append(Segment(
-                        start=seg_data.get('start', 0.0),
-                        end=seg_data.get('end', 0.0),
-                        text=seg_data.get('text', ''),
-                    ))
-            else:
-                text = result.get('text', '')
-                segments = [Segment(start=0.0, end=0.0, text=text)]
-
-            info = type('Info', (), {
-                'duration': 0.0,
-                'language': result.get('language', language),
-            })()
-            return segments, info
-
-        finally:
-            if converted_audio != audio_file and os.path.exists(converted_audio):
-                try:
-                    os.remove(converted_audio)
-                except OSError:
-                    pass
-
-    @staticmethod
-    def _convert_to_wav(audio_file: str, write: Callable = print) -> str:
-        import subprocess
-        converted = audio_file + '.converted.wav'
-        write("Converting audio to WAV format for Groq API...")
-        cmd = [
-            'ffmpeg', '-y', '-i', audio_file,
-            '-acodec', 'pcm_s16le', '-ac', '1', '-ar', '16000',
-            converted,
-        ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Audio conversion failed: {result.stderr}")
-        return converted
+            import pcm_store
+            converted_audio = pcm_store.get_wav(audio_file, write)
+
+        with open(converted_audio, 'rb') as f:
+            files = {'file': (os.path.basename(converted_audio), f)}
+            data: Dict[str, Any] = {'model': model, 'response_format': 'verbose_json'}
+            if language and language != 'none':
+                data['language'] = language
+            if temperature != 0.0:
+                data['temperature'] = temperature
+
+        write(f"Transcribing with Groq API using model: {model}")
+        with open(converted_audio, 'rb') as f:
+            files = {'file': (os.path.basename(converted_audio), f)}
+            response = requests.post(
+                url, headers=headers, files=files, data=data, timeout=300,
+            )
+
+        if response.status_code != 200:
+            raise Exception(f"Groq API error: {response.status_code} - {response.text}")
+
+        result = response.json()
+        segments: List[Segment] = []
+
+        if 'segments' in result and isinstance(result['segments'], list):
+            for seg_data in result['segments']:
+                segments.append(Segment(
+                    start=seg_data.get('start', 0.0),
+                    end=seg_data.get('end', 0.0),
+                    text=seg_data.get('text', ''),
+                ))
+        else:
+            text = result.get('text', '')
+            segments = [Segment(start=0.0, end=0.0, text=text)]
+
+        info = type('Info', (), {
+            'duration': 0.0,
+            'language': result.get('language', language),
+        })()
+        return segments, info
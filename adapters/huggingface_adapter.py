@@ -13,6 +13,10 @@ class HuggingFaceAdapter(TranscriptionAdapter):
     def prefix(self) -> str:
         return "hf"
 
+    @property
+    def is_remote(self) -> bool:
+        return True
+
     @property
     def display_name(self) -> str:
         return "HuggingFace API"
@@ -56,11 +56,13 @@ class MoonshineAdapter(TranscriptionAdapter):
     ) -> Tuple[List[Segment], Any]:
         import moonshine
 
-        write(f"Loading Moonshine model: {model}")
-        asr = moonshine.Moonshine(model_name=model)
+        def load():
+            write(f"Loading Moonshine model: {model}")
+            return moonshine.Moonshine(model_name=model)
 
-        write("Transcribing with Moonshine...")
-        text = asr.transcribe(audio_file)
+        with self.cached_model(('native', model), load, write) as asr:
+            write("Transcribing with Moonshine...")
+            text = asr.transcribe(audio_file)
 
         segments: List[Segment] = [Segment(start=0.0, end=0.0, text=text)]
         info = type('Info', (), {'duration': 0.0, 'language': 'en'})()
@@ -79,29 +81,31 @@ class MoonshineAdapter(TranscriptionAdapter):
 
         hf_model_id = f"UsefulSensors/{model.replace('/', '-')}"
 
-        write(f"Loading Moonshine via HuggingFace: {hf_model_id}")
         torch_device = 'cuda:0' if device == 'cuda' and torch.cuda.is_available() else 'cpu'
         torch_dtype = torch.float16 if torch_device != 'cpu' else torch.float32
 
-        hf_model = AutoModelForSpeechSeq2Seq.from_pretrained(
-            hf_model_id, torch_dtype=torch_dtype, low_cpu_mem_usage=True,
-        )
-        hf_model.to(torch_device)
-
-        processor = AutoProcessor.from_pretrained(hf_model_id)
-
-        pipe = pipeline(
-            'automatic-speech-recognition',
-            model=hf_model,
-            tokenizer=processor.tokenizer,
-            feature_extractor=processor.feature_extractor,
-            torch_dtype=torch_dtype,
-            device=torch_device,
-            return_timestamps=True,
-        )
-
-        write("Transcribing with Moonshine (HuggingFace)...")
-        result = pipe(audio_file)
+        def load():
+            write(f"Loading Moonshine via HuggingFace: {hf_model_id}")
+            hf_model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                hf_model_id, torch_dtype=torch_dtype, low_cpu_mem_usage=True,
+            )
+            hf_model.to(torch_device)
+
+            processor = AutoProcessor.from_pretrained(hf_model_id)
+
+            return pipeline(
+                'automatic-speech-recognition',
+                model=hf_model,
+                tokenizer=processor.tokenizer,
+                feature_extractor=processor.feature_extractor,
+                torch_dtype=torch_dtype,
+                device=torch_device,
+                return_timestamps=True,
+            )
+
+        with self.cached_model(('hf', hf_model_id, torch_device), load, write) as pipe:
+            write("Transcribing with Moonshine (HuggingFace)...")
+            result = pipe(audio_file)
 
         segments: List[Segment] = []
         if 'chunks' in result:
@@ -64,26 +64,28 @@ class ParakeetAdapter(TranscriptionAdapter):
         }
         nemo_id = nemo_model_map.get(model, model)
 
-        write(f"Loading Parakeet model: {nemo_id}")
-        try:
-            asr_model = nemo_asr.models.ASRModel.from_pretrained(
-                model_name=nemo_id,
-            )
-        except Exception as e:
-            err_msg = str(e)
-            if '401' in err_msg or 'Unauthorized' in err_msg or 'Repository Not Found' in err_msg:
-                raise RuntimeError(
-                    f"Cannot access '{nemo_id}' on HuggingFace (gated model). "
-                    f"You need to:\n"
-                    f"  1. Request access at https://huggingface.co/{nemo_id}\n"
-                    f"  2. Set your HF token: huggingface-cli login\n"
-                    f"     or: export HF_TOKEN=your_token\n"
-                    f"Original error: {e}"
-                ) from e
-            raise
+        def load():
+            write(f"Loading Parakeet model: {nemo_id}")
+            try:
+                return nemo_asr.models.ASRModel.from_pretrained(
+                    model_name=nemo_id,
+                )
+            except Exception as e:
+                err_msg = str(e)
+                if '401' in err_msg or 'Unauthorized' in err_msg or 'Repository Not Found' in err_msg:
+                    raise RuntimeError(
+                        f"Cannot access '{nemo_id}' on HuggingFace (gated model). "
+                        f"You need to:\n"
+                        f"  1. Request access at https://huggingface.co/{nemo_id}\n"
+                        f"  2. Set your HF token: huggingface-cli login\n"
+                        f"     or: export HF_TOKEN=your_token\n"
+                        f"Original error: {e}"
+                    ) from e
+                raise
 
-        write("Transcribing with Parakeet...")
-        output = asr_model.transcribe([audio_file], timestamps=True)
+        with self.cached_model((nemo_id,), load, write) as asr_model:
+            write("Transcribing with Parakeet...")
+            output = asr_model.transcribe([audio_file], timestamps=True)
 
         segments: List[Segment] = []
         if output and isinstance(output, list) and len(output) > 0:
@@ -45,29 +45,31 @@ class VibeVoiceAdapter(TranscriptionAdapter):
         }
         hf_model_id = hf_model_map.get(model, model)
 
-        write(f"Loading VibeVoice model: {hf_model_id}")
         torch_device = 'cuda:0' if device == 'cuda' and torch.cuda.is_available() else 'cpu'
         torch_dtype = torch.float16 if torch_device != 'cpu' else torch.float32
 
-        hf_model = AutoModelForSpeechSeq2Seq.from_pretrained(
-            hf_model_id, torch_dtype=torch_dtype, low_cpu_mem_usage=True,
-        )
-        hf_model.to(torch_device)
-
-        processor = AutoProcessor.from_pretrained(hf_model_id)
-
-        pipe = pipeline(
-            'automatic-speech-recognition',
-            model=hf_model,
-            tokenizer=processor.tokenizer,
-            feature_extractor=processor.feature_extractor,
-            torch_dtype=torch_dtype,
-            device=torch_device,
-            return_timestamps=True,
-        )
-
-        write("Transcribing with VibeVoice...")
-        result = pipe(audio_file)
+        def load():
+            write(f"Loading VibeVoice model: {hf_model_id}")
+            hf_model = AutoModelForSpeechSeq2Seq.from_pretrained(
+                hf_model_id, torch_dtype=torch_dtype, low_cpu_mem_usage=True,
+            )
+            hf_model.to(torch_device)
+
+            processor = AutoProcessor.from_pretrained(hf_model_id)
+
+            return pipeline(
+                'automatic-speech-recognition',
+                model=hf_model,
+                tokenizer=processor.tokenizer,
+                feature_extractor=processor.feature_extractor,
+                torch_dtype=torch_dtype,
+                device=torch_device,
+                return_timestamps=True,
+            )
+
+        with self.cached_model((hf_model_id, torch_device), load, write) as pipe:
+            write("Transcribing with VibeVoice...")
+            result = pipe(audio_file)
 
         segments: List[Segment] = []
         if 'chunks' in result:
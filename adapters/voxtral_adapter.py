@@ -45,40 +45,43 @@ class VoxtralAdapter(TranscriptionAdapter):
         }
         hf_model_id = hf_model_map.get(model, model)
 
-        write(f"Loading Voxtral model: {hf_model_id}")
         torch_device = 'cuda:0' if device == 'cuda' and torch.cuda.is_available() else 'cpu'
         torch_dtype = torch.float16 if torch_device != 'cpu' else torch.float32
 
-        processor = AutoProcessor.from_pretrained(hf_model_id)
-        model_obj = VoxtralForConditionalGeneration.from_pretrained(
-            hf_model_id, torch_dtype=torch_dtype, low_cpu_mem_usage=True,
-        )
-        model_obj.to(torch_device)
-
-        write("Transcribing with Voxtral...")
-        inputs = processor(
-            audios=[audio_file],
-            return_tensors='pt',
-            sampling_rate=16000,
-        ).to(torch_device)
-
-        lang_instruction = f"Transcribe the following audio in {language}. " if language else "Transcribe the following audio. "
-        prompt_text = processor.apply_chat_template(
-            [{'role': 'user', 'content': lang_instruction}],
-            tokenize=False,
-            add_generation_prompt=True,
-        )
-        prompt_inputs = processor(text=prompt_text, return_tensors='pt').to(torch_device)
-
-        generate_kwargs = {
-            'max_new_tokens': 4096,
-            'temperature': temperature if temperature > 0 else 0.0,
-        }
-        if temperature == 0.0:
-            generate_kwargs['do_sample'] = False
-
-        output_ids = model_obj.generate(**inputs, **generate_kwargs)
-        text = processor.batch_decode(output_ids, skip_special_tokens=True)[0]
+        def load():
+            write(f"Loading Voxtral model: {hf_model_id}")
+            processor = AutoProcessor.from_pretrained(hf_model_id)
+            model_obj = VoxtralForConditionalGeneration.from_pretrained(
+                hf_model_id, torch_dtype=torch_dtype, low_cpu_mem_usage=True,
+            )
+            model_obj.to(torch_device)
+            return processor, model_obj
+
+        with self.cached_model((hf_model_id, torch_device), load, write) as (processor, model_obj):
+            write("Transcribing with Voxtral...")
+            inputs = processor(
+                audios=[audio_file],
+                return_tensors='pt',
+                sampling_rate=16000,
+            ).to(torch_device)
+
+            lang_instruction = f"Transcribe the following audio in {language}. " if language else "Transcribe the following audio. "
+            prompt_text = processor.apply_chat_template(
+                [{'role': 'user', 'content': lang_instruction}],
+                tokenize=False,
+                add_generation_prompt=True,
+            )
+            prompt_inputs = processor(text=prompt_text, return_tensors='pt').to(torch_device)
+
+            generate_kwargs = {
+                'max_new_tokens': 4096,
+                'temperature': temperature if temperature > 0 else 0.0,
+            }
+            if temperature == 0.0:
+                generate_kwargs['do_sample'] = False
+
+            output_ids = model_obj.generate(**inputs, **generate_kwargs)
+            text = processor.batch_decode(output_ids, skip_special_tokens=True)[0]
 
         segments: List[Segment] = [Segment(start=0.0, end=0.0, text=text.strip())]
         info = type('Info', (), {'duration': 0.0, 'language': language or 'auto'})()
@@ -3,7 +3,7 @@ import os
 import subprocess
 import shutil
 import tempfile
-from typing import Any, Callable, List, Optional, Tuple
+from typing import Any, Callable, Iterator, List, Optional, Tuple
 
 from model import Segment, TranscriptionAdapter, register_adapter
 
@@ -66,84 +66,70 @@ class WhisperCppAdapter(TranscriptionAdapter):
         temperature: float = 0.0,
         **kwargs,
     ) -> Tuple[List[Segment], Any]:
+        segments = list(self.transcribe_stream(audio_file, model, language, write, temperature, **kwargs))
+        info = type('Info', (), {
+            'duration': segments[-1].end if segments else 0.0,
+            'language': language,
+        })()
+        return segments, info
+
+    def transcribe_stream(
+        self,
+        audio_file: str,
+        model: str,
+        language: Optional[str] = None,
+        write: Callable = print,
+        temperature: float = 0.0,
+        **kwargs,
+    ) -> Iterator[Segment]:
         binary = self._find_binary()
         model_file = self._find_model_file(model)
 
-        converted_audio = audio_file
-        needs_conversion = not audio_file.lower().endswith('.wav')
-        if needs_conversion:
-            converted_audio = self._convert_to_wav(audio_file, write)
-
-        try:
-            cmd = [
-                binary,
-                '-m', model_file,
-                '-f', converted_audio,
-                '--output-srt',
-                '-nt',
-            ]
-            if language and language != 'none':
-                cmd.extend(['-l', language])
-            if temperature != 0.0:
-                cmd.extend(['--temp', str(temperature)])
-
-            write(f"Running whisper.cpp: {' '.join(cmd)}")
-            result = subprocess.run(cmd, capture_output=True, text=True, timeout=3600)
-
-            if result.returncode != 0:
-                raise Exception(f"whisper.cpp error: {result.stderr}")
-
-            segments = self._parse_srt_output(result.stdout)
-            info = type('Info', (), {
-                'duration': segments[-1].end if segments else 0.0,
-                'language': language,
-            })()
-            return segments, info
-
-        finally:
-            if needs_conversion and os.path.exists(converted_audio):
-                try:
-                    os.remove(converted_audio)
-                except OSError:
-                    pass
+        # whisper.cpp only reads 16 kHz mono WAV; the store passes those through untouched
+        import pcm_store
+        converted_audio = pcm_store.get_wav(audio_file, write)
 
-    @staticmethod
-    def _convert_to_wav(audio_file: str, write: Callable = print) -> str:
-        converted = audio_file + '.whispercpp.wav'
-        write("Converting audio to WAV for whisper.cpp...")
+        # Timestamped lines on stdout are printed as each segment is decoded
         cmd = [
-            'ffmpeg', '-y', '-i', audio_file,
-            '-acodec', 'pcm_s16le', '-ac', '1', '-ar', '16000',
-            converted,
+            binary,
+            '-m', model_file,
+            '-f', converted_audio,
         ]
-        result = subprocess.run(cmd, capture_output=True, text=True)
-        if result.returncode != 0:
-            raise Exception(f"Audio conversion failed: {result.stderr}")
-        return converted
+        if language and language != 'none':
+            cmd.extend(['-l', language])
+        if temperature != 0.0:
+            cmd.extend(['--temp', str(temperature)])
+
+        write(f"Running whisper.cpp: {' '.join(cmd)}")
+        with tempfile.TemporaryFile(mode='w+') as stderr:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr, text=True)
+            try:
+                for line in process.stdout:
+                    segment = self._parse_stdout_line(line)
+                    if segment is not None:
+                        yield segment
+                process.wait()
+            finally:
+                if process.poll() is None:
+                    process.kill()
+                    process.wait()
+            if process.returncode != 0:
+                stderr.seek(0)
+                raise Exception(f"whisper.cpp error: {stderr.read()}")
 
     @staticmethod
-    def _parse_srt_output(srt_text: str) -> List['Segment']:
+    def _parse_stdout_line(line: str) -> Optional[Segment]:
+        """Parse a '[00:00:01.000 --> 00:00:04.500]  text' line from whisper.cpp."""
         import re
-        from model import Segment
-        segments: List[Segment] = []
-        blocks = srt_text.strip().split('\n\n')
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) >= 3:
-                try:
-                    int(lines[0])
-                    time_match = re.match(
-                        r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})',
-                        lines[1],
-                    )
-                    if time_match:
-                        start = WhisperCppAdapter._srt_to_seconds(time_match.group(1))
-                        end = WhisperCppAdapter._srt_to_seconds(time_match.group(2))
-                        text = '\n'.join(lines[2:]).strip()
-                        segments.append(Segment(start=start, end=end, text=text))
-                except (ValueError, IndexError):
-                    continue
-        return segments
+        match = re.match(
+            r'\s*\[(\d{2}:\d{2}:\d{2}[.,]\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2}[.,]\d{3})\]\s*(.*)',
+            line,
+        )
+        if not match:
+            return None
+        start = WhisperCppAdapter._srt_to_seconds(match.group(1).replace('.', ','))
+        end = WhisperCppAdapter._srt_to_seconds(match.group(2).replace('.', ','))
+        return Segment(start=start, end=end, text=match.group(3).strip())
 
     @staticmethod
     def _srt_to_seconds(time_str: str) -> float:
@@ -1,6 +1,6 @@
 """WhisperXAdapter - WhisperX with forced alignment and diarization."""
 import os
-from typing import Any, Callable, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
 from model import Segment, TranscriptionAdapter, register_adapter
 
@@ -28,6 +28,13 @@ class WhisperXAdapter(TranscriptionAdapter):
         return ["large-v3", "large-v2", "medium", "small", "base", "tiny",
                 "medium.en", "small.en", "base.en", "tiny.en"]
 
+    # Audio is transcribed and aligned one window at a time so segments stream out;
+    # 480 s is about one batch of 16 VAD chunks of up to 30 s, so batches stay full
+    WINDOW_SECONDS = 480
+    # Each cut lands on the quietest 100 ms frame in the last CUT_SEARCH_SECONDS of its window
+    CUT_SEARCH_SECONDS = 20
+    SAMPLE_RATE = 16000
+
     def transcribe(
         self,
         audio_file: str,
@@ -41,6 +48,43 @@ class WhisperXAdapter(TranscriptionAdapter):
         hf_token: Optional[str] = None,
         **kwargs,
     ) -> Tuple[List[Segment], Any]:
+        detected: Dict[str, Any] = {}
+        segments = list(self._stream(
+            audio_file, model, language, write, device, compute_type, diarize, hf_token, detected,
+        ))
+        info = type('Info', (), {
+            'duration': segments[-1].end if segments else 0.0,
+            'language': detected.get('language', language),
+        })()
+        return segments, info
+
+    def transcribe_stream(
+        self,
+        audio_file: str,
+        model: str,
+        language: Optional[str] = None,
+        write: Callable = print,
+        temperature: float = 0.0,
+        device: str = 'cpu',
+        compute_type: str = 'int8',
+        diarize: bool = False,
+        hf_token: Optional[str] = None,
+        **kwargs,
+    ) -> Iterator[Segment]:
+        return self._stream(audio_file, model, language, write, device, compute_type, diarize, hf_token, {})
+
+    def _stream(
+        self,
+        audio_file: str,
+        model: str,
+        language: Optional[str],
+        write: Callable,
+        device: str,
+        compute_type: str,
+        diarize: bool,
+        hf_token: Optional[str],
+        detected: Dict[str, Any],
+    ) -> Iterator[Segment]:
         import whisperx
         import torch
 
@@ -48,55 +92,107 @@ class WhisperXAdapter(TranscriptionAdapter):
         if device == 'cuda' and not torch.cuda.is_available():
             _device = 'cpu'
 
-        write(f"Loading WhisperX model: {model}")
-        whisper_model = whisperx.load_model(
-            model,
-            _device,
-            compute_type=compute_type,
-            language=language,
-        )
+        def load_model():
+            write(f"Loading WhisperX model: {model}")
+            return whisperx.load_model(
+                model,
+                _device,
+                compute_type=compute_type,
+                language=language,
+            )
 
         write("Loading audio...")
         audio = whisperx.load_audio(audio_file)
 
-        write("Transcribing...")
-        result = whisper_model.transcribe(audio, batch_size=16, language=language)
-
-        if language and language != 'none' and result.get('language') != language:
-            write(f"Aligning with language: {result.get('language')}")
-            align_model, metadata = whisperx.load_align_model(
-                language_code=result['language'], device=_device,
-            )
-            result = whisperx.align(
-                result['segments'], align_model, metadata, audio, _device,
+        # Diarization assigns speakers over the whole file, so it cannot stream
+        _hf_token = (hf_token or os.environ.get('HF_TOKEN')) if diarize else None
+        if diarize and not _hf_token:
+            write("HF_TOKEN not set, skipping diarization")
+
+        windows = self._windows(audio)
+        collected: List[Dict[str, Any]] = []
+        with self.cached_model((model, _device, compute_type, language), load_model, write) as whisper_model:
+            for n, (first, last) in enumerate(windows):
+                window = audio[first:last]
+                offset = first / self.SAMPLE_RATE
+                write(f"Transcribing window {n + 1}/{len(windows)}...")
+                result = whisper_model.transcribe(window, batch_size=16,
+                                                  language=detected.get('language', language))
+                # Later windows reuse the first window's detected language
+                detected.setdefault('language', result.get('language', language))
+                aligned = self._align(whisperx, result, window, _device, language, write,
+                                      result.get('segments', []), log=(n == 0))
+                raw_segments = [self._shift(seg, offset) for seg in aligned.get('segments', [])]
+                if _hf_token:
+                    collected.extend(raw_segments)
+                else:
+                    yield from self._to_segments(raw_segments)
+
+        if _hf_token:
+            write("Running diarization...")
+            load_diarize = lambda: whisperx.DiarizationPipeline(
+                use_auth_token=_hf_token, device=_device,
             )
-
-        if diarize:
-            _hf_token = hf_token or os.environ.get('HF_TOKEN')
-            if _hf_token:
-                write("Running diarization...")
-                diarize_model = whisperx.DiarizationPipeline(
-                    use_auth_token=_hf_token, device=_device,
-                )
+            with self.cached_model(('diarize', _device), load_diarize, write) as diarize_model:
                 diarize_segments = diarize_model(audio)
-                result = whisperx.assign_word_speakers(diarize_segments, result)
-            else:
-                write("HF_TOKEN not set, skipping diarization")
+            result = whisperx.assign_word_speakers(diarize_segments, {'segments': collected})
+            yield from self._to_segments(result.get('segments', []))
+
+    def _windows(self, audio) -> List[Tuple[int, int]]:
+        """Split audio into ~WINDOW_SECONDS sample ranges, cutting at quiet frames."""
+        import numpy as np
+        window = self.WINDOW_SECONDS * self.SAMPLE_RATE
+        search = self.CUT_SEARCH_SECONDS * self.SAMPLE_RATE
+        frame = self.SAMPLE_RATE // 10
+        total = len(audio)
+        ranges = []
+        first = 0
+        while total - first > window + search:
+            region = audio[first + window - search:first + window]
+            frames = region[:len(region) // frame * frame].reshape(-1, frame)
+            quietest = int(np.argmin(np.square(frames).mean(axis=1)))
+            cut = first + window - search + quietest * frame + frame // 2
+            ranges.append((first, cut))
+            first = cut
+        ranges.append((first, total))
+        return ranges
+
+    @staticmethod
+    def _shift(seg: Dict[str, Any], offset: float) -> Dict[str, Any]:
+        """Move a window-relative segment (and its words) to file time."""
+        if not offset:
+            return seg
+        seg = dict(seg)
+        for field in ('start', 'end'):
+            if field in seg:
+                seg[field] = seg[field] + offset
+        if seg.get('words'):
+            seg['words'] = [
+                {**w, **{f: w[f] + offset for f in ('start', 'end') if f in w}} for w in seg['words']
+            ]
+        return seg
+
+    def _align(self, whisperx, result, audio, device, language, write, segments, log=True) -> Dict[str, Any]:
+        """Align segments when the requested language differs from the detected one."""
+        if not (language and language != 'none' and result.get('language') != language):
+            return {'segments': segments}
+        if log:
+            write(f"Aligning with language: {result.get('language')}")
+        load_align = lambda: whisperx.load_align_model(
+            language_code=result['language'], device=device,
+        )
+        with self.cached_model(('align', result['language'], device), load_align, write) as (align_model, metadata):
+            return whisperx.align(segments, align_model, metadata, audio, device)
 
-        segments: List[Segment] = []
-        for seg in result.get('segments', []):
+    @staticmethod
+    def _to_segments(raw_segments: List[Dict[str, Any]]) -> Iterator[Segment]:
+        for seg in raw_segments:
             text = seg.get('text', '')
             speaker = seg.get('speaker', '')
             if speaker:
                 text = f"[{speaker}] {text}"
-            segments.append(Segment(
+            yield Segment(
                 start=seg.get('start', 0.0),
                 end=seg.get('end', 0.0),
                 text=text,
-            ))
-
-        info = type('Info', (), {
-            'duration': result.get('segments', [{}])[-1].get('end', 0.0) if segments else 0.0,
-            'language': result.get('language', language),
-        })()
-        return segments, info
+            )
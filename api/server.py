@@ -17,10 +17,10 @@ import jwt
 from typing import Optional, List, Dict, Any, Callable
 from fastapi import FastAPI, BackgroundTasks, HTTPException, Query, WebSocket, WebSocketDisconnect, Depends, Security, Form
 from fastapi.security import APIKeyHeader, APIKeyQuery
+from fastapi import Response
 from fastapi.responses import JSONResponse, FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field
-from concurrent.futures import ThreadPoolExecutor
 import threading
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -31,7 +31,13 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 # Import WhisperSubs
 from whisper_subs import WhisperSubs, add_job, get_jobs, list_jobs as get_job_list
+from scheduler import TaskScheduler
+from cancellation import TaskCancelled
+import cancellation
 import model
+import segment_stream
+import subtitle_catalog
+import task_store
 
 # Configuration
 API_CONFIG_FILE = os.path.join(os.path.dirname(__file__), 'api_config.json')
@@ -244,55 +250,8 @@ async def get_current_user_optional(
 sio = socketio.AsyncServer(async_mode='asgi', cors_allowed_origins='*')
 socket_app = socketio.ASGIApp(sio, app)
 
-# Enhanced thread pool with better resource management
-class PriorityThreadPoolExecutor:
-    """Thread pool executor with priority-based task scheduling"""
-    
-    def __init__(self, max_workers=5):
-        self.max_workers = max_workers
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
-        self.active_tasks = {}
-        self.task_lock = threading.Lock()
-        self.cpu_usage = {}
-        
-    def submit(self, fn, *args, priority=5, task_id=None, **kwargs):
-        """Submit task with priority (higher = more important)"""
-        if task_id:
-            with self.task_lock:
-                self.active_tasks[task_id] = {
-                    'priority': priority,
-                    'started_at': datetime.now(),
-                    'status': 'queued'
-                }
-        
-        def wrapper():
-            if task_id:
-                with self.task_lock:
-                    self.active_tasks[task_id]['status'] = 'running'
-            try:
-                return fn(*args, **kwargs)
-            finally:
-                if task_id:
-                    with self.task_lock:
-                        self.active_tasks.pop(task_id, None)
-        
-        return self.executor.submit(wrapper)
-    
-    def get_active_count(self):
-        """Get number of currently running tasks"""
-        with self.task_lock:
-            return len([t for t in self.active_tasks.values() if t['status'] == 'running'])
-    
-    def shutdown(self, wait=True):
-        """Shutdown the executor"""
-        self.executor.shutdown(wait=wait)
-
-# Global executor with increased workers for better concurrency
-executor = PriorityThreadPoolExecutor(max_workers=8)
-
-# Task queue for batch processing with priority support
-task_queue = asyncio.PriorityQueue()
-task_queue_lock = asyncio.Lock()
+# Priority scheduler: heap-ordered queue with aging, per-user fair share and preemption
+scheduler = TaskScheduler(max_workers=8)
 
 # Rate limiting
 rate_limit_lock = asyncio.Lock()
@@ -300,13 +259,21 @@ rate_limit_tasks = {}  # {client_ip: {'count': int, 'reset_at': datetime}}
 RATE_LIMIT_MAX = 10  # Max concurrent tasks per client
 RATE_LIMIT_WINDOW = 300  # 5 minutes
 
-# Dictionary to track ongoing tasks
-task_status = {}
-task_lock = threading.Lock()
+# Tasks and batches are kept in task_store (SQLite); purge finished ones this often
+TASK_PURGE_INTERVAL = 3600  # 1 hour
 
-# Batch processing state
-batch_status = {}
-batch_lock = threading.Lock()
+# WebSocket: ping after this long without news; drop a client that can't take a message for this long
+WS_PING_INTERVAL = 30
+WS_SEND_TIMEOUT = 30
+
+
+def task_event_handler(task_id: str) -> Callable[[str, Dict[str, Any]], None]:
+    """on_event callback for a task's WhisperSubs: feeds its live stream and its progress field"""
+    def on_event(kind: str, fields: Dict[str, Any]) -> None:
+        segment_stream.publish(task_id, kind, fields)
+        if kind == 'stats' and fields.get('percent') is not None:
+            task_store.update_task(task_id, progress=f"{fields['percent']:.1f}%")
+    return on_event
 
 # Resource monitoring
 resource_lock = threading.Lock()
@@ -357,11 +324,13 @@ class TranscriptionRequest(BaseModel):
     mpv_ipc: bool = Field(False, description="Enable MPV IPC subtitle reload")
     mpv_socket: Optional[str] = Field("/tmp/mpvsocket", description="MPV socket path")
 
+    # Scheduling
+    priority: int = Field(5, ge=1, le=10, description="Task priority (1=lowest, 10=highest)")
+
 
 class TranscriptionRequestAdvanced(TranscriptionRequest):
     """Extended request with batch processing support"""
     batch_id: Optional[str] = Field(None, description="Batch ID for grouping tasks")
-    priority: int = Field(5, ge=1, le=10, description="Task priority (1=lowest, 10=highest)")
 
 
 class BatchTranscriptionRequest(BaseModel):
@@ -438,6 +407,32 @@ class TaskStatusResponse(BaseModel):
     error: Optional[str] = None
     created_at: str
     completed_at: Optional[str] = None
+    queue_position: Optional[int] = None
+    estimated_start: Optional[str] = None
+
+
+@app.on_event("startup")
+async def restore_task_store():
+    """Fail tasks a previous run left unfinished and start aging out old ones"""
+    interrupted = task_store.recover_interrupted()
+    if interrupted:
+        print(f"Marked {interrupted} interrupted task(s) as failed")
+    
+    async def purge_periodically():
+        while True:
+            try:
+                await asyncio.to_thread(task_store.purge)
+            except Exception as e:
+                print(f"Task purge failed: {e}")
+            await asyncio.sleep(TASK_PURGE_INTERVAL)
+    
+    app.state.purge_task = asyncio.create_task(purge_periodically())
+
+
+@app.on_event("startup")
+async def start_subtitle_catalog():
+    """Index OUTPUT_DIR in the background and keep the index current for /subtitles/list"""
+    app.state.subtitle_catalog = subtitle_catalog.start(OUTPUT_DIR)
 
 
 @app.get("/")
@@ -558,8 +553,7 @@ def get_adapter_models():
 @app.get("/adapters")
 def get_adapters():
     """Get list of registered adapters with availability info"""
-    ctx = model.TranscriptionContext()
-    return ctx.list_available_adapters()
+    return model.get_context().list_available_adapters()
 
 
 @app.get("/cache/stats")
@@ -569,6 +563,13 @@ def get_cache_stats():
     return audio_cache.stats()
 
 
+@app.get("/cache/results/stats")
+def get_result_cache_stats():
+    """Get transcript result cache statistics"""
+    import result_cache
+    return result_cache.stats()
+
+
 @app.post("/transcribe", response_model=TaskResponse)
 async def start_transcription(
     request: TranscriptionRequest,
@@ -587,24 +588,24 @@ async def start_transcription(
     task_id = f"task_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
 
     # Create task status entry with extended info
-    with task_lock:
-        task_status[task_id] = {
-            "status": "pending",
-            "source": request.source,
-            "model_name": request.model_name,
-            "created_at": datetime.now().isoformat(),
-            "completed_at": None,
-            "progress": None,
-            "result": None,
-            "error": None,
-            "options": request.dict()
-        }
+    task = task_store.create_task(
+        task_id,
+        status="queued",
+        source=request.source,
+        model_name=request.model_name,
+        user=current_user,
+        priority=request.priority,
+        options=request.dict()
+    )
 
     # Create a WhisperSubs processor with all options
     def run_transcription():
+        # Registered before the status check, so a cancel either finds the token or the status
+        cancel_token = cancellation.register(task_id)
         try:
-            with task_lock:
-                task_status[task_id]["status"] = "processing"
+            if task_store.get_status(task_id) == "cancelled":
+                return
+            task_store.update_task(task_id, status="processing")
             
             # Build WhisperSubs with all parameters
             processor = WhisperSubs(
@@ -629,38 +630,48 @@ async def start_transcription(
                 end_time=request.end_time,
                 # MPV IPC
                 mpv_ipc=request.mpv_ipc,
-                mpv_socket=request.mpv_socket
+                mpv_socket=request.mpv_socket,
+                # Live segments for /ws/{task_id}
+                on_event=task_event_handler(task_id),
+                cancel_token=cancel_token
             )
 
             # Process the source
             job = add_job(request.source, request.model_name)
             processor.process(request.source)
+            if cancel_token.cancelled:
+                # cancel_task has already recorded the status
+                return
 
             # Update task status on completion
-            with task_lock:
-                task_status[task_id]["status"] = "completed"
-                task_status[task_id]["completed_at"] = datetime.now().isoformat()
-                task_status[task_id]["result"] = {
-                    "source": request.source,
-                    "output_directory": OUTPUT_DIR
-                }
+            result = {
+                "source": request.source,
+                "output_directory": OUTPUT_DIR
+            }
+            task_store.finish_task(task_id, "completed", result=result)
+            segment_stream.finish(task_id, "completed", result=result)
             
+        except TaskCancelled:
+            pass
         except Exception as e:
-            with task_lock:
-                task_status[task_id]["status"] = "failed"
-                task_status[task_id]["error"] = str(e)
-                task_status[task_id]["completed_at"] = datetime.now().isoformat()
+            if cancel_token.cancelled:
+                return
+            task_store.finish_task(task_id, "failed", error=str(e))
+            segment_stream.finish(task_id, "failed", error=str(e))
             print(f"Error processing task {task_id}: {e}")
+        finally:
+            cancellation.release(task_id)
 
-    # Run the transcription in a thread
-    background_tasks.add_task(run_transcription)
+    # Interactive requests go ahead of queued batch work
+    scheduler.submit(run_transcription, priority=request.priority, task_id=task_id,
+                     user=current_user, interactive=True)
 
     return TaskResponse(
         task_id=task_id,
-        status="pending",
+        status="queued",
         source=request.source,
         model_name=request.model_name,
-        created_at=task_status[task_id]["created_at"]
+        created_at=task["created_at"]
     )
 
 
@@ -677,18 +688,9 @@ async def start_batch_transcription(
     task_ids = []
     
     # Create batch status entry
-    with batch_lock:
-        batch_status[batch_id] = {
-            "total": len(request.sources),
-            "pending": len(request.sources),
-            "processing": 0,
-            "completed": 0,
-            "failed": 0,
-            "cancelled": 0,
-            "created_at": datetime.now().isoformat(),
-            "completed_at": None,
-            "tasks": []
-        }
+    if task_store.get_batch(batch_id):
+        raise HTTPException(status_code=409, detail="Batch ID already exists")
+    task_store.create_batch(batch_id, len(request.sources), user=current_user)
     
     # Create individual transcription requests for each source
     for idx, source in enumerate(request.sources):
@@ -696,95 +698,62 @@ async def start_batch_transcription(
         task_ids.append(task_id)
         
         # Create task status with batch reference
-        with task_lock:
-            task_status[task_id] = {
-                "status": "queued",
-                "source": source,
-                "model_name": request.model_name,
-                "batch_id": batch_id,
-                "priority": request.priority,
-                "created_at": datetime.now().isoformat(),
-                "completed_at": None,
-                "progress": None,
-                "result": None,
-                "error": None
-            }
-        
-        # Add to batch task list
-        with batch_lock:
-            batch_status[batch_id]["tasks"].append(task_id)
+        task_store.create_task(
+            task_id,
+            status="queued",
+            source=source,
+            model_name=request.model_name,
+            batch_id=batch_id,
+            user=current_user,
+            priority=request.priority
+        )
     
-    # Worker function to process tasks with concurrency limit and priority
+    # Queue every source on the scheduler; the batch's own concurrency is a group limit
     async def process_batch():
-        # Use semaphore for concurrency control
-        semaphore = asyncio.Semaphore(request.concurrent)
-        
-        # Sort sources by priority (could be extended for per-source priority)
-        sorted_sources = list(enumerate(request.sources))
-        
-        async def process_single_task(idx: int, source: str):
-            task_id = task_ids[idx]
-            async with semaphore:
-                # Check if task was cancelled
-                with task_lock:
-                    if task_status.get(task_id, {}).get('status') == 'cancelled':
-                        return
-                
-                # Run transcription in thread pool
-                loop = asyncio.get_event_loop()
-                await loop.run_in_executor(
-                    executor.executor,  # Use underlying executor
-                    run_single_transcription,
-                    task_id,
-                    source,
-                    request,
-                    batch_id,
-                    idx  # Pass index for retry logic
-                )
-        
-        # Create tasks for all sources
-        tasks = [
-            process_single_task(idx, source)
-            for idx, source in sorted_sources
+        futures = [
+            asyncio.wrap_future(scheduler.submit(
+                run_single_transcription, task_ids[idx], source, request, batch_id, idx,
+                priority=request.priority, task_id=task_ids[idx], user=current_user,
+                group=batch_id, group_limit=request.concurrent,
+            ))
+            for idx, source in enumerate(request.sources)
         ]
         
-        # Run all tasks with concurrency limit and exception handling
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        # Wait for all tasks; cancelled ones come back as CancelledError
+        results = await asyncio.gather(*futures, return_exceptions=True)
         
         # Handle any exceptions that weren't caught
         for idx, result in enumerate(results):
             if isinstance(result, Exception):
                 task_id = task_ids[idx]
-                with task_lock:
-                    if task_id in task_status:
-                        task_status[task_id]['status'] = 'failed'
-                        task_status[task_id]['error'] = str(result)
-                        task_status[task_id]['completed_at'] = datetime.now().isoformat()
-                        batch_status[batch_id]['failed'] += 1
-                        batch_status[batch_id]['processing'] = max(0, batch_status[batch_id]['processing'] - 1)
+                task_store.finish_task(task_id, 'failed', error=str(result))
+                segment_stream.finish(task_id, 'failed', error=str(result))
                 print(f"Task {task_id} failed with exception: {result}")
         
-        # Update batch status when all tasks complete
-        with batch_lock:
-            batch_status[batch_id]['completed_at'] = datetime.now().isoformat()
-            # Recalculate counts from tasks
-            completed = sum(1 for tid in task_ids if task_status.get(tid, {}).get('status') == 'completed')
-            failed = sum(1 for tid in task_ids if task_status.get(tid, {}).get('status') == 'failed')
-            batch_status[batch_id]['completed'] = completed
-            batch_status[batch_id]['failed'] = failed
-            batch_status[batch_id]['pending'] = 0
-            batch_status[batch_id]['processing'] = 0
+        # Update batch status when all tasks complete (counts come from the task rows)
+        task_store.finish_batch(batch_id)
+        batch = task_store.get_batch(batch_id)
         
         # Emit batch completion
         await sio.emit('batch_completed', {
             'batch_id': batch_id,
             'total': len(task_ids),
-            'completed': batch_status[batch_id]['completed'],
-            'failed': batch_status[batch_id]['failed']
+            'completed': batch['completed'],
+            'failed': batch['failed']
         })
     
     def run_single_transcription(task_id: str, source: str, request: BatchTranscriptionRequest, batch_id: str, task_index: int):
         """Run single transcription within batch with retry support"""
+        cancel_token = cancellation.register(task_id)
+        try:
+            if task_store.get_status(task_id) != 'cancelled':
+                run_attempts(task_id, source, request, cancel_token)
+        finally:
+            cancellation.release(task_id)
+
+    def run_attempts(task_id: str, source: str, request: BatchTranscriptionRequest,
+                     cancel_token: cancellation.CancelToken):
+        """Try the request's model, then its fallbacks, until one succeeds or the task is cancelled"""
         max_retries = 3 if request.auto_retry_failed else 1
         models_to_try = [request.model_name]
         
@@ -794,14 +763,13 @@ async def start_batch_transcription(
             models_to_try.extend([m for m in fallback_models if m != request.model_name])
         
         for attempt, model_name in enumerate(models_to_try[:max_retries]):
+            if cancel_token.cancelled:
+                return
             try:
-                with task_lock:
-                    if attempt == 0:
-                        task_status[task_id]['status'] = 'processing'
-                        batch_status[batch_id]['processing'] += 1
-                        batch_status[batch_id]['pending'] -= 1
-                    else:
-                        task_status[task_id]['progress'] = f"Retry {attempt}/{max_retries} with {model_name}"
+                if attempt == 0:
+                    task_store.update_task(task_id, status='processing')
+                else:
+                    task_store.update_task(task_id, progress=f"Retry {attempt}/{max_retries} with {model_name}")
                 
                 processor = WhisperSubs(
                     model_name=model_name,
@@ -821,33 +789,32 @@ async def start_batch_transcription(
                     start_time=request.start_time,
                     end_time=request.end_time,
                     mpv_ipc=request.mpv_ipc,
-                    mpv_socket=request.mpv_socket
+                    mpv_socket=request.mpv_socket,
+                    on_event=task_event_handler(task_id),
+                    cancel_token=cancel_token
                 )
                 
                 job = add_job(source, model_name)
                 processor.process(source)
+                if cancel_token.cancelled:
+                    return
                 
-                with task_lock:
-                    task_status[task_id]['status'] = 'completed'
-                    task_status[task_id]['completed_at'] = datetime.now().isoformat()
-                    task_status[task_id]['model_name'] = model_name
-                    batch_status[batch_id]['completed'] += 1
-                    batch_status[batch_id]['processing'] -= 1
+                task_store.finish_task(task_id, 'completed', model_name=model_name)
+                segment_stream.finish(task_id, 'completed', model_name=model_name)
                 
                 # Success - break retry loop
                 break
                 
+            except TaskCancelled:
+                return
             except Exception as e:
+                if cancel_token.cancelled:
+                    return
                 is_last_attempt = attempt >= len(models_to_try) - 1 or attempt >= max_retries - 1
                 
                 if is_last_attempt:
-                    with task_lock:
-                        task_status[task_id]['status'] = 'failed'
-                        task_status[task_id]['error'] = str(e)
-                        task_status[task_id]['completed_at'] = datetime.now().isoformat()
-                        batch_status[batch_id]['failed'] += 1
-                        if batch_status[batch_id]['processing'] > 0:
-                            batch_status[batch_id]['processing'] -= 1
+                    task_store.finish_task(task_id, 'failed', error=str(e))
+                    segment_stream.finish(task_id, 'failed', error=str(e))
                     print(f"Task {task_id} failed after {attempt + 1} attempts: {e}")
                 else:
                     print(f"Task {task_id} attempt {attempt + 1} failed, retrying with {models_to_try[attempt + 1]}...")
@@ -856,79 +823,81 @@ async def start_batch_transcription(
     # Start batch processing in background
     background_tasks.add_task(process_batch)
     
-    return BatchStatusResponse(
-        batch_id=batch_id,
-        total=batch_status[batch_id]["total"],
-        pending=batch_status[batch_id]["pending"],
-        processing=batch_status[batch_id]["processing"],
-        completed=batch_status[batch_id]["completed"],
-        failed=batch_status[batch_id]["failed"],
-        cancelled=batch_status[batch_id]["cancelled"],
-        created_at=batch_status[batch_id]["created_at"],
-        tasks=batch_status[batch_id]["tasks"]
-    )
+    return BatchStatusResponse(**task_store.get_batch(batch_id))
 
 
 @app.get("/batch/{batch_id}", response_model=BatchStatusResponse)
 def get_batch_status(batch_id: str):
     """Get status of a batch transcription"""
-    if batch_id not in batch_status:
+    batch = task_store.get_batch(batch_id)
+    if not batch:
         raise HTTPException(status_code=404, detail="Batch not found")
     
-    batch = batch_status[batch_id]
-    return BatchStatusResponse(
-        batch_id=batch_id,
-        total=batch["total"],
-        pending=batch["pending"],
-        processing=batch["processing"],
-        completed=batch["completed"],
-        failed=batch["failed"],
-        cancelled=batch["cancelled"],
-        created_at=batch["created_at"],
-        completed_at=batch.get("completed_at"),
-        tasks=batch["tasks"]
-    )
+    return BatchStatusResponse(**batch)
 
 
 @app.get("/batches", response_model=List[BatchStatusResponse])
-def list_batches():
-    """List all batch transcriptions"""
-    batches = []
-    for batch_id, batch in batch_status.items():
-        batches.append(BatchStatusResponse(
-            batch_id=batch_id,
-            total=batch["total"],
-            pending=batch["pending"],
-            processing=batch["processing"],
-            completed=batch["completed"],
-            failed=batch["failed"],
-            cancelled=batch["cancelled"],
-            created_at=batch["created_at"],
-            completed_at=batch.get("completed_at"),
-            tasks=batch["tasks"]
-        ))
-    return batches
+def list_batches(
+    response: Response,
+    active: Optional[bool] = Query(None, description="Only unfinished (true) or finished (false) batches"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(task_store.DEFAULT_PAGE_SIZE, ge=1, le=task_store.MAX_PAGE_SIZE)
+):
+    """List batch transcriptions, oldest first; the next page's cursor is in X-Next-Cursor"""
+    try:
+        batches, next_cursor = task_store.list_batches(active=active, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [BatchStatusResponse(**batch) for batch in batches]
 
 
 @app.websocket("/ws/{task_id}")
-async def websocket_endpoint(websocket: WebSocket, task_id: str):
-    """WebSocket endpoint for real-time task progress updates"""
-    await sio.connect(websocket)
+async def websocket_endpoint(websocket: WebSocket, task_id: str, from_segment: int = 0):
+    """WebSocket endpoint for live task progress
+    
+    Sends the task's status, then each segment as it is finalized
+    ({"type": "segment", "index", "start", "end", "text"}), progress
+    ({"type": "stats", "percent", "rtf", "eta", ...}) and rollbacks
+    ({"type": "truncate", "index"}: drop segments from index on), and finally
+    {"type": "status"} when the task ends. Reconnect with ?from_segment=N to
+    continue from segment N.
+    """
+    await websocket.accept()
+    
+    async def send(message):
+        await asyncio.wait_for(websocket.send_json(message), WS_SEND_TIMEOUT)
+    
     try:
-        # Join room for this task
-        await sio.enter_room(task_id)
+        task = task_store.get_task(task_id)
+        if not task:
+            await send({"type": "error", "error": "Task not found"})
+            await websocket.close(code=4404)
+            return
         
         # Send current status
-        if task_id in task_status:
-            await websocket.send_json(task_status[task_id])
+        await send(dict(task, type="status"))
         
-        # Keep connection alive
-        while True:
-            await asyncio.sleep(30)
-            await websocket.send_json({"type": "ping"})
-            
+        stream = segment_stream.get_stream(task_id)
+        if stream is None:
+            if task["status"] in task_store.FINISHED_STATUSES:
+                await websocket.close()
+                return
+            stream = segment_stream.open_stream(task_id)
+        
+        async for messages in stream.follow(from_segment, idle_timeout=WS_PING_INTERVAL):
+            if not messages:
+                await send({"type": "ping"})
+            for message in messages:
+                await send(message)
+        await websocket.close()
+    
     except WebSocketDisconnect:
-        await sio.leave_room(task_id)
+        pass
+    except asyncio.TimeoutError:
+        # Slow consumer: it can reconnect with from_segment and catch up
+        await websocket.close(code=1013)
     except Exception as e:
         print(f"WebSocket error: {e}")
 
@@ -936,19 +905,49 @@ async def websocket_endpoint(websocket: WebSocket, task_id: str):
 @app.get("/tasks/{task_id}/cancel")
 def cancel_task(task_id: str):
     """Cancel a transcription task"""
-    if task_id not in task_status:
+    status = task_store.get_status(task_id)
+    if status is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if task_status[task_id]["status"] in ["completed", "failed"]:
+    if status in ["completed", "failed"]:
         raise HTTPException(status_code=400, detail="Task already completed")
     
-    with task_lock:
-        task_status[task_id]["status"] = "cancelled"
-        task_status[task_id]["completed_at"] = datetime.now().isoformat()
+    task_store.finish_task(task_id, "cancelled")
+    segment_stream.finish(task_id, "cancelled")
+    
+    # Free its place in the queue if it hasn't started, or stop it if it has:
+    # the download is aborted and the transcription worker killed
+    scheduler.cancel(task_id)
+    cancellation.cancel(task_id)
     
     return {"message": f"Task {task_id} cancelled"}
 
 
+# Declared before /subtitles/{filename}, which would otherwise take "list" as a filename
+@app.get("/subtitles/list")
+def list_subtitles(
+    response: Response,
+    source: Optional[str] = Query(None, description="Only paths containing this (case-insensitive)"),
+    prefix: Optional[str] = Query(None, description="Only paths starting with this (case-insensitive)"),
+    sort: str = Query("created", description="Sort by created or path"),
+    order: str = Query("desc", description="asc or desc"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(subtitle_catalog.DEFAULT_PAGE_SIZE, ge=1, le=subtitle_catalog.MAX_PAGE_SIZE)
+):
+    """List subtitle files from the catalog, newest first; the next page's cursor is in X-Next-Cursor"""
+    if order not in ("asc", "desc"):
+        raise HTTPException(status_code=400, detail="order must be asc or desc")
+    catalog = subtitle_catalog.get_catalog() or subtitle_catalog.start(OUTPUT_DIR)
+    try:
+        subtitles, next_cursor = catalog.query(search=source, prefix=prefix, sort=sort,
+                                               descending=order == "desc", cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return subtitles
+
+
 @app.get("/subtitles/{filename}")
 def get_subtitle(filename: str):
     """Download a subtitle file"""
@@ -958,71 +957,65 @@ def get_subtitle(filename: str):
     return FileResponse(file_path, media_type="text/plain", filename=filename)
 
 
-@app.get("/subtitles/list")
-def list_subtitles(source: Optional[str] = None):
-    """List available subtitle files"""
-    subtitles = []
-    if os.path.exists(OUTPUT_DIR):
-        for root, dirs, files in os.walk(OUTPUT_DIR):
-            for file in files:
-                if file.endswith('.srt'):
-                    rel_path = os.path.relpath(os.path.join(root, file), OUTPUT_DIR)
-                    if source is None or source.lower() in rel_path.lower():
-                        subtitles.append({
-                            "filename": file,
-                            "path": rel_path,
-                            "created": datetime.fromtimestamp(os.path.getctime(os.path.join(root, file))).isoformat()
-                        })
-    return sorted(subtitles, key=lambda x: x['created'], reverse=True)
-
-
 @app.delete("/tasks/{task_id}")
 def delete_task(task_id: str):
     """Delete a completed/failed task from history"""
-    if task_id not in task_status:
+    status = task_store.get_status(task_id)
+    if status is None:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    if task_status[task_id]["status"] not in ["completed", "failed", "cancelled"]:
+    if status not in task_store.FINISHED_STATUSES:
         raise HTTPException(status_code=400, detail="Can only delete completed/failed tasks")
     
-    with task_lock:
-        del task_status[task_id]
+    task_store.delete_task(task_id)
     
     return {"message": f"Task {task_id} deleted"}
 
 
+def _task_response(task: Dict[str, Any], **extra) -> TaskStatusResponse:
+    return TaskStatusResponse(
+        task_id=task["task_id"],
+        status=task["status"],
+        progress=task.get("progress"),
+        result=task.get("result"),
+        error=task.get("error"),
+        created_at=task["created_at"],
+        completed_at=task.get("completed_at"),
+        **extra
+    )
+
+
 @app.get("/tasks/{task_id}", response_model=TaskStatusResponse)
 def get_task_status(task_id: str):
     """Get the status of a transcription task"""
-    if task_id not in task_status:
+    task = task_store.get_task(task_id)
+    if not task:
         raise HTTPException(status_code=404, detail="Task not found")
     
-    return TaskStatusResponse(
-        task_id=task_id,
-        status=task_status[task_id]["status"],
-        progress=task_status[task_id].get("progress"),
-        result=task_status[task_id].get("result"),
-        error=task_status[task_id].get("error"),
-        created_at=task_status[task_id]["created_at"],
-        completed_at=task_status[task_id].get("completed_at")
+    estimated_start = scheduler.estimated_start(task_id)
+    return _task_response(
+        task,
+        queue_position=scheduler.position(task_id),
+        estimated_start=estimated_start.isoformat() if estimated_start else None
     )
 
 
 @app.get("/tasks", response_model=List[TaskStatusResponse])
-def list_tasks():
-    """List all tasks"""
-    tasks = []
-    for task_id, details in task_status.items():
-        tasks.append(TaskStatusResponse(
-            task_id=task_id,
-            status=details["status"],
-            progress=details.get("progress"),
-            result=details.get("result"),
-            error=details.get("error"),
-            created_at=details["created_at"],
-            completed_at=details.get("completed_at")
-        ))
-    return tasks
+def list_tasks(
+    response: Response,
+    status: Optional[str] = Query(None, description="Only tasks with this status"),
+    batch_id: Optional[str] = Query(None, description="Only tasks of this batch"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor from the previous page"),
+    limit: int = Query(task_store.DEFAULT_PAGE_SIZE, ge=1, le=task_store.MAX_PAGE_SIZE)
+):
+    """List tasks, oldest first; the next page's cursor is in X-Next-Cursor"""
+    try:
+        tasks, next_cursor = task_store.list_tasks(status=status, batch_id=batch_id, cursor=cursor, limit=limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [_task_response(task) for task in tasks]
 
 
 @app.get("/jobs", response_model=List[Dict[str, Any]])
@@ -1044,30 +1037,21 @@ def health_check():
         resource_stats['disk_usage'] = psutil.disk_usage(OUTPUT_DIR).percent if os.path.exists(OUTPUT_DIR) else 0
         resource_stats['last_update'] = datetime.now().isoformat()
     
-    with task_lock:
-        active_tasks = len([t for t in task_status.values() if t["status"] == "processing"])
-        queued_tasks = len([t for t in task_status.values() if t["status"] == "queued"])
-    
-    with batch_lock:
-        active_batches = len([b for b in batch_status.values() if b.get('completed_at') is None])
+    counts = task_store.status_counts()
+    catalog = subtitle_catalog.get_catalog()
     
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
         "resources": resource_stats.copy(),
         "tasks": {
-            "total": len(task_status),
-            "active": active_tasks,
-            "queued": queued_tasks
+            "total": sum(counts.values()),
+            "active": counts.get("processing", 0),
+            "queued": counts.get("queued", 0)
         },
-        "batches": {
-            "total": len(batch_status),
-            "active": active_batches
-        },
-        "executor": {
-            "max_workers": executor.max_workers,
-            "active_tasks": executor.get_active_count()
-        }
+        "batches": task_store.batch_counts(),
+        "executor": scheduler.stats(),
+        "subtitles": catalog.stats() if catalog else None
     }
 
 
@@ -1103,22 +1087,14 @@ def get_metrics():
     } if disk else {"error": "Output directory not found"}
     
     # Task statistics
-    with task_lock:
-        task_stats = {
-            "total": len(task_status),
-            "by_status": {}
-        }
-        for task in task_status.values():
-            status = task.get('status', 'unknown')
-            task_stats['by_status'][status] = task_stats['by_status'].get(status, 0) + 1
+    by_status = task_store.status_counts()
+    task_stats = {
+        "total": sum(by_status.values()),
+        "by_status": by_status
+    }
     
     # Batch statistics
-    with batch_lock:
-        batch_stats = {
-            "total": len(batch_status),
-            "total_tasks": sum(b['total'] for b in batch_status.values()),
-            "completed_tasks": sum(b.get('completed', 0) for b in batch_status.values())
-        }
+    batch_stats = task_store.batch_counts()
     
     return {
         "timestamp": datetime.now().isoformat(),
@@ -1127,10 +1103,8 @@ def get_metrics():
         "disk": disk_info,
         "tasks": task_stats,
         "batches": batch_stats,
-        "executor": {
-            "max_workers": executor.max_workers,
-            "active": executor.get_active_count()
-        }
+        "executor": scheduler.stats(),
+        "model_cache": model.get_context().model_cache.stats()
     }
 
 
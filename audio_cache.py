@@ -1,39 +1,139 @@
 """
 AudioCache - Persistent disk cache for downloaded/converted audio files.
 
-Stores audio files keyed by source URL hash to avoid re-downloading.
-Evicts files older than 30 days or when the cache exceeds 100 files (LRU).
+Stores audio files keyed by source URL hash to avoid re-downloading. The
+files themselves are content-addressed blobs, so the same audio reached
+through different URLs is stored once. Blobs are linked in and out
+(hardlink, then reflink, then symlink) and only copied when the filesystem
+supports none of those.
+Evicts files older than 30 days, and otherwise least recently used (or least
+frequently used) entries whenever the cache exceeds its byte quota or the disk
+drops below a free-space floor. Entries pinned by a running task are skipped.
+
+The index is a SQLite database in WAL mode: lookups and LRU touches are single
+indexed statements, and writers serialize through transactions, so the API
+server's executor threads and separate CLI processes can share the cache
+safely. A legacy index.json is imported once, on first open.
 """
 import json
 import os
+import sqlite3
+import threading
 import time
+from contextlib import contextmanager
 from typing import Optional, Dict, Any
 
+from sqlite_db import Database, transaction
+
 CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-subs", "audio")
-INDEX_FILE = os.path.join(CACHE_DIR, "index.json")
-MAX_FILES = 100
+INDEX_DB_NAME = "index.db"
+BLOB_DIR_NAME = "blobs"
+LEGACY_INDEX_NAME = "index.json"
 MAX_AGE_DAYS = 30
 
+MAX_BYTES_ENV = "WHISPER_SUBS_AUDIO_CACHE_MB"
+MIN_FREE_ENV = "WHISPER_SUBS_AUDIO_CACHE_MIN_FREE_MB"
+POLICY_ENV = "WHISPER_SUBS_AUDIO_CACHE_POLICY"
+DEFAULT_MAX_MB = 20 * 1024
+DEFAULT_MIN_FREE_MB = 2 * 1024
+POLICIES = ("lru", "lfu")
+# A pin older than this is assumed to belong to a crashed process
+PIN_TTL_SECONDS = 24 * 3600
 
-def _ensure_cache_dir():
-    os.makedirs(CACHE_DIR, exist_ok=True)
 
+def _env_mb(name: str, default: float) -> int:
+    try:
+        return int(float(os.environ.get(name, default)) * 1024 * 1024)
+    except ValueError:
+        return int(default * 1024 * 1024)
+
+
+MAX_BYTES = _env_mb(MAX_BYTES_ENV, DEFAULT_MAX_MB)
+MIN_FREE_BYTES = _env_mb(MIN_FREE_ENV, DEFAULT_MIN_FREE_MB)
+POLICY = os.environ.get(POLICY_ENV, "lru").lower()
+if POLICY not in POLICIES:
+    POLICY = "lru"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    source TEXT,
+    mtime REAL NOT NULL,
+    size INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS entries_mtime ON entries(mtime);
+CREATE INDEX IF NOT EXISTS entries_path ON entries(path);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
 
-def _load_index() -> Dict[str, Any]:
-    _ensure_cache_dir()
-    if os.path.exists(INDEX_FILE):
+# Columns added since the index moved to SQLite; ALTERed into existing databases
+_ADDED_COLUMNS = {
+    "hits": "INTEGER NOT NULL DEFAULT 0",
+    "pins": "INTEGER NOT NULL DEFAULT 0",
+    "pinned_at": "REAL NOT NULL DEFAULT 0",
+}
+_ADDED_INDEXES = "CREATE INDEX IF NOT EXISTS entries_hits ON entries(hits, mtime);"
+
+# Eviction order per policy; both walk an index instead of sorting in Python
+_EVICTION_ORDER = {"lru": "mtime", "lfu": "hits, mtime"}
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection to the index (sqlite3 connections aren't shared)."""
+    return _db.connect(os.path.join(CACHE_DIR, INDEX_DB_NAME))
+
+
+def _add_columns(conn: sqlite3.Connection):
+    with transaction(conn):
+        existing = {row["name"] for row in conn.execute("PRAGMA table_info(entries)")}
+        for name, decl in _ADDED_COLUMNS.items():
+            if name not in existing:
+                conn.execute(f"ALTER TABLE entries ADD COLUMN {name} {decl}")
+        conn.execute(_ADDED_INDEXES)
+
+
+def _bump(conn: sqlite3.Connection, name: str, amount: int = 1):
+    conn.execute(
+        "INSERT INTO counters (name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+        (name, amount),
+    )
+
+
+def _migrate_legacy_index(conn: sqlite3.Connection):
+    """Import index.json into the database once, then move it aside."""
+    legacy = os.path.join(CACHE_DIR, LEGACY_INDEX_NAME)
+    if not os.path.exists(legacy):
+        return
+    with transaction(conn):
+        # Another process may have migrated it while we waited for the lock
+        if not os.path.exists(legacy):
+            return
         try:
-            with open(INDEX_FILE, "r", encoding="utf-8") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return {"entries": {}}
+            with open(legacy, "r", encoding="utf-8") as f:
+                entries = json.load(f).get("entries", {})
+        except (json.JSONDecodeError, OSError, AttributeError):
+            entries = {}
+        conn.executemany(
+            "INSERT OR IGNORE INTO entries (key, path, source, mtime, size) VALUES (?, ?, ?, ?, ?)",
+            [
+                (k, v.get("path", ""), v.get("source", ""), v.get("mtime", 0), v.get("size", 0))
+                for k, v in entries.items() if isinstance(v, dict) and v.get("path")
+            ],
+        )
+        os.replace(legacy, legacy + ".migrated")
+
 
+def _setup(conn: sqlite3.Connection):
+    _add_columns(conn)
+    _migrate_legacy_index(conn)
 
-def _save_index(index: Dict[str, Any]):
-    _ensure_cache_dir()
-    with open(INDEX_FILE, "w", encoding="utf-8") as f:
-        json.dump(index, f, indent=2, ensure_ascii=False)
+
+_db = Database(_SCHEMA, setup=_setup)
 
 
 def _cache_key(source: str) -> str:
@@ -41,81 +141,176 @@ def _cache_key(source: str) -> str:
     return hashlib.sha256(source.encode("utf-8")).hexdigest()[:16]
 
 
-def _evict(index: Dict[str, Any]):
-    entries = index["entries"]
-    now = time.time()
-    max_age_seconds = MAX_AGE_DAYS * 86400
-
-    expired = [
-        k for k, v in entries.items()
-        if now - v.get("mtime", 0) > max_age_seconds or not os.path.exists(v.get("path", ""))
-    ]
-    for k in expired:
-        path = entries[k].get("path", "")
-        if path and os.path.exists(path):
-            try:
-                os.remove(path)
-            except OSError:
-                pass
-        del entries[k]
-
-    while len(entries) > MAX_FILES:
-        oldest_key = min(entries, key=lambda k: entries[k].get("mtime", 0))
-        path = entries[oldest_key].get("path", "")
-        if path and os.path.exists(path):
-            try:
-                os.remove(path)
-            except OSError:
-                pass
-        del entries[oldest_key]
-
-    if expired or len(entries) > MAX_FILES:
-        _save_index(index)
+def _remove_file(path: str):
+    if path and os.path.exists(path):
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
 
-def put(source: str, audio_path: str) -> Optional[str]:
-    """Cache an audio file, returning the cached path (or None on failure).
+def _reflink(src: str, dst: str) -> bool:
+    """Copy-on-write clone (Btrfs, XFS, ...) via the Linux FICLONE ioctl."""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    ficlone = 0x40049409
+    try:
+        with open(src, "rb") as s, open(dst, "wb") as d:
+            fcntl.ioctl(d.fileno(), ficlone, s.fileno())
+        return True
+    except OSError:
+        _remove_file(dst)
+        return False
+
 
-    Copies the file into the cache directory and records it in the index.
-    The original file is NOT removed — the caller decides when to delete it.
+def link_file(src: str, dst: str, allow_symlink: bool = True) -> str:
+    """Make dst a zero-copy view of src where the filesystem allows it.
+
+    Tries a hardlink, a reflink, then (if allow_symlink) a symlink, and only
+    copies as a last resort. dst is replaced atomically. Returns the method
+    used: "hardlink", "reflink", "symlink" or "copy".
     """
-    if not audio_path or not os.path.exists(audio_path):
-        return None
+    import shutil
+    tmp = f"{dst}.{os.getpid()}.{threading.get_ident()}.part"
+    _remove_file(tmp)
+    try:
+        try:
+            os.link(src, tmp)
+            method = "hardlink"
+        except OSError:
+            if _reflink(src, tmp):
+                method = "reflink"
+            elif allow_symlink:
+                try:
+                    os.symlink(os.path.abspath(src), tmp)
+                    method = "symlink"
+                except OSError:
+                    shutil.copy2(src, tmp)
+                    method = "copy"
+            else:
+                shutil.copy2(src, tmp)
+                method = "copy"
+        os.replace(tmp, dst)
+        return method
+    except OSError:
+        _remove_file(tmp)
+        raise
 
-    index = _load_index()
-    _evict(index)
 
-    key = _cache_key(source)
+def _blob_path(audio_path: str) -> str:
+    """Blob named by the full-content sha256, so equal names mean equal audio."""
+    import pcm_store
     ext = os.path.splitext(audio_path)[1] or ".m4a"
-    cached_name = f"{key}{ext}"
-    cached_path = os.path.join(CACHE_DIR, cached_name)
+    return os.path.join(CACHE_DIR, BLOB_DIR_NAME, f"{pcm_store.content_digest(audio_path)}{ext}")
 
-    if os.path.exists(cached_path) and os.path.getsize(cached_path) == os.path.getsize(audio_path):
-        return cached_path
 
-    old_entry = index["entries"].get(key)
-    if old_entry:
-        old_path = old_entry.get("path", "")
-        if old_path and os.path.exists(old_path) and old_path != cached_path:
-            try:
-                os.remove(old_path)
-            except OSError:
-                pass
+def _total_bytes(conn: sqlite3.Connection) -> int:
+    """Bytes on disk: each blob counts once however many entries share it."""
+    return conn.execute(
+        "SELECT COALESCE(SUM(size), 0) FROM (SELECT MAX(size) AS size FROM entries GROUP BY path)"
+    ).fetchone()[0]
 
+
+def _drop(conn: sqlite3.Connection, key: str, path: str) -> bool:
+    """Delete an entry; True if that left its blob unreferenced."""
+    conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+    return conn.execute("SELECT 1 FROM entries WHERE path = ? LIMIT 1", (path,)).fetchone() is None
+
+
+def _free_bytes() -> int:
+    import shutil
     try:
-        import shutil
-        shutil.copy2(audio_path, cached_path)
+        return shutil.disk_usage(CACHE_DIR).free
     except OSError:
+        return MIN_FREE_BYTES
+
+
+def _evict(conn: sqlite3.Connection, incoming: int = 0):
+    """Drop expired entries, then evict by POLICY until the new file fits.
+
+    "Fits" means the cache stays within MAX_BYTES and at least MIN_FREE_BYTES
+    of the disk stays free after adding incoming bytes. Pinned entries are
+    never evicted, and a blob is only freed with the last entry using it.
+    """
+    now = time.time()
+    cutoff = now - MAX_AGE_DAYS * 86400
+    unpinned = "(pins = 0 OR pinned_at < ?)"
+    orphaned = []
+    with transaction(conn):
+        doomed = conn.execute(
+            f"SELECT key, path, size FROM entries WHERE mtime < ? AND {unpinned}",
+            (cutoff, now - PIN_TTL_SECONDS),
+        ).fetchall()
+        for row in doomed:
+            if _drop(conn, row["key"], row["path"]):
+                orphaned.append(row)
+        freed = sum(row["size"] for row in orphaned)
+        needed = max(_total_bytes(conn) + incoming - MAX_BYTES,
+                     MIN_FREE_BYTES - (_free_bytes() + freed - incoming))
+        if needed > 0:
+            candidates = conn.execute(
+                f"SELECT key, path, size FROM entries WHERE {unpinned} "
+                f"ORDER BY {_EVICTION_ORDER[POLICY]}",
+                (now - PIN_TTL_SECONDS,),
+            ).fetchall()
+            reclaimed = 0
+            for row in candidates:
+                if reclaimed >= needed:
+                    break
+                doomed.append(row)
+                if _drop(conn, row["key"], row["path"]):
+                    orphaned.append(row)
+                    reclaimed += row["size"]
+        if doomed:
+            _bump(conn, "evictions", len(doomed))
+            _bump(conn, "bytes_reclaimed", sum(row["size"] for row in orphaned))
+    # Files go after the commit; a reader holding the old row just sees a miss
+    for row in orphaned:
+        _remove_file(row["path"])
+
+
+def put(source: str, audio_path: str) -> Optional[str]:
+    """Cache an audio file, returning the cached path (or None on failure).
+
+    The file is linked into the blob store (copied only if linking fails)
+    and recorded in the index. The original file is NOT removed — the caller
+    decides when to delete it; a hardlinked blob survives that.
+    """
+    if not audio_path or not os.path.exists(audio_path):
         return None
 
-    index["entries"][key] = {
-        "path": cached_path,
-        "source": source[:200],
-        "mtime": time.time(),
-        "size": os.path.getsize(cached_path) if os.path.exists(cached_path) else 0,
-    }
-    _save_index(index)
-    return cached_path
+    size = os.path.getsize(audio_path)
+    if size > MAX_BYTES:
+        return None
+
+    conn = _connect()
+    key = _cache_key(source)
+    blob_path = _blob_path(audio_path)
+
+    if not (os.path.exists(blob_path) and os.path.getsize(blob_path) == size):
+        _evict(conn, incoming=size)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        try:
+            # No symlinks: the caller is about to delete audio_path
+            link_file(audio_path, blob_path, allow_symlink=False)
+        except OSError:
+            return None
+
+    with transaction(conn):
+        old = conn.execute("SELECT path FROM entries WHERE key = ?", (key,)).fetchone()
+        conn.execute(
+            "INSERT INTO entries (key, path, source, mtime, size) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(key) DO UPDATE SET path = excluded.path, source = excluded.source, "
+            "mtime = excluded.mtime, size = excluded.size",
+            (key, blob_path, source[:200], time.time(), size),
+        )
+        orphaned = old is not None and old["path"] != blob_path and conn.execute(
+            "SELECT 1 FROM entries WHERE path = ? LIMIT 1", (old["path"],)).fetchone() is None
+    if orphaned:
+        _remove_file(old["path"])
+    return blob_path
 
 
 def get(source: str) -> Optional[str]:
@@ -124,44 +319,89 @@ def get(source: str) -> Optional[str]:
     Returns the cached file path if it exists and is not expired, else None.
     Also updates mtime (LRU touch).
     """
-    index = _load_index()
+    conn = _connect()
     key = _cache_key(source)
-    entry = index["entries"].get(key)
-    if not entry:
-        return None
-
-    path = entry.get("path", "")
-    if not path or not os.path.exists(path):
-        del index["entries"][key]
-        _save_index(index)
+    row = conn.execute("SELECT path, mtime FROM entries WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        _bump(conn, "misses")
         return None
 
+    path = row["path"]
     now = time.time()
-    if now - entry.get("mtime", 0) > MAX_AGE_DAYS * 86400:
-        try:
-            os.remove(path)
-        except OSError:
-            pass
-        del index["entries"][key]
-        _save_index(index)
+    if not os.path.exists(path) or now - row["mtime"] > MAX_AGE_DAYS * 86400:
+        with transaction(conn):
+            # Match on path too, so a concurrent put() of a fresh file survives
+            conn.execute("DELETE FROM entries WHERE key = ? AND path = ?", (key, path))
+            orphaned = conn.execute("SELECT 1 FROM entries WHERE path = ? LIMIT 1", (path,)).fetchone() is None
+            _bump(conn, "misses")
+        if orphaned:
+            _remove_file(path)
         return None
 
-    entry["mtime"] = now
-    _save_index(index)
+    conn.execute("UPDATE entries SET mtime = ?, hits = hits + 1 WHERE key = ?", (now, key))
+    _bump(conn, "hits")
     return path
 
 
+def pin(source: str):
+    """Protect source's entry from eviction until unpin() (pins nest)."""
+    _connect().execute(
+        "UPDATE entries SET pins = pins + 1, pinned_at = ? WHERE key = ?",
+        (time.time(), _cache_key(source)),
+    )
+
+
+def unpin(source: str):
+    _connect().execute(
+        "UPDATE entries SET pins = MAX(pins - 1, 0) WHERE key = ?", (_cache_key(source),)
+    )
+
+
+def fetch(source: str, dest_dir: str) -> Optional[str]:
+    """Look up source and link its audio into dest_dir; return the new path.
+
+    Uses link_file(), so a hit costs no copy on filesystems with hardlinks,
+    reflinks or symlinks. The caller owns (and may delete) the returned path.
+    """
+    cached = get(source)
+    if cached is None:
+        return None
+    dest = os.path.join(dest_dir, os.path.basename(cached))
+    if not (os.path.exists(dest) and os.path.samefile(dest, cached)):
+        link_file(cached, dest)
+    return dest
+
+
+@contextmanager
+def pinned(source: str):
+    """Context manager form of pin()/unpin()."""
+    pin(source)
+    try:
+        yield
+    finally:
+        unpin(source)
+
+
 def stats() -> Dict[str, Any]:
     """Return cache statistics."""
-    index = _load_index()
-    entries = index["entries"]
-    total_size = sum(e.get("size", 0) for e in entries.values())
-    existing = sum(1 for e in entries.values() if os.path.exists(e.get("path", "")))
+    conn = _connect()
+    row = conn.execute(
+        "SELECT COUNT(*), COUNT(DISTINCT path), COALESCE(SUM(pins > 0), 0) FROM entries"
+    ).fetchone()
+    counters = {name: 0 for name in ("hits", "misses", "evictions", "bytes_reclaimed")}
+    counters.update({r["name"]: r["value"] for r in conn.execute("SELECT name, value FROM counters")})
+    lookups = counters["hits"] + counters["misses"]
     return {
-        "total_entries": len(entries),
-        "existing_files": existing,
-        "total_size_bytes": total_size,
+        "total_entries": row[0],
+        "blobs": row[1],
+        "total_size_bytes": _total_bytes(conn),
+        "pinned_entries": row[2],
+        **counters,
+        "hit_ratio": round(counters["hits"] / lookups, 3) if lookups else 0.0,
         "cache_dir": CACHE_DIR,
-        "max_files": MAX_FILES,
+        "max_bytes": MAX_BYTES,
+        "min_free_bytes": MIN_FREE_BYTES,
+        "free_bytes": _free_bytes(),
+        "policy": POLICY,
         "max_age_days": MAX_AGE_DAYS,
     }
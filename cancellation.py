@@ -0,0 +1,110 @@
+"""
+Cancellation - Stop a running task and give back what it holds.
+
+A CancelToken is handed down from whoever owns a task (the API, a CLI run)
+through WhisperSubs into the download and transcription code. Cancelling it
+makes every layer stop at its next check, and runs the callbacks registered
+with on_cancel() straight away: that is how blocking work is interrupted,
+e.g. the worker pool kills the worker process it is waiting on, which drops
+the loaded model with it.
+
+Code that notices the token raises TaskCancelled; the task's own cleanup
+(temp audio, cache pins, .part files) runs on the way out as for any other
+failure, but the task is reported as cancelled rather than failed.
+
+The module-level registry maps task ids to tokens, so a cancel request can
+reach a task that is already running.
+"""
+import threading
+from typing import Callable, Dict, List, Optional
+
+
+class TaskCancelled(Exception):
+    def __init__(self, message: str = "Task cancelled"):
+        super().__init__(message)
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: List[Callable[[], None]] = []
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self) -> bool:
+        """Cancel and run the registered callbacks; False if already cancelled."""
+        with self._lock:
+            if self._event.is_set():
+                return False
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+        return True
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise TaskCancelled()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Sleep up to timeout seconds; True if cancelled meanwhile."""
+        return self._event.wait(timeout)
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """Run callback on cancel (now, if already cancelled). Returns an unregister function."""
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                registered = True
+            else:
+                registered = False
+        if not registered:
+            try:
+                callback()
+            except Exception:
+                pass
+
+        def unregister():
+            with self._lock:
+                try:
+                    self._callbacks.remove(callback)
+                except ValueError:
+                    pass
+        return unregister
+
+
+def check(token: Optional[CancelToken]):
+    """raise_if_cancelled() for an optional token."""
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+_tokens: Dict[str, CancelToken] = {}
+_tokens_lock = threading.Lock()
+
+
+def register(key: str) -> CancelToken:
+    """The token for key, created if needed."""
+    with _tokens_lock:
+        token = _tokens.get(key)
+        if token is None:
+            token = _tokens[key] = CancelToken()
+        return token
+
+
+def cancel(key: str) -> bool:
+    """Cancel the task registered under key; False if it has no token."""
+    with _tokens_lock:
+        token = _tokens.get(key)
+    return token.cancel() if token is not None else False
+
+
+def release(key: str):
+    with _tokens_lock:
+        _tokens.pop(key, None)
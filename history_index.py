@@ -0,0 +1,107 @@
+"""
+HistoryIndex - In-memory index over history.txt, the processed-video log.
+
+history.txt stays the store: one "<unique_id> <model>" line per finished
+transcription, only ever appended to. The index reads the file once per
+process and afterwards only the bytes appended since (by this process or any
+other), keeping for each id the best model rank seen in each language tier.
+Lookups are then a dict access instead of a scan of the whole file.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+ENGLISH, MULTILINGUAL = 'en', 'multi'
+
+
+def _rank(model_name: str) -> int:
+    from model import getIndex
+    return getIndex(model_name)
+
+
+class HistoryIndex:
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        # unique_id -> {tier: best model index}; ids with unknown models map to {}
+        self._best: Dict[str, Dict[str, int]] = {}
+        self._offset = 0
+        self._inode = None
+
+    def _refresh(self):
+        """Read lines appended since the last refresh (all of them the first time)."""
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._best, self._offset, self._inode = {}, 0, None
+            return
+        if st.st_ino != self._inode or st.st_size < self._offset:
+            # Replaced or truncated: start over
+            self._best, self._offset, self._inode = {}, 0, st.st_ino
+        if st.st_size == self._offset:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._offset)
+            data = f.read(st.st_size - self._offset)
+        # A writer may be mid-line; leave the unterminated tail for next time
+        end = data.rfind(b'\n') + 1
+        for line in data[:end].decode('utf-8', errors='replace').splitlines():
+            parts = line.split()
+            if parts:
+                self._record(parts[0], parts[1] if len(parts) > 1 else None)
+        self._offset += end
+
+    def _record(self, unique_id: str, model_name: Optional[str]):
+        tiers = self._best.setdefault(unique_id, {})
+        if not model_name:
+            return
+        index = _rank(model_name)
+        if index == -1:
+            return
+        tier = ENGLISH if '.en' in model_name else MULTILINGUAL
+        if index > tiers.get(tier, -1):
+            tiers[tier] = index
+
+    def __contains__(self, unique_id: str) -> bool:
+        with self._lock:
+            self._refresh()
+            return unique_id in self._best
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._best)
+
+    def best_ranks(self, unique_id: str) -> Dict[str, int]:
+        """Best model index per tier ('en', 'multi') recorded for unique_id."""
+        with self._lock:
+            self._refresh()
+            return dict(self._best.get(unique_id, {}))
+
+    def add(self, unique_id: str, model_name: str):
+        """Append one history line; a single O_APPEND write so lines never interleave."""
+        line = f"{unique_id} {model_name}\n".encode('utf-8')
+        with self._lock:
+            self._refresh()
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            try:
+                if os.fstat(fd).st_size > self._offset:
+                    # The file ends in an unterminated line (edited by hand); don't glue onto it
+                    line = b'\n' + line
+                os.write(fd, line)
+            finally:
+                os.close(fd)
+
+
+_indexes: Dict[str, HistoryIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(path: str) -> HistoryIndex:
+    """Shared index for path, one per process."""
+    path = os.path.abspath(path)
+    with _indexes_lock:
+        if path not in _indexes:
+            _indexes[path] = HistoryIndex(path)
+        return _indexes[path]
@@ -0,0 +1,231 @@
+"""
+JobStore - Persistent transcription jobs and their per-task progress.
+
+Jobs and tasks are rows in a SQLite database (WAL) next to the other
+WhisperSubs config, so a task status change is a single-row UPDATE rather
+than a rewrite of every job, and the CLI, the API server's threads and the
+pipeline stages can all record progress concurrently. Task order is kept by
+a per-job sequence number, so a job still reads back exactly as it did from
+jobs.json. A legacy jobs.json is imported once, on first open, and moved
+aside.
+"""
+import datetime
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from sqlite_db import Database, transaction
+
+STORE_DIR = os.path.join(os.path.expanduser("~"), ".config", "WhisperSubs")
+DB_NAME = "jobs.db"
+LEGACY_JOBS_NAME = "jobs.json"
+FINISHED_STATUSES = ("completed", "failed")
+DONE_TASK_STATUSES = ("completed", "skipped")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    model TEXT,
+    source TEXT,
+    status TEXT NOT NULL,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, id);
+CREATE TABLE IF NOT EXISTS tasks (
+    job_id INTEGER NOT NULL REFERENCES jobs(id) ON DELETE CASCADE,
+    seq INTEGER NOT NULL,
+    source TEXT NOT NULL,
+    title TEXT,
+    status TEXT NOT NULL,
+    PRIMARY KEY (job_id, source)
+);
+CREATE INDEX IF NOT EXISTS tasks_order ON tasks(job_id, seq);
+"""
+
+_JOB_COLUMNS = ("date", "model", "source", "status")
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection to the job database."""
+    return _db.connect(os.path.join(STORE_DIR, DB_NAME))
+
+
+def _insert_job(conn: sqlite3.Connection, job: Dict[str, Any]) -> int:
+    extra = {k: v for k, v in job.items() if k not in _JOB_COLUMNS + ("id", "tasks")}
+    cur = conn.execute(
+        "INSERT INTO jobs (id, date, model, source, status, extra) VALUES (?, ?, ?, ?, ?, ?)",
+        (job.get("id"), job.get("date") or datetime.datetime.now().isoformat(), job.get("model"),
+         json.dumps(job.get("source")), job.get("status", "initializing"), json.dumps(extra)),
+    )
+    return cur.lastrowid
+
+
+def _replace_tasks(conn: sqlite3.Connection, job_id: int, tasks: List[Dict[str, Any]]):
+    conn.execute("DELETE FROM tasks WHERE job_id = ?", (job_id,))
+    rows = {}
+    for task in tasks:
+        # Later entries for a source win, as add_task would have left them
+        rows.pop(task["source"], None)
+        rows[task["source"]] = (task.get("title"), task.get("status", "pending"))
+    conn.executemany(
+        "INSERT INTO tasks (job_id, seq, source, title, status) VALUES (?, ?, ?, ?, ?)",
+        [(job_id, seq, source, title, status) for seq, (source, (title, status)) in enumerate(rows.items())],
+    )
+
+
+def _migrate_legacy_jobs(conn: sqlite3.Connection):
+    """Import jobs.json into the database once, then move it aside."""
+    legacy = os.path.join(STORE_DIR, LEGACY_JOBS_NAME)
+    if not os.path.exists(legacy):
+        return
+    with transaction(conn):
+        # Another process may have migrated it while we waited for the lock
+        if not os.path.exists(legacy):
+            return
+        try:
+            with open(legacy, "r", encoding="utf-8") as f:
+                jobs = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            jobs = []
+        for job in jobs if isinstance(jobs, list) else []:
+            if not isinstance(job, dict) or conn.execute(
+                    "SELECT 1 FROM jobs WHERE id = ?", (job.get("id"),)).fetchone():
+                continue
+            job_id = _insert_job(conn, job)
+            _replace_tasks(conn, job_id, [t for t in job.get("tasks", []) if isinstance(t, dict) and "source" in t])
+        os.replace(legacy, legacy + ".migrated")
+
+
+_db = Database(_SCHEMA, pragmas=("foreign_keys=ON",), setup=_migrate_legacy_jobs)
+
+
+def _job_dict(row: sqlite3.Row, tasks: Optional[List[Dict[str, Any]]] = None) -> Dict[str, Any]:
+    job = {
+        "id": row["id"],
+        "date": row["date"],
+        "model": row["model"],
+        "source": json.loads(row["source"]) if row["source"] else None,
+        "status": row["status"],
+    }
+    job.update(json.loads(row["extra"] or "{}"))
+    if tasks is not None:
+        job["tasks"] = tasks
+    return job
+
+
+def _tasks_for(conn: sqlite3.Connection, job_ids: List[int]) -> Dict[int, List[Dict[str, Any]]]:
+    tasks: Dict[int, List[Dict[str, Any]]] = {job_id: [] for job_id in job_ids}
+    if not job_ids:
+        return tasks
+    marks = ",".join("?" * len(job_ids))
+    for row in conn.execute(
+            f"SELECT job_id, source, title, status FROM tasks WHERE job_id IN ({marks}) ORDER BY job_id, seq",
+            job_ids):
+        tasks[row["job_id"]].append({"source": row["source"], "status": row["status"], "title": row["title"]})
+    return tasks
+
+
+def add_job(source, model_name: str) -> Dict[str, Any]:
+    """Create a job and return it as a dict (with an empty task list)."""
+    conn = _connect()
+    job = {
+        "date": datetime.datetime.now().isoformat(),
+        "model": model_name,
+        "source": source,
+        "status": "initializing",
+    }
+    with transaction(conn):
+        job_id = _insert_job(conn, job)
+    return dict(job, id=job_id, tasks=[])
+
+
+def get_job(job_id: int) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    row = conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    return _job_dict(row, _tasks_for(conn, [job_id])[job_id])
+
+
+def get_jobs() -> List[Dict[str, Any]]:
+    """Every job with its tasks, oldest first."""
+    conn = _connect()
+    rows = conn.execute("SELECT * FROM jobs ORDER BY id").fetchall()
+    tasks = _tasks_for(conn, [row["id"] for row in rows])
+    return [_job_dict(row, tasks[row["id"]]) for row in rows]
+
+
+def update_job(job_id: int, updates: Dict[str, Any]):
+    """Merge updates into a job; a "tasks" list replaces the job's tasks."""
+    conn = _connect()
+    with transaction(conn):
+        row = conn.execute("SELECT extra FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        if row is None:
+            return
+        extra = json.loads(row["extra"] or "{}")
+        for key, value in updates.items():
+            if key == "tasks":
+                _replace_tasks(conn, job_id, value)
+            elif key in _JOB_COLUMNS:
+                conn.execute(f"UPDATE jobs SET {key} = ? WHERE id = ?",
+                             (json.dumps(value) if key == "source" else value, job_id))
+            elif key != "id":
+                extra[key] = value
+        conn.execute("UPDATE jobs SET extra = ? WHERE id = ?", (json.dumps(extra), job_id))
+
+
+def add_task(job_id: int, task: Dict[str, Any]):
+    """Record a discovered task, replacing an unfinished entry for the same source."""
+    conn = _connect()
+    with transaction(conn):
+        seq = conn.execute("SELECT COALESCE(MAX(seq), -1) + 1 FROM tasks WHERE job_id = ?", (job_id,)).fetchone()[0]
+        conn.execute(
+            "INSERT INTO tasks (job_id, seq, source, title, status) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(job_id, source) DO UPDATE SET seq = excluded.seq, title = excluded.title, "
+            "status = excluded.status",
+            (job_id, seq, task["source"], task.get("title"), task.get("status", "pending")),
+        )
+
+
+def update_task_status(job_id: int, task_source: str, status: str, title: Optional[str] = None):
+    conn = _connect()
+    if title:
+        conn.execute("UPDATE tasks SET status = ?, title = ? WHERE job_id = ? AND source = ?",
+                     (status, title, job_id, task_source))
+    else:
+        conn.execute("UPDATE tasks SET status = ? WHERE job_id = ? AND source = ?",
+                     (status, job_id, task_source))
+
+
+def get_last_unfinished_job() -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    marks = ",".join("?" * len(FINISHED_STATUSES))
+    row = conn.execute(
+        f"SELECT id FROM jobs WHERE status NOT IN ({marks}) ORDER BY id DESC LIMIT 1", FINISHED_STATUSES
+    ).fetchone()
+    return get_job(row["id"]) if row else None
+
+
+def job_summaries() -> List[Dict[str, Any]]:
+    """Jobs without their task lists, with total and done task counts."""
+    conn = _connect()
+    marks = ",".join("?" * len(DONE_TASK_STATUSES))
+    rows = conn.execute(
+        f"SELECT j.*, COUNT(t.source) AS total_tasks, "
+        f"COALESCE(SUM(t.status IN ({marks})), 0) AS done_tasks "
+        f"FROM jobs j LEFT JOIN tasks t ON t.job_id = j.id GROUP BY j.id ORDER BY j.id",
+        DONE_TASK_STATUSES,
+    ).fetchall()
+    return [dict(_job_dict(row), total_tasks=row["total_tasks"], done_tasks=row["done_tasks"]) for row in rows]
+
+
+def compact():
+    """Fold the WAL back into the database; vacuum once a quarter of it is free pages."""
+    conn = _connect()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+    pages = conn.execute("PRAGMA page_count").fetchone()[0]
+    if pages and free * 4 >= pages:
+        conn.execute("VACUUM")
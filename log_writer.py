@@ -0,0 +1,201 @@
+"""
+LogWriter - Queue-backed background writer for the WhisperSubs log.
+
+Callers only put a record on a queue; a daemon thread drains it in batches,
+prints what passes the console level and appends everything that passes the
+file level to the log file as JSON lines ({"ts", "level", "msg", ...fields}),
+rotating the file by size. Chatty sources such as the worker's per-segment
+"Out:" lines then cost a queue put on the transcription thread instead of a
+print, an open, a write and a close.
+
+Fields set with context() (task id, stage) are attached to every record
+logged from that thread.
+"""
+import atexit
+import datetime
+import json
+import os
+import queue
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+LEVELS = {"DEBUG": 10, "INFO": 20, "WARNING": 30, "ERROR": 40}
+
+CONSOLE_LEVEL_ENV = "WHISPER_SUBS_LOG_LEVEL"
+MAX_BYTES_ENV = "WHISPER_SUBS_LOG_MB"
+DEFAULT_MAX_MB = 10
+BACKUP_COUNT = 3
+BATCH_SIZE = 500
+
+_STOP = object()
+_context = threading.local()
+
+
+def _level(name: Optional[str], default: str) -> int:
+    return LEVELS.get((name or default).upper(), LEVELS[default])
+
+
+def level_of(message: str) -> str:
+    """Guess a level for plain write-callback messages."""
+    # Worker stderr arrives as "Error: <line>"; faster-whisper's own records are "DEBUG:faster_whisper:..."
+    body = message[7:] if message.startswith("Error: ") else message
+    if body.startswith("Out: "):
+        body = body[5:]
+    if body.startswith("DEBUG:"):
+        return "DEBUG"
+    if message.startswith("Error") or message.startswith("ERROR"):
+        return "ERROR"
+    if message.startswith("Warning") or message.startswith("WARNING"):
+        return "WARNING"
+    return "INFO"
+
+
+@contextmanager
+def context(**fields):
+    """Attach fields (e.g. task, stage) to records logged from this thread."""
+    saved = getattr(_context, "fields", {})
+    _context.fields = dict(saved, **fields)
+    try:
+        yield
+    finally:
+        _context.fields = saved
+
+
+def current_context() -> Dict[str, Any]:
+    return dict(getattr(_context, "fields", {}))
+
+
+class LogWriter:
+    def __init__(
+        self,
+        path: Optional[str],
+        console: bool = True,
+        console_level: Optional[str] = None,
+        file_level: str = "DEBUG",
+        max_bytes: Optional[int] = None,
+        backups: int = BACKUP_COUNT,
+    ):
+        self.path = path
+        self.console = console
+        self.console_level = _level(console_level or os.environ.get(CONSOLE_LEVEL_ENV), "INFO")
+        self.file_level = _level(file_level, "DEBUG")
+        if max_bytes is None:
+            try:
+                max_bytes = int(float(os.environ.get(MAX_BYTES_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+            except ValueError:
+                max_bytes = DEFAULT_MAX_MB * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+        self._file = None
+        self._size = 0
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def log(self, message: Any, level: str = "INFO", **fields):
+        """Queue one record; formatting and I/O happen on the writer thread."""
+        self._queue.put((datetime.datetime.now(), level.upper(), str(message), fields))
+
+    def flush(self, timeout: float = 5.0):
+        """Block until everything queued so far has been written."""
+        done = threading.Event()
+        self._queue.put(done)
+        done.wait(timeout)
+
+    def close(self):
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(5)
+
+    def _run(self):
+        while True:
+            # Block for one record, then take whatever else piled up meanwhile
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < BATCH_SIZE:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            records = [item for item in batch if isinstance(item, tuple)]
+            if records:
+                try:
+                    self._write(records)
+                except Exception as e:
+                    sys.stderr.write(f"Log writer failed: {e}\n")
+            for item in batch:
+                if isinstance(item, threading.Event):
+                    item.set()
+            if any(item is _STOP for item in batch):
+                if self._file:
+                    self._file.close()
+                    self._file = None
+                return
+
+    def _write(self, records):
+        console, lines = [], []
+        for ts, level, message, fields in records:
+            rank = LEVELS.get(level, LEVELS["INFO"])
+            if self.console and rank >= self.console_level:
+                console.append(f"[{ts.strftime('%Y-%m-%d %H:%M:%S')}] {message}\n")
+            if self.path and rank >= self.file_level:
+                record = {"ts": ts.isoformat(timespec="milliseconds"), "level": level, "msg": message}
+                record.update(fields)
+                lines.append(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        if console:
+            sys.stdout.write("".join(console))
+            sys.stdout.flush()
+        if lines:
+            self._open()
+            chunk = []
+            for line in lines:
+                data = line.encode("utf-8")
+                if self._size and self._size + len(data) > self.max_bytes:
+                    self._file.write(b"".join(chunk))
+                    chunk = []
+                    self._rotate()
+                chunk.append(data)
+                self._size += len(data)
+            self._file.write(b"".join(chunk))
+            self._file.flush()
+
+    def _open(self):
+        if self._file is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._file = open(self.path, "ab")
+            self._size = self._file.tell()
+
+    def _rotate(self):
+        """whisper_subs.log -> .1 -> .2 ... keeping `backups` old files."""
+        self._file.close()
+        for n in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{n}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{n + 1}")
+        if self.backups > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+        self._size = 0
+
+
+_writers: Dict[Optional[str], LogWriter] = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path: Optional[str]) -> LogWriter:
+    """Shared writer for path, one per process, flushed at exit."""
+    key = os.path.abspath(path) if path else None
+    with _writers_lock:
+        if key not in _writers:
+            _writers[key] = LogWriter(key)
+        return _writers[key]
+
+
+@atexit.register
+def _close_all():
+    for writer in list(_writers.values()):
+        writer.close()
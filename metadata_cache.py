@@ -0,0 +1,146 @@
+"""
+MetadataCache - One yt-dlp metadata fetch per video, shared by every stage.
+
+Resolution, the task's title/channel lookup, the subtitle check and both
+steps of the audio download all need the same video info. The service
+fetches it once per URL (concurrent callers for the same URL wait for the
+first fetch), keeps the trimmed fields those call sites read in a SQLite
+database with a TTL (WHISPER_SUBS_METADATA_TTL_HOURS, default 24), and so
+restarts and --continue reuse it too.
+
+The full info dict, including stream URLs, stays in memory only for the
+most recent fetches and only briefly, because those URLs expire; within that
+window the download reuses it instead of extracting again.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+from sqlite_db import Database, transaction
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-subs", "metadata")
+DB_NAME = "metadata.db"
+TTL_ENV = "WHISPER_SUBS_METADATA_TTL_HOURS"
+DEFAULT_TTL_HOURS = 24
+# Stream URLs in a full info dict stop working after a few hours; stay well inside that
+FULL_INFO_MAX_AGE_SECONDS = 30 * 60
+# Full info dicts run to hundreds of KB; resolving a channel must not hold thousands
+MAX_FULL_INFOS = 16
+
+try:
+    TTL_SECONDS = float(os.environ.get(TTL_ENV, DEFAULT_TTL_HOURS)) * 3600
+except ValueError:
+    TTL_SECONDS = DEFAULT_TTL_HOURS * 3600
+
+# Fields the call sites read; everything else stays out of the database
+KEPT_FIELDS = (
+    "id", "title", "channel", "uploader", "timestamp", "upload_date", "language",
+    "duration", "webpage_url", "extractor_key", "live_status",
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS info (
+    key TEXT PRIMARY KEY,
+    payload TEXT NOT NULL,
+    fetched REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS info_fetched ON info(fetched);
+"""
+
+_db = Database(_SCHEMA)
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection to the metadata database."""
+    return _db.connect(os.path.join(CACHE_DIR, DB_NAME))
+
+
+def trim(info: Dict[str, Any]) -> Dict[str, Any]:
+    """The part of a yt-dlp info dict worth persisting."""
+    trimmed = {k: info[k] for k in KEPT_FIELDS if info.get(k) is not None}
+    trimmed["subtitles"] = {
+        lang: [{"ext": s.get("ext"), "is_automatic": bool(s.get("is_automatic"))} for s in subs or []]
+        for lang, subs in (info.get("subtitles") or {}).items()
+    }
+    return trimmed
+
+
+def load(key: str) -> Optional[Dict[str, Any]]:
+    """Persisted info for key if it is younger than the TTL."""
+    row = _connect().execute("SELECT payload, fetched FROM info WHERE key = ?", (key,)).fetchone()
+    if row is None or time.time() - row["fetched"] > TTL_SECONDS:
+        return None
+    return json.loads(row["payload"])
+
+
+def store(key: str, trimmed: Dict[str, Any]):
+    conn = _connect()
+    now = time.time()
+    with transaction(conn):
+        conn.execute(
+            "INSERT OR REPLACE INTO info (key, payload, fetched) VALUES (?, ?, ?)",
+            (key, json.dumps(trimmed, ensure_ascii=False), now),
+        )
+        conn.execute("DELETE FROM info WHERE fetched < ?", (now - TTL_SECONDS,))
+
+
+class MetadataService:
+    """Fetch-once front for an extract(url) -> info dict (or None) function."""
+
+    def __init__(self, extract: Callable[[str], Optional[Dict[str, Any]]]):
+        self._extract = extract
+        self._lock = threading.Lock()
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._trimmed: Dict[str, Dict[str, Any]] = {}
+        self._full: "OrderedDict[str, tuple]" = OrderedDict()
+        self.fetches = 0
+
+    def _key_lock(self, url: str) -> threading.Lock:
+        with self._lock:
+            return self._key_locks.setdefault(url, threading.Lock())
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Trimmed info for url: memory, then disk, then one extraction."""
+        with self._key_lock(url):
+            if url in self._trimmed:
+                return self._trimmed[url]
+            try:
+                trimmed = load(url)
+            except sqlite3.Error:
+                trimmed = None
+            if trimmed is None:
+                info = self._extract(url)
+                self.fetches += 1
+                if not info:
+                    return None
+                trimmed = trim(info)
+                with self._lock:
+                    self._full[url] = (time.time(), info)
+                    while len(self._full) > MAX_FULL_INFOS:
+                        self._full.popitem(last=False)
+                try:
+                    store(url, trimmed)
+                except sqlite3.Error:
+                    pass
+            self._trimmed[url] = trimmed
+            return trimmed
+
+    def full_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """The untrimmed info from this process's fetch, while its stream URLs are fresh."""
+        with self._lock:
+            entry = self._full.get(url)
+            if entry and time.time() - entry[0] > FULL_INFO_MAX_AGE_SECONDS:
+                del self._full[url]
+                entry = None
+        return entry[1] if entry else None
+
+    def release(self, url: str):
+        """Drop the in-memory copies for a finished task (the disk entry stays)."""
+        with self._lock:
+            self._full.pop(url, None)
+            self._trimmed.pop(url, None)
+            self._key_locks.pop(url, None)
@@ -9,9 +9,13 @@ import sys
 import os
 import argparse
 import importlib
+import threading
+import time
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple, Type
 
 os.environ["KMP_DUPLICATE_LIB_OK"] = "TRUE"
 
@@ -23,11 +27,219 @@ class Segment:
     end: float
     text: str
 
+# ============ Model Cache ============
+
+MODEL_CACHE_BUDGET_ENV = "WHISPER_SUBS_MODEL_CACHE_MB"
+DEFAULT_MODEL_CACHE_MB = 4096
+
+def _process_rss() -> int:
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+def _gpu_allocated() -> int:
+    """Bytes held by torch's CUDA allocator on all devices (0 if CUDA is unused)."""
+    torch = sys.modules.get('torch')
+    if torch is None:
+        return 0
+    try:
+        if not torch.cuda.is_initialized():
+            return 0
+        return sum(torch.cuda.memory_allocated(i) for i in range(torch.cuda.device_count()))
+    except Exception:
+        return 0
+
+@dataclass
+class _CacheEntry:
+    model: Any
+    size_bytes: int
+    load_seconds: float
+    refcount: int = 0
+    hits: int = 0
+    # Held for the whole use of a model that can't run two calls at once
+    use_lock: threading.Lock = field(default_factory=threading.Lock)
+
+class ModelCache:
+    """LRU cache of loaded models bounded by a RAM budget.
+
+    Entries are reference counted while in use and are only evicted once
+    released. Exclusive entries (the default) are used by one caller at a
+    time; callers whose models are thread-safe pass exclusive=False to share
+    them. Sizes come from the caller's estimate when given, otherwise from the
+    process RSS plus torch CUDA allocator growth during load; such loads run
+    one at a time so the growth belongs to a single model.
+    Keys are tuples whose first element is the adapter namespace.
+    """
+
+    def __init__(self, budget_mb: Optional[float] = None):
+        if budget_mb is None:
+            try:
+                budget_mb = float(os.environ.get(MODEL_CACHE_BUDGET_ENV, DEFAULT_MODEL_CACHE_MB))
+            except ValueError:
+                budget_mb = DEFAULT_MODEL_CACHE_MB
+        self.budget_bytes = int(budget_mb * 1024 * 1024)
+        self._entries: "OrderedDict[Tuple, _CacheEntry]" = OrderedDict()
+        self._loading: Dict[Tuple, threading.Lock] = {}
+        self._lock = threading.RLock()
+        self._measure_lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def _count(self, namespace: str, name: str, amount: float = 1):
+        counters = self._counters.setdefault(
+            namespace, {'hits': 0, 'misses': 0, 'evictions': 0, 'load_seconds': 0.0})
+        counters[name] += amount
+
+    def _checkout(self, key: Tuple) -> Optional[_CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is not None:
+            entry.refcount += 1
+            entry.hits += 1
+            self._entries.move_to_end(key)
+            self._count(key[0], 'hits')
+        return entry
+
+    @property
+    def used_bytes(self) -> int:
+        return sum(e.size_bytes for e in self._entries.values())
+
+    def _evict(self, write: Callable = print):
+        """Drop least recently used idle entries until within budget."""
+        evicted = False
+        for key in list(self._entries.keys()):
+            if self.used_bytes <= self.budget_bytes:
+                break
+            entry = self._entries[key]
+            if entry.refcount > 0:
+                continue
+            del self._entries[key]
+            self._count(key[0], 'evictions')
+            evicted = True
+            write(f"Model cache: evicted {'/'.join(str(k) for k in key)} "
+                  f"({entry.size_bytes / 1024 / 1024:.0f} MB)")
+        if evicted:
+            import gc
+            gc.collect()
+            if 'torch' in sys.modules:
+                try:
+                    sys.modules['torch'].cuda.empty_cache()
+                except Exception:
+                    pass
+
+    def _load(self, loader: Callable[[], Any], size_bytes: Optional[int]) -> Tuple[Any, int, float]:
+        """Run loader; return (model, size in bytes, load seconds)."""
+        if size_bytes is not None:
+            started = time.time()
+            return loader(), size_bytes, time.time() - started
+        with self._measure_lock:
+            before = _process_rss() + _gpu_allocated()
+            started = time.time()
+            model = loader()
+            load_seconds = time.time() - started
+            return model, max(_process_rss() + _gpu_allocated() - before, 0), load_seconds
+
+    @contextmanager
+    def acquire(self, key: Tuple, loader: Callable[[], Any], write: Callable = print,
+                exclusive: bool = True, size_bytes: Optional[int] = None):
+        """Yield the model for key, loading it with loader() on a miss.
+
+        With exclusive=True other callers for the same key wait until this
+        one's with block ends. size_bytes is an estimate of the model's
+        footprint (e.g. for GPU memory the RSS can't see); when omitted it is
+        measured during the load.
+        """
+        key = tuple(key)
+        with self._lock:
+            entry = self._checkout(key)
+            if entry is None:
+                load_lock = self._loading.setdefault(key, threading.Lock())
+
+        if entry is None:
+            # One loader per key; concurrent callers wait and then hit
+            with load_lock:
+                with self._lock:
+                    entry = self._checkout(key)
+                if entry is None:
+                    try:
+                        model, measured, load_seconds = self._load(loader, size_bytes)
+                    finally:
+                        with self._lock:
+                            if self._loading.get(key) is load_lock:
+                                del self._loading[key]
+                    entry = _CacheEntry(model=model, size_bytes=measured,
+                                        load_seconds=load_seconds, refcount=1)
+                    with self._lock:
+                        self._entries[key] = entry
+                        self._count(key[0], 'misses')
+                        self._count(key[0], 'load_seconds', load_seconds)
+                        self._evict(write)
+        try:
+            if exclusive:
+                with entry.use_lock:
+                    yield entry.model
+            else:
+                yield entry.model
+        finally:
+            with self._lock:
+                entry.refcount -= 1
+                self._evict(write)
+
+    def clear(self):
+        """Drop every idle entry regardless of budget."""
+        with self._lock:
+            for key in [k for k, e in self._entries.items() if e.refcount == 0]:
+                del self._entries[key]
+                self._count(key[0], 'evictions')
+
+    def stats(self, namespace: Optional[str] = None) -> Dict[str, Any]:
+        """Hit/miss/eviction counters and resident models, optionally for one namespace."""
+        with self._lock:
+            if namespace is None:
+                counters = {'hits': 0, 'misses': 0, 'evictions': 0, 'load_seconds': 0.0}
+                for c in self._counters.values():
+                    for name, value in c.items():
+                        counters[name] += value
+            else:
+                counters = dict(self._counters.get(
+                    namespace, {'hits': 0, 'misses': 0, 'evictions': 0, 'load_seconds': 0.0}))
+            models = [
+                {
+                    'key': list(k),
+                    'size_mb': round(e.size_bytes / 1024 / 1024, 1),
+                    'load_seconds': round(e.load_seconds, 2),
+                    'in_use': e.refcount,
+                    'hits': e.hits,
+                }
+                for k, e in self._entries.items()
+                if namespace is None or k[0] == namespace
+            ]
+            lookups = counters['hits'] + counters['misses']
+            result = {
+                **counters,
+                'load_seconds': round(counters['load_seconds'], 2),
+                'hit_rate': round(counters['hits'] / lookups, 3) if lookups else 0.0,
+                'models': models,
+            }
+            if namespace is None:
+                result['budget_mb'] = round(self.budget_bytes / 1024 / 1024, 1)
+                result['used_mb'] = round(self.used_bytes / 1024 / 1024, 1)
+            return result
+
+@contextmanager
+def _uncached(loader: Callable[[], Any]):
+    yield loader()
+
 # ============ Transcription Adapter (Strategy Interface) ============
 
 class TranscriptionAdapter(ABC):
     """Abstract base class for transcription backends (Strategy pattern)."""
 
+    # Set by TranscriptionContext so loaded models outlive a single call
+    model_cache: Optional[ModelCache] = None
+    # True if one loaded model can serve concurrent transcribe calls
+    model_thread_safe: bool = False
+
     @abstractmethod
     def transcribe(
         self,
@@ -41,6 +253,30 @@ class TranscriptionAdapter(ABC):
         """Transcribe audio and return (segments, info)."""
         ...
 
+    def transcribe_stream(
+        self,
+        audio_file: str,
+        model: str,
+        language: Optional[str] = None,
+        write: Callable = print,
+        temperature: float = 0.0,
+        **kwargs,
+    ) -> Iterator[Segment]:
+        """Yield segments as they are produced.
+
+        The default waits for transcribe(); backends that decode incrementally
+        override this so callers can write and check each segment as it arrives.
+        """
+        segments, _ = self.transcribe(
+            audio_file=audio_file,
+            model=model,
+            language=language,
+            write=write,
+            temperature=temperature,
+            **kwargs,
+        )
+        yield from segments
+
     @abstractmethod
     def is_available(self) -> bool:
         """Check if this adapter's dependencies are installed."""
@@ -61,6 +297,28 @@ class TranscriptionAdapter(ABC):
         """Human-readable name for logging."""
         return self.__class__.__name__
 
+    @property
+    def is_remote(self) -> bool:
+        """True for hosted API backends (no local model, compute or memory cost)."""
+        return False
+
+    @property
+    def cache_namespace(self) -> str:
+        """Namespace for this adapter's entries in the model cache."""
+        return self.prefix or "faster-whisper"
+
+    def cached_model(self, key: Tuple, loader: Callable[[], Any], write: Callable = print,
+                     size_bytes: Optional[int] = None):
+        """Context manager yielding a model from the shared cache (or a fresh one).
+
+        Unless model_thread_safe is set, the model is not shared with other
+        callers while the with block runs.
+        """
+        if self.model_cache is None:
+            return _uncached(loader)
+        return self.model_cache.acquire((self.cache_namespace,) + tuple(key), loader, write,
+                                        exclusive=not self.model_thread_safe, size_bytes=size_bytes)
+
 # ============ Adapter Registry ============
 
 _ADAPTER_CLASSES: List[Type[TranscriptionAdapter]] = []
@@ -95,9 +353,10 @@ def build_adapter_map() -> Dict[str, TranscriptionAdapter]:
 class TranscriptionContext:
     """Resolves a model identifier to the correct adapter and dispatches transcription."""
 
-    def __init__(self):
+    def __init__(self, model_cache: Optional[ModelCache] = None):
         self._adapter_map: Optional[Dict[str, TranscriptionAdapter]] = None
         self._default_adapter: Optional[TranscriptionAdapter] = None
+        self.model_cache = model_cache if model_cache is not None else ModelCache()
 
     def _ensure_initialized(self):
         if self._adapter_map is None:
@@ -107,6 +366,9 @@ class TranscriptionContext:
                 self._default_adapter = FasterWhisperAdapter()
             except Exception:
                 self._default_adapter = None
+            for adapter in [self._default_adapter, *self._adapter_map.values()]:
+                if adapter is not None:
+                    adapter.model_cache = self.model_cache
 
     def resolve(self, model_name: str) -> Tuple[TranscriptionAdapter, str]:
         """Resolve model_name to (adapter, stripped_model_name).
@@ -155,6 +417,27 @@ class TranscriptionContext:
             **kwargs,
         )
 
+    def transcribe_stream(
+        self,
+        audio_file: str,
+        model_name: str,
+        language: Optional[str] = None,
+        write: Callable = print,
+        temperature: float = 0.0,
+        **kwargs,
+    ) -> Iterator[Segment]:
+        """Dispatch streaming transcription to the correct adapter."""
+        adapter, resolved_model = self.resolve(model_name)
+        write(f"Using {adapter.display_name} with model {resolved_model}")
+        return adapter.transcribe_stream(
+            audio_file=audio_file,
+            model=resolved_model,
+            language=language,
+            write=write,
+            temperature=temperature,
+            **kwargs,
+        )
+
     def is_api_model(self, model_name: str) -> Tuple[bool, str, str]:
         """Check if model_name refers to a non-local (API/subprocess) backend.
 
@@ -176,6 +459,7 @@ class TranscriptionContext:
                 'name': self._default_adapter.display_name,
                 'models': self._default_adapter.get_model_names(),
                 'available': self._default_adapter.is_available(),
+                'model_cache': self.model_cache.stats(self._default_adapter.cache_namespace),
             })
         for prefix, adapter in self._adapter_map.items():
             result.append({
@@ -183,6 +467,7 @@ class TranscriptionContext:
                 'name': adapter.display_name,
                 'models': adapter.get_model_names(),
                 'available': adapter.is_available(),
+                'model_cache': self.model_cache.stats(adapter.cache_namespace),
             })
         return result
 
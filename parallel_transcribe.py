@@ -0,0 +1,347 @@
+"""
+WhisperSubs Parallel Transcription
+
+Splits long audio at silence-aligned cut points, transcribes the chunks
+concurrently on the worker pool and stitches the per-chunk SRTs back into a
+single file. Chunk state lives next to the output in <name>.chunks/, so an
+interrupted run only redoes the chunks that never finished; each unfinished
+chunk resumes from its own partial SRT via try_transcribe.
+
+Every concurrent chunk runs in its own worker process with its own copy of the
+model, so memory use grows with the chunk count.
+"""
+import datetime
+import json
+import os
+import re
+import shutil
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pcm_store
+from cancellation import CancelToken
+from model import Segment
+
+MIN_CHUNK_SECONDS = 10 * 60
+CUT_SEARCH_WINDOW = 90.0
+SILENCE_NOISE = '-35dB'
+SILENCE_MIN_DURATION = 0.5
+BOUNDARY_MERGE_GAP = 1.0
+PLAN_VERSION = 2
+
+
+def probe_duration(audio_file: str) -> float:
+    """Return the media duration in seconds, or 0 when ffprobe cannot tell."""
+    try:
+        result = subprocess.run(
+            ['ffprobe', '-v', 'error', '-show_entries', 'format=duration',
+             '-of', 'default=noprint_wrappers=1:nokey=1', audio_file],
+            capture_output=True, text=True, check=False
+        )
+        return float(result.stdout.strip()) if result.stdout.strip() else 0.0
+    except (OSError, ValueError):
+        return 0.0
+
+
+def detect_silences(audio_file: str, start: float, end: float) -> List[Tuple[float, float]]:
+    """Run ffmpeg silencedetect over [start, end) and return absolute (start, end) pairs."""
+    cmd = ['ffmpeg', '-hide_banner', '-nostats', '-ss', f"{max(start, 0.0):.3f}",
+           '-t', f"{max(end - start, 0.0):.3f}", '-i', audio_file, '-vn',
+           '-af', f"silencedetect=noise={SILENCE_NOISE}:d={SILENCE_MIN_DURATION}",
+           '-f', 'null', '-']
+    try:
+        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
+    except OSError:
+        return []
+    silences = []
+    current_start = None
+    for line in result.stderr.splitlines():
+        if m := re.search(r'silence_start:\s*(-?[\d.]+)', line):
+            current_start = float(m.group(1))
+        elif (m := re.search(r'silence_end:\s*(-?[\d.]+)', line)) and current_start is not None:
+            silences.append((start + max(current_start, 0.0), start + float(m.group(1))))
+            current_start = None
+    return silences
+
+
+def plan_chunks(
+    duration: float,
+    n_chunks: int,
+    find_silences: Callable[[float, float], List[Tuple[float, float]]],
+    min_chunk_seconds: float = MIN_CHUNK_SECONDS
+) -> List[Tuple[float, float]]:
+    """Split [0, duration) into up to n_chunks ranges cut in the middle of silences.
+
+    Each cut starts at an even split and moves to the nearest silence within
+    CUT_SEARCH_WINDOW seconds; if none is found the even split is used.
+    """
+    n_chunks = max(1, min(n_chunks, int(duration // min_chunk_seconds) or 1))
+    cuts = [0.0]
+    for k in range(1, n_chunks):
+        ideal = duration * k / n_chunks
+        lo = max(cuts[-1] + 1.0, ideal - CUT_SEARCH_WINDOW)
+        hi = min(duration - 1.0, ideal + CUT_SEARCH_WINDOW)
+        best = ideal
+        candidates = [(s + e) / 2 for s, e in find_silences(lo, hi) if lo <= (s + e) / 2 <= hi]
+        if candidates:
+            best = min(candidates, key=lambda c: abs(c - ideal))
+        cuts.append(round(best, 3))
+    cuts.append(duration)
+    return [(cuts[i], cuts[i + 1]) for i in range(len(cuts) - 1)]
+
+
+def read_srt_segments(srt_path: str) -> List[Segment]:
+    """Parse an SRT file into segments, skipping malformed blocks."""
+    from transcribe import srt_time_to_seconds
+    segments = []
+    if not os.path.exists(srt_path):
+        return segments
+    with open(srt_path, 'r', encoding='utf-8') as f:
+        content = f.read().strip()
+    for block in content.split('\n\n'):
+        lines = block.strip().split('\n')
+        if len(lines) < 3:
+            continue
+        m = re.search(r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})', lines[1])
+        if not m:
+            continue
+        segments.append(Segment(
+            start=srt_time_to_seconds(m.group(1)),
+            end=srt_time_to_seconds(m.group(2)),
+            text='\n'.join(lines[2:]).strip()
+        ))
+    return segments
+
+
+def stitch_segments(chunks: List[Tuple[float, List[Segment]]]) -> List[Segment]:
+    """Shift per-chunk segments by their chunk offset and fix up chunk boundaries.
+
+    Overlaps are clamped so timestamps stay monotonic, and a line repeated on
+    both sides of a cut (the decoder hearing the same words twice) is merged.
+    """
+    merged: List[Segment] = []
+    for offset, segments in chunks:
+        for i, seg in enumerate(segments):
+            text = seg.text.strip()
+            if not text:
+                continue
+            start, end = seg.start + offset, seg.end + offset
+            if merged:
+                prev = merged[-1]
+                if (i == 0 and text.lower() == prev.text.strip().lower()
+                        and start - prev.end <= BOUNDARY_MERGE_GAP):
+                    prev.end = max(prev.end, end)
+                    continue
+                if start < prev.end:
+                    start = prev.end
+            if end <= start:
+                end = start + 0.01
+            merged.append(Segment(start=start, end=end, text=text))
+    return merged
+
+
+def _write_srt(segments: List[Segment], srt_path: str):
+    from transcribe import format_timestamp
+    with open(srt_path, 'w', encoding='utf-8') as f:
+        for i, seg in enumerate(segments, start=1):
+            f.write(f"{i}\n{format_timestamp(seg.start)} --> {format_timestamp(seg.end)}\n{seg.text}\n\n")
+
+
+def _load_plan(plan_file: str, audio_file: str, n_chunks: int) -> Optional[Dict[str, Any]]:
+    """Return a saved plan if it was made for this exact source and chunk count."""
+    try:
+        with open(plan_file, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+        st = os.stat(audio_file)
+        if (plan.get('version') == PLAN_VERSION and plan.get('source') == os.path.abspath(audio_file)
+                and plan.get('size') == st.st_size and plan.get('requested_chunks') == n_chunks):
+            return plan
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def _save_plan(plan: Dict[str, Any], plan_file: str):
+    tmp = plan_file + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(plan, f, indent=2)
+    os.replace(tmp, plan_file)
+
+
+def transcribe_chunked(
+    file: str, model_name: str, srt_file: str, language: str,
+    device: str, compute_type: str, write: Callable = print,
+    cpu_threads: Optional[int] = None, n_chunks: int = 2,
+    vad_filter: bool = False, vad_params: Optional[Dict[str, Any]] = None,
+    temperature: float = 0, merge_lines: bool = False,
+    diarization: bool = False, diarization_params: Optional[Dict[str, Any]] = None,
+    mpv_ipc_reload: Optional[Callable] = None,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    cancel_token: Optional[CancelToken] = None
+) -> bool:
+    """Transcribe file as n_chunks concurrent jobs and merge the result into srt_file.
+
+    Cancelling cancel_token stops every chunk's worker; finished chunks stay
+    in the plan for resume. The plan is also reused when the caller falls back
+    to another model: only the unfinished chunks are run again.
+
+    on_event gets 'stats' for the whole file while the chunks run, then one
+    'segment' per entry of the stitched SRT (chunk indexes overlap and the
+    boundaries are rewritten, so per-chunk segments are not passed on).
+    mpv_ipc_reload is called once the merged SRT is in place.
+    """
+    from transcribe import try_transcribe
+    from helper_files import make_files
+
+    chunks_dir = os.path.splitext(srt_file)[0] + '.chunks'
+    plan_file = os.path.join(chunks_dir, 'plan.json')
+    os.makedirs(chunks_dir, exist_ok=True)
+
+    plan = _load_plan(plan_file, file, n_chunks)
+    if plan:
+        done = sum(1 for c in plan['chunks'] if c['done'])
+        write(f"Resuming parallel transcription: {done}/{len(plan['chunks'])} chunks already done")
+    else:
+        duration = probe_duration(file)
+        if duration <= 0:
+            write("Could not determine audio duration, transcribing sequentially")
+            shutil.rmtree(chunks_dir, ignore_errors=True)
+            return try_transcribe(file, model_name, srt_file, language, device, compute_type, True, write,
+                                  cpu_threads, vad_filter, vad_params, diarization, diarization_params,
+                                  temperature, merge_lines, mpv_ipc_reload=mpv_ipc_reload,
+                                  on_event=on_event, cancel_token=cancel_token)
+        write(f"Finding silence-aligned cut points for {n_chunks} chunks...")
+        ranges = plan_chunks(duration, n_chunks, lambda lo, hi: detect_silences(file, lo, hi))
+        plan = {
+            'version': PLAN_VERSION,
+            'source': os.path.abspath(file),
+            'size': os.path.getsize(file),
+            'requested_chunks': n_chunks,
+            'duration': duration,
+            'chunks': [{'start': s, 'end': e, 'done': False} for s, e in ranges],
+        }
+        _save_plan(plan, plan_file)
+
+    chunks = plan['chunks']
+    if len(chunks) < 2:
+        write("Audio too short for parallel transcription, transcribing sequentially")
+        shutil.rmtree(chunks_dir, ignore_errors=True)
+        return try_transcribe(file, model_name, srt_file, language, device, compute_type, True, write,
+                              cpu_threads, vad_filter, vad_params, diarization, diarization_params,
+                              temperature, merge_lines, mpv_ipc_reload=mpv_ipc_reload,
+                              on_event=on_event, cancel_token=cancel_token)
+
+    # Decode once; every chunk is a time range of the same stored PCM
+    try:
+        source_wav = pcm_store.get_wav(file, write)
+    except Exception as e:
+        write(f"Could not decode audio for parallel transcription: {e}")
+        return False
+
+    total_threads = cpu_threads or os.cpu_count() or 1
+    threads_per_chunk = max(1, total_threads // len(chunks))
+    write(f"Parallel transcription: {len(chunks)} chunks x {threads_per_chunk} threads "
+          f"(cuts at {', '.join(str(datetime.timedelta(seconds=int(c['start']))) for c in chunks[1:])})")
+    plan_lock = threading.Lock()
+    duration = plan['duration']
+    chunk_percent = [100.0 if c['done'] else 0.0 for c in chunks]
+
+    def chunk_events(index: int) -> Optional[Callable[[str, Dict[str, Any]], None]]:
+        if on_event is None:
+            return None
+
+        def forward(kind: str, fields: Dict[str, Any]):
+            # Report progress over the whole file, weighting each chunk by its length
+            if kind != 'stats' or fields.get('percent') is None or duration <= 0:
+                return
+            with plan_lock:
+                chunk_percent[index] = fields['percent']
+                percent = sum(p * (c['end'] - c['start']) for p, c in zip(chunk_percent, chunks)) / duration
+            on_event('stats', {'percent': round(min(percent, 100.0), 1)})
+        return forward
+
+    def run_chunk(index: int) -> bool:
+        chunk = chunks[index]
+        label = f"[chunk {index + 1}/{len(chunks)}]"
+        chunk_write = lambda message: write(f"{label} {message}")
+        if chunk['done']:
+            return True
+
+        chunk_srt = os.path.join(chunks_dir, f"chunk_{index:03d}.srt")
+        chunk_unfinished = chunk_srt.replace('.srt', '.unfinished.srt')
+        # A previous failed attempt leaves its partial output as the chunk SRT; resume from it
+        if os.path.isfile(chunk_srt) and not os.path.islink(chunk_srt) and not os.path.exists(chunk_unfinished):
+            os.rename(chunk_srt, chunk_unfinished)
+
+        # The worker reads the chunk's range straight out of source_wav; its SRT
+        # times are absolute, so resume and stitching need no per-chunk offset
+        ok = try_transcribe(source_wav, model_name, chunk_srt, language, device, compute_type, True,
+                            chunk_write, threads_per_chunk, vad_filter, vad_params, diarization,
+                            diarization_params, temperature, merge_lines,
+                            f"{chunk['start']:.3f}", f"{chunk['end']:.3f}",
+                            on_event=chunk_events(index), cancel_token=cancel_token)
+        if ok:
+            with plan_lock:
+                chunk['done'] = True
+                chunk['model'] = model_name
+                _save_plan(plan, plan_file)
+        return ok
+
+    with ThreadPoolExecutor(max_workers=len(chunks)) as pool:
+        results = list(pool.map(run_chunk, range(len(chunks))))
+
+    if not all(results):
+        failed = [str(i + 1) for i, ok in enumerate(results) if not ok]
+        write(f"Chunks {', '.join(failed)} failed; finished chunks are kept in {chunks_dir} for resume")
+        return False
+
+    merged = stitch_segments([
+        (0.0, read_srt_segments(os.path.join(chunks_dir, f"chunk_{i:03d}.srt")))
+        for i in range(len(chunks))
+    ])
+    if not merged:
+        write("Parallel transcription produced no segments")
+        return False
+
+    unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
+    _write_srt(merged, unfinished_srt)
+    if os.path.islink(srt_file) or os.path.exists(srt_file):
+        os.remove(srt_file)
+    os.rename(unfinished_srt, srt_file)
+    make_files(srt_file)
+    if on_event is not None:
+        for number, seg in enumerate(merged, start=1):
+            on_event('segment', {'index': number, 'start': round(seg.start, 3),
+                                 'end': round(seg.end, 3), 'text': seg.text})
+    if mpv_ipc_reload is not None:
+        try:
+            mpv_ipc_reload()
+        except Exception as ipc_err:
+            write(f"MPV IPC reload failed: {ipc_err}")
+
+    metadata_file = srt_file.replace('.srt', '.metadata.json')
+    metadata = {
+        "model": model_name,
+        "date": datetime.datetime.now().isoformat(),
+        "source_file": file,
+        "language": language if language not in (None, 'none') else None,
+        "device": device,
+        "compute_type": compute_type,
+        "cpu_threads": total_threads,
+        "vad_enabled": vad_filter,
+        "temperature": temperature,
+        "parallel_chunks": [[c['start'], c['end']] for c in chunks],
+        "chunk_models": [c.get('model', model_name) for c in chunks],
+        "segments_count": len(merged)
+    }
+    try:
+        with open(metadata_file, 'w', encoding='utf-8') as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        write(f"Warning: Could not create metadata file: {e}")
+
+    shutil.rmtree(chunks_dir, ignore_errors=True)
+    write(f"Merged {len(merged)} segments from {len(chunks)} chunks into {srt_file}")
+    return True
@@ -0,0 +1,220 @@
+"""
+PcmStore - Decode-once cache of 16 kHz mono PCM audio.
+
+Every engine that needs raw audio asks this store instead of running its own
+ffmpeg conversion. Sources are keyed by a full-content sha256, decoded once
+to a 16-bit WAV under ~/.cache/whisper-subs/pcm and shared from there, so
+retries, model fallbacks and different adapters on the same file never decode
+twice. Callers must not delete the returned paths.
+
+Evicts files not used for 7 days or when the store exceeds 10 GB (LRU).
+"""
+import hashlib
+import os
+import subprocess
+import threading
+import time
+import wave
+from collections import OrderedDict
+from typing import Callable, Dict, Optional
+
+STORE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-subs", "pcm")
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHANNELS = 1
+BYTES_PER_SECOND = SAMPLE_RATE * SAMPLE_WIDTH * CHANNELS
+MAX_BYTES = 10 * 1024 ** 3
+MAX_AGE_DAYS = 7
+# Files used this recently are never evicted; another job may be about to open them
+EVICT_GRACE_SECONDS = 3600
+_DIGEST_CHUNK = 4 * 1024 * 1024
+_DIGEST_MEMO_SIZE = 256
+
+_key_locks: Dict[str, threading.Lock] = {}
+_key_locks_guard = threading.Lock()
+_digests: "OrderedDict[tuple, str]" = OrderedDict()
+_digests_guard = threading.Lock()
+
+
+def content_digest(path: str) -> str:
+    """Full-content sha256 of a file, streamed once per (path, size, mtime)."""
+    st = os.stat(path)
+    memo_key = (os.path.realpath(path), st.st_size, st.st_mtime_ns)
+    with _digests_guard:
+        digest = _digests.get(memo_key)
+        if digest is not None:
+            _digests.move_to_end(memo_key)
+            return digest
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(_DIGEST_CHUNK), b''):
+            h.update(block)
+    digest = h.hexdigest()
+    with _digests_guard:
+        _digests[memo_key] = digest
+        while len(_digests) > _DIGEST_MEMO_SIZE:
+            _digests.popitem(last=False)
+    return digest
+
+
+def is_pcm_wav(path: str) -> bool:
+    """True if path is already a 16 kHz mono 16-bit PCM WAV."""
+    if not path.lower().endswith('.wav'):
+        return False
+    try:
+        with wave.open(path, 'rb') as w:
+            return (w.getframerate() == SAMPLE_RATE and w.getnchannels() == CHANNELS
+                    and w.getsampwidth() == SAMPLE_WIDTH and w.getcomptype() == 'NONE')
+    except (wave.Error, EOFError, OSError):
+        return False
+
+
+def _lock_for(key: str) -> threading.Lock:
+    with _key_locks_guard:
+        return _key_locks.setdefault(key, threading.Lock())
+
+
+def get_wav(source: str, write: Callable = print) -> str:
+    """Return a 16 kHz mono PCM WAV for source, decoding it at most once."""
+    if not os.path.exists(source):
+        raise FileNotFoundError(source)
+    if is_pcm_wav(source):
+        return source
+
+    os.makedirs(STORE_DIR, exist_ok=True)
+    key = content_digest(source)
+    wav_path = os.path.join(STORE_DIR, f"{key}.wav")
+
+    with _lock_for(key):
+        if os.path.exists(wav_path):
+            os.utime(wav_path)
+            return wav_path
+
+        write(f"Decoding {os.path.basename(source)} to 16 kHz PCM...")
+        tmp_path = os.path.join(STORE_DIR, f"{key}.{os.getpid()}.{threading.get_ident()}.part.wav")
+        cmd = [
+            'ffmpeg', '-y', '-v', 'error', '-i', source, '-vn',
+            '-map_metadata', '-1', '-fflags', '+bitexact', '-flags:a', '+bitexact',
+            '-acodec', 'pcm_s16le', '-ac', str(CHANNELS), '-ar', str(SAMPLE_RATE),
+            tmp_path,
+        ]
+        result = subprocess.run(cmd, capture_output=True, text=True)
+        if result.returncode != 0 or not os.path.exists(tmp_path):
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise RuntimeError(f"Audio decode failed: {result.stderr.strip()[:500]}")
+        # Atomic publish; a concurrent process decoding the same key just overwrites
+        os.replace(tmp_path, wav_path)
+
+    _evict(keep=wav_path)
+    return wav_path
+
+
+def data_offset(wav_path: str) -> int:
+    """Byte offset of the sample data in a WAV file (walks the RIFF chunks)."""
+    with open(wav_path, 'rb') as f:
+        header = f.read(12)
+        if header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+            raise ValueError(f"Not a WAV file: {wav_path}")
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                raise ValueError(f"No data chunk in {wav_path}")
+            size = int.from_bytes(chunk[4:8], 'little')
+            if chunk[:4] == b'data':
+                return f.tell()
+            f.seek(size + (size & 1), os.SEEK_CUR)
+
+
+def duration(wav_path: str) -> float:
+    """Length of a store WAV in seconds."""
+    return max(os.path.getsize(wav_path) - data_offset(wav_path), 0) / BYTES_PER_SECOND
+
+
+def open_pcm(wav_path: str):
+    """Memory-map the samples of a PCM WAV as a read-only int16 numpy array."""
+    import numpy as np
+    offset = data_offset(wav_path)
+    count = (os.path.getsize(wav_path) - offset) // SAMPLE_WIDTH
+    return np.memmap(wav_path, dtype=np.int16, mode='r', offset=offset, shape=(count,))
+
+
+def read_samples(wav_path: str, start: float = 0.0, end: Optional[float] = None):
+    """Return float32 samples in [-1, 1] for [start, end) seconds, read via mmap."""
+    return slice_samples(open_pcm(wav_path), start, end)
+
+
+def slice_samples(pcm, start: float = 0.0, end: Optional[float] = None):
+    """read_samples() for an array already returned by open_pcm().
+
+    A job that may re-read windows late keeps its open_pcm() mapping: the
+    mapping stays valid even if _evict() unlinks the WAV in the meantime.
+    """
+    import numpy as np
+    first = max(int(start * SAMPLE_RATE), 0)
+    last = len(pcm) if end is None else min(int(end * SAMPLE_RATE), len(pcm))
+    return pcm[first:max(last, first)].astype(np.float32) / 32768.0
+
+
+def extract_range(wav_path: str, start: float, end: Optional[float], out_path: str) -> str:
+    """Write [start, end) of a PCM WAV to out_path as a new WAV (byte copy, no decode)."""
+    with wave.open(wav_path, 'rb') as src:
+        total = src.getnframes()
+        first = min(max(int(start * SAMPLE_RATE), 0), total)
+        last = total if end is None else min(max(int(end * SAMPLE_RATE), first), total)
+        src.setpos(first)
+        with wave.open(out_path, 'wb') as dst:
+            dst.setnchannels(CHANNELS)
+            dst.setsampwidth(SAMPLE_WIDTH)
+            dst.setframerate(SAMPLE_RATE)
+            remaining = last - first
+            while remaining > 0:
+                block = min(remaining, SAMPLE_RATE * 60)
+                dst.writeframes(src.readframes(block))
+                remaining -= block
+    return out_path
+
+
+def _evict(keep: Optional[str] = None):
+    """Drop expired files, then least recently used files until under MAX_BYTES."""
+    try:
+        entries = []
+        for name in os.listdir(STORE_DIR):
+            if not name.endswith('.wav') or name.endswith('.part.wav'):
+                continue
+            path = os.path.join(STORE_DIR, name)
+            st = os.stat(path)
+            entries.append((st.st_mtime, st.st_size, path))
+    except OSError:
+        return
+
+    now = time.time()
+    entries.sort()
+    total = sum(size for _, size, _ in entries)
+    for mtime, size, path in entries:
+        if path == keep or now - mtime < EVICT_GRACE_SECONDS:
+            continue
+        if total <= MAX_BYTES and now - mtime <= MAX_AGE_DAYS * 86400:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+def stats() -> Dict[str, float]:
+    """Return store statistics."""
+    files = 0
+    total = 0
+    if os.path.isdir(STORE_DIR):
+        for name in os.listdir(STORE_DIR):
+            if name.endswith('.wav') and not name.endswith('.part.wav'):
+                files += 1
+                total += os.path.getsize(os.path.join(STORE_DIR, name))
+    return {
+        "files": files,
+        "total_size_mb": round(total / (1024 * 1024), 1),
+        "store_dir": STORE_DIR,
+        "max_gb": MAX_BYTES / 1024 ** 3,
+    }
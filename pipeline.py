@@ -0,0 +1,111 @@
+"""
+Pipeline - Bounded multi-stage executor for per-task work.
+
+Items flow through the stages in order. Stages are joined by bounded queues
+and each runs its own worker threads, so while one stage is busy with item N
+(transcription) the stages before it (metadata, download) are already working
+on items N+1..N+k, and the stages after it (helper files) drain finished
+items. The queue bound caps how far the early stages run ahead, which limits
+the number of downloaded-but-untranscribed files on disk.
+
+A stage function returns True to pass the item on, or False to drop it
+(skipped, finished early or failed softly). An exception drops the item and is
+reported to on_error. Either way on_exit is called exactly once per item as it
+leaves the pipeline, so per-item cleanup always runs.
+"""
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional
+
+_DONE = object()
+
+
+class Stage(NamedTuple):
+    name: str
+    func: Callable[[Any], bool]
+    workers: int = 1
+
+
+class Pipeline:
+    def __init__(
+        self,
+        stages: List[Stage],
+        queue_size: int = 2,
+        on_error: Optional[Callable[[str, Any, BaseException], None]] = None,
+        on_exit: Optional[Callable[[Any], None]] = None,
+        stop_event: Optional[threading.Event] = None,
+    ):
+        if not stages:
+            raise ValueError("Pipeline needs at least one stage")
+        self.stages = [stage._replace(workers=max(1, stage.workers)) for stage in stages]
+        self.queue_size = max(1, queue_size)
+        self.on_error = on_error
+        self.on_exit = on_exit
+        self.stop_event = stop_event or threading.Event()
+
+    def stop(self):
+        """Stop feeding new items; queued items leave through on_exit unprocessed."""
+        self.stop_event.set()
+
+    def run(self, items: Iterable[Any]) -> None:
+        """Push items through every stage and return once all have left."""
+        queues = [queue.Queue(maxsize=self.queue_size) for _ in self.stages]
+        remaining = [stage.workers for stage in self.stages]
+        lock = threading.Lock()
+        threads = []
+        for index, stage in enumerate(self.stages):
+            for n in range(stage.workers):
+                thread = threading.Thread(
+                    target=self._worker, args=(index, queues, remaining, lock),
+                    name=f"pipeline-{stage.name}-{n}", daemon=True,
+                )
+                thread.start()
+                threads.append(thread)
+
+        try:
+            for item in items:
+                if self.stop_event.is_set():
+                    break
+                queues[0].put(item)
+        except BaseException:
+            self.stop()
+            raise
+        finally:
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+        for thread in threads:
+            thread.join()
+
+    def _worker(self, index: int, queues: List[queue.Queue], remaining: List[int], lock: threading.Lock):
+        stage = self.stages[index]
+        is_last = index + 1 == len(self.stages)
+        while True:
+            item = queues[index].get()
+            if item is _DONE:
+                break
+            passed = False
+            if not self.stop_event.is_set():
+                try:
+                    passed = bool(stage.func(item))
+                except Exception as e:
+                    if self.on_error:
+                        self.on_error(stage.name, item, e)
+            if passed and not is_last:
+                queues[index + 1].put(item)
+            else:
+                self._exit(item)
+
+        # The last worker out of a stage closes the next one
+        with lock:
+            remaining[index] -= 1
+            closing = remaining[index] == 0
+        if closing and not is_last:
+            for _ in range(self.stages[index + 1].workers):
+                queues[index + 1].put(_DONE)
+
+    def _exit(self, item: Any):
+        if self.on_exit:
+            try:
+                self.on_exit(item)
+            except Exception:
+                pass
@@ -0,0 +1,275 @@
+"""
+ResultCache - Finished transcripts keyed by audio content and decoding settings.
+
+A successful transcription is stored as its segments plus its metadata, under
+a key built from the audio's full-content hash (pcm_store.content_digest) and every
+setting that changes the output: adapter, model, language, VAD, temperature,
+line merging, time range and diarization. Running the same audio again with
+the same settings (from another channel, a renamed file or the API) writes
+the SRT straight from the cache instead of transcribing. The SRT's leading
+"TRANSCRIPTION METADATA" entry is not stored; restore() writes a fresh one
+for the run that asked for it.
+
+Entries live in a SQLite database (WAL) as zlib-compressed JSON and are
+evicted least recently used once the cache exceeds its byte quota
+(WHISPER_SUBS_RESULT_CACHE_MB, default 512 MB).
+"""
+import datetime
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlite_db import Database, transaction
+
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "whisper-subs", "results")
+DB_NAME = "results.db"
+MAX_BYTES_ENV = "WHISPER_SUBS_RESULT_CACHE_MB"
+DEFAULT_MAX_MB = 512
+# Bump when the key fields or payload layout change; old entries stop matching
+KEY_VERSION = 2
+
+try:
+    MAX_BYTES = int(float(os.environ.get(MAX_BYTES_ENV, DEFAULT_MAX_MB)) * 1024 * 1024)
+except ValueError:
+    MAX_BYTES = DEFAULT_MAX_MB * 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key TEXT PRIMARY KEY,
+    model TEXT,
+    payload BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results(last_used);
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+METADATA_HEADER = "TRANSCRIPTION METADATA"
+
+_TIMING = re.compile(r'(\d+):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d+):(\d{2}):(\d{2}),(\d{3})')
+
+_db = Database(_SCHEMA)
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection to the cache database."""
+    return _db.connect(os.path.join(CACHE_DIR, DB_NAME))
+
+
+def _bump(conn: sqlite3.Connection, name: str, amount: int = 1):
+    conn.execute(
+        "INSERT INTO counters (name, value) VALUES (?, ?) "
+        "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+        (name, amount),
+    )
+
+
+def make_key(
+    audio_file: str,
+    model_name: str,
+    adapter: str = "faster-whisper",
+    language: Optional[str] = None,
+    vad_filter: bool = False,
+    vad_params: Optional[Dict[str, Any]] = None,
+    temperature: Optional[float] = 0.0,
+    merge_lines: bool = False,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    diarization: bool = False,
+    diarization_params: Optional[Dict[str, Any]] = None,
+) -> Optional[str]:
+    """Cache key for transcribing audio_file with these settings (None if unreadable)."""
+    import pcm_store
+    try:
+        content = pcm_store.content_digest(audio_file)
+    except OSError:
+        return None
+    fields = {
+        "version": KEY_VERSION,
+        "content": content,
+        "adapter": adapter,
+        "model": model_name,
+        "language": None if language in (None, "", "none") else language,
+        "vad": [bool(vad_filter), vad_params if vad_filter else None],
+        "temperature": float(temperature or 0.0),
+        "merge_lines": bool(merge_lines),
+        "range": [start_time or None, end_time or None],
+        "diarization": [bool(diarization), diarization_params if diarization else None],
+    }
+    canonical = json.dumps(fields, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def _format_ms(ms: int) -> str:
+    return f"{ms // 3600000:02d}:{ms // 60000 % 60:02d}:{ms // 1000 % 60:02d},{ms % 1000:03d}"
+
+
+def read_srt(srt_file: str) -> List[List[Any]]:
+    """Parse an SRT into [start_ms, end_ms, text] lists (exact, no float drift)."""
+    with open(srt_file, "r", encoding="utf-8") as f:
+        content = f.read()
+    segments = []
+    for block in re.split(r'\n\s*\n', content.strip()):
+        lines = block.strip().split("\n")
+        if len(lines) < 3:
+            continue
+        m = _TIMING.search(lines[1])
+        if not m:
+            continue
+        h1, m1, s1, ms1, h2, m2, s2, ms2 = (int(g) for g in m.groups())
+        segments.append([
+            ((h1 * 60 + m1) * 60 + s1) * 1000 + ms1,
+            ((h2 * 60 + m2) * 60 + s2) * 1000 + ms2,
+            "\n".join(lines[2:]),
+        ])
+    return segments
+
+
+def _is_metadata_entry(segment: List[Any]) -> bool:
+    start, end, text = segment
+    return start == 0 and end == 0 and text.startswith(METADATA_HEADER)
+
+
+def _metadata_entry(metadata: Dict[str, Any], source_file: str, created: float) -> str:
+    """The SRT's leading metadata entry, describing this restore rather than the cached run."""
+    lines = [METADATA_HEADER, f"Model: {metadata.get('model', 'unknown')}"]
+    if metadata.get("provider"):
+        lines.append(f"Provider: {metadata['provider']}")
+    lines.append(f"Date: {datetime.datetime.now().isoformat()}")
+    lines.append(f"Source: {os.path.basename(source_file)}")
+    if metadata.get("language"):
+        lines.append(f"Language: {metadata['language']}")
+    lines.append(f"Cached: {datetime.datetime.fromtimestamp(created).isoformat()}")
+    return "\n".join(lines)
+
+
+def _evict(conn: sqlite3.Connection, incoming: int):
+    """Remove least recently used results until incoming bytes fit the quota."""
+    total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+    needed = total + incoming - MAX_BYTES
+    if needed <= 0:
+        return
+    doomed, reclaimed = [], 0
+    for row in conn.execute("SELECT key, size FROM results ORDER BY last_used"):
+        if reclaimed >= needed:
+            break
+        doomed.append(row["key"])
+        reclaimed += row["size"]
+    conn.executemany("DELETE FROM results WHERE key = ?", [(k,) for k in doomed])
+    _bump(conn, "evictions", len(doomed))
+    _bump(conn, "bytes_reclaimed", reclaimed)
+
+
+def put(key: str, srt_file: str, metadata: Optional[Dict[str, Any]] = None) -> bool:
+    """Store the finished srt_file (and its metadata) under key."""
+    segments = [seg for seg in read_srt(srt_file) if not _is_metadata_entry(seg)]
+    if not segments:
+        return False
+    payload = zlib.compress(json.dumps(
+        {"segments": segments, "metadata": metadata or {}}, ensure_ascii=False
+    ).encode("utf-8"))
+    if len(payload) > MAX_BYTES:
+        return False
+    conn = _connect()
+    now = time.time()
+    with transaction(conn):
+        conn.execute("DELETE FROM results WHERE key = ?", (key,))
+        _evict(conn, len(payload))
+        conn.execute(
+            "INSERT INTO results (key, model, payload, size, created, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+            (key, (metadata or {}).get("model"), payload, len(payload), now, now),
+        )
+    return True
+
+
+def get(key: str) -> Optional[Dict[str, Any]]:
+    """Return {"segments": [...], "metadata": {...}, "created": ts} for key, or None."""
+    conn = _connect()
+    row = conn.execute("SELECT payload, created FROM results WHERE key = ?", (key,)).fetchone()
+    if row is None:
+        _bump(conn, "misses")
+        return None
+    conn.execute("UPDATE results SET last_used = ?, hits = hits + 1 WHERE key = ?", (time.time(), key))
+    _bump(conn, "hits")
+    entry = json.loads(zlib.decompress(row["payload"]).decode("utf-8"))
+    entry["created"] = row["created"]
+    return entry
+
+
+def restore(key: str, srt_file: str, source_file: str, write: Callable = print,
+            on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None) -> bool:
+    """Write srt_file, its metadata and helper files from a cached result.
+
+    on_event gets a 'segment' event per restored entry, numbered as in srt_file,
+    the same as a live transcription would send.
+    """
+    entry = get(key)
+    if entry is None:
+        return False
+
+    os.makedirs(os.path.dirname(srt_file) or ".", exist_ok=True)
+    tmp_path = f"{srt_file}.{os.getpid()}.{threading.get_ident()}.part"
+    header = _metadata_entry(entry.get("metadata") or {}, source_file, entry["created"])
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(f"1\n{_format_ms(0)} --> {_format_ms(0)}\n{header}\n\n")
+        for i, (start, end, text) in enumerate(entry["segments"], start=2):
+            f.write(f"{i}\n{_format_ms(start)} --> {_format_ms(end)}\n{text}\n\n")
+    # srt_file may still be the symlink to an unfinished SRT from an earlier run
+    if os.path.islink(srt_file):
+        os.remove(srt_file)
+    os.replace(tmp_path, srt_file)
+
+    metadata_file = os.path.splitext(srt_file)[0] + ".metadata.json"
+    metadata = dict(entry.get("metadata") or {})
+    metadata.update({
+        "date": datetime.datetime.now().isoformat(),
+        "source_file": os.path.basename(source_file),
+        "result_cache": {
+            "key": key[:16],
+            "transcribed": datetime.datetime.fromtimestamp(entry["created"]).isoformat(),
+        },
+    })
+    if "output_files" in metadata:
+        metadata["output_files"] = {"srt": srt_file, "json": metadata_file}
+    try:
+        with open(metadata_file, "w", encoding="utf-8") as f:
+            json.dump(metadata, f, indent=2, ensure_ascii=False)
+    except OSError as e:
+        write(f"Warning: Could not create metadata file: {e}")
+
+    from helper_files import make_files
+    make_files(srt_file)
+    if on_event is not None:
+        for i, (start, end, text) in enumerate(entry["segments"], start=2):
+            on_event("segment", {"index": i, "start": start / 1000, "end": end / 1000, "text": text})
+    write(f"Restored {len(entry['segments'])} segments from the result cache")
+    return True
+
+
+def stats() -> Dict[str, Any]:
+    """Return cache statistics."""
+    conn = _connect()
+    row = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+    counters = {name: 0 for name in ("hits", "misses", "evictions", "bytes_reclaimed")}
+    counters.update({r["name"]: r["value"] for r in conn.execute("SELECT name, value FROM counters")})
+    lookups = counters["hits"] + counters["misses"]
+    return {
+        "total_entries": row[0],
+        "total_size_bytes": row[1],
+        **counters,
+        "hit_ratio": round(counters["hits"] / lookups, 3) if lookups else 0.0,
+        "cache_dir": CACHE_DIR,
+        "max_bytes": MAX_BYTES,
+    }
@@ -0,0 +1,287 @@
+"""
+TaskScheduler - Priority worker pool for the API server.
+
+Queued work waits in heaps and a fixed set of worker threads takes the best
+entry whenever one of them frees up, so priority decides the order in which
+tasks start, not only what is recorded about them. Four rules set that order:
+
+* Priority: higher runs first (the API uses 1..10).
+* Aging: a waiting task gains one priority level per `aging_seconds`, so
+  low-priority batch work still gets its turn behind a steady stream of
+  higher-priority requests. Because every waiting task ages at the same
+  rate, the heap key `priority - enqueued / aging_seconds` never has to be
+  recomputed.
+* Fair share: each user's running tasks count against the next one they
+  start, so one user's 500-item batch doesn't hold every worker while
+  another user's single request waits. Groups (a batch) can also cap how
+  many of their tasks run at once.
+* Preemption: an interactive submission with `preempt` on goes ahead of the
+  queued (never the running) non-interactive tasks it would otherwise wait
+  behind. A task loses its place at most `preempt_limit` times.
+
+position() and estimated_start() report where a queued task stands, the
+latter from a running average of task durations.
+"""
+import heapq
+import itertools
+import threading
+import time
+from concurrent.futures import Future
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_AGING_SECONDS = 60.0
+FAIR_SHARE_WEIGHT = 2.0
+DEFAULT_PREEMPT_LIMIT = 3
+# Used for start estimates until some tasks have finished
+DEFAULT_TASK_SECONDS = 300.0
+DURATION_SMOOTHING = 0.2
+# Interactive tasks are placed this far ahead of the tasks they preempt
+_PREEMPT_STEP = 1e-6
+
+
+class _Entry:
+    __slots__ = ("score", "seq", "task_id", "user", "group", "interactive",
+                 "fn", "args", "kwargs", "future", "preempted")
+
+    def __init__(self, score, seq, task_id, user, group, interactive, fn, args, kwargs, future):
+        self.score = score
+        self.seq = seq
+        self.task_id = task_id
+        self.user = user
+        self.group = group
+        self.interactive = interactive
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.future = future
+        self.preempted = 0
+
+    def __lt__(self, other: "_Entry") -> bool:
+        # heapq pops the smallest: best score first, then submission order
+        return (-self.score, self.seq) < (-other.score, other.seq)
+
+
+class TaskScheduler:
+    def __init__(
+        self,
+        max_workers: int = 5,
+        aging_seconds: float = DEFAULT_AGING_SECONDS,
+        fair_share_weight: float = FAIR_SHARE_WEIGHT,
+        preempt: bool = True,
+        preempt_limit: int = DEFAULT_PREEMPT_LIMIT,
+    ):
+        self.max_workers = max(1, max_workers)
+        self.aging_seconds = max(1e-3, aging_seconds)
+        self.fair_share_weight = fair_share_weight
+        self.preempt = preempt
+        self.preempt_limit = preempt_limit
+        self._cond = threading.Condition()
+        # One heap per (user, group); all entries in a heap share their fair-share and group limits
+        self._heaps: Dict[Tuple[Any, Any], List[_Entry]] = {}
+        self._queued: Dict[str, _Entry] = {}
+        self._running: Dict[str, Tuple[_Entry, float]] = {}
+        self._user_running: Dict[Any, int] = {}
+        self._group_running: Dict[Any, int] = {}
+        self._group_limits: Dict[Any, int] = {}
+        self._seq = itertools.count()
+        self._epoch = time.monotonic()
+        self._avg_seconds = DEFAULT_TASK_SECONDS
+        self._shutdown = False
+        self.preemptions = 0
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"scheduler-{n}", daemon=True)
+            for n in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(
+        self,
+        fn: Callable,
+        *args,
+        priority: float = 5,
+        task_id: Optional[str] = None,
+        user: Any = None,
+        group: Any = None,
+        group_limit: Optional[int] = None,
+        interactive: bool = False,
+        **kwargs,
+    ) -> Future:
+        """Queue fn(*args, **kwargs) and return its Future (higher priority = sooner)."""
+        future: Future = Future()
+        with self._cond:
+            if self._shutdown:
+                raise RuntimeError("Scheduler is shut down")
+            if task_id is None or task_id in self._queued or task_id in self._running:
+                task_id = f"{task_id or 'task'}#{next(self._seq)}"
+            if group is not None and group_limit:
+                self._group_limits[group] = group_limit
+            score = priority - (time.monotonic() - self._epoch) / self.aging_seconds
+            if interactive and self.preempt:
+                score = self._preempt_score(score)
+            entry = _Entry(score, next(self._seq), task_id, user, group, interactive, fn, args, kwargs, future)
+            heapq.heappush(self._heaps.setdefault((user, group), []), entry)
+            self._queued[task_id] = entry
+            self._cond.notify()
+        return future
+
+    def _preempt_score(self, score: float) -> float:
+        """Score that puts an interactive task ahead of the queued batch work it can preempt."""
+        ahead = [e for e in self._queued.values() if e.score >= score and not e.interactive]
+        movable = [e.score for e in ahead if e.preempted < self.preempt_limit]
+        if not movable:
+            return score
+        target = max(movable) + _PREEMPT_STEP
+        protected = [e.score for e in ahead if e.preempted >= self.preempt_limit]
+        if protected:
+            target = min(target, min(protected) - _PREEMPT_STEP)
+        for entry in ahead:
+            if entry.score < target:
+                entry.preempted += 1
+                self.preemptions += 1
+        return max(score, target)
+
+    def cancel(self, task_id: str) -> bool:
+        """Drop a task that hasn't started yet. Running tasks are left alone."""
+        with self._cond:
+            entry = self._queued.pop(task_id, None)
+            if entry is None:
+                return False
+            heap = self._heaps[(entry.user, entry.group)]
+            heap.remove(entry)
+            heapq.heapify(heap)
+            if not heap:
+                del self._heaps[(entry.user, entry.group)]
+        entry.future.cancel()
+        return True
+
+    def _dispatch_score(self, entry: _Entry) -> float:
+        return entry.score - self.fair_share_weight * self._user_running.get(entry.user, 0)
+
+    def _group_full(self, group: Any) -> bool:
+        limit = self._group_limits.get(group)
+        return group is not None and limit is not None and self._group_running.get(group, 0) >= limit
+
+    def _pop_next(self) -> Optional[_Entry]:
+        """Best runnable entry across the heaps, or None if everything is waiting on a group limit."""
+        best_key, best = None, None
+        for key, heap in self._heaps.items():
+            if self._group_full(key[1]):
+                continue
+            head = heap[0]
+            rank = (-self._dispatch_score(head), head.seq)
+            if best is None or rank < best:
+                best_key, best = key, rank
+        if best_key is None:
+            return None
+        heap = self._heaps[best_key]
+        entry = heapq.heappop(heap)
+        if not heap:
+            del self._heaps[best_key]
+        return entry
+
+    def _worker(self):
+        while True:
+            with self._cond:
+                while True:
+                    entry = self._pop_next()
+                    if entry is not None:
+                        break
+                    if self._shutdown:
+                        return
+                    self._cond.wait()
+                del self._queued[entry.task_id]
+                self._running[entry.task_id] = (entry, time.monotonic())
+                self._user_running[entry.user] = self._user_running.get(entry.user, 0) + 1
+                if entry.group is not None:
+                    self._group_running[entry.group] = self._group_running.get(entry.group, 0) + 1
+
+            if entry.future.set_running_or_notify_cancel():
+                try:
+                    entry.future.set_result(entry.fn(*entry.args, **entry.kwargs))
+                except BaseException as e:
+                    entry.future.set_exception(e)
+
+            with self._cond:
+                _, started = self._running.pop(entry.task_id)
+                elapsed = time.monotonic() - started
+                self._avg_seconds += DURATION_SMOOTHING * (elapsed - self._avg_seconds)
+                self._release(self._user_running, entry.user)
+                if entry.group is not None:
+                    if self._release(self._group_running, entry.group) == 0 and not any(
+                            key[1] == entry.group for key in self._heaps):
+                        self._group_limits.pop(entry.group, None)
+                # A freed group slot may unblock work another worker skipped
+                self._cond.notify_all()
+
+    @staticmethod
+    def _release(counts: Dict[Any, int], key: Any) -> int:
+        left = counts.get(key, 0) - 1
+        if left > 0:
+            counts[key] = left
+        else:
+            counts.pop(key, None)
+        return max(left, 0)
+
+    def _order(self) -> List[_Entry]:
+        """Queued entries in the order they would start if nothing else changed."""
+        return sorted(self._queued.values(), key=lambda e: (-self._dispatch_score(e), e.seq))
+
+    def position(self, task_id: str) -> Optional[int]:
+        """1-based place in the queue, or None if the task isn't queued."""
+        with self._cond:
+            if task_id not in self._queued:
+                return None
+            return next(n for n, e in enumerate(self._order(), 1) if e.task_id == task_id)
+
+    def estimated_start(self, task_id: str) -> Optional[datetime]:
+        """When a queued task should start, assuming average task durations."""
+        with self._cond:
+            if task_id not in self._queued:
+                return None
+            now = time.monotonic()
+            avg = self._avg_seconds
+            # Seconds until each worker is free
+            free = [max(0.0, avg - (now - started)) for _, started in self._running.values()]
+            free += [0.0] * (self.max_workers - len(free))
+            heapq.heapify(free)
+            for entry in self._order():
+                start = heapq.heappop(free)
+                if entry.task_id == task_id:
+                    return datetime.now() + timedelta(seconds=start)
+                heapq.heappush(free, start + avg)
+        return None
+
+    def get_active_count(self) -> int:
+        """Number of tasks currently running"""
+        with self._cond:
+            return len(self._running)
+
+    def get_queued_count(self) -> int:
+        with self._cond:
+            return len(self._queued)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "max_workers": self.max_workers,
+                "active": len(self._running),
+                "queued": len(self._queued),
+                "preemptions": self.preemptions,
+                "avg_task_seconds": round(self._avg_seconds, 1),
+            }
+
+    def shutdown(self, wait: bool = True, cancel_queued: bool = True):
+        """Stop the workers; queued tasks are cancelled unless cancel_queued is False."""
+        with self._cond:
+            if cancel_queued:
+                for task_id in list(self._queued):
+                    entry = self._queued.pop(task_id)
+                    entry.future.cancel()
+                self._heaps.clear()
+            self._shutdown = True
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join()
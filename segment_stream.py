@@ -0,0 +1,178 @@
+"""
+SegmentStream - Live transcription events for the API's WebSocket clients.
+
+The transcription side publishes from whatever thread it runs on: each SRT
+entry as it is written ('segment'), progress figures ('stats') and
+loop-recovery rollbacks ('truncate'), then the task's final status. The
+stream keeps the task's current segment list, so a client that reconnects
+can resume from segment N instead of downloading the SRT.
+
+Subscribers don't get a queue each. They hold a cursor into the shared
+segment list and are woken when something new arrives, then read at their
+own pace: a slow client holds back nobody, costs no extra memory, and is
+sent only the latest stats rather than every one it missed. A segment whose
+index is not past the last one (a retry or a resumed pass writing over
+earlier entries) drops everything from that index on, exactly like an
+explicit truncate.
+
+Finished streams are kept for RETENTION_SECONDS so late reconnects can still
+replay them.
+"""
+import asyncio
+import bisect
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Optional, Set, Tuple
+
+RETENTION_SECONDS = 300
+# Most segments handed to a subscriber per wake-up, so pings and stats still interleave
+MAX_BATCH = 200
+
+
+class SegmentStream:
+    def __init__(self, key: str):
+        self.key = key
+        self._lock = threading.Lock()
+        self._indices: List[int] = []
+        self._segments: List[Dict[str, Any]] = []
+        # Index each rollback cut back to, in order
+        self._truncations: List[int] = []
+        self._stats: Optional[Dict[str, Any]] = None
+        self._stats_version = 0
+        self._status: Optional[Dict[str, Any]] = None
+        self._waiters: Set[Tuple[asyncio.AbstractEventLoop, asyncio.Event]] = set()
+        self.finished_at: Optional[float] = None
+
+    def publish(self, kind: str, fields: Dict[str, Any]):
+        """Record one transcription event; unknown kinds are ignored."""
+        with self._lock:
+            if kind == 'segment':
+                index = int(fields['index'])
+                if self._indices and index <= self._indices[-1]:
+                    self._truncate(index)
+                self._indices.append(index)
+                self._segments.append(dict(fields, type='segment', index=index))
+            elif kind == 'truncate':
+                self._truncate(int(fields['index']))
+            elif kind == 'stats':
+                self._stats = dict(fields, type='stats')
+                self._stats_version += 1
+            else:
+                return
+        self._notify()
+
+    def _truncate(self, index: int):
+        cut = bisect.bisect_left(self._indices, index)
+        del self._indices[cut:]
+        del self._segments[cut:]
+        self._truncations.append(index)
+
+    def finish(self, status: str, **fields):
+        """Final status; subscribers get it after the remaining segments and stop."""
+        with self._lock:
+            self._status = dict(fields, type='status', status=status)
+            self.finished_at = time.monotonic()
+        self._notify()
+
+    def segments(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            return list(self._segments)
+
+    def _notify(self):
+        with self._lock:
+            waiters = list(self._waiters)
+        for loop, event in waiters:
+            try:
+                loop.call_soon_threadsafe(event.set)
+            except RuntimeError:
+                # The subscriber's loop is gone; its finally block drops the waiter
+                pass
+
+    async def follow(self, from_index: int = 0,
+                     idle_timeout: Optional[float] = None) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Yield lists of messages from segment from_index on, ending with the final status.
+
+        An empty list is yielded after idle_timeout seconds without news, so
+        the caller can ping.
+        """
+        event = asyncio.Event()
+        waiter = (asyncio.get_running_loop(), event)
+        with self._lock:
+            self._waiters.add(waiter)
+            seen_truncations = len(self._truncations)
+            next_index = from_index
+            if self._indices and from_index > self._indices[-1] + 1:
+                # Rolled back below what the client already has since it last saw us
+                next_index = self._indices[-1] + 1
+            pending = [{'type': 'truncate', 'index': next_index}] if next_index < from_index else []
+        stats_version = 0
+        try:
+            while True:
+                event.clear()
+                messages, pending = pending, []
+                with self._lock:
+                    cuts = self._truncations[seen_truncations:]
+                    seen_truncations = len(self._truncations)
+                    if cuts and min(cuts) < next_index:
+                        next_index = min(cuts)
+                        messages.append({'type': 'truncate', 'index': next_index})
+                    start = bisect.bisect_left(self._indices, next_index)
+                    chunk = self._segments[start:start + MAX_BATCH]
+                    if chunk:
+                        messages.extend(chunk)
+                        next_index = chunk[-1]['index'] + 1
+                    more = start + len(chunk) < len(self._segments)
+                    if self._stats is not None and self._stats_version != stats_version:
+                        messages.append(self._stats)
+                        stats_version = self._stats_version
+                    status = self._status if not more else None
+                if status is not None:
+                    messages.append(status)
+                if messages:
+                    yield messages
+                if status is not None:
+                    return
+                if more:
+                    continue
+                try:
+                    await asyncio.wait_for(event.wait(), idle_timeout)
+                except asyncio.TimeoutError:
+                    yield []
+        finally:
+            with self._lock:
+                self._waiters.discard(waiter)
+
+
+_streams: Dict[str, SegmentStream] = {}
+_streams_lock = threading.Lock()
+
+
+def _expire():
+    """Drop streams that finished more than RETENTION_SECONDS ago (caller holds the lock)."""
+    cutoff = time.monotonic() - RETENTION_SECONDS
+    for key in [k for k, s in _streams.items() if s.finished_at is not None and s.finished_at < cutoff]:
+        del _streams[key]
+
+
+def open_stream(key: str) -> SegmentStream:
+    """The stream for key, created if needed."""
+    with _streams_lock:
+        _expire()
+        stream = _streams.get(key)
+        if stream is None:
+            stream = _streams[key] = SegmentStream(key)
+        return stream
+
+
+def get_stream(key: str) -> Optional[SegmentStream]:
+    with _streams_lock:
+        _expire()
+        return _streams.get(key)
+
+
+def publish(key: str, kind: str, fields: Dict[str, Any]):
+    open_stream(key).publish(kind, fields)
+
+
+def finish(key: str, status: str, **fields):
+    open_stream(key).finish(status, **fields)
@@ -0,0 +1,62 @@
+"""
+SqliteDb - Connection plumbing shared by the SQLite-backed caches and stores.
+
+audio_cache, result_cache, metadata_cache, job_store and task_store each keep
+one database file. They all want the same things from it: one connection per
+thread (sqlite3 connections aren't shared), WAL so readers never block the
+writer, autocommit for single statements and BEGIN IMMEDIATE for multi-statement
+updates, so separate processes serialize cleanly.
+
+A Database holds a schema (plus optional pragmas and a setup hook for
+migrations) and hands out the calling thread's connection for a path. The path
+is passed on every call because the owning module's directory can change at
+runtime (tests point it at a temporary directory).
+"""
+import os
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Callable, Optional, Sequence
+
+# Seconds a writer waits for another process's transaction before giving up
+LOCK_TIMEOUT_SECONDS = 30
+
+
+class Database:
+    def __init__(self, schema: str, pragmas: Sequence[str] = (),
+                 setup: Optional[Callable[[sqlite3.Connection], None]] = None):
+        self.schema = schema
+        self.pragmas = tuple(pragmas)
+        self.setup = setup
+        self._local = threading.local()
+
+    def connect(self, db_path: str) -> sqlite3.Connection:
+        """The calling thread's connection to db_path, opened (and set up) on first use."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.db_path == db_path:
+            return conn
+        os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+        # Autocommit; multi-statement updates use transaction()
+        conn = sqlite3.connect(db_path, timeout=LOCK_TIMEOUT_SECONDS, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        for pragma in self.pragmas:
+            conn.execute(f"PRAGMA {pragma}")
+        conn.executescript(self.schema)
+        if self.setup is not None:
+            self.setup(conn)
+        self._local.conn, self._local.db_path = conn, db_path
+        return conn
+
+
+@contextmanager
+def transaction(conn: sqlite3.Connection):
+    """BEGIN IMMEDIATE ... COMMIT, rolled back if the block raises."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        yield conn
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
@@ -0,0 +1,185 @@
+"""
+SrtIndex - Tail index for SRT files that are still being written.
+
+Resume and loop-trim only care about the end of an .unfinished.srt, so the
+writer keeps a one-line sidecar (<srt>.idx) with the last complete segment's
+number, end time and the byte offset just past it. Readers trust the sidecar
+after checking the bytes right before that offset, and otherwise fall back to
+reading blocks backwards from the end of the file. Neither path reads the
+whole transcript, however long it is.
+"""
+import os
+import re
+from typing import Iterator, NamedTuple, Optional, Tuple
+
+INDEX_SUFFIX = ".idx"
+_CHUNK_BYTES = 64 * 1024
+_VERIFY_BYTES = 4096
+_TIME_RE = re.compile(rb'(\d{2}):(\d{2}):(\d{2}),(\d{3})\s*-->\s*(\d{2}):(\d{2}):(\d{2}),(\d{3})')
+# Fixed width so every update overwrites the previous line in place
+_LINE_FORMAT = "{number:>10} {end:>16.3f} {offset:>16}\n"
+
+
+class TailEntry(NamedTuple):
+    number: int
+    end: float
+    offset: int  # byte offset just past the segment's trailing blank line
+
+
+def index_path(srt_path: str) -> str:
+    return srt_path + INDEX_SUFFIX
+
+
+def _parse_block(block: bytes) -> Optional[Tuple[int, float]]:
+    """Return (number, end_seconds) for a complete SRT block, else None."""
+    lines = block.strip().split(b'\n')
+    if len(lines) < 3:
+        return None
+    try:
+        number = int(lines[0])
+    except ValueError:
+        return None
+    match = _TIME_RE.search(lines[1])
+    if not match:
+        return None
+    h, m, s, ms = (int(g) for g in match.groups()[4:])
+    return number, h * 3600 + m * 60 + s + ms / 1000.0
+
+
+def iter_blocks_reverse(srt_path: str, chunk_bytes: int = _CHUNK_BYTES) -> Iterator[Tuple[int, int, bytes]]:
+    """Yield (start, end, raw_block) from the last block to the first.
+
+    The file is read backwards in chunks, so stopping early costs only the
+    tail that was actually visited.
+    """
+    with open(srt_path, 'rb') as f:
+        pos = f.seek(0, os.SEEK_END)
+        buf = b''
+        while pos > 0:
+            step = min(chunk_bytes, pos)
+            pos -= step
+            f.seek(pos)
+            buf = f.read(step) + buf
+            parts = buf.split(b'\n\n')
+            # parts[0] may continue into the previous chunk; keep it for the next read
+            buf = parts[0]
+            offset = pos + len(parts[0]) + 2
+            found = []
+            for part in parts[1:]:
+                found.append((offset, offset + len(part), part))
+                offset += len(part) + 2
+            for item in reversed(found):
+                if item[2].strip():
+                    yield item
+        if buf.strip():
+            yield 0, len(buf), buf
+
+
+def _entry_after(srt_path: str, start: int, end: int, block: bytes) -> Optional[TailEntry]:
+    parsed = _parse_block(block)
+    if parsed is None:
+        return None
+    # Include the blank line after the block when it is on disk
+    size = os.path.getsize(srt_path)
+    return TailEntry(parsed[0], parsed[1], min(end + 2, size))
+
+
+def _read_index(srt_path: str) -> Optional[TailEntry]:
+    """Return the sidecar entry if it still matches the SRT on disk."""
+    try:
+        with open(index_path(srt_path), 'r', encoding='ascii') as f:
+            number, end, offset = f.readline().split()
+        entry = TailEntry(int(number), float(end), int(offset))
+    except (OSError, ValueError):
+        return None
+    try:
+        if entry.offset > os.path.getsize(srt_path) or entry.offset < 2:
+            return None
+        with open(srt_path, 'rb') as f:
+            lo = max(entry.offset - _VERIFY_BYTES, 0)
+            f.seek(lo)
+            tail = f.read(entry.offset - lo)
+    except OSError:
+        return None
+    if not tail.endswith(b'\n\n'):
+        return None
+    last = tail[:-2].rsplit(b'\n\n', 1)[-1]
+    parsed = _parse_block(last)
+    if parsed is None or parsed[0] != entry.number or abs(parsed[1] - entry.end) > 0.002:
+        return None
+    return entry
+
+
+def last_segment(srt_path: str) -> Optional[TailEntry]:
+    """Last complete segment of an SRT, from the sidecar or a reverse scan."""
+    if not os.path.exists(srt_path):
+        return None
+    entry = _read_index(srt_path)
+    if entry is not None:
+        return entry
+    for start, end, block in iter_blocks_reverse(srt_path):
+        entry = _entry_after(srt_path, start, end, block)
+        if entry is not None:
+            return entry
+    return None
+
+
+def truncate_after(srt_path: str, max_end_seconds: float) -> Optional[TailEntry]:
+    """Drop trailing segments ending after max_end_seconds (and any partial block).
+
+    Returns the new last segment, or None if nothing was kept.
+    """
+    if not os.path.exists(srt_path):
+        return None
+    keep_until = 0
+    kept = None
+    for start, end, block in iter_blocks_reverse(srt_path):
+        entry = _entry_after(srt_path, start, end, block)
+        if entry is not None and entry.end <= max_end_seconds:
+            keep_until, kept = entry.offset, entry
+            break
+    with open(srt_path, 'r+b') as f:
+        f.truncate(keep_until)
+    if kept is not None:
+        write_index(srt_path, kept)
+    else:
+        remove(srt_path)
+    return kept
+
+
+def write_index(srt_path: str, entry: TailEntry):
+    with open(index_path(srt_path), 'w', encoding='ascii') as f:
+        f.write(_LINE_FORMAT.format(number=entry.number, end=entry.end, offset=entry.offset))
+
+
+def remove(srt_path: str):
+    try:
+        os.remove(index_path(srt_path))
+    except OSError:
+        pass
+
+
+class IndexWriter:
+    """Keeps the sidecar current while a writer appends segments.
+
+    Call update() after each block has been written and flushed; the line is
+    rewritten in place so each update is a single small write.
+    """
+
+    def __init__(self, srt_path: str):
+        self.srt_path = srt_path
+        self._file = open(index_path(srt_path), 'w', encoding='ascii')
+
+    def update(self, number: int, end: float, offset: int):
+        self._file.seek(0)
+        self._file.write(_LINE_FORMAT.format(number=number, end=end, offset=offset))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,394 @@
+"""
+SubtitleCatalog - In-memory index of the .srt files under the output tree.
+
+/subtitles/list used to walk the whole output directory and stat every
+subtitle on each request. The catalog does that walk once, in the
+background, when the API starts, and then keeps itself current two ways:
+
+- the writer tells it: WhisperSubs calls notify() for every subtitle it
+  finalizes, so API transcriptions show up at once;
+- it polls directory mtimes every POLL_SECONDS
+  (WHISPER_SUBS_CATALOG_POLL_SECONDS, default 5) for everything else (CLI
+  runs, downloaded subtitles, files deleted by hand). A directory's mtime
+  changes whenever an entry is added, removed or renamed in it, so a poll
+  stats each known directory and lists only the ones that changed, which
+  costs a stat per directory instead of a stat per file.
+
+Entries are kept sorted by creation time and by lower-cased path, so a page
+in date order, a path-prefix search and the next page after a cursor are
+bisects plus a slice; a substring search scans in sort order and stops as
+soon as the page is full.
+"""
+import base64
+import bisect
+import datetime
+import json
+import os
+import threading
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Tuple
+
+POLL_ENV = "WHISPER_SUBS_CATALOG_POLL_SECONDS"
+DEFAULT_POLL_SECONDS = 5.0
+SUBTITLE_SUFFIX = ".srt"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+SORT_FIELDS = ("created", "path")
+# A directory bringing more new files than this is appended and sorted once, not insorted one by one
+BULK_ADD_THRESHOLD = 64
+# Searches with more hits than this scan the sorted list instead of sorting every hit
+SEARCH_SORT_LIMIT = 5000
+
+try:
+    POLL_SECONDS = float(os.environ.get(POLL_ENV, DEFAULT_POLL_SECONDS))
+except ValueError:
+    POLL_SECONDS = DEFAULT_POLL_SECONDS
+
+
+class _File(NamedTuple):
+    inode: int
+    created: float
+
+
+class _Dir:
+    __slots__ = ("mtime_ns", "files", "subdirs")
+
+    def __init__(self):
+        self.mtime_ns: Optional[int] = None
+        self.files: Dict[str, _File] = {}
+        self.subdirs: Set[str] = set()
+
+
+class SubtitleCatalog:
+    def __init__(self, root: str):
+        self.root = os.path.abspath(root)
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, _Dir] = {}
+        # Relative path -> (created, lower-cased path)
+        self._entries: Dict[str, Tuple[float, str]] = {}
+        self._by_created: List[Tuple[float, str]] = []
+        self._by_path: List[Tuple[str, str]] = []
+        # Bulk adds are appended; the lists are re-sorted before the next bisect
+        self._unsorted = False
+        # Joined lower-cased paths for substring search, rebuilt after a change
+        self._blob: Optional[str] = None
+        self._blob_starts: List[int] = []
+        self._blob_rels: List[str] = []
+        self.ready = False
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- index maintenance (caller holds the lock) ----
+
+    def _add(self, rel: str, created: float, bulk: bool = False):
+        self._remove(rel)
+        lower = rel.lower()
+        self._entries[rel] = (created, lower)
+        self._blob = None
+        if bulk or self._unsorted:
+            self._by_created.append((created, rel))
+            self._by_path.append((lower, rel))
+            self._unsorted = True
+        else:
+            bisect.insort(self._by_created, (created, rel))
+            bisect.insort(self._by_path, (lower, rel))
+
+    def _ensure_sorted(self):
+        if self._unsorted:
+            # Sorted runs plus an appended tail: timsort merges these in about linear time
+            self._by_created.sort()
+            self._by_path.sort()
+            self._unsorted = False
+
+    def _remove(self, rel: str):
+        entry = self._entries.pop(rel, None)
+        if entry is None:
+            return
+        self._blob = None
+        self._ensure_sorted()
+        created, lower = entry
+        for items, key in ((self._by_created, (created, rel)), (self._by_path, (lower, rel))):
+            i = bisect.bisect_left(items, key)
+            if i < len(items) and items[i] == key:
+                del items[i]
+
+    def _forget_dir(self, path: str):
+        record = self._dirs.pop(path, None)
+        if record is None:
+            return
+        for name in record.files:
+            self._remove(os.path.relpath(os.path.join(path, name), self.root))
+        for sub in record.subdirs:
+            self._forget_dir(sub)
+
+    # ---- scanning ----
+
+    def _scan_dir(self, path: str) -> List[str]:
+        """Bring one directory up to date; returns subdirectories not seen before."""
+        try:
+            # Taken before listing, so a change made meanwhile is picked up by the next poll
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as it:
+                listing = list(it)
+        except OSError:
+            with self._lock:
+                self._forget_dir(path)
+            return []
+
+        files: Dict[str, Optional[int]] = {}
+        subdirs: Set[str] = set()
+        for entry in listing:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.add(entry.path)
+                elif entry.name.endswith(SUBTITLE_SUFFIX):
+                    files[entry.name] = entry.inode()
+            except OSError:
+                continue
+
+        with self._lock:
+            record = self._dirs.get(path) or _Dir()
+            known = dict(record.files)
+        # Stat outside the lock: only new files and ones replaced by a rename
+        stats: Dict[str, _File] = {}
+        for name, inode in files.items():
+            old = known.get(name)
+            if old is not None and old.inode == inode:
+                stats[name] = old
+                continue
+            try:
+                stats[name] = _File(inode, os.path.getctime(os.path.join(path, name)))
+            except OSError:
+                continue
+
+        with self._lock:
+            for name in set(record.files) - set(stats):
+                self._remove(os.path.relpath(os.path.join(path, name), self.root))
+            changed = [(os.path.relpath(os.path.join(path, name), self.root), info)
+                       for name, info in stats.items() if record.files.get(name) != info]
+            # Drop replaced entries first so the bulk appends don't force a re-sort each
+            for rel, _ in changed:
+                self._remove(rel)
+            bulk = len(changed) > BULK_ADD_THRESHOLD
+            for rel, info in changed:
+                self._add(rel, info.created, bulk)
+            for sub in record.subdirs - subdirs:
+                self._forget_dir(sub)
+            new_dirs = [sub for sub in subdirs if sub not in self._dirs]
+            record.files, record.subdirs, record.mtime_ns = stats, subdirs, mtime_ns
+            self._dirs[path] = record
+        return new_dirs
+
+    def refresh(self) -> int:
+        """One poll: relist directories whose mtime changed. Returns how many were listed."""
+        with self._lock:
+            candidates = list(self._dirs.items()) or [(self.root, None)]
+        pending = []
+        for path, record in candidates:
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                mtime_ns = None
+            if record is None or mtime_ns != record.mtime_ns:
+                pending.append(path)
+        listed = 0
+        while pending:
+            path = pending.pop()
+            listed += 1
+            pending.extend(self._scan_dir(path))
+        with self._lock:
+            # Done here, off the request path
+            self._ensure_sorted()
+            self._build_search_index()
+        return listed
+
+    def notify(self, path: str):
+        """The writer's hint that path was created, replaced or deleted."""
+        path = os.path.abspath(path)
+        directory, name = os.path.split(path)
+        if not name.endswith(SUBTITLE_SUFFIX) or os.path.commonpath([self.root, path]) != self.root:
+            return
+        rel = os.path.relpath(path, self.root)
+        try:
+            info = _File(os.stat(path).st_ino, os.path.getctime(path))
+        except OSError:
+            info = None
+        with self._lock:
+            record = self._dirs.get(directory)
+            if info is None:
+                self._remove(rel)
+                if record is not None:
+                    record.files.pop(name, None)
+                return
+            self._add(rel, info.created)
+            if record is not None:
+                record.files[name] = info
+        # A directory the catalog hasn't seen yet is picked up by the next poll
+
+    # ---- background thread ----
+
+    def start(self, poll_seconds: float = POLL_SECONDS) -> "SubtitleCatalog":
+        def run():
+            self._refresh_logged()
+            self.ready = True
+            while not self._stop.wait(poll_seconds):
+                self._refresh_logged()
+
+        self._thread = threading.Thread(target=run, name="subtitle-catalog", daemon=True)
+        self._thread.start()
+        return self
+
+    def _refresh_logged(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Subtitle catalog refresh failed: {e}")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    # ---- queries ----
+
+    def query(self, search: Optional[str] = None, prefix: Optional[str] = None,
+              sort: str = "created", descending: bool = True, cursor: Optional[str] = None,
+              limit: int = DEFAULT_PAGE_SIZE) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """One page of subtitles and the cursor for the next page (None at the end).
+
+        search matches anywhere in the relative path, prefix at its start;
+        both ignore case. Raises ValueError for an unknown sort or a bad cursor.
+        """
+        if sort not in SORT_FIELDS:
+            raise ValueError(f"Unknown sort field: {sort}")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        search = search.lower() if search else None
+        prefix = prefix.lower() if prefix else None
+        after = _decode_cursor(cursor, sort) if cursor else None
+
+        with self._lock:
+            self._ensure_sorted()
+            matches = self._search(search) if search is not None else None
+            if matches is not None:
+                # Few enough hits to sort outright; nothing left to filter but the prefix
+                search = None
+                if prefix is not None:
+                    matches = [rel for rel in matches if self._entries[rel][1].startswith(prefix)]
+                keys = sorted(self._key(rel, sort) for rel in matches)
+            elif prefix is not None:
+                lo = bisect.bisect_left(self._by_path, (prefix,))
+                hi = bisect.bisect_left(self._by_path, (prefix + "\U0010ffff",))
+                if sort == "path":
+                    keys = self._by_path[lo:hi]
+                else:
+                    keys = sorted((self._entries[rel][0], rel) for _, rel in self._by_path[lo:hi])
+            else:
+                keys = self._by_path if sort == "path" else self._by_created
+
+            if after is None:
+                positions = range(len(keys) - 1, -1, -1) if descending else range(len(keys))
+            elif descending:
+                positions = range(bisect.bisect_left(keys, after) - 1, -1, -1)
+            else:
+                positions = range(bisect.bisect_right(keys, after), len(keys))
+
+            page = []
+            for i in positions:
+                key = keys[i]
+                rel = key[1]
+                if search is not None and search not in self._entries[rel][1]:
+                    continue
+                if len(page) == limit:
+                    return [_item(k, self._entries) for k in page], _encode_cursor(sort, page[-1])
+                page.append(key)
+            return [_item(k, self._entries) for k in page], None
+
+    def _key(self, rel: str, sort: str) -> Tuple[Any, str]:
+        created, lower = self._entries[rel]
+        return (created, rel) if sort == "created" else (lower, rel)
+
+    def _build_search_index(self):
+        if self._blob is not None:
+            return
+        rels = list(self._entries)
+        lowers = [self._entries[rel][1] for rel in rels]
+        starts = [0]
+        for lower in lowers:
+            starts.append(starts[-1] + len(lower) + 1)
+        self._blob, self._blob_starts, self._blob_rels = "\0".join(lowers), starts, rels
+
+    def _search(self, needle: str) -> Optional[List[str]]:
+        """Paths containing needle, or None when there are more than SEARCH_SORT_LIMIT.
+
+        All lower-cased paths are joined into one string so str.find does the
+        scanning; a common needle is better served by walking the sorted list,
+        which fills a page after a few entries.
+        """
+        if "\0" in needle:
+            return []
+        self._build_search_index()
+        blob, starts, rels = self._blob, self._blob_starts, self._blob_rels
+        found = []
+        pos = blob.find(needle)
+        while pos != -1:
+            i = bisect.bisect_right(starts, pos) - 1
+            found.append(rels[i])
+            if len(found) > SEARCH_SORT_LIMIT:
+                return None
+            pos = blob.find(needle, starts[i + 1])
+        return found
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"ready": self.ready, "subtitles": len(self._entries), "directories": len(self._dirs)}
+
+
+def _item(key: Tuple[Any, str], entries: Dict[str, Tuple[float, str]]) -> Dict[str, Any]:
+    rel = key[1]
+    return {
+        "filename": os.path.basename(rel),
+        "path": rel,
+        "created": datetime.datetime.fromtimestamp(entries[rel][0]).isoformat(),
+    }
+
+
+def _encode_cursor(sort: str, key: Tuple[Any, str]) -> str:
+    return base64.urlsafe_b64encode(json.dumps([sort, key[0], key[1]]).encode()).decode()
+
+
+def _decode_cursor(cursor: str, sort: str) -> Tuple[Any, str]:
+    try:
+        cursor_sort, first, rel = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if cursor_sort != sort:
+            raise ValueError
+        return (float(first) if sort == "created" else str(first)), str(rel)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+_catalog: Optional[SubtitleCatalog] = None
+_catalog_lock = threading.Lock()
+
+
+def start(root: str, poll_seconds: float = POLL_SECONDS) -> SubtitleCatalog:
+    """Create the process-wide catalog for root and start indexing it in the background."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None or _catalog.root != os.path.abspath(root):
+            if _catalog is not None:
+                _catalog.stop()
+            _catalog = SubtitleCatalog(root).start(poll_seconds)
+        return _catalog
+
+
+def get_catalog() -> Optional[SubtitleCatalog]:
+    return _catalog
+
+
+def notify(path: str):
+    """Tell the catalog, if this process runs one, that a subtitle was written or removed."""
+    catalog = _catalog
+    if catalog is not None:
+        try:
+            catalog.notify(path)
+        except Exception:
+            pass
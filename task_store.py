@@ -0,0 +1,311 @@
+"""
+TaskStore - Persistent API task and batch records.
+
+The API server's per-request tasks and batches live in a SQLite database
+(WAL) beside the job store, indexed by status, batch and creation time, so
+a restart keeps the history, list endpoints page through it with a cursor
+instead of serialising every entry ever created, and the health counters are
+GROUP BY queries over an index. Batch counts are derived from the batch's
+task rows, so there is no second set of counters to keep in step.
+
+Tasks that were queued or running when the server stopped are marked failed
+by recover_interrupted(); finished tasks older than the retention period are
+dropped by purge().
+"""
+import base64
+import datetime
+import json
+import os
+import sqlite3
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlite_db import Database, transaction
+
+STORE_DIR = os.path.join(os.path.expanduser("~"), ".config", "WhisperSubs")
+DB_NAME = "api_tasks.db"
+RETENTION_ENV = "WHISPER_SUBS_TASK_RETENTION_DAYS"
+DEFAULT_RETENTION_DAYS = 7
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+FINISHED_STATUSES = ("completed", "failed", "cancelled")
+ACTIVE_STATUSES = ("pending", "queued", "processing")
+
+try:
+    RETENTION_DAYS = float(os.environ.get(RETENTION_ENV, DEFAULT_RETENTION_DAYS))
+except ValueError:
+    RETENTION_DAYS = DEFAULT_RETENTION_DAYS
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    source TEXT,
+    model_name TEXT,
+    batch_id TEXT,
+    user TEXT,
+    priority INTEGER,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    progress TEXT,
+    result TEXT,
+    error TEXT,
+    options TEXT
+);
+CREATE INDEX IF NOT EXISTS tasks_created ON tasks(created_at, id);
+CREATE INDEX IF NOT EXISTS tasks_status ON tasks(status, created_at);
+CREATE INDEX IF NOT EXISTS tasks_batch ON tasks(batch_id, status);
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    user TEXT,
+    total INTEGER NOT NULL,
+    created_at TEXT NOT NULL,
+    completed_at TEXT
+);
+CREATE INDEX IF NOT EXISTS batches_created ON batches(created_at, id);
+"""
+
+_TASK_COLUMNS = ("status", "source", "model_name", "batch_id", "user", "priority",
+                 "created_at", "completed_at", "progress", "result", "error", "options")
+_JSON_COLUMNS = ("result", "options")
+# Task status -> BatchStatusResponse counter
+_BATCH_BUCKETS = {"pending": "pending", "queued": "pending", "processing": "processing",
+                  "completed": "completed", "failed": "failed", "cancelled": "cancelled"}
+
+_db = Database(_SCHEMA)
+
+
+def _connect() -> sqlite3.Connection:
+    """Per-thread connection to the task database."""
+    return _db.connect(os.path.join(STORE_DIR, DB_NAME))
+
+
+def _now() -> str:
+    return datetime.datetime.now().isoformat()
+
+
+def _encode_cursor(created_at: str, key: str) -> str:
+    return base64.urlsafe_b64encode(json.dumps([created_at, key]).encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        created_at, key = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(key)
+    except (ValueError, TypeError):
+        raise ValueError("Invalid cursor")
+
+
+def _page(rows: List[sqlite3.Row], limit: int) -> Tuple[List[sqlite3.Row], Optional[str]]:
+    """Split the limit+1 rows a page query fetched into the page and the next cursor."""
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, _encode_cursor(rows[-1]["created_at"], rows[-1]["id"])
+
+
+def _task_dict(row: sqlite3.Row) -> Dict[str, Any]:
+    task = {"task_id": row["id"]}
+    for column in _TASK_COLUMNS:
+        value = row[column]
+        task[column] = json.loads(value) if column in _JSON_COLUMNS and value is not None else value
+    return task
+
+
+def _column_value(column: str, value: Any) -> Any:
+    return json.dumps(value) if column in _JSON_COLUMNS and value is not None else value
+
+
+def create_task(task_id: str, **fields) -> Dict[str, Any]:
+    """Insert a task; status defaults to pending and created_at to now."""
+    fields.setdefault("status", "pending")
+    fields.setdefault("created_at", _now())
+    unknown = set(fields) - set(_TASK_COLUMNS)
+    if unknown:
+        raise KeyError(f"Unknown task fields: {sorted(unknown)}")
+    columns = ["id"] + list(fields)
+    _connect().execute(
+        f"INSERT INTO tasks ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+        [task_id] + [_column_value(c, v) for c, v in fields.items()],
+    )
+    return get_task(task_id)
+
+
+def update_task(task_id: str, **fields) -> bool:
+    """Set fields on a task; False if there is no such task."""
+    unknown = set(fields) - set(_TASK_COLUMNS)
+    if unknown:
+        raise KeyError(f"Unknown task fields: {sorted(unknown)}")
+    if not fields:
+        return get_task(task_id) is not None
+    assignments = ", ".join(f"{column} = ?" for column in fields)
+    cur = _connect().execute(
+        f"UPDATE tasks SET {assignments} WHERE id = ?",
+        [_column_value(c, v) for c, v in fields.items()] + [task_id],
+    )
+    return cur.rowcount > 0
+
+
+def finish_task(task_id: str, status: str, **fields) -> bool:
+    """Move a task to a final status, stamping completed_at."""
+    return update_task(task_id, status=status, completed_at=_now(), **fields)
+
+
+def get_task(task_id: str) -> Optional[Dict[str, Any]]:
+    row = _connect().execute("SELECT * FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    return _task_dict(row) if row else None
+
+
+def get_status(task_id: str) -> Optional[str]:
+    row = _connect().execute("SELECT status FROM tasks WHERE id = ?", (task_id,)).fetchone()
+    return row["status"] if row else None
+
+
+def delete_task(task_id: str) -> bool:
+    return _connect().execute("DELETE FROM tasks WHERE id = ?", (task_id,)).rowcount > 0
+
+
+def list_tasks(
+    status: Optional[str] = None,
+    batch_id: Optional[str] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of tasks, oldest first, and the cursor for the next page (None at the end)."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    where, params = [], []
+    if status:
+        where.append("status = ?")
+        params.append(status)
+    if batch_id:
+        where.append("batch_id = ?")
+        params.append(batch_id)
+    if cursor:
+        where.append("(created_at, id) > (?, ?)")
+        params.extend(_decode_cursor(cursor))
+    sql = "SELECT * FROM tasks"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at, id LIMIT ?"
+    rows, next_cursor = _page(_connect().execute(sql, params + [limit + 1]).fetchall(), limit)
+    return [_task_dict(row) for row in rows], next_cursor
+
+
+def status_counts() -> Dict[str, int]:
+    """Number of tasks in each status."""
+    rows = _connect().execute("SELECT status, COUNT(*) AS n FROM tasks GROUP BY status").fetchall()
+    return {row["status"]: row["n"] for row in rows}
+
+
+def create_batch(batch_id: str, total: int, user: Optional[str] = None) -> Dict[str, Any]:
+    _connect().execute(
+        "INSERT INTO batches (id, user, total, created_at) VALUES (?, ?, ?, ?)",
+        (batch_id, user, total, _now()),
+    )
+    return get_batch(batch_id)
+
+
+def finish_batch(batch_id: str):
+    _connect().execute("UPDATE batches SET completed_at = ? WHERE id = ?", (_now(), batch_id))
+
+
+def _batch_dicts(conn: sqlite3.Connection, rows: List[sqlite3.Row]) -> List[Dict[str, Any]]:
+    batches = {}
+    for row in rows:
+        batches[row["id"]] = {
+            "batch_id": row["id"],
+            "total": row["total"],
+            "pending": 0, "processing": 0, "completed": 0, "failed": 0, "cancelled": 0,
+            "created_at": row["created_at"],
+            "completed_at": row["completed_at"],
+            "tasks": [],
+        }
+    if not batches:
+        return []
+    marks = ",".join("?" * len(batches))
+    for row in conn.execute(
+            f"SELECT id, batch_id, status FROM tasks WHERE batch_id IN ({marks}) ORDER BY created_at, id",
+            list(batches)):
+        batch = batches[row["batch_id"]]
+        batch["tasks"].append(row["id"])
+        bucket = _BATCH_BUCKETS.get(row["status"])
+        if bucket:
+            batch[bucket] += 1
+    return list(batches.values())
+
+
+def get_batch(batch_id: str) -> Optional[Dict[str, Any]]:
+    conn = _connect()
+    rows = conn.execute("SELECT * FROM batches WHERE id = ?", (batch_id,)).fetchall()
+    batches = _batch_dicts(conn, rows)
+    return batches[0] if batches else None
+
+
+def list_batches(
+    active: Optional[bool] = None,
+    cursor: Optional[str] = None,
+    limit: int = DEFAULT_PAGE_SIZE,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """One page of batches, oldest first, and the cursor for the next page."""
+    limit = max(1, min(limit, MAX_PAGE_SIZE))
+    where, params = [], []
+    if active is not None:
+        where.append("completed_at IS NULL" if active else "completed_at IS NOT NULL")
+    if cursor:
+        where.append("(created_at, id) > (?, ?)")
+        params.extend(_decode_cursor(cursor))
+    sql = "SELECT * FROM batches"
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    sql += " ORDER BY created_at, id LIMIT ?"
+    conn = _connect()
+    rows, next_cursor = _page(conn.execute(sql, params + [limit + 1]).fetchall(), limit)
+    return _batch_dicts(conn, rows), next_cursor
+
+
+def batch_counts() -> Dict[str, int]:
+    """Batch totals for /health and /metrics."""
+    conn = _connect()
+    row = conn.execute(
+        "SELECT COUNT(*) AS total, COALESCE(SUM(completed_at IS NULL), 0) AS active, "
+        "COALESCE(SUM(total), 0) AS total_tasks FROM batches"
+    ).fetchone()
+    completed = conn.execute(
+        "SELECT COUNT(*) FROM tasks WHERE batch_id IS NOT NULL AND status = 'completed'"
+    ).fetchone()[0]
+    return {"total": row["total"], "active": row["active"],
+            "total_tasks": row["total_tasks"], "completed_tasks": completed}
+
+
+def recover_interrupted() -> int:
+    """Fail the tasks a previous server process left queued or running; returns how many."""
+    conn = _connect()
+    now = _now()
+    marks = ",".join("?" * len(ACTIVE_STATUSES))
+    with transaction(conn):
+        count = conn.execute(
+            f"UPDATE tasks SET status = 'failed', error = 'Interrupted by server restart', completed_at = ? "
+            f"WHERE status IN ({marks})",
+            (now,) + ACTIVE_STATUSES,
+        ).rowcount
+        conn.execute("UPDATE batches SET completed_at = ? WHERE completed_at IS NULL", (now,))
+    return count
+
+
+def purge(retention_days: Optional[float] = None) -> int:
+    """Drop finished tasks, and finished batches left empty, older than the retention period."""
+    days = RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = (datetime.datetime.now() - datetime.timedelta(days=days)).isoformat()
+    conn = _connect()
+    marks = ",".join("?" * len(FINISHED_STATUSES))
+    with transaction(conn):
+        count = conn.execute(
+            f"DELETE FROM tasks WHERE status IN ({marks}) AND completed_at < ?",
+            FINISHED_STATUSES + (cutoff,),
+        ).rowcount
+        conn.execute(
+            "DELETE FROM batches WHERE completed_at < ? "
+            "AND NOT EXISTS (SELECT 1 FROM tasks WHERE tasks.batch_id = batches.id)",
+            (cutoff,),
+        )
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    return count
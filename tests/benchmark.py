@@ -0,0 +1,428 @@
+#!/usr/bin/env python3
+"""Real-time-factor benchmark for the local transcription adapters.
+
+Generates (or loads) fixed-length fixtures and, for every available local
+adapter and compute type, measures each stage in a fresh subprocess so model
+loads are cold and peak RSS belongs to that run alone:
+
+    decode         source -> 16 kHz PCM through pcm_store (cold, private store)
+    load           model load, as recorded by the model cache
+    first segment  time from the transcribe call to the first yielded segment
+    rtf            transcription time (without load) / audio duration
+    peak RSS       max resident set size of the run
+
+Results are written as JSON and CSV with stable row order and columns, so two
+files from different commits can be diffed directly or with --compare.
+
+Usage:
+    # 30 s and 10 min noise fixtures, every local adapter
+    python tests/benchmark.py
+
+    # Include the 1 h fixture, synthetic speech (needs espeak-ng)
+    python tests/benchmark.py --durations 30,600,3600 --kind speech
+
+    # Your own audio, specific models and compute types
+    python tests/benchmark.py --audio talk.mp3 --models tiny,base,whispercpp:base --compute-types int8,float32
+
+    # Compare against an earlier run
+    python tests/benchmark.py --compare tests/benchmarks/abc1234.json
+"""
+import argparse
+import csv
+import datetime
+import inspect
+import json
+import os
+import platform
+import random
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'benchmarks')
+FIXTURE_KINDS = ('noise', 'speech', 'silence')
+DEFAULT_DURATIONS = (30, 600)
+DEFAULT_COMPUTE_TYPES = {'cpu': ('int8', 'int8_float32', 'float32'), 'cuda': ('float16', 'int8_float16')}
+# faster-whisper model used when --models is not given
+DEFAULT_LOCAL_MODEL = 'base'
+RUN_TIMEOUT_SECONDS = 4 * 3600
+SAMPLE_RATE = 16000
+
+FIELDS = [
+    'fixture', 'audio_seconds', 'model', 'adapter', 'device', 'compute_type', 'cpu_threads',
+    'status', 'decode_seconds', 'load_seconds', 'first_segment_seconds',
+    'transcribe_seconds', 'rtf', 'peak_rss_mb', 'segments', 'error',
+]
+COMPARE_FIELDS = ('decode_seconds', 'load_seconds', 'first_segment_seconds', 'rtf', 'peak_rss_mb')
+
+
+# ============ Fixtures ============
+
+def fixture_path(kind: str, seconds: float, ext: str = 'wav') -> str:
+    return os.path.join(FIXTURE_DIR, f"bench_{kind}_{int(seconds)}s.{ext}")
+
+
+def _wav_seconds(path: str) -> float:
+    with wave.open(path, 'rb') as w:
+        return w.getnframes() / float(w.getframerate())
+
+
+def _noise_block(seconds: int = 10) -> bytes:
+    """Deterministic low-level white noise (same bytes on every machine)."""
+    rng = random.Random(0)
+    return struct.pack(f'<{seconds * SAMPLE_RATE}h',
+                       *(rng.randint(-3000, 3000) for _ in range(seconds * SAMPLE_RATE)))
+
+
+def _tts_available() -> bool:
+    return bool((shutil.which('espeak-ng') or shutil.which('espeak')) and shutil.which('ffmpeg'))
+
+
+def _speech_block() -> Optional[bytes]:
+    """A TTS sentence as 16 kHz PCM frames, or None without espeak."""
+    if not _tts_available():
+        return None
+    from tests.generate_test_audio import generate_tts_wav
+    text = ("The quick brown fox jumps over the lazy dog. This recording is used to measure "
+            "how fast each transcription engine runs on this machine. ")
+    with tempfile.TemporaryDirectory() as d:
+        path = generate_tts_wav(os.path.join(d, 'speech.wav'), text)
+        with wave.open(path, 'rb') as w:
+            if w.getframerate() != SAMPLE_RATE or w.getnchannels() != 1 or w.getsampwidth() != 2:
+                return None
+            return w.readframes(w.getnframes()) + b'\0\0' * (SAMPLE_RATE // 2)
+
+
+def fixture_kind(kind: str) -> str:
+    """The kind of fixture make_fixture() will actually produce for a requested kind."""
+    if kind == 'speech' and not _tts_available():
+        return 'noise'
+    return kind
+
+
+def make_fixture(kind: str, seconds: float) -> str:
+    """Write (once) a 16 kHz mono WAV of the given kind and length; return its path.
+
+    Without espeak a speech request gets a noise fixture, named and cached as
+    noise, so a later run with espeak still generates real speech.
+    """
+    actual = fixture_kind(kind)
+    if actual != kind:
+        print(f"  espeak/ffmpeg not found, using a {actual} fixture instead of {kind}")
+    path = fixture_path(actual, seconds)
+    if os.path.exists(path) and abs(_wav_seconds(path) - seconds) < 0.01:
+        return path
+
+    block = _speech_block() if actual == 'speech' else None
+    if block is None and actual == 'speech':
+        raise RuntimeError("Text-to-speech produced no usable audio for the speech fixture")
+    if actual == 'noise':
+        block = _noise_block()
+    elif actual == 'silence':
+        block = b'\0\0' * SAMPLE_RATE
+
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    remaining = int(seconds * SAMPLE_RATE) * 2
+    tmp_path = path + '.part'
+    with wave.open(tmp_path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SAMPLE_RATE)
+        while remaining > 0:
+            chunk = block[:remaining]
+            w.writeframes(chunk)
+            remaining -= len(chunk)
+    os.replace(tmp_path, path)
+    print(f"  Generated {path}")
+    return path
+
+
+def encoded_fixture(wav_path: str) -> str:
+    """AAC copy of a fixture, so the decode stage does the work a download would.
+
+    Falls back to the WAV itself (decode becomes a pass-through) without ffmpeg.
+    """
+    m4a_path = os.path.splitext(wav_path)[0] + '.m4a'
+    if os.path.exists(m4a_path) and os.path.getmtime(m4a_path) >= os.path.getmtime(wav_path):
+        return m4a_path
+    if not shutil.which('ffmpeg'):
+        return wav_path
+    result = subprocess.run(
+        ['ffmpeg', '-y', '-v', 'error', '-i', wav_path, '-c:a', 'aac', '-b:a', '96k', m4a_path],
+        capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        print(f"  Could not encode {wav_path}: {result.stderr.strip()[:200]}")
+        return wav_path
+    return m4a_path
+
+
+# ============ One run (child process) ============
+
+def _peak_rss_mb() -> Optional[float]:
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macOS, KiB elsewhere
+        return round(peak / 1024 / (1024 if sys.platform == 'darwin' else 1), 1)
+    except ImportError:
+        try:
+            import psutil
+            return round(psutil.Process().memory_info().peak_wset / 1024 / 1024, 1)
+        except Exception:
+            return None
+
+
+def run_one(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Time every stage for one (audio, model, compute type) combination."""
+    import pcm_store
+    from model import ModelCache, TranscriptionContext
+
+    row: Dict[str, Any] = {'status': 'ok'}
+    # Private store: the decode is always cold and the user's cache is untouched
+    with tempfile.TemporaryDirectory() as store:
+        pcm_store.STORE_DIR = store
+        started = time.perf_counter()
+        wav_path = pcm_store.get_wav(spec['audio'], write=lambda *a: None)
+        row['decode_seconds'] = round(time.perf_counter() - started, 3)
+        audio_seconds = pcm_store.duration(wav_path)
+
+        ctx = TranscriptionContext(model_cache=ModelCache())
+        adapter, _ = ctx.resolve(spec['model'])
+        kwargs: Dict[str, Any] = {'device': spec['device']}
+        if spec.get('compute_type'):
+            kwargs['compute_type'] = spec['compute_type']
+        if spec.get('cpu_threads'):
+            kwargs['cpu_threads'] = spec['cpu_threads']
+
+        first_segment = None
+        segments = 0
+        started = time.perf_counter()
+        for _ in ctx.transcribe_stream(wav_path, spec['model'], language=spec.get('language'),
+                                       write=lambda *a: None, **kwargs):
+            if first_segment is None:
+                first_segment = time.perf_counter() - started
+            segments += 1
+        total = time.perf_counter() - started
+
+    stats = ctx.model_cache.stats(adapter.cache_namespace)
+    # Adapters that don't go through the model cache report load as part of transcribe
+    load = stats['load_seconds'] if stats['misses'] else None
+    # stats() rounds load_seconds, so clamp tiny runs at zero
+    transcribe_seconds = max(total - (load or 0.0), 0.0)
+    row.update({
+        'adapter': adapter.display_name,
+        'audio_seconds': round(audio_seconds, 2),
+        'load_seconds': load,
+        'first_segment_seconds': round(first_segment, 3) if first_segment is not None else None,
+        'transcribe_seconds': round(transcribe_seconds, 3),
+        'rtf': round(transcribe_seconds / audio_seconds, 4) if audio_seconds > 0 else None,
+        'peak_rss_mb': _peak_rss_mb(),
+        'segments': segments,
+    })
+    return row
+
+
+# ============ Planning and driving runs ============
+
+def _takes_compute_type(adapter) -> bool:
+    params = inspect.signature(adapter.transcribe_stream).parameters
+    return 'compute_type' in params
+
+
+def plan_runs(models: Optional[List[str]], compute_types: List[str]) -> List[Tuple[str, str, Optional[str]]]:
+    """Return (model, adapter display name, compute type) for every combination to run."""
+    from model import TranscriptionContext
+    ctx = TranscriptionContext()
+    ctx._ensure_initialized()
+
+    if models is None:
+        models = []
+        if ctx._default_adapter and ctx._default_adapter.is_available():
+            models.append(DEFAULT_LOCAL_MODEL)
+        for prefix, adapter in sorted(ctx._adapter_map.items()):
+            if adapter.is_available() and not adapter.is_remote and adapter.get_model_names():
+                models.append(f"{prefix}:{adapter.get_model_names()[0]}")
+
+    runs = []
+    for model_name in models:
+        try:
+            adapter, _ = ctx.resolve(model_name)
+        except ValueError as e:
+            print(f"  Skipping {model_name}: {e}")
+            continue
+        if adapter.is_remote:
+            print(f"  Skipping {model_name}: remote API adapter")
+            continue
+        for compute_type in (compute_types if _takes_compute_type(adapter) else [None]):
+            runs.append((model_name, adapter.display_name, compute_type))
+    return runs
+
+
+def run_isolated(spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one combination in a fresh interpreter and return its row."""
+    with tempfile.TemporaryDirectory() as d:
+        result_file = os.path.join(d, 'result.json')
+        cmd = [sys.executable, os.path.abspath(__file__), '--run-one', json.dumps(spec),
+               '--result-file', result_file]
+        try:
+            proc = subprocess.run(cmd, capture_output=True, text=True, timeout=RUN_TIMEOUT_SECONDS)
+        except subprocess.TimeoutExpired:
+            return {'status': 'error', 'error': f"timed out after {RUN_TIMEOUT_SECONDS}s"}
+        if os.path.exists(result_file):
+            with open(result_file, encoding='utf-8') as f:
+                return json.load(f)
+        tail = (proc.stderr or proc.stdout).strip().splitlines()[-1:] or ['no output']
+        return {'status': 'error', 'error': f"exit {proc.returncode}: {tail[0][:300]}"}
+
+
+def _git_label() -> str:
+    try:
+        result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)))
+        if result.returncode == 0 and result.stdout.strip():
+            return result.stdout.strip()
+    except OSError:
+        pass
+    return datetime.datetime.now().strftime('%Y%m%d-%H%M%S')
+
+
+def write_results(rows: List[Dict[str, Any]], meta: Dict[str, Any], out_dir: str, label: str) -> Tuple[str, str]:
+    os.makedirs(out_dir, exist_ok=True)
+    rows = sorted(rows, key=lambda r: (r['fixture'], r['model'], r['compute_type'] or ''))
+    json_path = os.path.join(out_dir, f"{label}.json")
+    csv_path = os.path.join(out_dir, f"{label}.csv")
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump({'meta': meta, 'results': [{k: r.get(k) for k in FIELDS} for r in rows]},
+                  f, indent=2, sort_keys=False)
+        f.write('\n')
+    with open(csv_path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS, lineterminator='\n')
+        writer.writeheader()
+        for r in rows:
+            writer.writerow({k: '' if r.get(k) is None else r.get(k) for k in FIELDS})
+    return json_path, csv_path
+
+
+def _row_key(row: Dict[str, Any]) -> Tuple:
+    return row['fixture'], row['model'], row['device'], row['compute_type'] or ''
+
+
+def compare(old_rows: List[Dict[str, Any]], new_rows: List[Dict[str, Any]]) -> List[str]:
+    """Lines describing the change of each timed field between two runs."""
+    old = {_row_key(r): r for r in old_rows}
+    lines = []
+    for row in new_rows:
+        before = old.get(_row_key(row))
+        if before is None or row.get('status') != 'ok' or before.get('status') != 'ok':
+            continue
+        changes = []
+        for field in COMPARE_FIELDS:
+            a, b = before.get(field), row.get(field)
+            if a and b is not None:
+                changes.append(f"{field} {a} -> {b} ({(b - a) / a * 100:+.1f}%)")
+        if changes:
+            lines.append(f"{row['fixture']} {row['model']} {row['compute_type'] or '-'}: " + ", ".join(changes))
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="whisper-subs real-time-factor benchmark")
+    parser.add_argument('--durations', default=','.join(str(d) for d in DEFAULT_DURATIONS),
+                        help="Fixture lengths in seconds (default: 30,600; add 3600 for 1 h)")
+    parser.add_argument('--kind', choices=FIXTURE_KINDS, default='noise', help="Synthetic fixture content")
+    parser.add_argument('--audio', action='append', help="Benchmark this file instead of fixtures (repeatable)")
+    parser.add_argument('--models', help="Comma-separated models (default: one per available local adapter)")
+    parser.add_argument('--device', default='cpu', choices=['cpu', 'cuda'])
+    parser.add_argument('--compute-types', help="Comma-separated compute types (default depends on --device)")
+    parser.add_argument('--cpu-threads', type=int, help="Threads per run (default: all cores)")
+    parser.add_argument('--lang', default='en', help="Language code passed to every run")
+    parser.add_argument('--output-dir', default=RESULTS_DIR)
+    parser.add_argument('--label', help="Result file name (default: current git commit)")
+    parser.add_argument('--compare', help="Earlier results JSON to compare against")
+    parser.add_argument('--run-one', help=argparse.SUPPRESS)
+    parser.add_argument('--result-file', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        try:
+            row = run_one(json.loads(args.run_one))
+        except Exception as e:
+            row = {'status': 'error', 'error': f"{type(e).__name__}: {e}"[:300], 'peak_rss_mb': _peak_rss_mb()}
+        with open(args.result_file, 'w', encoding='utf-8') as f:
+            json.dump(row, f)
+        return 0
+
+    print("=" * 60)
+    print("Real-Time-Factor Benchmark")
+    print("=" * 60)
+
+    if args.audio:
+        sources = [(os.path.basename(p), p) for p in args.audio]
+    else:
+        sources = []
+        for seconds in (float(d) for d in args.durations.split(',') if d.strip()):
+            wav_path = make_fixture(args.kind, seconds)
+            sources.append((os.path.basename(wav_path), encoded_fixture(wav_path)))
+
+    compute_types = (args.compute_types.split(',') if args.compute_types
+                     else list(DEFAULT_COMPUTE_TYPES[args.device]))
+    models = [m.strip() for m in args.models.split(',')] if args.models else None
+    runs = plan_runs(models, compute_types)
+    if not runs:
+        print("\n  No local adapters available. Install faster-whisper or another local backend.")
+        return 1
+
+    print(f"\n  {len(sources)} source(s) x {len(runs)} combination(s)")
+    rows = []
+    for fixture, source in sources:
+        for model_name, adapter_name, compute_type in runs:
+            spec = {'audio': source, 'model': model_name, 'device': args.device,
+                    'compute_type': compute_type, 'cpu_threads': args.cpu_threads, 'language': args.lang}
+            print(f"\n  {fixture} | {model_name} | {compute_type or '-'}")
+            row = {'fixture': fixture, 'model': model_name, 'adapter': adapter_name,
+                   'device': args.device, 'compute_type': compute_type,
+                   'cpu_threads': args.cpu_threads or os.cpu_count(), **run_isolated(spec)}
+            if row['status'] == 'ok':
+                print(f"    decode {row['decode_seconds']}s | load {row['load_seconds']}s | "
+                      f"first segment {row['first_segment_seconds']}s | RTF {row['rtf']} | "
+                      f"peak RSS {row['peak_rss_mb']} MB")
+            else:
+                print(f"    ERROR: {row['error']}")
+            rows.append(row)
+
+    meta = {
+        'label': args.label or _git_label(),
+        'date': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'kind': None if args.audio else fixture_kind(args.kind),
+        'requested_kind': None if args.audio else args.kind,
+    }
+    json_path, csv_path = write_results(rows, meta, args.output_dir, meta['label'])
+    print(f"\n  Results: {json_path}\n           {csv_path}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            old_rows = json.load(f)['results']
+        print(f"\n  Compared with {args.compare}:")
+        for line in compare(old_rows, rows) or ["no matching rows"]:
+            print(f"    {line}")
+
+    print("=" * 60)
+    return 0 if all(r['status'] == 'ok' for r in rows) else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,87 @@
+"""Shared helpers for the test scripts."""
+import os
+import tempfile
+import wave
+from contextlib import contextmanager
+
+
+@contextmanager
+def temp_dir(module, attr, subdir=None):
+    """Point module.<attr> at a temporary directory for the duration of a test.
+
+    Yields the temporary directory; attr is set to it, or to subdir inside it.
+    """
+    original = getattr(module, attr)
+    with tempfile.TemporaryDirectory() as tmp:
+        setattr(module, attr, os.path.join(tmp, subdir) if subdir else tmp)
+        try:
+            yield tmp
+        finally:
+            setattr(module, attr, original)
+
+
+class FakeInfo:
+    def __init__(self, duration):
+        self.duration = duration
+
+
+class LoopingModel:
+    """Fake WhisperModel that loops once it is past loop_at on its first pass.
+
+    Audio comes in as a path (first pass) or as a (start, end) window from the
+    patched pcm_store.slice_samples, so the model knows where it is. With
+    always_loop it loops in every pass, whatever the settings.
+    """
+
+    def __init__(self, total, loop_at=5.0, always_loop=False):
+        self.total = total
+        self.loop_at = loop_at
+        self.always_loop = always_loop
+        self.calls = []
+
+    def transcribe(self, audio, **kwargs):
+        start, end = (0.0, None) if isinstance(audio, str) else audio
+        end = self.total if end is None else end
+        self.calls.append((start, end, dict(kwargs)))
+        loops = self.always_loop or len(self.calls) == 1
+
+        def segments():
+            t = start
+            while t < end:
+                text = "same words" if loops and t >= self.loop_at else f"line {int(t)}"
+                yield FakeSegment(t - start, t - start + 1.0, text)
+                t += 1.0
+        return segments(), FakeInfo(end - start)
+
+
+class FakeSegment:
+    def __init__(self, start, end, text):
+        self.start, self.end, self.text = start, end, text
+        self.compression_ratio = 1.0
+
+
+def make_wav(path, seconds):
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(16000)
+        w.writeframes(b'\0\0' * int(seconds * 16000))
+    return path
+
+
+@contextmanager
+def windowed_pcm():
+    """Map store WAVs to a frame range and hand windows to the model as (start, end)."""
+    import pcm_store
+
+    def open_pcm(path):
+        with wave.open(path, 'rb') as w:
+            return range(w.getnframes())
+
+    originals = pcm_store.open_pcm, pcm_store.slice_samples
+    pcm_store.open_pcm = open_pcm
+    pcm_store.slice_samples = lambda pcm, start=0.0, end=None: (start, end)
+    try:
+        yield
+    finally:
+        pcm_store.open_pcm, pcm_store.slice_samples = originals
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""Test the audio cache: SQLite index, eviction and content-addressed blobs.
+
+Usage:
+    python tests/test_audio_cache.py
+"""
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import temp_dir
+
+
+def _audio(d, name, size=1000):
+    path = os.path.join(d, name)
+    with open(path, 'wb') as f:
+        f.write(os.urandom(size))
+    return path
+
+
+def test_put_get_roundtrip():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d:
+        cached = audio_cache.put('https://example.com/a', _audio(d, 'a.m4a'))
+        assert cached and os.path.exists(cached)
+        assert audio_cache.get('https://example.com/a') == cached
+        assert audio_cache.get('https://example.com/missing') is None
+        os.remove(cached)
+        assert audio_cache.get('https://example.com/a') is None, "Missing file should be a miss"
+        assert audio_cache.stats()['total_entries'] == 0, "Stale entry should be dropped"
+    print("  [PASS] put/get round trip and stale entries")
+
+
+def test_legacy_json_migrated():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d:
+        os.makedirs(audio_cache.CACHE_DIR)
+        kept = _audio(audio_cache.CACHE_DIR, 'old.m4a', 500)
+        key = audio_cache._cache_key('https://example.com/old')
+        with open(os.path.join(audio_cache.CACHE_DIR, 'index.json'), 'w', encoding='utf-8') as f:
+            json.dump({"entries": {key: {"path": kept, "source": "x", "mtime": time.time(), "size": 500}}}, f)
+        assert audio_cache.get('https://example.com/old') == kept
+        assert not os.path.exists(os.path.join(audio_cache.CACHE_DIR, 'index.json'))
+        assert audio_cache.stats()['total_size_bytes'] == 500
+    print("  [PASS] index.json imported once and moved aside")
+
+
+class _Limits:
+    """Temporarily override the cache quota, free-space floor and policy."""
+
+    def __init__(self, max_bytes, min_free=0, policy='lru', free=10 ** 12):
+        self.values = {'MAX_BYTES': max_bytes, 'MIN_FREE_BYTES': min_free, 'POLICY': policy,
+                       '_free_bytes': lambda: free}
+
+    def __enter__(self):
+        import audio_cache
+        self._saved = {k: getattr(audio_cache, k) for k in self.values}
+        for k, v in self.values.items():
+            setattr(audio_cache, k, v)
+
+    def __exit__(self, *exc):
+        import audio_cache
+        for k, v in self._saved.items():
+            setattr(audio_cache, k, v)
+
+
+def _fill(d, count, size=1000):
+    import audio_cache
+    for i in range(count):
+        audio_cache.put(f'src{i}', _audio(d, f'{i}.m4a', size))
+        time.sleep(0.01)
+
+
+def test_byte_quota_evicts_lru():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d, _Limits(max_bytes=3000):
+        _fill(d, 3)
+        audio_cache.get('src0')
+        audio_cache.put('src3', _audio(d, '3.m4a'))
+        assert audio_cache.get('src1') is None, "Least recently used entry should go first"
+        assert audio_cache.get('src0') is not None, "Touched entry should survive"
+        s = audio_cache.stats()
+        assert s['total_size_bytes'] <= 3000, s
+        assert s['evictions'] == 1 and s['bytes_reclaimed'] == 1000, s
+        assert audio_cache.put('big', _audio(d, 'big.m4a', 5000)) is None, "Larger than the quota"
+    print("  [PASS] Byte quota evicts least recently used")
+
+
+def test_lfu_and_pinning():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d, _Limits(max_bytes=3000, policy='lfu'):
+        _fill(d, 3)
+        for _ in range(3):
+            audio_cache.get('src0')
+        audio_cache.get('src2')
+        with audio_cache.pinned('src1'):
+            audio_cache.put('src3', _audio(d, '3.m4a'))
+            assert audio_cache.get('src1') is not None, "Pinned entry must not be evicted"
+            assert audio_cache.get('src2') is None, "Least frequently used unpinned entry goes"
+            assert audio_cache.stats()['pinned_entries'] == 1
+        assert audio_cache.stats()['pinned_entries'] == 0
+    print("  [PASS] LFU eviction skips pinned entries")
+
+
+def test_free_space_floor():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d, _Limits(max_bytes=10 ** 9, min_free=2500, free=3000):
+        _fill(d, 3)
+        audio_cache.put('src3', _audio(d, '3.m4a'))
+        s = audio_cache.stats()
+        assert s['bytes_reclaimed'] >= 1000, s
+    print("  [PASS] Free-space floor triggers eviction")
+
+
+def test_identical_audio_shares_blob():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d:
+        first = _audio(d, 'a.m4a', 2000)
+        second = os.path.join(d, 'b.m4a')
+        with open(first, 'rb') as f, open(second, 'wb') as out:
+            out.write(f.read())
+        blob = audio_cache.put('https://a.example/1', first)
+        assert audio_cache.put('https://b.example/2', second) == blob
+        assert os.path.samefile(blob, first), "put() should hardlink, not copy"
+        os.remove(first)
+        s = audio_cache.stats()
+        assert s['total_entries'] == 2 and s['blobs'] == 1 and s['total_size_bytes'] == 2000, s
+
+        audio_cache.get('https://a.example/1')
+        os.makedirs(os.path.join(d, 'out'))
+        fetched = audio_cache.fetch('https://b.example/2', os.path.join(d, 'out'))
+        assert fetched != blob and os.path.samefile(fetched, blob), "fetch() should link out"
+        os.remove(fetched)
+        assert os.path.exists(blob)
+    print("  [PASS] Identical audio shares one blob, linked in and out")
+
+
+def test_lookalike_audio_gets_own_blob():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d:
+        # Same size and same first/middle/last MB, different audio in between
+        body = bytearray(5 * 1024 * 1024)
+        first = os.path.join(d, 'a.m4a')
+        with open(first, 'wb') as f:
+            f.write(body)
+        body[1536 * 1024] = 1
+        second = os.path.join(d, 'b.m4a')
+        with open(second, 'wb') as f:
+            f.write(body)
+        blob_a = audio_cache.put('https://a.example/1', first)
+        blob_b = audio_cache.put('https://b.example/2', second)
+        assert blob_a != blob_b, "Different audio must not reuse another recording's blob"
+        os.makedirs(os.path.join(d, 'out'))
+        fetched = audio_cache.fetch('https://b.example/2', os.path.join(d, 'out'))
+        with open(fetched, 'rb') as f:
+            assert f.read() == bytes(body)
+    print("  [PASS] Lookalike recordings are stored as separate blobs")
+
+
+def test_shared_blob_outlives_one_entry():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d, _Limits(max_bytes=3000):
+        audio = _audio(d, 'a.m4a', 1000)
+        blob = audio_cache.put('x', audio)
+        audio_cache.put('y', audio)
+        with audio_cache.pinned('y'):
+            audio_cache.put('big', _audio(d, 'big.m4a', 2500))
+            assert audio_cache.get('x') is None, "Unpinned entry should be evicted"
+            assert audio_cache.get('y') == blob and os.path.exists(blob), "Blob still used by y"
+            assert audio_cache.stats()['bytes_reclaimed'] == 0
+    print("  [PASS] Blobs are freed only with their last entry")
+
+
+def test_link_file_copy_fallback():
+    import audio_cache
+    with tempfile.TemporaryDirectory() as d:
+        src = _audio(d, 'src.m4a')
+        original_link = os.link
+        os.link = lambda *a: (_ for _ in ()).throw(OSError("cross-device"))
+        try:
+            method = audio_cache.link_file(src, os.path.join(d, 'dst.m4a'), allow_symlink=False)
+        finally:
+            os.link = original_link
+        assert method in ('reflink', 'copy'), method
+        with open(src, 'rb') as a, open(os.path.join(d, 'dst.m4a'), 'rb') as b:
+            assert a.read() == b.read()
+    print("  [PASS] link_file falls back when hardlinks fail")
+
+
+def test_concurrent_puts():
+    import audio_cache
+    with temp_dir(audio_cache, 'CACHE_DIR', 'cache') as d:
+        sources = [_audio(d, f'{i}.m4a') for i in range(40)]
+        errors = []
+
+        def worker(start):
+            try:
+                for i in range(start, len(sources), 8):
+                    assert audio_cache.put(f'src{i}', sources[i])
+                    assert audio_cache.get(f'src{i}')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        assert audio_cache.stats()['total_entries'] == 40, audio_cache.stats()
+    print("  [PASS] Concurrent puts from 8 threads lose no entries")
+
+
+def main():
+    tests = [
+        test_put_get_roundtrip,
+        test_legacy_json_migrated,
+        test_byte_quota_evicts_lru,
+        test_lfu_and_pinning,
+        test_free_space_floor,
+        test_identical_audio_shares_blob,
+        test_lookalike_audio_gets_own_blob,
+        test_shared_blob_outlives_one_entry,
+        test_link_file_copy_fallback,
+        test_concurrent_puts,
+    ]
+
+    print("=" * 60)
+    print("Audio Cache Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
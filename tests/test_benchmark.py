@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Test the benchmark runner's fixtures, result files and comparisons.
+
+Usage:
+    python tests/test_benchmark.py
+"""
+import sys
+import os
+import csv
+import json
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_fixture_length_and_reuse():
+    from tests import benchmark
+    original = benchmark.FIXTURE_DIR
+    with tempfile.TemporaryDirectory() as d:
+        benchmark.FIXTURE_DIR = d
+        try:
+            path = benchmark.make_fixture('noise', 12)
+            assert abs(benchmark._wav_seconds(path) - 12) < 0.01
+            mtime = os.path.getmtime(path)
+            assert benchmark.make_fixture('noise', 12) == path
+            assert os.path.getmtime(path) == mtime, "Existing fixture should be reused"
+            silence = benchmark.make_fixture('silence', 2)
+            with open(silence, 'rb') as f:
+                assert f.read()[-100:] == b'\0' * 100
+        finally:
+            benchmark.FIXTURE_DIR = original
+    print("  [PASS] Fixtures have the requested length and are reused")
+
+
+def test_speech_without_tts_is_named_noise():
+    from tests import benchmark
+    original_dir, original_tts = benchmark.FIXTURE_DIR, benchmark._tts_available
+    with tempfile.TemporaryDirectory() as d:
+        benchmark.FIXTURE_DIR = d
+        benchmark._tts_available = lambda: False
+        try:
+            path = benchmark.make_fixture('speech', 2)
+            assert os.path.basename(path) == 'bench_noise_2s.wav', path
+            assert benchmark.fixture_kind('speech') == 'noise'
+            assert not os.path.exists(benchmark.fixture_path('speech', 2)), "No noise cached under the speech name"
+        finally:
+            benchmark.FIXTURE_DIR, benchmark._tts_available = original_dir, original_tts
+    print("  [PASS] Speech requested without espeak yields a fixture named as noise")
+
+
+def test_results_stable_and_comparable():
+    from tests import benchmark
+    rows = [
+        {'fixture': 'b.wav', 'model': 'tiny', 'device': 'cpu', 'compute_type': 'int8', 'status': 'ok',
+         'rtf': 0.2, 'peak_rss_mb': 500.0, 'load_seconds': None},
+        {'fixture': 'a.wav', 'model': 'tiny', 'device': 'cpu', 'compute_type': 'int8', 'status': 'ok',
+         'rtf': 0.1, 'peak_rss_mb': 400.0, 'load_seconds': 1.0},
+    ]
+    with tempfile.TemporaryDirectory() as d:
+        json_path, csv_path = benchmark.write_results(rows, {'label': 'x'}, d, 'x')
+        with open(json_path, encoding='utf-8') as f:
+            saved = json.load(f)['results']
+        with open(csv_path, encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            assert reader.fieldnames == benchmark.FIELDS
+            csv_rows = list(reader)
+    assert [r['fixture'] for r in saved] == ['a.wav', 'b.wav'], "Rows should be sorted"
+    assert list(saved[0]) == benchmark.FIELDS
+    assert csv_rows[1]['load_seconds'] == ''
+
+    newer = [dict(saved[0], rtf=0.05)]
+    lines = benchmark.compare(saved, newer)
+    assert len(lines) == 1 and 'rtf 0.1 -> 0.05 (-50.0%)' in lines[0], lines
+    print("  [PASS] Results are written in a stable order and compare across runs")
+
+
+def test_remote_adapters_not_planned():
+    from tests import benchmark
+    runs = benchmark.plan_runs(['groq:whisper-large-v3', 'deepgram:nova-3'], ['int8'])
+    assert runs == [], runs
+    print("  [PASS] Remote API adapters are never benchmarked")
+
+
+def main():
+    tests = [
+        test_fixture_length_and_reuse,
+        test_speech_without_tts_is_named_noise,
+        test_results_stable_and_comparable,
+        test_remote_adapters_not_planned,
+    ]
+
+    print("=" * 60)
+    print("Benchmark Runner Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Test task cancellation: tokens, the registry and killing busy workers.
+
+Usage:
+    python tests/test_cancellation.py
+"""
+import sys
+import os
+import subprocess
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _stuck_worker_class():
+    import worker_pool
+
+    class StuckWorker(worker_pool.TranscriptionWorker):
+        """Takes the job and never answers, like a worker deep in a long decode."""
+
+        def __init__(self, key):
+            self.key = key
+            self.jobs_run = 0
+            self.broken = False
+            self.last_used = time.time()
+            self._write = print
+            self.process = subprocess.Popen(
+                [sys.executable, '-c', 'import sys, time; sys.stdin.readline(); time.sleep(60)'],
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, bufsize=1,
+            )
+
+    return StuckWorker
+
+
+def test_token_callbacks():
+    from cancellation import CancelToken, TaskCancelled
+    token = CancelToken()
+    calls = []
+    token.on_cancel(lambda: calls.append('a'))
+    unregister = token.on_cancel(lambda: calls.append('b'))
+    unregister()
+    token.raise_if_cancelled()
+    assert not token.wait(0.01)
+
+    assert token.cancel()
+    assert not token.cancel(), "Second cancel is a no-op"
+    assert calls == ['a'], calls
+    token.on_cancel(lambda: calls.append('late'))
+    assert calls == ['a', 'late'], "Callbacks registered after cancel run at once"
+    assert token.wait(0)
+    try:
+        token.raise_if_cancelled()
+    except TaskCancelled:
+        pass
+    else:
+        raise AssertionError("A cancelled token should raise")
+    print("  [PASS] Callbacks run once on cancel; late ones run immediately")
+
+
+def test_registry():
+    import cancellation
+    token = cancellation.register('task-1')
+    assert cancellation.register('task-1') is token
+    assert not cancellation.cancel('unknown')
+    assert cancellation.cancel('task-1') and token.cancelled
+    cancellation.release('task-1')
+    assert cancellation.register('task-1') is not token, "Released ids get a fresh token"
+    cancellation.release('task-1')
+    print("  [PASS] Registry hands the same token to the runner and the cancel request")
+
+
+def test_cancel_kills_running_worker():
+    import worker_pool
+    from cancellation import CancelToken
+
+    original = worker_pool.TranscriptionWorker
+    worker_pool.TranscriptionWorker = _stuck_worker_class()
+    pool = worker_pool.WorkerPool()
+    try:
+        token = CancelToken()
+        key = worker_pool.WorkerKey('fake', 'cpu', 'int8')
+        result = {}
+
+        def run():
+            result['code'] = pool.run(key, {'audio_file': 'x'}, write=lambda line: None, cancel_token=token)
+
+        thread = threading.Thread(target=run)
+        thread.start()
+        time.sleep(0.3)
+        assert thread.is_alive(), "The stuck worker should still be running"
+        cancelled_at = time.monotonic()
+        token.cancel()
+        thread.join(5)
+        elapsed = time.monotonic() - cancelled_at
+        assert not thread.is_alive(), "run() should return once cancelled"
+        assert result['code'] == worker_pool.RESULT_CANCELLED, result
+        assert elapsed < 2, f"Cancel took {elapsed:.2f}s"
+        assert pool.stats()['idle_workers'] == 0, "A killed worker is not kept for reuse"
+    finally:
+        worker_pool.TranscriptionWorker = original
+        pool.shutdown()
+    print("  [PASS] Cancelling kills the busy worker and the pool drops it")
+
+
+def test_cancelled_before_start():
+    import worker_pool
+    from cancellation import CancelToken
+
+    pool = worker_pool.WorkerPool()
+    token = CancelToken()
+    token.cancel()
+    code = pool.run(worker_pool.WorkerKey('fake', 'cpu', 'int8'), {}, cancel_token=token)
+    assert code == worker_pool.RESULT_CANCELLED, code
+    assert pool.spawned == 0, "No worker should be started for a cancelled task"
+    print("  [PASS] A task cancelled before its turn never starts a worker")
+
+
+def main():
+    tests = [
+        test_token_callbacks,
+        test_registry,
+        test_cancel_kills_running_worker,
+        test_cancelled_before_start,
+    ]
+
+    print("=" * 60)
+    print("Cancellation Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Test the processed-video history index.
+
+Usage:
+    python tests/test_history_index.py
+"""
+import sys
+import os
+import tempfile
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_imports_existing_history():
+    from history_index import HistoryIndex
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'history.txt')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write("abc small\nabc tiny\nabc medium.en\nxyz not-a-model\n\nqqq base")
+        index = HistoryIndex(path)
+        assert index.best_ranks('abc') == {'multi': 2, 'en': 10}, index.best_ranks('abc')
+        assert 'xyz' in index and index.best_ranks('xyz') == {}, "Unknown models still count as seen"
+        assert 'qqq' not in index, "Unterminated line is left for the next read"
+        index.add('new', 'large-v3')
+        assert 'qqq' in index and index.best_ranks('new') == {'multi': 6}
+        with open(path, encoding='utf-8') as f:
+            assert f.read().endswith("qqq base\nnew large-v3\n")
+    print("  [PASS] Existing history.txt is imported and kept best-rank per id")
+
+
+def test_sees_appends_from_other_writers():
+    from history_index import HistoryIndex
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'history.txt')
+        first, second = HistoryIndex(path), HistoryIndex(path)
+        assert 'a' not in first
+        second.add('a', 'base')
+        assert first.best_ranks('a') == {'multi': 1}, "Appends by another writer are picked up"
+        os.remove(path)
+        assert 'a' not in first and len(first) == 0, "Removed file resets the index"
+    print("  [PASS] Appends by other processes are read incrementally")
+
+
+def test_concurrent_adds_keep_whole_lines():
+    from history_index import HistoryIndex
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'history.txt')
+        index = HistoryIndex(path)
+        threads = [threading.Thread(target=lambda n=n: [index.add(f"id{n}_{i}", 'tiny') for i in range(50)])
+                   for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with open(path, encoding='utf-8') as f:
+            lines = f.read().splitlines()
+        assert len(lines) == 400 and all(line.endswith(' tiny') for line in lines)
+        assert len(HistoryIndex(path)) == 400
+    print("  [PASS] Concurrent appends never interleave")
+
+
+def main():
+    tests = [
+        test_imports_existing_history,
+        test_sees_appends_from_other_writers,
+        test_concurrent_adds_keep_whole_lines,
+    ]
+
+    print("=" * 60)
+    print("History Index Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Test the SQLite job store: migration, per-task updates and queries.
+
+Usage:
+    python tests/test_job_store.py
+"""
+import sys
+import os
+import json
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import temp_dir
+
+
+def test_legacy_json_migrated():
+    import job_store
+    legacy = [
+        {"id": 1, "date": "2024-01-01T10:00:00", "model": "tiny", "source": ["a"], "status": "completed",
+         "tasks": [{"source": "a", "status": "completed", "title": "A"}]},
+        {"id": 2, "date": "2024-01-02T10:00:00", "model": "base", "source": ["b", "c"], "status": "processing",
+         "tasks": [{"source": "b", "status": "completed", "title": "B"},
+                   {"source": "c", "status": "pending", "title": "C"}]},
+    ]
+    with temp_dir(job_store, 'STORE_DIR') as d:
+        with open(os.path.join(d, 'jobs.json'), 'w', encoding='utf-8') as f:
+            json.dump(legacy, f)
+        assert job_store.get_jobs() == legacy, job_store.get_jobs()
+        assert not os.path.exists(os.path.join(d, 'jobs.json'))
+        assert job_store.get_last_unfinished_job()['id'] == 2
+        assert job_store.add_job("d", "small")['id'] == 3, "Ids continue after imported jobs"
+    print("  [PASS] jobs.json imported once with ids and task order intact")
+
+
+def test_task_updates_and_summaries():
+    import job_store
+    with temp_dir(job_store, 'STORE_DIR'):
+        job = job_store.add_job(["src"], "tiny")
+        for name in "abc":
+            job_store.add_task(job['id'], {"source": name, "status": "pending", "title": name.upper()})
+        job_store.update_task_status(job['id'], "a", "completed", "Alpha")
+        job_store.update_task_status(job['id'], "b", "skipped")
+        job_store.add_task(job['id'], {"source": "a", "status": "pending", "title": "Again"})
+        job_store.update_job(job['id'], {"status": "processing", "note": "kept"})
+
+        stored = job_store.get_job(job['id'])
+        assert [t['source'] for t in stored['tasks']] == ["b", "c", "a"], "Re-added task moves to the end"
+        assert stored['tasks'][2] == {"source": "a", "status": "pending", "title": "Again"}
+        assert stored['status'] == "processing" and stored['note'] == "kept" and stored['source'] == ["src"]
+
+        summary = job_store.job_summaries()[0]
+        assert summary['total_tasks'] == 3 and summary['done_tasks'] == 1, summary
+        assert 'tasks' not in summary
+        job_store.update_job(job['id'], {"status": "completed"})
+        assert job_store.get_last_unfinished_job() is None
+        job_store.compact()
+    print("  [PASS] Per-task updates, ordering and summary counts")
+
+
+def test_concurrent_status_updates():
+    import job_store
+    with temp_dir(job_store, 'STORE_DIR'):
+        job = job_store.add_job("src", "tiny")
+        sources = [f"task{i}" for i in range(80)]
+        for source in sources:
+            job_store.add_task(job['id'], {"source": source, "status": "pending", "title": source})
+        errors = []
+
+        def worker(start):
+            try:
+                for source in sources[start::8]:
+                    job_store.update_task_status(job['id'], source, 'transcribing')
+                    job_store.update_task_status(job['id'], source, 'completed')
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert not errors, errors
+        statuses = {t['status'] for t in job_store.get_job(job['id'])['tasks']}
+        assert statuses == {'completed'}, statuses
+    print("  [PASS] Concurrent task updates from 8 threads are all kept")
+
+
+def main():
+    tests = [
+        test_legacy_json_migrated,
+        test_task_updates_and_summaries,
+        test_concurrent_status_updates,
+    ]
+
+    print("=" * 60)
+    print("Job Store Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
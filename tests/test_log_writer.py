@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""Test the background log writer: JSON lines, levels, context and rotation.
+
+Usage:
+    python tests/test_log_writer.py
+"""
+import sys
+import os
+import io
+import json
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _lines(path):
+    with open(path, encoding='utf-8') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_json_lines_with_levels_and_context():
+    import log_writer
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'whisper_subs.log')
+        original_stdout, sys.stdout = sys.stdout, io.StringIO()
+        try:
+            writer = log_writer.LogWriter(path, console_level='INFO')
+            writer.log("Downloading audio", task='abc', stage='download')
+            with log_writer.context(task='xyz', stage='transcribe'):
+                writer.log("Error: DEBUG:faster_whisper:Processing segment at 00:30.000",
+                           log_writer.level_of("Error: DEBUG:faster_whisper:Processing segment at 00:30.000"),
+                           **log_writer.current_context())
+            assert log_writer.current_context() == {}, "Context ends with the block"
+            writer.flush()
+            console = sys.stdout.getvalue()
+        finally:
+            sys.stdout = original_stdout
+            writer.close()
+
+        records = _lines(path)
+        assert [r['level'] for r in records] == ['INFO', 'DEBUG'], records
+        assert records[0]['msg'] == "Downloading audio" and records[0]['task'] == 'abc'
+        assert records[1]['stage'] == 'transcribe' and records[1]['task'] == 'xyz'
+        assert "Downloading audio" in console and "Processing segment" not in console, console
+    print("  [PASS] JSON lines carry level and task/stage; DEBUG stays off the console")
+
+
+def test_level_of():
+    import log_writer
+    assert log_writer.level_of("Out: Written 10 new segments (total 40)") == 'INFO'
+    assert log_writer.level_of("Error: DEBUG:faster_whisper:Processing segment at 00:00.000") == 'DEBUG'
+    assert log_writer.level_of("Error on task 'x' (download): boom") == 'ERROR'
+    assert log_writer.level_of("Warning: Could not copy") == 'WARNING'
+    print("  [PASS] Write-callback messages are given sensible levels")
+
+
+def test_rotation_by_size():
+    import log_writer
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'whisper_subs.log')
+        writer = log_writer.LogWriter(path, console=False, max_bytes=2000, backups=2)
+        try:
+            for i in range(200):
+                writer.log(f"line {i:04d} " + "x" * 40)
+                if i % 20 == 0:
+                    writer.flush()
+            writer.flush()
+        finally:
+            writer.close()
+        assert os.path.exists(path + '.1') and os.path.exists(path + '.2')
+        assert not os.path.exists(path + '.3'), "Only `backups` old files are kept"
+        assert all(os.path.getsize(p) <= 2000 for p in (path, path + '.1', path + '.2'))
+        assert _lines(path)[-1]['msg'].startswith("line 0199")
+    print("  [PASS] Log rotates by size and keeps a bounded number of backups")
+
+
+def test_log_call_is_cheap_and_ordered():
+    import log_writer
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'whisper_subs.log')
+        writer = log_writer.LogWriter(path, console=False)
+        try:
+            started = time.perf_counter()
+            threads = [threading.Thread(target=lambda n=n: [writer.log(f"Out: {n} {i}") for i in range(2500)])
+                       for n in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            queued = time.perf_counter() - started
+            writer.flush(30)
+        finally:
+            writer.close()
+        records = _lines(path)
+        assert len(records) == 10000, len(records)
+        for n in range(4):
+            mine = [int(r['msg'].split()[2]) for r in records if r['msg'].split()[1] == str(n)]
+            assert mine == list(range(2500)), "Each thread's lines stay in order"
+        assert queued < 2.0, f"Queueing 10000 records took {queued:.2f}s"
+    print("  [PASS] 10000 records from 4 threads queued cheaply and written in order")
+
+
+def main():
+    tests = [
+        test_json_lines_with_levels_and_context,
+        test_level_of,
+        test_rotation_by_size,
+        test_log_call_is_cheap_and_ordered,
+    ]
+
+    print("=" * 60)
+    print("Log Writer Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Test in-worker loop recovery: trim, re-decode the window, carry on.
+
+Usage:
+    python tests/test_loop_recovery.py
+"""
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import FakeInfo, FakeSegment, LoopingModel, make_wav, windowed_pcm
+
+
+def _run(model, audio_file, d, emit=lambda *a, **k: None):
+    import worker_pool
+    srt = os.path.join(d, 'out.srt')
+    job = {
+        "audio_file": audio_file,
+        "srt_file": srt,
+        "unfinished_srt": os.path.join(d, 'out.unfinished.srt'),
+        "language": 'en',
+    }
+    with windowed_pcm():
+        key = worker_pool.WorkerKey('fake', 'cpu', 'int8')
+        return worker_pool._run_job(model, key, job, emit), job
+
+
+def test_loop_recovered_in_process():
+    import worker_pool
+    with tempfile.TemporaryDirectory() as d:
+        model = LoopingModel(total=60)
+        result, job = _run(model, make_wav(os.path.join(d, 'a.wav'), 60), d)
+        assert result == worker_pool.RESULT_OK, f"Expected success, got {result}"
+        with open(job['srt_file'], encoding='utf-8') as f:
+            content = f.read()
+    assert content.count("same words") < 10, "Looped lines should be trimmed away"
+    assert "line 5\n" in content and "line 59\n" in content, content
+    numbers = [int(b.split('\n')[0]) for b in content.strip().split('\n\n')]
+    assert numbers == list(range(1, len(numbers) + 1)), "Numbering should continue after the trim"
+    recovery = model.calls[1][2]
+    assert recovery['condition_on_previous_text'] is False
+    assert recovery['temperature'] > 0
+    assert model.calls[-1][2].get('condition_on_previous_text', True), "Normal settings after the window"
+    print("  [PASS] Loop recovered without leaving the worker")
+
+
+def test_persistent_loop_gives_up():
+    import worker_pool
+    with tempfile.TemporaryDirectory() as d:
+        model = LoopingModel(total=60, always_loop=True)
+        result, job = _run(model, make_wav(os.path.join(d, 'a.wav'), 60), d)
+        assert result == worker_pool.RESULT_LOOP
+        assert os.path.exists(job['unfinished_srt'].replace('.srt', '.loop_detect'))
+    assert len(model.calls) == worker_pool.MAX_LOOP_RECOVERIES + 1, model.calls
+    temps = [c[2]['temperature'] for c in model.calls[1:]]
+    assert temps == sorted(temps) and len(set(temps)) == len(temps), "Temperature should rise per attempt"
+    print("  [PASS] Persistent loop falls back to RESULT_LOOP")
+
+
+def test_recovery_survives_eviction():
+    import worker_pool
+
+    class EvictedModel(LoopingModel):
+        """Deletes the store WAV once decoding starts, as pcm_store._evict may on a long job."""
+
+        def transcribe(self, audio, **kwargs):
+            if isinstance(audio, str) and os.path.exists(audio):
+                os.remove(audio)
+            return super().transcribe(audio, **kwargs)
+
+    with tempfile.TemporaryDirectory() as d:
+        model = EvictedModel(total=60)
+        result, _ = _run(model, make_wav(os.path.join(d, 'a.wav'), 60), d)
+    assert result == worker_pool.RESULT_OK, f"Expected success, got {result}"
+    assert len(model.calls) >= 2, "Recovery should re-decode from the mapping taken at job start"
+    print("  [PASS] Loop recovery reads the audio mapped at job start, even once evicted")
+
+
+def test_progress_through_empty_segments():
+    import worker_pool
+
+    class SilentModel:
+        def transcribe(self, audio, **kwargs):
+            return iter([FakeSegment(t, t + 1.0, "   " if t else "hi") for t in range(30)]), FakeInfo(30)
+
+    events = []
+    with tempfile.TemporaryDirectory() as d:
+        result, _ = _run(SilentModel(), make_wav(os.path.join(d, 'a.wav'), 30), d,
+                         emit=lambda kind, **fields: events.append((kind, fields)))
+    assert result == worker_pool.RESULT_OK, result
+    progress = [fields['segments'] for kind, fields in events if kind == 'progress']
+    assert progress == [10, 20, 30], progress
+    print("  [PASS] Progress is reported through runs of empty segments")
+
+
+def test_unseekable_audio_not_recovered():
+    import worker_pool
+    with tempfile.TemporaryDirectory() as d:
+        audio = os.path.join(d, 'a.mp3')
+        open(audio, 'wb').close()
+        result, _ = _run(LoopingModel(total=60), audio, d)
+    assert result == worker_pool.RESULT_LOOP
+    print("  [PASS] Non-store audio falls back to RESULT_LOOP")
+
+
+def main():
+    tests = [
+        test_loop_recovered_in_process,
+        test_persistent_loop_gives_up,
+        test_recovery_survives_eviction,
+        test_progress_through_empty_segments,
+        test_unseekable_audio_not_recovered,
+    ]
+
+    print("=" * 60)
+    print("Loop Recovery Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""Test the shared metadata cache: single fetch, persistence and TTL.
+
+Usage:
+    python tests/test_metadata_cache.py
+"""
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import temp_dir
+
+INFO = {
+    "id": "dQw4w9WgXcQ", "title": "A video", "channel": "Chan", "timestamp": 1700000000,
+    "language": "en", "formats": [{"url": "https://stream.example/expiring"}] * 50,
+    "subtitles": {"en": [{"ext": "vtt", "url": "https://subs.example/x"}]},
+}
+
+
+class _Extractor:
+    def __init__(self, delay=0.0):
+        self.calls = 0
+        self.delay = delay
+
+    def __call__(self, url):
+        self.calls += 1
+        time.sleep(self.delay)
+        return dict(INFO, webpage_url=url)
+
+
+def test_concurrent_callers_share_one_fetch():
+    import metadata_cache
+    with temp_dir(metadata_cache, 'CACHE_DIR'):
+        extract = _Extractor(delay=0.1)
+        service = metadata_cache.MetadataService(extract)
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(service.get('https://y/1'))) for _ in range(6)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert extract.calls == 1, f"{extract.calls} extractions for one URL"
+        assert all(r['title'] == "A video" for r in results)
+        assert 'formats' not in results[0], "Stream URLs are not kept in the trimmed info"
+        assert results[0]['subtitles'] == {"en": [{"ext": "vtt", "is_automatic": False}]}
+        assert service.full_info('https://y/1')['formats'], "Fresh full info is reusable for the download"
+    print("  [PASS] Concurrent callers share a single extraction")
+
+
+def test_persisted_across_restarts_with_ttl():
+    import metadata_cache
+    original_ttl = metadata_cache.TTL_SECONDS
+    with temp_dir(metadata_cache, 'CACHE_DIR'):
+        metadata_cache.MetadataService(_Extractor()).get('https://y/2')
+
+        extract = _Extractor()
+        restarted = metadata_cache.MetadataService(extract)
+        assert restarted.get('https://y/2')['channel'] == "Chan"
+        assert extract.calls == 0, "A restart reuses the persisted info"
+        assert restarted.full_info('https://y/2') is None, "Full info never comes from disk"
+
+        metadata_cache.TTL_SECONDS = -1
+        try:
+            expired = metadata_cache.MetadataService(extract)
+            expired.get('https://y/2')
+            assert extract.calls == 1, "Expired info is fetched again"
+        finally:
+            metadata_cache.TTL_SECONDS = original_ttl
+    print("  [PASS] Info persists across restarts until its TTL")
+
+
+def test_failures_and_full_info_bounds():
+    import metadata_cache
+    with temp_dir(metadata_cache, 'CACHE_DIR'):
+        service = metadata_cache.MetadataService(lambda url: None)
+        assert service.get('https://y/missing') is None
+        assert metadata_cache.load('https://y/missing') is None, "Failed fetches are not cached"
+
+        service = metadata_cache.MetadataService(_Extractor())
+        for i in range(metadata_cache.MAX_FULL_INFOS + 5):
+            service.get(f'https://y/many{i}')
+        assert service.full_info('https://y/many0') is None, "Oldest full info is dropped"
+        assert service.full_info(f'https://y/many{metadata_cache.MAX_FULL_INFOS + 4}') is not None
+        service.release(f'https://y/many{metadata_cache.MAX_FULL_INFOS + 4}')
+        assert service.full_info(f'https://y/many{metadata_cache.MAX_FULL_INFOS + 4}') is None
+    print("  [PASS] Failed fetches aren't cached and full info is bounded")
+
+
+def main():
+    tests = [
+        test_concurrent_callers_share_one_fetch,
+        test_persisted_across_restarts_with_ttl,
+        test_failures_and_full_info_bounds,
+    ]
+
+    print("=" * 60)
+    print("Metadata Cache Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
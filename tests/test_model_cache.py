@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""Test the shared model cache: LRU eviction, refcounting, budget and stats.
+
+Usage:
+    python tests/test_model_cache.py
+"""
+import sys
+import os
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+MB = 1024 * 1024
+
+
+def _fake_loader(counter, name):
+    """Loader that records calls; sizes are pinned with _set_size since RSS is noisy."""
+    def load():
+        counter.append(name)
+        return f"model:{name}"
+    return load
+
+
+def _set_size(cache, key, size_mb):
+    cache._entries[tuple(key)].size_bytes = int(size_mb * MB)
+
+
+def test_hit_and_miss():
+    from model import ModelCache
+    cache = ModelCache(budget_mb=100)
+    loads = []
+    with cache.acquire(('ns', 'a'), _fake_loader(loads, 'a')) as m:
+        assert m == "model:a"
+    with cache.acquire(('ns', 'a'), _fake_loader(loads, 'a')) as m:
+        assert m == "model:a"
+    assert loads == ['a'], f"Expected one load, got {loads}"
+    stats = cache.stats()
+    assert stats['hits'] == 1 and stats['misses'] == 1
+    assert stats['hit_rate'] == 0.5
+    print("  [PASS] Cache hit and miss")
+
+
+def test_lru_eviction_over_budget():
+    from model import ModelCache
+    cache = ModelCache(budget_mb=25)
+    loads = []
+    for name in ('a', 'b'):
+        with cache.acquire(('ns', name), _fake_loader(loads, name)):
+            _set_size(cache, ('ns', name), 10)
+    # Touch 'a' so 'b' becomes least recently used
+    with cache.acquire(('ns', 'a'), _fake_loader(loads, 'a')):
+        pass
+    with cache.acquire(('ns', 'c'), _fake_loader(loads, 'c')):
+        _set_size(cache, ('ns', 'c'), 10)
+    keys = [tuple(m['key']) for m in cache.stats()['models']]
+    assert ('ns', 'b') not in keys, f"LRU entry should be evicted: {keys}"
+    assert ('ns', 'a') in keys and ('ns', 'c') in keys
+    assert cache.stats()['evictions'] == 1
+    print("  [PASS] LRU eviction over budget")
+
+
+def test_in_use_models_not_evicted():
+    from model import ModelCache
+    cache = ModelCache(budget_mb=5)
+    loads = []
+    with cache.acquire(('ns', 'big'), _fake_loader(loads, 'big')) as m:
+        _set_size(cache, ('ns', 'big'), 10)
+        # Over budget but referenced: a second (shared) acquire must still hit
+        with cache.acquire(('ns', 'big'), _fake_loader(loads, 'big'), exclusive=False) as m2:
+            assert m2 == m
+        assert cache.stats()['models'], "In-use model was evicted"
+    assert not cache.stats()['models'], "Idle over-budget model should be evicted on release"
+    assert loads == ['big']
+    print("  [PASS] In-use models are never evicted")
+
+
+def test_concurrent_single_load():
+    from model import ModelCache
+    import time
+    cache = ModelCache(budget_mb=100)
+    loads = []
+
+    def slow_load():
+        time.sleep(0.05)
+        loads.append(1)
+        return object()
+
+    results = []
+
+    def worker():
+        with cache.acquire(('ns', 'shared'), slow_load) as m:
+            results.append(m)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(loads) == 1, f"Expected a single load, got {len(loads)}"
+    assert all(r is results[0] for r in results)
+    print("  [PASS] Concurrent acquires share one load")
+
+
+def test_exclusive_use():
+    from model import ModelCache
+    import time
+    cache = ModelCache(budget_mb=100)
+    active = []
+    overlaps = []
+
+    def worker(exclusive):
+        with cache.acquire(('ns', 'm'), object, exclusive=exclusive):
+            active.append(1)
+            overlaps.append(len(active))
+            time.sleep(0.05)
+            active.pop()
+
+    for exclusive, expected in ((True, 1), (False, 3)):
+        overlaps.clear()
+        threads = [threading.Thread(target=worker, args=(exclusive,)) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        assert max(overlaps) == expected, f"exclusive={exclusive}: {overlaps}"
+    print("  [PASS] Exclusive models serve one caller at a time; shared ones overlap")
+
+
+def test_failed_load_is_retried():
+    from model import ModelCache
+    cache = ModelCache(budget_mb=100)
+
+    def broken():
+        raise RuntimeError("no such model")
+
+    try:
+        with cache.acquire(('ns', 'x'), broken):
+            pass
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("Loader error should propagate")
+    assert not cache._loading, "A failed load must not leave its lock behind"
+    loads = []
+    with cache.acquire(('ns', 'x'), _fake_loader(loads, 'x')) as m:
+        assert m == "model:x"
+    assert loads == ['x'] and cache.stats()['misses'] == 1
+    print("  [PASS] A failed load is cleaned up and retried next time")
+
+
+def test_size_estimate():
+    from model import ModelCache
+    from adapters.faster_whisper_adapter import _gpu_size_estimate
+    cache = ModelCache(budget_mb=100)
+    with cache.acquire(('ns', 'gpu'), object, size_bytes=42 * MB):
+        pass
+    assert cache.stats()['models'][0]['size_mb'] == 42
+    assert _gpu_size_estimate('large-v3', 'float16') == int(1550e6 * 2)
+    assert _gpu_size_estimate('distil-large-v3', 'int8_float16') == int(756e6)
+    assert _gpu_size_estimate('mystery', 'float16') is None
+    print("  [PASS] Caller size estimates replace RSS measurement")
+
+
+def test_namespace_stats_in_adapter_listing():
+    from model import ModelCache, TranscriptionContext
+    cache = ModelCache(budget_mb=100)
+    ctx = TranscriptionContext(model_cache=cache)
+    adapters = ctx.list_available_adapters()
+    assert adapters, "No adapters listed"
+    for entry in adapters:
+        assert 'model_cache' in entry, f"Missing model_cache stats for {entry['prefix']}"
+        assert entry['model_cache']['hits'] == 0
+    for adapter in ctx._adapter_map.values():
+        assert adapter.model_cache is cache
+    print(f"  [PASS] Model cache stats listed for {len(adapters)} adapters")
+
+
+def main():
+    tests = [
+        test_hit_and_miss,
+        test_lru_eviction_over_budget,
+        test_in_use_models_not_evicted,
+        test_concurrent_single_load,
+        test_exclusive_use,
+        test_failed_load_is_retried,
+        test_size_estimate,
+        test_namespace_stats_in_adapter_listing,
+    ]
+
+    print("=" * 60)
+    print("Model Cache Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""Test chunk planning and SRT stitching for parallel transcription.
+
+Usage:
+    python tests/test_parallel_transcribe.py
+"""
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_plan_cuts_at_nearest_silence():
+    from parallel_transcribe import plan_chunks
+    silences = [(1190.0, 1192.0), (1230.0, 1240.0), (2390.0, 2391.0)]
+    find = lambda lo, hi: [s for s in silences if s[0] >= lo and s[1] <= hi]
+    ranges = plan_chunks(3600.0, 3, find)
+    assert len(ranges) == 3, ranges
+    assert ranges[0] == (0.0, 1191.0), ranges
+    assert ranges[1] == (1191.0, 2390.5), ranges
+    assert ranges[2][1] == 3600.0
+    print("  [PASS] Cuts placed in the nearest silence")
+
+
+def test_plan_falls_back_to_even_split():
+    from parallel_transcribe import plan_chunks
+    ranges = plan_chunks(2400.0, 2, lambda lo, hi: [])
+    assert ranges == [(0.0, 1200.0), (1200.0, 2400.0)], ranges
+    print("  [PASS] Even split without silences")
+
+
+def test_plan_limits_chunks_for_short_audio():
+    from parallel_transcribe import plan_chunks
+    ranges = plan_chunks(900.0, 8, lambda lo, hi: [])
+    assert len(ranges) == 1, f"Short audio should not be split: {ranges}"
+    print("  [PASS] Short audio stays in one chunk")
+
+
+def test_stitch_offsets_and_boundaries():
+    from model import Segment
+    from parallel_transcribe import stitch_segments
+    chunk_a = [Segment(0.0, 2.0, "hello"), Segment(598.0, 600.5, "see you")]
+    chunk_b = [Segment(0.0, 1.0, "See you"), Segment(0.5, 3.0, "next part"), Segment(4.0, 4.0, "")]
+    merged = stitch_segments([(0.0, chunk_a), (600.0, chunk_b)])
+    texts = [s.text for s in merged]
+    assert texts == ["hello", "see you", "next part"], texts
+    assert merged[1].end == 601.0, "Duplicated boundary line should extend the previous segment"
+    assert merged[2].start >= merged[1].end, "Overlaps must be clamped"
+    assert merged[2].end == 603.0
+    print("  [PASS] Stitching offsets, dedupes and clamps boundaries")
+
+
+def test_read_srt_segments_roundtrip():
+    from model import Segment
+    from parallel_transcribe import read_srt_segments, _write_srt
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'x.srt')
+        _write_srt([Segment(1.0, 2.5, "one"), Segment(3.0, 4.25, "two\nlines")], path)
+        segments = read_srt_segments(path)
+    assert [s.text for s in segments] == ["one", "two\nlines"]
+    assert segments[1].start == 3.0 and segments[1].end == 4.25
+    print("  [PASS] SRT read/write roundtrip")
+
+
+def main():
+    tests = [
+        test_plan_cuts_at_nearest_silence,
+        test_plan_falls_back_to_even_split,
+        test_plan_limits_chunks_for_short_audio,
+        test_stitch_offsets_and_boundaries,
+        test_read_srt_segments_roundtrip,
+    ]
+
+    print("=" * 60)
+    print("Parallel Transcription Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""Test the decode-once PCM store: WAV detection, range extraction and reads.
+
+Usage:
+    python tests/test_pcm_store.py
+"""
+import sys
+import os
+import struct
+import tempfile
+import wave
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _make_wav(path, seconds, rate=16000, channels=1):
+    """Write a WAV whose sample values encode their own index (mod 32768)."""
+    frames = int(seconds * rate)
+    with wave.open(path, 'wb') as w:
+        w.setnchannels(channels)
+        w.setsampwidth(2)
+        w.setframerate(rate)
+        w.writeframes(b''.join(struct.pack('<h', i % 32768) * channels for i in range(frames)))
+    return path
+
+
+def test_pcm_wav_passthrough():
+    import pcm_store
+    with tempfile.TemporaryDirectory() as d:
+        good = _make_wav(os.path.join(d, 'good.wav'), 0.5)
+        stereo = _make_wav(os.path.join(d, 'stereo.wav'), 0.5, channels=2)
+        resampled = _make_wav(os.path.join(d, 'rate.wav'), 0.5, rate=44100)
+        assert pcm_store.is_pcm_wav(good)
+        assert not pcm_store.is_pcm_wav(stereo)
+        assert not pcm_store.is_pcm_wav(resampled)
+        assert pcm_store.get_wav(good) == good, "Conforming WAV should be used in place"
+    print("  [PASS] 16 kHz mono WAVs pass through without decoding")
+
+
+def test_duration_and_offset():
+    import pcm_store
+    with tempfile.TemporaryDirectory() as d:
+        path = _make_wav(os.path.join(d, 'a.wav'), 2.0)
+        assert pcm_store.data_offset(path) == 44
+        assert abs(pcm_store.duration(path) - 2.0) < 1e-6
+    print("  [PASS] Duration read from the data chunk")
+
+
+def test_extract_range_is_exact():
+    import pcm_store
+    with tempfile.TemporaryDirectory() as d:
+        path = _make_wav(os.path.join(d, 'a.wav'), 3.0)
+        out = pcm_store.extract_range(path, 1.0, 2.5, os.path.join(d, 'cut.wav'))
+        with wave.open(out, 'rb') as w:
+            assert w.getnframes() == 24000, w.getnframes()
+            first = struct.unpack('<h', w.readframes(1))[0]
+        assert first == 16000, f"Range should start at sample 16000, got {first}"
+        tail = pcm_store.extract_range(path, 2.0, None, os.path.join(d, 'tail.wav'))
+        assert abs(pcm_store.duration(tail) - 1.0) < 1e-6
+    print("  [PASS] Range extraction copies exact sample spans")
+
+
+def test_read_samples():
+    import pcm_store
+    with tempfile.TemporaryDirectory() as d:
+        path = _make_wav(os.path.join(d, 'a.wav'), 1.0)
+        samples = pcm_store.read_samples(path, 0.5, 0.75)
+        assert len(samples) == 4000
+        assert samples.dtype.name == 'float32'
+        assert abs(samples[0] - 8000 / 32768.0) < 1e-6
+    print("  [PASS] Sample reads via mmap")
+
+
+def main():
+    tests = [
+        test_pcm_wav_passthrough,
+        test_duration_and_offset,
+        test_extract_range_is_exact,
+        test_read_samples,
+    ]
+
+    print("=" * 60)
+    print("PCM Store Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
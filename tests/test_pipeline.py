@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Test the staged task pipeline: overlap, bounded read-ahead and cleanup.
+
+Usage:
+    python tests/test_pipeline.py
+"""
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def test_downloads_overlap_transcription():
+    from pipeline import Pipeline, Stage
+    events = []
+    lock = threading.Lock()
+
+    def stage(name, seconds):
+        def run(item):
+            with lock:
+                events.append((name, item, 'start', time.monotonic()))
+            time.sleep(seconds)
+            with lock:
+                events.append((name, item, 'end', time.monotonic()))
+            return True
+        return run
+
+    finished = []
+    started = time.monotonic()
+    Pipeline([
+        Stage('download', stage('download', 0.1), workers=2),
+        Stage('transcribe', stage('transcribe', 0.1)),
+    ], queue_size=2, on_exit=finished.append).run(range(6))
+    elapsed = time.monotonic() - started
+
+    assert sorted(finished) == list(range(6)), finished
+    assert elapsed < 1.0, f"Serial run would take 1.2s, pipeline took {elapsed:.2f}s"
+    transcribing = [e for e in events if e[0] == 'transcribe']
+    spans = [(e[3], f[3]) for e, f in zip(transcribing[::2], transcribing[1::2])]
+    assert all(a[1] <= b[0] + 1e-3 for a, b in zip(spans, spans[1:])), "One transcription at a time"
+    print("  [PASS] Downloads overlap transcription, transcription stays serial")
+
+
+def test_read_ahead_is_bounded():
+    from pipeline import Pipeline, Stage
+    pulled = []
+    release = threading.Event()
+
+    def items():
+        for i in range(20):
+            pulled.append(i)
+            yield i
+
+    runner = threading.Thread(target=Pipeline([
+        Stage('download', lambda item: True),
+        Stage('transcribe', lambda item: release.wait(5)),
+    ], queue_size=2).run, args=(items(),))
+    runner.start()
+    time.sleep(0.3)
+    # 1 transcribing + 2 queued for it + 1 held by download + 2 queued for download + 1 blocked in put
+    assert len(pulled) <= 7, f"Pulled {len(pulled)} items while the last stage was stuck"
+    release.set()
+    runner.join(5)
+    assert len(pulled) == 20
+    print("  [PASS] Early stages run at most queue_size items ahead")
+
+
+def test_errors_and_drops_exit_once():
+    from pipeline import Pipeline, Stage
+    errors, exits, finalized = [], [], []
+
+    def prepare(item):
+        if item == 1:
+            return False
+        if item == 2:
+            raise RuntimeError("boom")
+        return True
+
+    Pipeline([
+        Stage('prepare', prepare, workers=3),
+        Stage('finalize', lambda item: finalized.append(item) or True),
+    ], on_error=lambda stage, item, e: errors.append((stage, item, str(e))),
+        on_exit=exits.append).run(range(5))
+
+    assert sorted(exits) == list(range(5)), exits
+    assert sorted(finalized) == [0, 3, 4], finalized
+    assert errors == [('prepare', 2, 'boom')], errors
+    print("  [PASS] Dropped and failed items leave through on_exit exactly once")
+
+
+def test_stop_skips_remaining_items():
+    from pipeline import Pipeline, Stage
+    stop = threading.Event()
+    processed, exits = [], []
+
+    def transcribe(item):
+        processed.append(item)
+        if item == 2:
+            stop.set()
+        return True
+
+    Pipeline([Stage('transcribe', transcribe)], queue_size=1, on_exit=exits.append,
+             stop_event=stop).run(range(10))
+    assert processed == [0, 1, 2], processed
+    assert set(processed) <= set(exits) and len(exits) == len(set(exits)), exits
+    print("  [PASS] Stopping drains queued items without processing them")
+
+
+def main():
+    tests = [
+        test_downloads_overlap_transcription,
+        test_read_ahead_is_bounded,
+        test_errors_and_drops_exit_once,
+        test_stop_skips_remaining_items,
+    ]
+
+    print("=" * 60)
+    print("Pipeline Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
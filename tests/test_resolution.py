@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Test channel/playlist resolution: flat entries, history filtering, no per-entry fetches.
+
+Usage:
+    python tests/test_resolution.py
+"""
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+VIDEO_IDS = [f"vid{i:08d}"[:11] for i in range(3000)]
+
+
+class _FlatYoutubeDL:
+    """Stands in for yt_dlp.YoutubeDL: a channel with Videos and Shorts tabs."""
+    calls = []
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def extract_info(self, url, download=False):
+        _FlatYoutubeDL.calls.append((url, bool(self.opts.get('extract_flat'))))
+        entries = [{"id": v, "url": f"https://www.youtube.com/watch?v={v}", "title": f"Video {v}"}
+                   for v in VIDEO_IDS]
+        return {"entries": [
+            {"_type": "playlist", "title": "Videos", "entries": entries[:2500]},
+            {"_type": "playlist", "title": "Shorts", "entries": entries[2500:] + [None]},
+        ]}
+
+
+def test_channel_resolution_uses_flat_entries_and_history():
+    import time
+    import whisper_subs
+    with tempfile.TemporaryDirectory() as d:
+        original = (whisper_subs.HISTORY_FILE, whisper_subs.yt_dlp.YoutubeDL)
+        whisper_subs.HISTORY_FILE = os.path.join(d, 'history.txt')
+        whisper_subs.yt_dlp.YoutubeDL = _FlatYoutubeDL
+        _FlatYoutubeDL.calls = []
+        try:
+            with open(whisper_subs.HISTORY_FILE, 'w', encoding='utf-8') as f:
+                for v in VIDEO_IDS[:2990]:
+                    f.write(f"{v} large-v3\n")
+                f.write(f"{VIDEO_IDS[2990]} tiny\n")
+            subs = whisper_subs.WhisperSubs(model_name='large-v3', browser=None)
+            subs.log = lambda *a, **k: None
+            started = time.perf_counter()
+            tasks = list(subs.resolve_source_to_tasks_lazy('https://www.youtube.com/@example'))
+            elapsed = time.perf_counter() - started
+        finally:
+            whisper_subs.HISTORY_FILE, whisper_subs.yt_dlp.YoutubeDL = original
+
+    assert _FlatYoutubeDL.calls == [('https://www.youtube.com/@example', True)], _FlatYoutubeDL.calls
+    assert [t['source'][-11:] for t in tasks] == VIDEO_IDS[2990:], "Processed with a smaller model reruns"
+    assert tasks[0]['title'] == f"Video {VIDEO_IDS[2990]}"
+    assert elapsed < 5, f"Resolving 3000 entries took {elapsed:.1f}s"
+    print("  [PASS] One flat extract; history filters entries without per-video fetches")
+
+
+def main():
+    tests = [
+        test_channel_resolution_uses_flat_entries_and_history,
+    ]
+
+    print("=" * 60)
+    print("Resolution Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
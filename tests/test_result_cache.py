@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Test the transcript result cache: keys, round trips and eviction.
+
+Usage:
+    python tests/test_result_cache.py
+"""
+import sys
+import os
+import json
+import shutil
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import temp_dir
+
+SRT = """1
+00:00:00,000 --> 00:00:00,000
+TRANSCRIPTION METADATA
+Model: tiny
+
+2
+00:00:01,001 --> 00:00:02,999
+Hello there.
+
+3
+01:02:03,004 --> 01:02:05,000
+Two lines
+of text.
+
+"""
+
+
+def _audio(d, name, content=b'audio bytes' * 1000):
+    path = os.path.join(d, name)
+    with open(path, 'wb') as f:
+        f.write(content)
+    return path
+
+
+def test_key_follows_content_and_settings():
+    import result_cache
+    with tempfile.TemporaryDirectory() as d:
+        a = _audio(d, 'episode.m4a')
+        renamed = os.path.join(d, 'other_channel', 'renamed.m4a')
+        os.makedirs(os.path.dirname(renamed))
+        shutil.copy(a, renamed)
+        key = result_cache.make_key(a, 'tiny', language='en')
+        assert key == result_cache.make_key(renamed, 'tiny', language='en'), "Same audio, same key"
+        assert key != result_cache.make_key(a, 'base', language='en')
+        assert key != result_cache.make_key(a, 'tiny', language='ja')
+        assert key != result_cache.make_key(a, 'tiny', language='en', temperature=0.2)
+        assert key != result_cache.make_key(a, 'tiny', language='en', vad_filter=True)
+        assert key != result_cache.make_key(a, 'tiny', language='en', start_time='00:10')
+        assert result_cache.make_key(a, 'tiny', language='none') == result_cache.make_key(a, 'tiny')
+        assert result_cache.make_key(a, 'tiny', temperature=None) == result_cache.make_key(a, 'tiny')
+        assert result_cache.make_key(os.path.join(d, 'missing.m4a'), 'tiny') is None
+
+        # Same size and same first/middle/last MB, different audio in between
+        body = bytearray(5 * 1024 * 1024)
+        first = _audio(d, 'first.m4a', bytes(body))
+        body[1536 * 1024] = 1
+        second = _audio(d, 'second.m4a', bytes(body))
+        assert result_cache.make_key(first, 'tiny') != result_cache.make_key(second, 'tiny'), \
+            "Recordings that differ anywhere must not share a key"
+    print("  [PASS] Key follows audio content and every output-changing setting")
+
+
+def test_restore_writes_identical_srt():
+    import result_cache
+    with temp_dir(result_cache, 'CACHE_DIR', 'results') as d:
+        srt = os.path.join(d, 'first.srt')
+        with open(srt, 'w', encoding='utf-8') as f:
+            f.write(SRT)
+        key = result_cache.make_key(_audio(d, 'a.m4a'), 'tiny')
+        assert result_cache.put(key, srt, {"model": "tiny", "segments_count": 3})
+
+        out = os.path.join(d, 'out', 'second.srt')
+        events = []
+        assert result_cache.restore(key, out, 'renamed.m4a', write=lambda *a: None,
+                                    on_event=lambda kind, fields: events.append((kind, fields)))
+        with open(out, encoding='utf-8') as f:
+            header, body = f.read().split('\n\n', 1)
+        assert body == SRT.split('\n\n', 1)[1], "Transcript entries should round-trip exactly"
+        assert header.startswith('1\n00:00:00,000 --> 00:00:00,000\nTRANSCRIPTION METADATA\nModel: tiny\n'), header
+        assert 'Source: renamed.m4a' in header, "Metadata entry describes this restore, not the cached run"
+        assert result_cache.read_srt(out)[1:] == result_cache.read_srt(srt)[1:]
+        assert len(result_cache.get(key)['segments']) == 2, "The metadata entry is not stored"
+        assert [(kind, f['index'], f['start'], f['end'], f['text']) for kind, f in events] == [
+            ('segment', n, start / 1000, end / 1000, text)
+            for n, (start, end, text) in enumerate(result_cache.read_srt(out)[1:], start=2)
+        ], "Restored entries are published as segment events numbered as in the SRT"
+        with open(os.path.join(d, 'out', 'second.metadata.json'), encoding='utf-8') as f:
+            metadata = json.load(f)
+        assert metadata['model'] == 'tiny' and metadata['source_file'] == 'renamed.m4a'
+        assert 'result_cache' in metadata
+        assert not result_cache.restore('0' * 64, out, 'x', write=lambda *a: None)
+        s = result_cache.stats()
+        assert s['hits'] == 2 and s['misses'] == 1 and s['total_entries'] == 1, s
+    print("  [PASS] Cached result restores the same SRT and metadata")
+
+
+def test_size_bounded_eviction():
+    import result_cache
+    original = result_cache.MAX_BYTES
+    with temp_dir(result_cache, 'CACHE_DIR', 'results') as d:
+        srt = os.path.join(d, 'a.srt')
+        with open(srt, 'w', encoding='utf-8') as f:
+            for i in range(50):
+                f.write(f"{i + 1}\n00:00:{i:02d},000 --> 00:00:{i:02d},500\n{os.urandom(40).hex()}\n\n")
+        result_cache.MAX_BYTES = 10 ** 9
+        try:
+            result_cache.put('k0', srt)
+            size = result_cache.stats()['total_size_bytes']
+            result_cache.MAX_BYTES = size * 2 + size // 2
+            result_cache.put('k1', srt)
+            result_cache.get('k0')
+            result_cache.put('k2', srt)
+            assert result_cache.get('k1') is None, "Least recently used result should be evicted"
+            assert result_cache.get('k0') is not None
+            assert result_cache.stats()['evictions'] == 1
+        finally:
+            result_cache.MAX_BYTES = original
+    print("  [PASS] Results are evicted LRU past the byte quota")
+
+
+def main():
+    tests = [
+        test_key_follows_content_and_settings,
+        test_restore_writes_identical_srt,
+        test_size_bounded_eviction,
+    ]
+
+    print("=" * 60)
+    print("Result Cache Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
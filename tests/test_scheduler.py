@@ -0,0 +1,219 @@
+#!/usr/bin/env python3
+"""Test the API task scheduler: priority order, aging, fair share, preemption.
+
+Usage:
+    python tests/test_scheduler.py
+"""
+import sys
+import os
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+class _Gate:
+    """Occupies the scheduler's only worker until opened, so later submissions queue up."""
+
+    def __init__(self, scheduler):
+        self.opened = threading.Event()
+        self.started = threading.Event()
+        self.future = scheduler.submit(self._hold, task_id='gate', user='gate')
+        assert self.started.wait(2), "Gate task never started"
+
+    def _hold(self):
+        self.started.set()
+        self.opened.wait(5)
+
+    def open(self):
+        self.opened.set()
+
+
+def _run_order(scheduler, submissions):
+    """Queue submissions behind a gate and return task ids in the order they ran."""
+    order = []
+    gate = _Gate(scheduler)
+    futures = [
+        scheduler.submit(order.append, task_id, task_id=task_id, **options)
+        for task_id, options in submissions
+    ]
+    gate.open()
+    for future in futures:
+        future.result(5)
+    return order
+
+
+def test_higher_priority_runs_first():
+    from scheduler import TaskScheduler
+    scheduler = TaskScheduler(max_workers=1, preempt=False)
+    try:
+        order = _run_order(scheduler, [
+            ('low', {'priority': 1}),
+            ('high', {'priority': 9}),
+            ('mid', {'priority': 5}),
+        ])
+        assert order == ['high', 'mid', 'low'], order
+    finally:
+        scheduler.shutdown()
+    print("  [PASS] Queued tasks start in priority order")
+
+
+def test_aging_lets_old_low_priority_work_through():
+    from scheduler import TaskScheduler
+    scheduler = TaskScheduler(max_workers=1, aging_seconds=0.05, preempt=False)
+    try:
+        order = []
+        gate = _Gate(scheduler)
+        old = scheduler.submit(order.append, 'old-low', task_id='old-low', priority=1)
+        time.sleep(0.3)  # six priority levels of aging
+        new = scheduler.submit(order.append, 'new-high', task_id='new-high', priority=5)
+        gate.open()
+        old.result(5), new.result(5)
+        assert order == ['old-low', 'new-high'], order
+    finally:
+        scheduler.shutdown()
+    print("  [PASS] Aging lets long-waiting low-priority work go first")
+
+
+def test_fair_share_between_users():
+    from scheduler import TaskScheduler
+    scheduler = TaskScheduler(max_workers=2, preempt=False)
+    try:
+        release = threading.Event()
+        started = []
+        lock = threading.Lock()
+
+        def work(name):
+            with lock:
+                started.append(name)
+            release.wait(5)
+
+        gate_a = _Gate(scheduler)
+        gate_b = _Gate(scheduler)
+        # alice's backlog is queued before bob's single task
+        futures = [scheduler.submit(work, f'alice-{n}', task_id=f'alice-{n}', user='alice') for n in range(5)]
+        futures.append(scheduler.submit(work, 'bob-0', task_id='bob-0', user='bob'))
+        assert scheduler.position('bob-0') == 6, scheduler.position('bob-0')
+        gate_a.open()
+        gate_b.open()
+        time.sleep(0.2)
+        with lock:
+            first = list(started)
+        release.set()
+        for future in futures:
+            future.result(5)
+        assert sorted(first) == ['alice-0', 'bob-0'], first
+    finally:
+        scheduler.shutdown()
+    print("  [PASS] A second user's task starts before the first user's backlog")
+
+
+def test_group_limit_caps_concurrency():
+    from scheduler import TaskScheduler
+    scheduler = TaskScheduler(max_workers=4, preempt=False)
+    try:
+        running = []
+        peak = []
+        lock = threading.Lock()
+
+        def work():
+            with lock:
+                running.append(1)
+                peak.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.pop()
+
+        futures = [scheduler.submit(work, group='batch', group_limit=2) for _ in range(8)]
+        for future in futures:
+            future.result(5)
+        assert max(peak) <= 2, f"Group ran {max(peak)} at once"
+    finally:
+        scheduler.shutdown()
+    print("  [PASS] Group limit caps how many of a batch run at once")
+
+
+def test_interactive_preempts_queued_batch_work():
+    from scheduler import TaskScheduler
+    scheduler = TaskScheduler(max_workers=1, preempt_limit=1)
+    try:
+        order = []
+        gate = _Gate(scheduler)
+        futures = [scheduler.submit(order.append, f'batch-{n}', task_id=f'batch-{n}', priority=8)
+                   for n in range(3)]
+        futures.append(scheduler.submit(order.append, 'ui-1', task_id='ui-1', priority=3, interactive=True))
+        assert scheduler.position('ui-1') == 1, scheduler.position('ui-1')
+        # Every batch task has now been passed over once, so the next one can't jump them again
+        futures.append(scheduler.submit(order.append, 'ui-2', task_id='ui-2', priority=3, interactive=True))
+        assert scheduler.position('ui-2') == 5, scheduler.position('ui-2')
+        gate.open()
+        for future in futures:
+            future.result(5)
+        assert order == ['ui-1', 'batch-0', 'batch-1', 'batch-2', 'ui-2'], order
+        assert scheduler.preemptions == 3, scheduler.preemptions
+    finally:
+        scheduler.shutdown()
+    print("  [PASS] Interactive work preempts queued batch work up to the limit")
+
+
+def test_cancel_and_estimates():
+    from scheduler import TaskScheduler
+    import datetime
+    scheduler = TaskScheduler(max_workers=1, preempt=False)
+    try:
+        gate = _Gate(scheduler)
+        first = scheduler.submit(lambda: None, task_id='first')
+        second = scheduler.submit(lambda: None, task_id='second')
+        assert scheduler.position('second') == 2
+        est_first = scheduler.estimated_start('first')
+        est_second = scheduler.estimated_start('second')
+        assert est_first < est_second, (est_first, est_second)
+        assert est_first > datetime.datetime.now(), "The only worker is busy"
+        assert scheduler.cancel('first')
+        assert first.cancelled()
+        assert not scheduler.cancel('first')
+        assert scheduler.position('second') == 1
+        assert scheduler.position('gate') is None, "Running tasks have no queue position"
+        gate.open()
+        second.result(5)
+        assert scheduler.position('second') is None
+    finally:
+        scheduler.shutdown()
+    print("  [PASS] Cancel frees the queue slot; positions and start estimates follow")
+
+
+def main():
+    tests = [
+        test_higher_priority_runs_first,
+        test_aging_lets_old_low_priority_work_through,
+        test_fair_share_between_users,
+        test_group_limit_caps_concurrency,
+        test_interactive_preempts_queued_batch_work,
+        test_cancel_and_estimates,
+    ]
+
+    print("=" * 60)
+    print("Scheduler Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Test live segment streams: delivery, resume, rollbacks and slow consumers.
+
+Usage:
+    python tests/test_segment_stream.py
+"""
+import sys
+import os
+import asyncio
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _segment(index, text=None):
+    return {'index': index, 'start': float(index), 'end': index + 1.0, 'text': text or f"line {index}"}
+
+
+async def _collect(stream, from_index=0, idle_timeout=None):
+    received = []
+    async for messages in stream.follow(from_index, idle_timeout=idle_timeout):
+        received.extend(messages)
+    return received
+
+
+def _apply(messages):
+    """What a client ends up showing: segments by index, honouring truncates."""
+    shown = {}
+    for message in messages:
+        if message['type'] == 'truncate':
+            shown = {i: t for i, t in shown.items() if i < message['index']}
+        elif message['type'] == 'segment':
+            shown[message['index']] = message['text']
+    return [shown[i] for i in sorted(shown)]
+
+
+def test_segments_arrive_as_published():
+    from segment_stream import SegmentStream
+    stream = SegmentStream('t')
+    delays = []
+
+    def producer():
+        for n in range(1, 6):
+            time.sleep(0.02)
+            stream.publish('segment', dict(_segment(n), sent=time.monotonic()))
+        stream.finish('completed')
+
+    async def consume():
+        received = []
+        threading.Thread(target=producer).start()
+        async for messages in stream.follow():
+            now = time.monotonic()
+            delays.extend(now - m['sent'] for m in messages if m['type'] == 'segment')
+            received.extend(messages)
+        return received
+
+    received = asyncio.run(consume())
+    assert [m['index'] for m in received if m['type'] == 'segment'] == [1, 2, 3, 4, 5], received
+    assert received[-1] == {'type': 'status', 'status': 'completed'}, received[-1]
+    assert max(delays) < 0.5, f"Slowest segment took {max(delays):.3f}s"
+    print("  [PASS] Segments from another thread reach the subscriber at once")
+
+
+def test_resume_from_segment():
+    from segment_stream import SegmentStream
+    stream = SegmentStream('t')
+    for n in range(1, 11):
+        stream.publish('segment', _segment(n))
+    stream.finish('completed')
+    received = asyncio.run(_collect(stream, from_index=8))
+    assert [m['index'] for m in received if m['type'] == 'segment'] == [8, 9, 10], received
+    print("  [PASS] Reconnecting with from_segment skips what the client has")
+
+
+def test_rollbacks_reach_subscribers():
+    from segment_stream import SegmentStream
+    stream = SegmentStream('t')
+
+    async def scenario():
+        received = []
+        follower = stream.follow()
+        for n in range(1, 6):
+            stream.publish('segment', _segment(n, "loop"))
+        received.extend(await follower.__anext__())
+        # Loop recovery cuts back to 3; a model retry starts over at 1
+        stream.publish('truncate', {'index': 3})
+        stream.publish('segment', _segment(3))
+        received.extend(await follower.__anext__())
+        stream.publish('segment', _segment(1))
+        stream.publish('segment', _segment(2))
+        stream.finish('completed')
+        async for messages in follower:
+            received.extend(messages)
+        return received
+
+    received = asyncio.run(scenario())
+    assert _apply(received) == ["line 1", "line 2"], _apply(received)
+    assert [s['text'] for s in stream.segments()] == ["line 1", "line 2"]
+    late = asyncio.run(_collect(stream, from_index=5))
+    assert late[0] == {'type': 'truncate', 'index': 3}, "A client ahead of the stream is told to roll back"
+    print("  [PASS] Truncates and rewritten indices roll subscribers back")
+
+
+def test_slow_consumer_gets_coalesced_stats():
+    import segment_stream
+    stream = segment_stream.SegmentStream('t')
+    for n in range(1, segment_stream.MAX_BATCH + 51):
+        stream.publish('segment', _segment(n))
+        stream.publish('stats', {'percent': n / 10})
+    stream.finish('completed')
+
+    async def consume():
+        batches = []
+        async for messages in stream.follow():
+            batches.append(messages)
+        return batches
+
+    batches = asyncio.run(consume())
+    stats = [m for batch in batches for m in batch if m['type'] == 'stats']
+    assert len(stats) == 1 and stats[0]['percent'] == (segment_stream.MAX_BATCH + 50) / 10, stats
+    assert len(batches[0]) <= segment_stream.MAX_BATCH + 2, len(batches[0])
+    segments = [m['index'] for batch in batches for m in batch if m['type'] == 'segment']
+    assert segments == list(range(1, segment_stream.MAX_BATCH + 51)), "Every segment once, in order"
+    print("  [PASS] A consumer that falls behind reads in batches and sees only the latest stats")
+
+
+def test_idle_subscriber_is_pinged():
+    from segment_stream import SegmentStream
+    stream = SegmentStream('t')
+
+    async def first_wake():
+        async for messages in stream.follow(idle_timeout=0.05):
+            return messages
+
+    assert asyncio.run(first_wake()) == []
+    print("  [PASS] Idle subscribers wake up with an empty batch to ping")
+
+
+def test_worker_events_match_srt():
+    import worker_pool
+    from segment_stream import SegmentStream
+    from tests.helpers import LoopingModel, make_wav, windowed_pcm
+
+    stream = SegmentStream('t')
+
+    def emit(kind, **fields):
+        if kind in worker_pool.EVENT_KINDS:
+            stream.publish(kind, fields)
+
+    with tempfile.TemporaryDirectory() as d:
+        srt = os.path.join(d, 'out.srt')
+        job = {
+            "audio_file": make_wav(os.path.join(d, 'a.wav'), 60),
+            "srt_file": srt,
+            "unfinished_srt": os.path.join(d, 'out.unfinished.srt'),
+            "language": 'en',
+        }
+        with windowed_pcm():
+            result = worker_pool._run_job(LoopingModel(total=60), worker_pool.WorkerKey('fake', 'cpu', 'int8'), job, emit)
+        assert result == worker_pool.RESULT_OK, result
+        with open(srt, encoding='utf-8') as f:
+            blocks = [b.split('\n') for b in f.read().strip().split('\n\n')]
+    expected = [(int(b[0]), b[2]) for b in blocks]
+    assert [(s['index'], s['text']) for s in stream.segments()] == expected, "Stream should end up as the SRT"
+    print("  [PASS] Worker segment/truncate events leave the stream equal to the SRT")
+
+
+def main():
+    tests = [
+        test_segments_arrive_as_published,
+        test_resume_from_segment,
+        test_rollbacks_reach_subscribers,
+        test_slow_consumer_gets_coalesced_stats,
+        test_idle_subscriber_is_pinged,
+        test_worker_events_match_srt,
+    ]
+
+    print("=" * 60)
+    print("Segment Stream Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
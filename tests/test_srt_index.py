@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Test the SRT tail index used for resume and loop trimming.
+
+Usage:
+    python tests/test_srt_index.py
+"""
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _block(number, start, end, text):
+    return f"{number}\n00:00:{start:02d},000 --> 00:00:{end:02d},500\n{text}\n\n"
+
+
+def _write_indexed(path, count):
+    import srt_index
+    with open(path, 'w', encoding='utf-8') as f, srt_index.IndexWriter(path) as index:
+        for i in range(1, count + 1):
+            f.write(_block(i, i, i, f"line {i}"))
+            f.flush()
+            index.update(i, i + 0.5, f.tell())
+
+
+def test_index_used_when_valid():
+    import srt_index
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'a.unfinished.srt')
+        _write_indexed(path, 30)
+        entry = srt_index._read_index(path)
+        assert entry is not None, "Sidecar should validate against the file"
+        assert (entry.number, entry.end) == (30, 30.5), entry
+        assert srt_index.last_segment(path) == entry
+    print("  [PASS] Sidecar index answers resume queries")
+
+
+def test_reverse_scan_skips_partial_block():
+    import srt_index
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'a.srt')
+        with open(path, 'w', encoding='utf-8') as f:
+            for i in range(1, 2000):
+                f.write(_block(i, i % 60, i % 60, f"line {i} " + "x" * 40))
+            f.write("2000\n00:00:1")
+        entry = srt_index.last_segment(path)
+        assert entry.number == 1999, entry
+        assert entry.offset == os.path.getsize(path) - len("2000\n00:00:1")
+    print("  [PASS] Reverse scan ignores a half-written block across chunks")
+
+
+def test_stale_index_falls_back():
+    import srt_index
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'a.srt')
+        _write_indexed(path, 10)
+        # Rewritten by something that does not maintain the sidecar
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(_block(1, 1, 1, "rewritten") + _block(2, 2, 2, "again"))
+        entry = srt_index.last_segment(path)
+        assert entry.number == 2, f"Stale sidecar must not be trusted: {entry}"
+    print("  [PASS] Stale sidecar is ignored")
+
+
+def test_truncate_after_timestamp():
+    import srt_index
+    from transcribe import get_srt_resume_info, _trim_srt_to_timestamp
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, 'a.unfinished.srt')
+        _write_indexed(path, 20)
+        _trim_srt_to_timestamp(path, 12.6)
+        assert get_srt_resume_info(path) == (12.5, 12)
+        with open(path, encoding='utf-8') as f:
+            content = f.read()
+        assert content.endswith("line 12\n\n") and "line 13" not in content
+        assert srt_index._read_index(path) is not None, "Trim should refresh the sidecar"
+        _trim_srt_to_timestamp(path, 0.5)
+        assert os.path.getsize(path) == 0
+        assert get_srt_resume_info(path) == (0.0, 0)
+    print("  [PASS] Trimming cuts only the tail")
+
+
+def main():
+    tests = [
+        test_index_used_when_valid,
+        test_reverse_scan_skips_partial_block,
+        test_stale_index_falls_back,
+        test_truncate_after_timestamp,
+    ]
+
+    print("=" * 60)
+    print("SRT Index Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
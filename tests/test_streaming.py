@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Test streaming segment delivery from adapters into the adapter SRT writer.
+
+Usage:
+    python tests/test_streaming.py
+"""
+import sys
+import os
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _make_adapters():
+    from model import Segment, TranscriptionAdapter
+
+    class ListAdapter(TranscriptionAdapter):
+        """Only implements transcribe(); exercises the default transcribe_stream."""
+        prefix = "fakelist"
+
+        def transcribe(self, audio_file, model, language=None, write=print, temperature=0.0, **kwargs):
+            return [Segment(i, i + 1.0, f"line {i}") for i in range(3)], None
+
+        def is_available(self):
+            return True
+
+        def get_model_names(self):
+            return ["m"]
+
+    class StreamAdapter(ListAdapter):
+        """Yields segments lazily and records how far the consumer got."""
+        prefix = "fakestream"
+        closed = False
+
+        def __init__(self, texts):
+            self.texts = texts
+            self.yielded = 0
+
+        def transcribe_stream(self, audio_file, model, language=None, write=print, temperature=0.0, **kwargs):
+            try:
+                for i, text in enumerate(self.texts):
+                    self.yielded += 1
+                    yield Segment(float(i), i + 1.0, text)
+            finally:
+                StreamAdapter.closed = True
+
+    return ListAdapter, StreamAdapter
+
+
+def _context_with(*adapters):
+    from model import ModelCache, TranscriptionContext
+    ctx = TranscriptionContext(model_cache=ModelCache(budget_mb=1))
+    ctx._adapter_map = {a.prefix: a for a in adapters}
+    return ctx
+
+
+def _run(ctx, model_name, srt_file, reload=None):
+    import transcribe
+    original = transcribe.get_context
+    transcribe.get_context = lambda: ctx
+    try:
+        return transcribe._transcribe_with_adapter(
+            audio_file=srt_file + '.wav', model_name=model_name, srt_file=srt_file,
+            write=lambda *a: None, mpv_ipc_reload=reload,
+        )
+    finally:
+        transcribe.get_context = original
+
+
+def test_default_stream_wraps_transcribe():
+    ListAdapter, _ = _make_adapters()
+    segments = list(ListAdapter().transcribe_stream('x.wav', 'm'))
+    assert [s.text for s in segments] == ["line 0", "line 1", "line 2"]
+    print("  [PASS] Default transcribe_stream wraps transcribe()")
+
+
+def test_segments_written_while_streaming():
+    _, StreamAdapter = _make_adapters()
+    adapter = StreamAdapter([f"sentence {i}" for i in range(25)])
+    seen = []
+    with tempfile.TemporaryDirectory() as d:
+        srt = os.path.join(d, 'out.srt')
+
+        def reload():
+            with open(srt, encoding='utf-8') as f:
+                seen.append((adapter.yielded, f.read().count(' --> ') - 1))
+
+        assert _run(_context_with(adapter), 'fakestream:m', srt, reload)
+        with open(srt, encoding='utf-8') as f:
+            content = f.read()
+    assert seen[0] == (10, 10), f"First reload should see 10 written segments: {seen}"
+    assert seen[1] == (20, 20), seen
+    assert "sentence 24" in content
+    assert "\n26\n" in content, "Segments should be numbered after the metadata block"
+    print("  [PASS] Segments written and player reloaded while streaming")
+
+
+def test_loop_stops_stream():
+    _, StreamAdapter = _make_adapters()
+    StreamAdapter.closed = False
+    adapter = StreamAdapter(["intro"] + ["same words"] * 40)
+    with tempfile.TemporaryDirectory() as d:
+        srt = os.path.join(d, 'out.srt')
+        assert not _run(_context_with(adapter), 'fakestream:m', srt)
+    assert adapter.yielded < 41, f"Stream should stop at the loop, consumed {adapter.yielded}"
+    assert StreamAdapter.closed, "Generator should be closed when a loop is detected"
+    print("  [PASS] Loop detection stops the stream early")
+
+
+def main():
+    tests = [
+        test_default_stream_wraps_transcribe,
+        test_segments_written_while_streaming,
+        test_loop_stops_stream,
+    ]
+
+    print("=" * 60)
+    print("Streaming Transcription Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
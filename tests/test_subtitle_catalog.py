@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""Test the subtitle catalog: indexing, polling, writer hints, search and paging.
+
+Usage:
+    python tests/test_subtitle_catalog.py
+"""
+import sys
+import os
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+
+def _touch(path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("1\n00:00:00,000 --> 00:00:01,000\nhi\n\n")
+    return path
+
+
+def _paths(items):
+    return [item['path'] for item in items]
+
+
+def _bump_mtime(directory):
+    """Make sure a directory change is visible even on coarse mtime filesystems."""
+    stat = os.stat(directory)
+    os.utime(directory, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_initial_scan_and_ordering():
+    from subtitle_catalog import SubtitleCatalog
+    with tempfile.TemporaryDirectory() as root:
+        for name in ['a/one.srt', 'b/two.srt', 'b/deep/three.srt']:
+            _touch(os.path.join(root, name))
+            time.sleep(0.02)
+        _touch(os.path.join(root, 'a', 'notes.txt'))
+        catalog = SubtitleCatalog(root)
+        catalog.refresh()
+        items, cursor = catalog.query()
+        assert _paths(items) == [os.path.join('b', 'deep', 'three.srt'), os.path.join('b', 'two.srt'),
+                                 os.path.join('a', 'one.srt')], items
+        assert cursor is None
+        assert items[0]['filename'] == 'three.srt' and items[0]['created'], items[0]
+        oldest, _ = catalog.query(descending=False, limit=1)
+        assert _paths(oldest) == [os.path.join('a', 'one.srt')], oldest
+        by_path, _ = catalog.query(sort='path', descending=False)
+        assert _paths(by_path) == sorted(_paths(items), key=str.lower), by_path
+    print("  [PASS] Startup scan finds every .srt, newest first by default")
+
+
+def test_poll_picks_up_changes():
+    from subtitle_catalog import SubtitleCatalog
+    with tempfile.TemporaryDirectory() as root:
+        _touch(os.path.join(root, 'chan', 'old.srt'))
+        catalog = SubtitleCatalog(root)
+        catalog.refresh()
+        assert catalog.refresh() == 0, "Nothing changed, so nothing is listed again"
+
+        _touch(os.path.join(root, 'chan', 'new.srt'))
+        _touch(os.path.join(root, 'other', 'fresh.srt'))
+        os.remove(os.path.join(root, 'chan', 'old.srt'))
+        _bump_mtime(os.path.join(root, 'chan'))
+        _bump_mtime(root)
+        catalog.refresh()
+        items, _ = catalog.query(sort='path', descending=False)
+        assert _paths(items) == [os.path.join('chan', 'new.srt'), os.path.join('other', 'fresh.srt')], items
+
+        import shutil
+        shutil.rmtree(os.path.join(root, 'other'))
+        _bump_mtime(root)
+        catalog.refresh()
+        assert _paths(catalog.query()[0]) == [os.path.join('chan', 'new.srt')]
+        assert catalog.stats()['directories'] == 2, catalog.stats()
+    print("  [PASS] Polling relists only changed directories and follows adds and deletes")
+
+
+def test_writer_notify():
+    from subtitle_catalog import SubtitleCatalog
+    with tempfile.TemporaryDirectory() as root:
+        _touch(os.path.join(root, 'chan', 'a.srt'))
+        catalog = SubtitleCatalog(root)
+        catalog.refresh()
+        written = _touch(os.path.join(root, 'chan', 'b.srt'))
+        catalog.notify(written)
+        assert os.path.join('chan', 'b.srt') in _paths(catalog.query()[0]), "Notified file is listed before any poll"
+        catalog.notify(os.path.join(tempfile.gettempdir(), 'elsewhere.srt'))
+        os.remove(written)
+        catalog.notify(written)
+        assert _paths(catalog.query()[0]) == [os.path.join('chan', 'a.srt')]
+    print("  [PASS] Writer hints add and drop files without waiting for a poll")
+
+
+def test_search_prefix_and_cursor():
+    from subtitle_catalog import SubtitleCatalog
+    with tempfile.TemporaryDirectory() as root:
+        for channel in ['Alpha', 'beta']:
+            for n in range(30):
+                _touch(os.path.join(root, channel, f"episode_{n:02d}.large.srt"))
+        catalog = SubtitleCatalog(root)
+        catalog.refresh()
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = catalog.query(limit=7, cursor=cursor)
+            seen.extend(_paths(page))
+            if cursor is None:
+                break
+        assert len(seen) == 60 and len(set(seen)) == 60, len(seen)
+
+        alpha, _ = catalog.query(prefix='alpha' + os.sep, limit=100)
+        assert len(alpha) == 30 and all(p.startswith('Alpha') for p in _paths(alpha)), alpha
+        hits, _ = catalog.query(search='EPISODE_1', sort='path', descending=False)
+        assert len(hits) == 20 and _paths(hits)[0] == os.path.join('Alpha', 'episode_10.large.srt'), hits
+        both, _ = catalog.query(search='_2', prefix='beta')
+        assert sorted(_paths(both)) == [os.path.join('beta', f"episode_2{n}.large.srt") for n in range(10)], both
+
+        paged, cursor = catalog.query(search='episode', sort='path', descending=False, limit=50)
+        rest, end = catalog.query(search='episode', sort='path', descending=False, limit=50, cursor=cursor)
+        assert len(paged) == 50 and len(rest) == 10 and end is None
+        # A cursor only continues the sort it came from
+        for bad in [dict(cursor='nope'), dict(sort='size'), dict(sort='created', cursor=cursor)]:
+            try:
+                catalog.query(**bad)
+            except ValueError:
+                continue
+            raise AssertionError(f"{bad} should be rejected")
+    print("  [PASS] Substring and prefix search page through matches with a cursor")
+
+
+def test_large_catalog_answers_quickly():
+    import subtitle_catalog
+    catalog = subtitle_catalog.SubtitleCatalog(os.path.join(tempfile.gettempdir(), 'unused'))
+    with catalog._lock:
+        for n in range(200_000):
+            catalog._add(os.path.join(f"channel_{n % 400}", f"video_{n}.large.srt"), float(n), bulk=True)
+        catalog._ensure_sorted()
+        catalog._build_search_index()
+    timings = {}
+    for name, query in [
+        ('newest', {}),
+        ('prefix', {'prefix': 'channel_17'}),
+        ('rare', {'search': 'video_1999'}),
+        ('common', {'search': '.srt'}),
+        ('missing', {'search': 'nothing-like-this'}),
+    ]:
+        start = time.perf_counter()
+        items, _ = catalog.query(**query)
+        timings[name] = time.perf_counter() - start
+        assert items or name == 'missing', name
+    slowest = max(timings, key=timings.get)
+    assert timings[slowest] < 0.1, f"{slowest} took {timings[slowest] * 1000:.1f}ms"
+    print(f"  [PASS] 200k subtitles: slowest query ({slowest}) took {timings[slowest] * 1000:.1f}ms")
+
+
+def main():
+    tests = [
+        test_initial_scan_and_ordering,
+        test_poll_picks_up_changes,
+        test_writer_notify,
+        test_search_prefix_and_cursor,
+        test_large_catalog_answers_quickly,
+    ]
+
+    print("=" * 60)
+    print("Subtitle Catalog Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""Test the API task store: persistence, pagination, batch counts and purging.
+
+Usage:
+    python tests/test_task_store.py
+"""
+import sys
+import os
+import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from tests.helpers import temp_dir
+
+
+def test_task_round_trip():
+    import task_store
+    with temp_dir(task_store, 'STORE_DIR'):
+        task_store.create_task('t1', status='queued', source='a.mp3', model_name='tiny',
+                               priority=7, options={'force': True})
+        assert task_store.get_status('t1') == 'queued'
+        assert task_store.update_task('t1', status='processing', progress='50%')
+        assert task_store.finish_task('t1', 'completed', result={'output_directory': '/out'})
+        task = task_store.get_task('t1')
+        assert task['status'] == 'completed' and task['completed_at'], task
+        assert task['result'] == {'output_directory': '/out'}, task
+        assert task['options'] == {'force': True} and task['priority'] == 7, task
+        assert not task_store.update_task('missing', status='failed')
+        assert task_store.delete_task('t1') and task_store.get_task('t1') is None
+    print("  [PASS] Tasks round-trip with JSON fields and final status")
+
+
+def test_pagination_and_filters():
+    import task_store
+    with temp_dir(task_store, 'STORE_DIR'):
+        base = datetime.datetime(2024, 1, 1)
+        for n in range(25):
+            task_store.create_task(
+                f't{n:02d}', status='completed' if n % 2 else 'failed',
+                batch_id='b1' if n < 10 else None,
+                created_at=(base + datetime.timedelta(minutes=n)).isoformat(),
+            )
+        seen, cursor = [], None
+        while True:
+            page, cursor = task_store.list_tasks(cursor=cursor, limit=10)
+            seen.extend(t['task_id'] for t in page)
+            if cursor is None:
+                break
+        assert seen == [f't{n:02d}' for n in range(25)], seen
+
+        failed, cursor = task_store.list_tasks(status='failed', limit=100)
+        assert len(failed) == 13 and cursor is None, len(failed)
+        in_batch, _ = task_store.list_tasks(batch_id='b1', status='completed')
+        assert [t['task_id'] for t in in_batch] == ['t01', 't03', 't05', 't07', 't09'], in_batch
+        assert task_store.status_counts() == {'completed': 12, 'failed': 13}
+        try:
+            task_store.list_tasks(cursor='not-a-cursor')
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("A bad cursor should be rejected")
+    print("  [PASS] Cursor pages cover every task once; filters use status and batch")
+
+
+def test_batch_counts_come_from_tasks():
+    import task_store
+    with temp_dir(task_store, 'STORE_DIR'):
+        task_store.create_batch('b1', 4, user='alice')
+        for n, status in enumerate(['queued', 'processing', 'completed', 'cancelled']):
+            task_store.create_task(f'b1-{n}', status=status, batch_id='b1')
+        batch = task_store.get_batch('b1')
+        assert (batch['pending'], batch['processing'], batch['completed'], batch['cancelled']) == (1, 1, 1, 1), batch
+        assert batch['tasks'] == ['b1-0', 'b1-1', 'b1-2', 'b1-3'], batch['tasks']
+        assert task_store.batch_counts()['active'] == 1
+
+        task_store.finish_task('b1-1', 'failed', error='boom')
+        task_store.finish_batch('b1')
+        batch = task_store.get_batch('b1')
+        assert batch['failed'] == 1 and batch['processing'] == 0 and batch['completed_at'], batch
+        active, _ = task_store.list_batches(active=True)
+        assert active == []
+        assert task_store.batch_counts() == {'total': 1, 'active': 0, 'total_tasks': 4, 'completed_tasks': 1}
+    print("  [PASS] Batch counts follow their task rows")
+
+
+def test_restart_recovery_and_purge():
+    import task_store
+    with temp_dir(task_store, 'STORE_DIR'):
+        old = (datetime.datetime.now() - datetime.timedelta(days=30)).isoformat()
+        task_store.create_batch('b-old', 1)
+        task_store.create_task('old', status='completed', batch_id='b-old', created_at=old, completed_at=old)
+        task_store.create_task('recent', status='completed', completed_at=datetime.datetime.now().isoformat())
+        task_store.create_task('running', status='processing')
+        task_store.create_task('waiting', status='queued')
+
+        assert task_store.recover_interrupted() == 2
+        assert task_store.get_task('running')['status'] == 'failed'
+        assert 'restart' in task_store.get_task('waiting')['error']
+
+        task_store._connect().execute("UPDATE batches SET completed_at = ?", (old,))
+        assert task_store.purge(retention_days=7) == 1
+        assert task_store.get_task('old') is None and task_store.get_batch('b-old') is None
+        assert task_store.get_task('recent') is not None
+        assert task_store.get_task('running') is not None, "Just-failed tasks are kept"
+    print("  [PASS] Restart fails interrupted tasks; purge drops only old finished ones")
+
+
+def main():
+    tests = [
+        test_task_round_trip,
+        test_pagination_and_filters,
+        test_batch_counts_come_from_tasks,
+        test_restart_recovery_and_purge,
+    ]
+
+    print("=" * 60)
+    print("Task Store Tests")
+    print("=" * 60)
+    passed = 0
+    failed = 0
+    for test in tests:
+        name = test.__name__
+        try:
+            test()
+            passed += 1
+        except AssertionError as e:
+            print(f"  [FAIL] {name}: {e}")
+            failed += 1
+        except Exception as e:
+            print(f"  [ERROR] {name}: {e}")
+            failed += 1
+
+    print("-" * 60)
+    print(f"Results: {passed} passed, {failed} failed")
+    print("=" * 60)
+    return 0 if failed == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -5,8 +5,8 @@ WhisperSubs Transcribe Module
 
 Core transcription functionality using faster-whisper and adapter-based services.
 Routes prefixed models (e.g., 'groq:whisper-large-v3') through TranscriptionContext
-which dispatches to the appropriate adapter. Bare model names use the subprocess-based
-local faster-whisper pipeline for backward compatibility.
+which dispatches to the appropriate adapter. Bare model names run on the local
+faster-whisper worker pool (see worker_pool.py), which keeps models warm between calls.
 """
 import model as _model_module
 from model import Segment, TranscriptionContext, get_context
@@ -17,6 +17,7 @@ import sys
 import subprocess
 import os
 import json
+import contextlib
 import threading
 import re
 import datetime
@@ -25,6 +26,10 @@ from dataclasses import dataclass
 from typing import Any, Dict, List, Optional, Tuple, Callable
 from whisper_model_chooser import WhisperModelChooser
 from helper_files import make_files, cleanup_unfinished
+import worker_pool
+import pcm_store
+import srt_index
+from cancellation import CancelToken, TaskCancelled, check as check_cancelled
 
 os.environ["PYDEVD_DISABLE_FILE_VALIDATION"] = "1"
 os.environ['TF_FORCE_GPU_ALLOW_GROWTH'] = 'true'
@@ -63,12 +68,19 @@ def _transcribe_with_adapter(
     vad_filter: bool = False,
     vad_params: Optional[Dict[str, Any]] = None,
     mpv_ipc_reload: Optional[Callable] = None,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    cancel_token: Optional[CancelToken] = None,
     **kwargs,
 ) -> bool:
     """Transcribe using the adapter system (for all prefixed models).
 
-    Dispatches through TranscriptionContext to the correct adapter,
-    then writes the result as an SRT file.
+    Dispatches through TranscriptionContext to the correct adapter and writes
+    each segment to the .unfinished SRT as the adapter yields it, so players
+    attached over mpv IPC see the subtitles grow during transcription. Each
+    written segment is also passed to on_event('segment', {...}).
+
+    Raises TaskCancelled at the next segment once cancel_token is cancelled;
+    closing the segment generator stops the backend.
 
     Returns:
         bool: True if successful, False otherwise
@@ -79,7 +91,7 @@ def _transcribe_with_adapter(
         ctx = get_context()
         is_api, prefix, stripped_model = ctx.is_api_model(model_name)
 
-        segments, info = ctx.transcribe(
+        segments = ctx.transcribe_stream(
             audio_file=audio_file,
             model_name=model_name,
             language=language,
@@ -93,16 +105,19 @@ def _transcribe_with_adapter(
             **kwargs,
         )
 
-        if start_offset_seconds > 0:
-            for seg in segments:
-                seg.start += start_offset_seconds
-                seg.end += start_offset_seconds
+        def reload_player():
+            if mpv_ipc_reload is not None:
+                try:
+                    mpv_ipc_reload()
+                except Exception as e:
+                    write(f"MPV IPC reload failed: {e}")
 
         loop_window = []
         loop_consecutive_required = 10
         loop_threshold_seconds = 10.0
         loop_detected = False
         loop_timestamp = 0.0
+        segments_count = 0
 
         with open(real_srt, 'w', encoding='utf-8') as srt:
             srt.write("1\n00:00:00,000 --> 00:00:00,000\n")
@@ -112,34 +127,61 @@ def _transcribe_with_adapter(
             srt.write(f"Date: {datetime.datetime.now().isoformat()}\n")
             srt.write(f"Source: {os.path.basename(audio_file)}\n")
             srt.write("\n")
+            srt.flush()
 
-        for i, segment in enumerate(segments, start=1):
-            text_normalized = segment.text.strip().lower()
-            if text_normalized:
-                loop_window.append((text_normalized, segment.end))
-                while len(loop_window) > loop_consecutive_required * 2:
-                    loop_window.pop(0)
-                if len(loop_window) >= loop_consecutive_required:
-                    recent = loop_window[-loop_consecutive_required:]
-                    if all(t == recent[0][0] for t, _ in recent):
-                        first_ts = recent[0][1]
-                        last_ts = recent[-1][1]
-                        if last_ts - first_ts >= loop_threshold_seconds or len(loop_window) >= loop_consecutive_required * 2:
-                            loop_detected = True
-                            loop_timestamp = first_ts
-                            write(f"Loop detected: '{recent[0][0][:40]}' repeated {loop_consecutive_required}+ times from {first_ts:.1f}s")
-                            break
-
-                start_time = format_timestamp(segment.start if segment.start > 0 else 0)
-                end_time = format_timestamp(segment.end if segment.end > 0 else 0)
-                srt.write(f"{i}\n")
-                srt.write(f"{start_time} --> {end_time}\n")
-                srt.write(f"{segment.text}\n\n")
+            # Expose the growing file under the final name while we write
+            if os.path.exists(srt_file) or os.path.islink(srt_file):
+                os.remove(srt_file)
+            try:
+                os.symlink(os.path.basename(real_srt), srt_file)
+                write(f"Created symlink: {srt_file} -> {os.path.basename(real_srt)}")
+            except OSError:
+                write("Could not create symlink, subtitles will appear when finished")
+            write(f"Transcription in progress: {srt_file}")
+
+            try:
+                for segment in segments:
+                    check_cancelled(cancel_token)
+                    if start_offset_seconds > 0:
+                        segment.start += start_offset_seconds
+                        segment.end += start_offset_seconds
+
+                    text_normalized = segment.text.strip().lower()
+                    if not text_normalized:
+                        continue
+                    loop_window.append((text_normalized, segment.end))
+                    while len(loop_window) > loop_consecutive_required * 2:
+                        loop_window.pop(0)
+                    if len(loop_window) >= loop_consecutive_required:
+                        recent = loop_window[-loop_consecutive_required:]
+                        if all(t == recent[0][0] for t, _ in recent):
+                            first_ts = recent[0][1]
+                            last_ts = recent[-1][1]
+                            if last_ts - first_ts >= loop_threshold_seconds or len(loop_window) >= loop_consecutive_required * 2:
+                                loop_detected = True
+                                loop_timestamp = first_ts
+                                write(f"Loop detected: '{recent[0][0][:40]}' repeated {loop_consecutive_required}+ times from {first_ts:.1f}s")
+                                break
+
+                    segments_count += 1
+                    start_time = format_timestamp(segment.start if segment.start > 0 else 0)
+                    end_time = format_timestamp(segment.end if segment.end > 0 else 0)
+                    srt.write(f"{segments_count + 1}\n")
+                    srt.write(f"{start_time} --> {end_time}\n")
+                    srt.write(f"{segment.text}\n\n")
+                    srt.flush()
+                    _emit_segment(on_event, segments_count + 1, segment)
+                    if segments_count % 10 == 0:
+                        reload_player()
+            finally:
+                # Stops the backend (and releases its cached model) on loop or error
+                close = getattr(segments, 'close', None)
+                if close is not None:
+                    close()
 
         if loop_detected:
             write(f"Loop detected at {loop_timestamp:.1f}s, stopping. SRT saved up to loop point.")
             _trim_srt_to_timestamp(real_srt, loop_timestamp)
-            segments = [s for s in segments if s.end <= loop_timestamp]
             raise LoopDetectedError(loop_timestamp, f"Loop detected at {loop_timestamp:.1f}s during adapter transcription")
 
         metadata_file = os.path.splitext(srt_file)[0] + ".metadata.json"
@@ -150,7 +192,7 @@ def _transcribe_with_adapter(
                 "date": datetime.datetime.now().isoformat(),
                 "source_file": os.path.basename(audio_file),
                 "language": language or "auto-detect",
-                "segments_count": len(segments),
+                "segments_count": segments_count,
                 "start_offset_seconds": start_offset_seconds
             }
             with open(metadata_file, "w", encoding="utf-8") as f:
@@ -159,24 +201,6 @@ def _transcribe_with_adapter(
         except Exception as e:
             write(f"Warning: Could not create metadata file: {e}")
 
-        if os.path.exists(srt_file) or os.path.islink(srt_file):
-            os.remove(srt_file)
-        try:
-            os.symlink(os.path.basename(real_srt), srt_file)
-            write(f"Created symlink: {srt_file} -> {os.path.basename(real_srt)}")
-        except OSError:
-            write(f"Could not create symlink, copying instead")
-            shutil.copy2(real_srt, srt_file)
-
-        write(f"Transcription in progress: {srt_file}")
-        make_files(srt_file)
-
-        if mpv_ipc_reload is not None:
-            try:
-                mpv_ipc_reload()
-            except Exception as e:
-                write(f"MPV IPC reload failed: {e}")
-
         if os.path.islink(srt_file):
             os.remove(srt_file)
         if os.path.exists(real_srt):
@@ -184,14 +208,19 @@ def _transcribe_with_adapter(
             write(f"Successfully finalized: {srt_file}")
             make_files(srt_file)
 
-        if mpv_ipc_reload is not None:
-            try:
-                mpv_ipc_reload()
-            except Exception as e:
-                write(f"MPV IPC reload failed: {e}")
+        reload_player()
 
         return True
 
+    except TaskCancelled:
+        write("Adapter transcription cancelled")
+        if os.path.islink(srt_file):
+            try:
+                os.remove(srt_file)
+            except OSError:
+                pass
+        raise
+
     except Exception as e:
         write(f"Error during adapter transcription: {e}")
         if os.path.exists(real_srt):
@@ -224,100 +253,56 @@ def srt_time_to_seconds(time_str: str) -> float:
     except (ValueError, IndexError):
         return 0.0
 
+def parse_time_string(value: Any, write: Callable = print) -> Optional[float]:
+    """Parse a --start/--end value (HH:MM:SS, MM:SS or seconds) into seconds.
+
+    Returns None and logs a warning if the value cannot be parsed.
+    """
+    if value is None or value == '':
+        return None
+    text = str(value).strip()
+    try:
+        if ':' in text:
+            parts = text.split(':')
+            if len(parts) == 3:
+                return int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
+            if len(parts) == 2:
+                return int(parts[0]) * 60 + float(parts[1])
+        else:
+            return float(text)
+    except ValueError:
+        pass
+    write(f"Warning: Invalid time format '{value}', expected HH:MM:SS, MM:SS or seconds")
+    return None
+
 def get_srt_resume_info(srt_path: str) -> Tuple[float, int]:
     """
-    Parses an SRT file to find the last segment's number and end time.
+    Find the last complete segment of an unfinished SRT.
     Returns (last_end_time_seconds, last_segment_number).
-    
-    Enhanced to handle:
-    - Metadata headers (skip lines starting with numbers followed by newline)
-    - Malformed segments
-    - Partial writes (incomplete last segment)
-    - Corrupted files
+
+    Uses the writer's sidecar index when it matches the file, otherwise reads
+    blocks backwards from the end (see srt_index), so the cost does not grow
+    with the length of the transcript. A partially written final block is
+    ignored.
     """
     if not os.path.exists(srt_path) or os.path.getsize(srt_path) < 10:
         return 0.0, 0
-
-    last_segment_number = 0
-    last_end_time = 0.0
-    valid_segments_found = 0
-
     try:
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-
-        segments = content.split('\n\n')
-        if not segments:
-            return 0.0, 0
-
-        # Iterate backwards to find the last COMPLETE valid segment block
-        for segment_block in reversed(segments):
-            lines = segment_block.strip().split('\n')
-            if len(lines) >= 3:  # Need: number, timestamp, text
-                try:
-                    # First line should be segment number
-                    current_segment_number = int(lines[0])
-                    
-                    # Second line should be timestamp
-                    time_line = lines[1]
-                    match = re.search(r'\d{2}:\d{2}:\d{2},\d{3}\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})', time_line)
-                    if match:
-                        end_time_str = match.group(1)
-                        last_end_time = srt_time_to_seconds(end_time_str)
-                        last_segment_number = current_segment_number
-                        valid_segments_found += 1
-                        
-                        # Need at least 2 valid segments to be confident
-                        if valid_segments_found >= 2:
-                            return last_end_time, last_segment_number
-                except (ValueError, IndexError):
-                    # This block is malformed, continue to the previous one
-                    continue
-            elif len(lines) == 2:
-                # Might be incomplete last segment - check if it has timestamp
-                try:
-                    time_line = lines[1] if lines[0].isdigit() else lines[0]
-                    match = re.search(r'\d{2}:\d{2}:\d{2},\d{3}\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})', time_line)
-                    if match:
-                        # Incomplete segment - don't use this, use previous
-                        continue
-                except:
-                    pass
-
-        # If we found at least one valid segment, use it
-        if valid_segments_found >= 1:
-            return last_end_time, last_segment_number
-        
-        return 0.0, 0  # No valid segments found
+        entry = srt_index.last_segment(srt_path)
     except Exception as e:
         print(f"Could not parse SRT for resume info: {e}")
         return 0.0, 0
+    if entry is None:
+        return 0.0, 0
+    return entry.end, entry.number
 
 
 def _trim_srt_to_timestamp(srt_path: str, max_end_seconds: float):
+    """Drop trailing segments that end after max_end_seconds (tail-only rewrite)."""
     if not os.path.exists(srt_path):
         return
     try:
-        with open(srt_path, 'r', encoding='utf-8') as f:
-            content = f.read().strip()
-        blocks = content.split('\n\n')
-        kept = []
-        for block in blocks:
-            lines = block.strip().split('\n')
-            if len(lines) >= 2:
-                time_line = lines[1]
-                match = re.search(r'(\d{2}:\d{2}:\d{2},\d{3})\s*-->\s*(\d{2}:\d{2}:\d{2},\d{3})', time_line)
-                if match:
-                    end_str = match.group(2)
-                    end_sec = srt_time_to_seconds(end_str)
-                    if end_sec <= max_end_seconds:
-                        kept.append(block)
-        with open(srt_path, 'w', encoding='utf-8') as f:
-            for i, block in enumerate(kept, start=1):
-                lines = block.strip().split('\n')
-                if lines and lines[0].strip().isdigit():
-                    lines[0] = str(i)
-                f.write('\n'.join(lines) + '\n\n')
+        srt_index.truncate_after(srt_path, max_end_seconds)
     except Exception as e:
         print(f"Warning: Could not trim SRT file: {e}")
 
@@ -404,12 +389,25 @@ def merge_segments(
     return merged
 
 
+def _emit_segment(on_event: Optional[Callable], index: int, segment) -> None:
+    """Pass one written SRT entry to on_event as a 'segment' event."""
+    if on_event is None:
+        return
+    try:
+        on_event('segment', {'index': index, 'start': round(max(segment.start, 0), 3),
+                             'end': round(max(segment.end, 0), 3), 'text': segment.text.strip()})
+    except Exception:
+        pass
+
+
 class ProgressTracker:
     """Track transcription progress with ETA estimation"""
     
-    def __init__(self, total_duration: float, write: Callable = print):
+    def __init__(self, total_duration: float, write: Callable = print,
+                 on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None):
         self.total_duration = total_duration
         self.write = write
+        self.on_event = on_event
         self.start_time = time.time()
         self.last_progress_time = 0
         self.segments_processed = 0
@@ -438,6 +436,15 @@ class ProgressTracker:
                           f"Elapsed: {str(datetime.timedelta(seconds=int(elapsed)))} | "
                           f"ETA: {eta_str} | "
                           f"Speed: {speed:.1f}x real-time")
+                if self.on_event is not None:
+                    try:
+                        self.on_event('stats', {
+                            'percent': round(progress, 1), 'elapsed': round(elapsed, 1),
+                            'eta': round(remaining, 1), 'speed': round(speed, 2),
+                            'rtf': round(1 / speed, 3) if speed > 0 else None,
+                            'segments': self.segments_processed})
+                    except Exception:
+                        pass
             
             self.last_progress_time = current_time
 
@@ -459,6 +466,8 @@ def transcribe_audio(
     vad_filter: bool = False,
     vad_params: Optional[Dict[str, Any]] = None,
     mpv_ipc_reload: Optional[Callable] = None,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    cancel_token: Optional[CancelToken] = None,
     **kwargs
 ) -> bool:
     """
@@ -481,52 +490,18 @@ def transcribe_audio(
         start_offset_seconds = 0.0
 
         if start_time or end_time:
-            trimmed_audio_path = os.path.splitext(audio_file)[0] + ".trimmed.m4a"
-            ffmpeg_cmd = ['ffmpeg', '-y']
-
-            if start_time:
-                if ':' in str(start_time):
-                    parts = str(start_time).split(':')
-                    if len(parts) == 3:
-                        start_offset_seconds = int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    elif len(parts) == 2:
-                        start_offset_seconds = int(parts[0]) * 60 + float(parts[1])
-                    else:
-                        start_offset_seconds = 0
-                        write(f"Warning: Invalid start_time format '{start_time}', expected HH:MM:SS or MM:SS")
-                    ffmpeg_cmd.extend(['-ss', str(start_time)])
-                else:
-                    start_offset_seconds = float(start_time)
-                    ffmpeg_cmd.extend(['-ss', str(datetime.timedelta(seconds=start_offset_seconds))])
-
-                ffmpeg_cmd.extend(['-i', audio_file])
-
-            if end_time:
-                if ':' in str(end_time):
-                    parts = str(end_time).split(':')
-                    if len(parts) == 3:
-                        end_seconds = int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    elif len(parts) == 2:
-                        end_seconds = int(parts[0]) * 60 + float(parts[1])
-                    else:
-                        end_seconds = 0
-                        write(f"Warning: Invalid end_time format '{end_time}', expected HH:MM:SS or MM:SS")
-                else:
-                    end_seconds = float(end_time)
-                if start_time:
-                    duration = end_seconds - start_offset_seconds
-                else:
-                    duration = end_seconds
-                ffmpeg_cmd.extend(['-t', str(datetime.timedelta(seconds=duration))])
-
-            ffmpeg_cmd.extend(['-vn', '-acodec', 'aac', '-b:a', '128k', '-ac', '1', '-ar', '16000', trimmed_audio_path])
+            start_offset_seconds = parse_time_string(start_time, write) or 0.0
+            end_seconds = parse_time_string(end_time, write)
+            # Adapters take a file, so copy the range out of the decoded PCM (no transcode)
+            trimmed_audio_path = os.path.splitext(srt_file)[0] + ".trimmed.wav"
             write(f"Cutting audio from {start_time or 'start'} to {end_time or 'end'}...")
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, check=False)
-            if result.returncode == 0:
+            try:
+                source_wav = pcm_store.get_wav(audio_file, write)
+                pcm_store.extract_range(source_wav, start_offset_seconds, end_seconds, trimmed_audio_path)
                 audio_to_transcribe = trimmed_audio_path
                 write(f"Created trimmed audio: {trimmed_audio_path}")
-            else:
-                write(f"Warning: FFmpeg trimming failed: {result.stderr}, using original file")
+            except Exception as e:
+                write(f"Warning: Trimming failed: {e}, using original file")
                 start_offset_seconds = 0.0
 
         try:
@@ -544,6 +519,8 @@ def transcribe_audio(
                 vad_filter=vad_filter,
                 vad_params=vad_params,
                 mpv_ipc_reload=mpv_ipc_reload,
+                on_event=on_event,
+                cancel_token=cancel_token,
             )
         except LoopDetectedError as e:
             write(f"Loop detected at {e.timestamp:.1f}s — partial SRT saved. Try a different model.")
@@ -568,6 +545,8 @@ def transcribe_audio(
             compute_type = 'int8'
             print("PyTorch not available, falling back to CPU")
 
+    # Holds the cached model until the segment generator is drained
+    models = contextlib.ExitStack()
     try:
         # Get audio duration for progress tracking
         try:
@@ -581,18 +560,24 @@ def transcribe_audio(
         except Exception:
             total_duration = 0
         
-        # Initialize model with specified CPU threads
+        # Take the model from the shared cache (keyed like the faster-whisper
+        # adapter's entries), so repeated files don't reload it
         import faster_whisper
-        whisper_model = faster_whisper.WhisperModel(
-            model_name,
-            device=device,
-            compute_type=compute_type,
-            device_index=0,
-            cpu_threads=cpu_threads if cpu_threads else os.cpu_count()
-        )
+        threads = cpu_threads if cpu_threads else os.cpu_count()
+        adapter, _ = get_context().resolve(model_name)
+        whisper_model = models.enter_context(adapter.cached_model(
+            (model_name, device, compute_type, threads),
+            lambda: faster_whisper.WhisperModel(
+                model_name,
+                device=device,
+                compute_type=compute_type,
+                device_index=0,
+                cpu_threads=threads
+            ),
+            write))
         
         # Initialize progress tracker
-        progress = ProgressTracker(total_duration, write) if total_duration > 0 else None
+        progress = ProgressTracker(total_duration, write, on_event) if total_duration > 0 else None
         
         write(f"Starting transcription (duration: {str(datetime.timedelta(seconds=int(total_duration))) if total_duration else 'unknown'})")
 
@@ -649,6 +634,7 @@ def transcribe_audio(
 
             seg_idx = 0
             for segment in result_segments:
+                check_cancelled(cancel_token)
                 # Track compression ratio failures from faster-whisper segments
                 if hasattr(segment, 'compression_ratio') and segment.compression_ratio > 2.4:
                     if compression_fail_streak == 0:
@@ -699,6 +685,7 @@ def transcribe_audio(
                 srt.write(f"{start_ts} --> {end_ts}\n")
                 srt.write(f"{segment.text}\n\n")
                 srt.flush()
+                _emit_segment(on_event, seg_idx, segment)
 
                 if progress:
                     progress.update(segment.start, segment.end)
@@ -792,7 +779,9 @@ def transcribe_audio(
                 merge_lines=merge_lines,
                 vad_filter=vad_filter,
                 vad_params=vad_params,
-                mpv_ipc_reload=mpv_ipc_reload
+                mpv_ipc_reload=mpv_ipc_reload,
+                on_event=on_event,
+                cancel_token=cancel_token
             )
         else:
             print(f"Error during transcription: {e}", file=sys.stderr)
@@ -805,6 +794,9 @@ def transcribe_audio(
         make_files(original)
         return False
 
+    finally:
+        models.close()
+
 def format_timestamp(timestamp):
     """
     Formats a timestamp in seconds to the HH:MM:SS,mmm format for SRT.
@@ -863,12 +855,127 @@ def process_create(
     merge_lines: bool = False,
     start_time: Optional[str] = None,
     end_time: Optional[str] = None,
-    mpv_ipc_reload: Optional[Callable] = None
+    mpv_ipc_reload: Optional[Callable] = None,
+    parallel_chunks: int = 1,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    cancel_token: Optional[CancelToken] = None
 ) -> bool:
-    """Creates a new process to retry the transcription. Routes prefixed models through adapters."""
+    """Creates a new process to retry the transcription. Routes prefixed models through adapters.
+
+    With parallel_chunks > 1, local models split the audio at silences and
+    transcribe the chunks concurrently (see parallel_transcribe.py). Results
+    are looked up in and saved to result_cache first, so the same audio with
+    the same settings is only ever transcribed once.
+
+    on_event(kind, fields) receives each SRT entry as it is written
+    ('segment'), progress figures ('stats') and loop-recovery rollbacks
+    ('truncate'); see worker_pool.
+
+    Once cancel_token is cancelled the running worker is killed (or the
+    adapter stops at its next segment), no fallback model is tried and
+    TaskCancelled is raised; the .unfinished SRT is kept for a later resume.
+    """
     if file is None:
         raise ValueError("The 'file' argument cannot be None. Please provide a valid file path.")
 
+    cache_key = None
+    if srt_file not in (None, 'none'):
+        cache_key = _result_cache_key(
+            file, model_name, write, language=language, vad_filter=vad_filter, vad_params=vad_params,
+            temperature=temperature, merge_lines=merge_lines, start_time=start_time, end_time=end_time,
+            diarization=diarization, diarization_params=diarization_params)
+    if cache_key:
+        try:
+            import result_cache
+            if result_cache.restore(cache_key, srt_file, file, write, on_event=on_event):
+                return True
+        except Exception as e:
+            write(f"Result cache lookup failed: {e}")
+
+    success = _process_create(
+        file=file,
+        model_name=model_name,
+        srt_file=srt_file,
+        segments_file=segments_file,
+        language=language,
+        device=device,
+        compute_type=compute_type,
+        force_device=force_device,
+        auto=auto,
+        write=write,
+        cpu_threads=cpu_threads,
+        vad_filter=vad_filter,
+        vad_params=vad_params,
+        diarization=diarization,
+        diarization_params=diarization_params,
+        temperature=temperature,
+        merge_lines=merge_lines,
+        start_time=start_time,
+        end_time=end_time,
+        mpv_ipc_reload=mpv_ipc_reload,
+        parallel_chunks=parallel_chunks,
+        on_event=on_event,
+        cancel_token=cancel_token
+    )
+    if success and cache_key:
+        _store_result(cache_key, srt_file, model_name, write)
+    return success
+
+def _result_cache_key(file: str, model_name: str, write: Callable, **settings) -> Optional[str]:
+    try:
+        import result_cache
+        is_remote, provider, _ = is_api_model(model_name)
+        return result_cache.make_key(file, model_name, adapter=provider if is_remote else 'faster-whisper',
+                                     **settings)
+    except Exception as e:
+        write(f"Result cache unavailable: {e}")
+        return None
+
+def _store_result(cache_key: str, srt_file: str, model_name: str, write: Callable):
+    """Save a finished SRT to the result cache if it came from the requested model."""
+    try:
+        import result_cache
+        metadata_file = os.path.splitext(srt_file)[0] + '.metadata.json'
+        metadata = {}
+        if os.path.exists(metadata_file):
+            with open(metadata_file, 'r', encoding='utf-8') as f:
+                metadata = json.load(f)
+        # Fallbacks (smaller models, GPU auto-selection) must not answer for the requested model
+        requested = {model_name, model_name.split(':', 1)[-1], _model_module.getName(model_name)}
+        if metadata.get('model') not in requested:
+            write(f"Not caching result: produced by {metadata.get('model')}, not {model_name}")
+            return
+        if result_cache.put(cache_key, srt_file, metadata):
+            write("Saved transcript to the result cache")
+    except Exception as e:
+        write(f"Warning: Could not save to result cache: {e}")
+
+def _process_create(
+    file: str,
+    model_name: str,
+    srt_file: str = 'none',
+    segments_file: str = 'segments.json',
+    language: str = 'none',
+    device: str = 'cpu',
+    compute_type: str = 'int8',
+    force_device: bool = False,
+    auto: bool = True,
+    write: Callable = print,
+    cpu_threads: Optional[int] = None,
+    vad_filter: bool = False,
+    vad_params: Optional[Dict[str, Any]] = None,
+    diarization: bool = False,
+    diarization_params: Optional[Dict[str, Any]] = None,
+    temperature: float = 0,
+    merge_lines: bool = False,
+    start_time: Optional[str] = None,
+    end_time: Optional[str] = None,
+    mpv_ipc_reload: Optional[Callable] = None,
+    parallel_chunks: int = 1,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    cancel_token: Optional[CancelToken] = None
+) -> bool:
+    """Transcribe without the result cache (see process_create)."""
     # Check for prefixed (adapter-based) models - route through adapter system
     is_remote, provider, _ = is_api_model(model_name)
     if is_remote:
@@ -888,7 +995,9 @@ def process_create(
             merge_lines=merge_lines,
             vad_filter=vad_filter,
             vad_params=vad_params,
-            mpv_ipc_reload=mpv_ipc_reload
+            mpv_ipc_reload=mpv_ipc_reload,
+            on_event=on_event,
+            cancel_token=cancel_token
         )
 
     # Only switch to CPU if not forcing device
@@ -911,11 +1020,26 @@ def process_create(
     if model_name in model_names:
         i = model_names.index(model_name)
 
+        if parallel_chunks > 1 and (start_time or end_time):
+            write("Parallel chunks are not used with a start/end time range, transcribing sequentially")
+        chunked = parallel_chunks > 1 and not (start_time or end_time)
+
+        def attempt(current_model: str, current_device: str, current_compute_type: str,
+                    current_force_device: bool) -> bool:
+            # Fallback models reuse the chunk plan, so finished chunks and cut points carry over
+            if chunked:
+                import parallel_transcribe
+                return parallel_transcribe.transcribe_chunked(
+                    file, current_model, srt_file, language, current_device, current_compute_type, write,
+                    cpu_threads, parallel_chunks, vad_filter, vad_params, temperature, merge_lines,
+                    diarization, diarization_params, mpv_ipc_reload, on_event, cancel_token)
+            return try_transcribe(file, current_model, srt_file, language, current_device, current_compute_type,
+                                  current_force_device, write, cpu_threads, vad_filter, vad_params, diarization,
+                                  diarization_params, temperature, merge_lines, start_time, end_time,
+                                  mpv_ipc_reload, on_event=on_event, cancel_token=cancel_token)
+
         # Try with original settings first
-        success = try_transcribe(file, model_name, srt_file, language, device, compute_type, force_device, write, cpu_threads,
-                                 vad_filter, vad_params, diarization, diarization_params, temperature, merge_lines,
-                                 start_time, end_time)
-        if success:
+        if attempt(model_name, device, compute_type, force_device):
             return True
 
         # If not forcing device and original settings fail, try smaller models
@@ -923,17 +1047,12 @@ def process_create(
             write("Trying smaller models...")
             for j in range(i-1, -1, -1):
                 current_model = model_names[j]
-                success = try_transcribe(file, current_model, srt_file, language, device, compute_type, force_device, write, cpu_threads,
-                                         vad_filter, vad_params, diarization, diarization_params, temperature, merge_lines,
-                                         start_time, end_time)
-                if success:
+                if attempt(current_model, device, compute_type, force_device):
                     write(f"Successfully transcribed with {current_model}")
                     return True
             if device == 'cuda':
                 write("All GPU models failed, falling back to CPU...")
-                return try_transcribe(file, 'medium.en' if 'en' in model_name else 'large-v3', srt_file, language, 'cpu', 'int8', False, write, cpu_threads,
-                                      vad_filter, vad_params, diarization, diarization_params, temperature, merge_lines,
-                                      start_time, end_time)
+                return attempt('medium.en' if 'en' in model_name else 'large-v3', 'cpu', 'int8', False)
     else:
         write('No model')
     return False
@@ -946,89 +1065,29 @@ def try_transcribe(
     diarization_params: Optional[Dict[str, Any]] = None, temperature: float = 0,
     merge_lines: bool = False, start_time: Optional[str] = None,
     end_time: Optional[str] = None, mpv_ipc_reload: Optional[Callable] = None,
-    _loop_retry_count: int = 0
+    _loop_retry_count: int = 0,
+    on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+    cancel_token: Optional[CancelToken] = None
 ) -> bool:
-    """Try transcription with given parameters, supporting resume."""
-    script_path = None
-    resume_audio_path = None
-    trimmed_audio_path = None
+    """Try transcription on a warm pooled worker, supporting resume."""
+    cancelled = False
     try:
+        check_cancelled(cancel_token)
         unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
         os.makedirs(os.path.dirname(unfinished_srt) or '.', exist_ok=True)
 
-        # --- TIME RANGE CUTTING ---
+        # --- TIME RANGE ---
+        # The range is read straight out of the stored PCM by the worker (clip_start/clip_end)
         audio_to_transcribe = file
         start_offset_seconds = 0.0
-        
-        if start_time or end_time:
-            trimmed_audio_path = os.path.splitext(file)[0] + ".trimmed.m4a"
-            # Use -ss BEFORE -i for faster seeking, -vn to skip video processing
-            ffmpeg_cmd = ['ffmpeg', '-y']
-
-            if start_time:
-                # Parse start time (support HH:MM:SS, MM:SS, or seconds)
-                if ':' in str(start_time):
-                    # Place -ss before -i for fast seeking
-                    ffmpeg_cmd.extend(['-ss', str(start_time)])
-                    # Calculate offset for subtitle timestamps
-                    parts = str(start_time).split(':')
-                    if len(parts) == 3:  # HH:MM:SS
-                        start_offset_seconds = int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    elif len(parts) == 2:  # MM:SS
-                        start_offset_seconds = int(parts[0]) * 60 + float(parts[1])
-                    else:  # Invalid format
-                        start_offset_seconds = 0
-                        write(f"Warning: Invalid start_time format '{start_time}', expected HH:MM:SS or MM:SS")
-                else:
-                    start_offset_seconds = float(start_time)
-                    ffmpeg_cmd.extend(['-ss', str(datetime.timedelta(seconds=start_offset_seconds))])
-
-            ffmpeg_cmd.extend(['-i', file])
-
-            if end_time:
-                # Parse end time and calculate duration
-                if ':' in str(end_time):
-                    # Convert HH:MM:SS or MM:SS to seconds
-                    parts = str(end_time).split(':')
-                    if len(parts) == 3:  # HH:MM:SS
-                        end_seconds = int(parts[0]) * 3600 + int(parts[1]) * 60 + float(parts[2])
-                    elif len(parts) == 2:  # MM:SS
-                        end_seconds = int(parts[0]) * 60 + float(parts[1])
-                    else:  # Invalid format
-                        end_seconds = 0
-                        write(f"Warning: Invalid end_time format '{end_time}', expected HH:MM:SS or MM:SS")
-                else:
-                    end_seconds = float(end_time)
-
-                # Calculate duration
-                if start_time:
-                    duration = end_seconds - start_offset_seconds
-                else:
-                    duration = end_seconds
-
-                ffmpeg_cmd.extend(['-t', str(datetime.timedelta(seconds=duration))])
-
-            # Audio only - optimized for transcription speed
-            ffmpeg_cmd.extend([
-                '-vn',  # No video
-                '-acodec', 'aac',
-                '-b:a', '128k',  # Sufficient for speech
-                '-ac', '1',  # Mono
-                '-ar', '16000',  # Whisper native sample rate
-                trimmed_audio_path
-            ])
+        end_seconds = None
 
-            write(f"Cutting audio from {start_time or 'start'} to {end_time or 'end'}...")
-            result = subprocess.run(ffmpeg_cmd, capture_output=True, text=True, check=False)
-            if result.returncode == 0:
-                audio_to_transcribe = trimmed_audio_path
-                write(f"Created trimmed audio: {trimmed_audio_path}")
-                write(f"Subtitle offset: {start_offset_seconds:.2f}s")
-            else:
-                write(f"Warning: FFmpeg trimming failed: {result.stderr}, using original file")
-                trimmed_audio_path = None
-                start_offset_seconds = 0.0
-        # --- END TIME RANGE CUTTING ---
+        if start_time or end_time:
+            start_offset_seconds = parse_time_string(start_time, write) or 0.0
+            end_seconds = parse_time_string(end_time, write)
+            write(f"Transcribing range {start_time or 'start'} to {end_time or 'end'} "
+                  f"(subtitle offset: {start_offset_seconds:.2f}s)")
+        # --- END TIME RANGE ---
 
         # --- RESUME LOGIC ---
         resume_offset_seconds = 0.0
@@ -1059,32 +1118,12 @@ def try_transcribe(
 
             if last_end_time > 0.1:  # Resume if there's more than 0.1s transcribed
                 write(f"✓ Found unfinished transcription: {last_segment_number} segments, resuming from {last_end_time:.2f}s")
-                resume_offset_seconds = last_end_time
+                # SRT times include the range offset; the audio being resumed does not
+                resume_offset_seconds = max(last_end_time - start_offset_seconds, 0.0)
                 start_index = last_segment_number
                 open_mode = 'a'
-                resume_audio_path = os.path.splitext(audio_to_transcribe)[0] + ".resume.m4a"
-
-                try:
-                    ss_time = str(datetime.timedelta(seconds=resume_offset_seconds))
-                    ffmpeg_command = ['/bin/ffmpeg', '-y', '-ss', ss_time, '-i', audio_to_transcribe, '-c:a', 'aac', '-b:a', '128k', '-ac', '1', '-ar', '16000', resume_audio_path]
-                    write(f"✂️  Creating partial audio file for resume (from {ss_time})...")
-
-                    result = subprocess.run(ffmpeg_command, capture_output=True, text=True, check=False)
-                    if result.returncode != 0:
-                        raise Exception(f"FFmpeg failed: {result.stderr[:200] if result.stderr else 'Unknown error'}")
-
-                    audio_to_transcribe = resume_audio_path
-                    write(f"✓ Resume audio created successfully")
-                except Exception as e:
-                    write(f"⚠️  Could not create resume audio: {e}")
-                    write(f"→ Starting from beginning (clearing unfinished file)")
-                    resume_offset_seconds, start_index, open_mode = 0.0, 0, 'w'
-                    audio_to_transcribe = file
-                    try:
-                        with open(unfinished_srt, 'w', encoding='utf-8') as f:
-                            f.write('')
-                    except:
-                        pass
+                # Drop a half-written final block before appending after it
+                _trim_srt_to_timestamp(unfinished_srt, last_end_time)
             else:
                 # No valid resume point - start fresh
                 with open(unfinished_srt, 'w', encoding='utf-8') as f:
@@ -1095,6 +1134,23 @@ def try_transcribe(
                 f.write('')
         # --- END RESUME LOGIC ---
 
+        # Run from the stored PCM: the decode happens once per source, and
+        # ranges and resumes just seek into the same samples
+        try:
+            audio_to_transcribe = pcm_store.get_wav(audio_to_transcribe, write)
+        except Exception as e:
+            write(f"⚠️  Could not decode to PCM store: {e}")
+            if start_offset_seconds > 0 or end_seconds is not None:
+                write("→ Transcribing the whole file instead of the requested range")
+                start_offset_seconds, end_seconds = 0.0, None
+            if open_mode == 'a':
+                write(f"→ Starting from beginning (clearing unfinished file)")
+                resume_offset_seconds, start_index, open_mode = 0.0, 0, 'w'
+                with open(unfinished_srt, 'w', encoding='utf-8') as f:
+                    f.write('')
+        if open_mode == 'a':
+            write(f"Resuming from {datetime.timedelta(seconds=resume_offset_seconds)} in stored PCM")
+
         # Create helper files for the unfinished SRT file
         make_files(unfinished_srt)
 
@@ -1108,312 +1164,43 @@ def try_transcribe(
             write(f"Could not create symlink, skipping")
 
         is_english_only = '.en' in current_model
-        language_param = '\'en\'' if is_english_only else ('None' if language == 'none' else f"'{language}'")
+        language_param = 'en' if is_english_only else (None if language in (None, 'none') else language)
         whisper_log = srt_file.replace('.srt', '.whisper.log')
-        
-        # Initialize audio_duration for progress tracking (will be updated after model loads)
-        audio_duration = 0
-
-        script = f'''
-import faster_whisper
-import os
-import sys
-import threading
-import queue
-import time
-import logging
-import datetime
-from dataclasses import dataclass
-
-logging.basicConfig()
-logging.getLogger("faster_whisper").setLevel(logging.DEBUG)
-whisper_logger = logging.getLogger("faster_whisper")
-whisper_logger.setLevel(logging.DEBUG)
-log_file = r"{whisper_log}"
-file_handler = logging.FileHandler(log_file, mode='w', encoding='utf-8')
-file_handler.setLevel(logging.DEBUG)
-file_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
-whisper_logger.addHandler(file_handler)
-
-os.makedirs(os.path.dirname(r"{srt_file}"), exist_ok=True)
-
-@dataclass
-class Segment:
-    start: float
-    end: float
-    text: str
-    compression_ratio: float = 0.0
-
-def format_timestamp(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    seconds_val = seconds % 60
-    milliseconds = int((seconds_val % 1) * 1000)
-    seconds_int = int(seconds_val)
-    return f"{{hours:02d}}:{{minutes:02d}}:{{seconds_int:02d}},{{milliseconds:03d}}"
-
-segment_queue = queue.Queue(maxsize=100)
-write_event = threading.Event()
-stop_event = threading.Event()
-device = "{device}"
-compute_type = "{compute_type}"
-cpu_threads = {cpu_threads if cpu_threads else 'None'}
-vad_filter = {str(vad_filter).capitalize()}
-vad_params = {vad_params if vad_filter and vad_params else 'None'}
-temperature = {temperature}
-merge_lines = {str(merge_lines).capitalize()}
-mpv_ipc_reload = {mpv_ipc_reload if mpv_ipc_reload else 'None'}
-start_offset_seconds = {start_offset_seconds}
-segments_written = 0
-audio_duration = {audio_duration}
-loop_detect_file = r"{unfinished_srt}".replace(".srt", ".loop_detect")
-loop_window = []
-loop_threshold_seconds = 10.0
-loop_consecutive_required = 10
-compression_fail_streak = 0
-compression_fail_first_ts = 0.0
-compression_fail_max = 20
-
-def write_segments():
-    global segments_written
-    current_index = {start_index} + 1
-    with open(r"{unfinished_srt}", "{open_mode}", encoding="utf-8") as f:
-        if "{open_mode}" == "a" and os.path.getsize(r"{unfinished_srt}") > 0:
-            f.write("\\n")
-
-        while not stop_event.is_set() or not segment_queue.empty():
-            try:
-                segment = segment_queue.get(timeout=0.5)
-                # Apply time offset if audio was trimmed
-                adjusted_start = segment.start + start_offset_seconds
-                adjusted_end = segment.end + start_offset_seconds
-                start_time = format_timestamp(adjusted_start)
-                end_time = format_timestamp(adjusted_end)
-
-                f.write(f"{{current_index}}\\n")
-                f.write(f"{{start_time}} --> {{end_time}}\\n")
-                f.write(f"{{segment.text.strip()}}\\n\\n")
-                f.flush()
-
-                current_index += 1
-                segments_written += 1
-                segment_queue.task_done()
-                write_event.set()
-
-                text_normalized = segment.text.strip().lower()
-                if text_normalized:
-                    loop_window.append((text_normalized, adjusted_end))
-                    while len(loop_window) > loop_consecutive_required * 2:
-                        loop_window.pop(0)
-                    if len(loop_window) >= loop_consecutive_required:
-                        recent = loop_window[-loop_consecutive_required:]
-                        if all(t == recent[0][0] for t, _ in recent):
-                            first_ts = recent[0][1]
-                            last_ts = recent[-1][1]
-                            if last_ts - first_ts >= loop_threshold_seconds or len(loop_window) >= loop_consecutive_required * 2:
-                                print(f"Loop detected: '{{recent[0][0][:40]}}' repeated {{loop_consecutive_required}}+ times from {{first_ts:.1f}}s")
-                                with open(loop_detect_file, "w") as lf:
-                                    lf.write(str(first_ts))
-                                stop_event.set()
-                                os._exit(42)
-
-                    # Reload subtitles in MPV via IPC every 10 segments
-                    if segments_written % 10 == 0 and mpv_ipc_reload is not None:
-                        try:
-                            mpv_ipc_reload()
-                        except Exception as ipc_err:
-                            print(f"MPV IPC reload failed: {{ipc_err}}")
-
-                    if current_index % 10 == 0:
-                        print(f"Written {{current_index - {start_index} - 1}} new segments (total {{current_index-1}})")
-            except queue.Empty:
-                continue
-            except Exception as e:
-                print(f"Error writing segment: {{e}}")
-
-writer_thread = threading.Thread(target=write_segments, daemon=True)
-writer_thread.start()
-
-try:
-    print(f"Starting transcription with model {current_model} on device {{device}}")
-    print(f"Full log will be written to: {{log_file}}")
-
-    model = faster_whisper.WhisperModel("{current_model}", device=device, compute_type=compute_type, cpu_threads=cpu_threads if cpu_threads else os.cpu_count())
-
-    # Build transcribe kwargs dynamically - only pass non-None values
-    transcribe_kwargs = {{
-        "language": {language_param}
-    }}
-    
-    if vad_filter is not None:
-        transcribe_kwargs["vad_filter"] = vad_filter
-        if vad_params is not None:
-            transcribe_kwargs["vad_parameters"] = vad_params
-    
-    if temperature is not None:
-        transcribe_kwargs["temperature"] = temperature
-    
-    if merge_lines:
-        transcribe_kwargs["no_speech_threshold"] = 0.6
-        transcribe_kwargs["compression_ratio_threshold"] = 1.4
-
-    # Add distil-whisper specific parameters
-    if 'distil' in '{current_model}'.lower():
-        transcribe_kwargs["condition_on_previous_text"] = False
-        transcribe_kwargs["max_new_tokens"] = 128
-        transcribe_kwargs["beam_size"] = 5
-        print("Using distil-whisper optimized parameters")
-
-    # audio_file is passed as positional argument, not keyword
-    segments, info = model.transcribe(r"{audio_to_transcribe}", **transcribe_kwargs)
-    
-    # Update audio_duration from info if available
-    if hasattr(info, 'duration'):
-        audio_duration = info.duration
-    
-    if audio_duration > 0:
-        print(f"Starting transcription (duration: {str(datetime.timedelta(seconds=int(audio_duration)))})")
-    
-    start_time = time.time()
-    last_progress = 0
-    segments_count = 0
-
-    resume_offset = {resume_offset_seconds}
-
-    for segment in segments:
-        while segment_queue.full() and not stop_event.is_set():
-            time.sleep(0.1)
-        if stop_event.is_set(): break
-
-        # Track compression ratio failures for hallucination detection
-        seg_cr = getattr(segment, 'compression_ratio', 0.0) or 0.0
-        if seg_cr > 2.4:
-            if compression_fail_streak == 0:
-                compression_fail_first_ts = segment.start
-            compression_fail_streak += 1
-        else:
-            compression_fail_streak = 0
-
-        if compression_fail_streak >= compression_fail_max:
-            print(f"Hallucination detected: {{compression_fail_streak}} consecutive compression ratio failures starting from {{compression_fail_first_ts:.1f}}s")
-            with open(loop_detect_file, "w") as lf:
-                lf.write(str(compression_fail_first_ts + resume_offset))
-            stop_event.set()
-            os._exit(42)
-
-        adjusted_segment = Segment(
-            start=segment.start + resume_offset,
-            end=segment.end + resume_offset,
-            text=segment.text,
-            compression_ratio=seg_cr
-        )
-        segment_queue.put(adjusted_segment)
-        segments_count += 1
 
-        # Progress update every second
-        current_time = time.time()
-        if current_time - last_progress >= 1.0 and audio_duration > 0:
-            progress_pct = (segment.end / audio_duration) * 100
-            elapsed = current_time - start_time
-            if progress_pct > 0:
-                eta = (elapsed / progress_pct * 100) - elapsed
-                speed = segment.end / elapsed
-                print("Progress: %.1f%% | Elapsed: %s | ETA: %s | Speed: %.1fx" % (
-                    progress_pct,
-                    str(datetime.timedelta(seconds=int(elapsed))),
-                    str(datetime.timedelta(seconds=int(eta))),
-                    speed
-                ))
-            last_progress = current_time
-
-        write_event.wait(timeout=1.0)
-        write_event.clear()
-
-    # Final progress
-    if audio_duration > 0:
-        elapsed = time.time() - start_time
-        speed = audio_duration / elapsed
-        print("Transcription completed in %s (%.1fx real-time)" % (
-            str(datetime.timedelta(seconds=int(elapsed))),
-            speed
-        ))
-    
-    stop_event.set()
-    writer_thread.join(timeout=30)
-
-    if os.path.exists(r"{unfinished_srt}") and os.path.getsize(r"{unfinished_srt}") > 10:
-        if os.path.islink(r"{srt_file}"): os.remove(r"{srt_file}")
-        elif os.path.exists(r"{srt_file}"): os.remove(r"{srt_file}")
-        os.rename(r"{unfinished_srt}", r"{srt_file}")
-
-        # Recreate helper files for the final SRT file
-        import sys as _sys
-        _sys.path.insert(0, r"{os.path.dirname(os.path.abspath(__file__))}")
-        import helper_files as _hf
-        _hf.make_files(r"{srt_file}")
-        
-        # Create JSON metadata file
-        import json
-        metadata_file = r"{srt_file}".replace('.srt', '.metadata.json')
-        metadata = {{
-            "model": "{current_model}",
-            "date": datetime.datetime.now().isoformat(),
-            "source_file": r"{audio_to_transcribe}",
-            "language": {language_param},
-            "device": "{device}",
-            "compute_type": "{compute_type}",
-            "cpu_threads": {cpu_threads if cpu_threads else 'None'},
-            "vad_enabled": {vad_filter},
-            "temperature": {temperature},
-            "segments_count": segments_count
-        }}
-        try:
-            with open(metadata_file, "w", encoding="utf-8") as f:
-                json.dump(metadata, f, indent=2, ensure_ascii=False)
-            print(f"Metadata saved to: {{metadata_file}}")
-        except Exception as e:
-            print(f"Warning: Could not create metadata file: {{e}}")
+        job = {
+            "audio_file": audio_to_transcribe,
+            "source_file": os.path.basename(file),
+            "srt_file": srt_file,
+            "unfinished_srt": unfinished_srt,
+            "whisper_log": whisper_log,
+            "language": language_param,
+            "vad_filter": vad_filter,
+            "vad_params": vad_params if vad_filter and vad_params else None,
+            "temperature": temperature,
+            "merge_lines": merge_lines,
+            "start_index": start_index,
+            "open_mode": open_mode,
+            "resume_offset": resume_offset_seconds,
+            "clip_start": start_offset_seconds + resume_offset_seconds,
+            "clip_end": end_seconds,
+            "start_offset_seconds": start_offset_seconds,
+        }
 
-        print("Transcription completed successfully")
-    else:
-        print("Output file is empty or too small")
-        exit(1)
-except Exception as e:
-    print(f"Error during transcription: {{e}}")
-    import traceback
-    traceback.print_exc()
-    exit(1)
-finally:
-    file_handler.close()
-    whisper_logger.removeHandler(file_handler)
-'''
-        
-        import tempfile
-        temp_dir = tempfile.gettempdir()
-        script_path = os.path.join(temp_dir, f"temp_whisper_{os.getpid()}.py")
-        
-        with open(script_path, 'w', encoding='utf-8') as f:
-            f.write(script)
+        def on_progress(segments_written):
+            # Reload subtitles in MPV via IPC every 10 segments
+            if mpv_ipc_reload is not None:
+                try:
+                    mpv_ipc_reload()
+                except Exception as ipc_err:
+                    write(f"MPV IPC reload failed: {ipc_err}")
 
-        args = [sys.executable, script_path]
         write(f"Running transcription with model {current_model} on {device}")
-        
-        process = subprocess.Popen(
-            args, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
-            encoding='utf-8', errors='replace', text=True, bufsize=1, universal_newlines=True
-        )
-
-        def log_output(pipe, prefix):
-            for line in pipe:
-                if line := line.strip(): write(f"{prefix}: {line}")
-
-        stdout_thread = threading.Thread(target=log_output, args=(process.stdout, "Out"), daemon=True)
-        stderr_thread = threading.Thread(target=log_output, args=(process.stderr, "Error"), daemon=True)
-        stdout_thread.start(); stderr_thread.start()
-        
-        exit_code = process.wait()
-
-        stdout_thread.join(timeout=5); stderr_thread.join(timeout=5)
+        key = worker_pool.WorkerKey(current_model, device, compute_type, cpu_threads)
+        exit_code = worker_pool.get_pool().run(key, job, write, on_progress=on_progress, on_event=on_event,
+                                               cancel_token=cancel_token)
+        if exit_code == worker_pool.RESULT_CANCELLED:
+            write("Transcription cancelled, worker stopped")
+            raise TaskCancelled()
 
         if exit_code == 42:
             loop_detect_file = unfinished_srt.replace('.srt', '.loop_detect')
@@ -1437,7 +1224,9 @@ finally:
                     force_device, write, cpu_threads, vad_filter, vad_params,
                     diarization, diarization_params, temperature, merge_lines,
                     start_time, end_time, mpv_ipc_reload,
-                    _loop_retry_count=_loop_retry_count + 1
+                    _loop_retry_count=_loop_retry_count + 1,
+                    on_event=on_event,
+                    cancel_token=cancel_token
                 )
             else:
                 write("Max loop retries reached, keeping partial SRT")
@@ -1447,6 +1236,7 @@ finally:
                     if os.path.exists(srt_file):
                         os.remove(srt_file)
                     os.rename(unfinished_srt, srt_file)
+                    srt_index.remove(unfinished_srt)
                     make_files(srt_file)
                     return True
                 return False
@@ -1459,23 +1249,22 @@ finally:
         write(f"Process exited with code {exit_code}")
         return False
 
+    except TaskCancelled:
+        cancelled = True
+        raise
+
     except Exception as e:
         write(f"An error occurred: {e}")
         return False
 
     finally:
         try:
-            if script_path and os.path.exists(script_path): os.unlink(script_path)
-            if resume_audio_path and os.path.exists(resume_audio_path):
-                os.unlink(resume_audio_path)
-                write("Removed temporary resume audio file.")
-            if trimmed_audio_path and os.path.exists(trimmed_audio_path):
-                os.unlink(trimmed_audio_path)
-                write("Removed temporary trimmed audio file.")
             if os.path.islink(srt_file):
                 os.remove(srt_file)
-                if os.path.exists(unfinished_srt):
+                # A cancelled run keeps its .unfinished SRT so the next attempt resumes it
+                if os.path.exists(unfinished_srt) and not cancelled:
                     os.rename(unfinished_srt, srt_file)
+                    srt_index.remove(unfinished_srt)
         except Exception as e:
             write(f"Warning: Could not remove temporary file: {e}")
 
@@ -114,234 +114,22 @@ class TranscriptionThread(threading.Thread):
             file_suffix = f"_{video_id}" if video_id else ""
             safe_model = _safe_model_filename(model_name)
             srt_file = os.path.join(dir_path, f"{base_name}{file_suffix}.{safe_model}.srt")
-            log_file = os.path.join(dir_path, f"{base_name}{file_suffix}.{safe_model}.log")
 
             device = 'cuda' if self.gpu_radio.get_active() else 'cpu'
             compute_type = self.compute_combo.get_active_text().split(' ')[0]
 
-            script_content = f'''
-import faster_whisper
-import os
-import sys
-sys.path.insert(0, r"' + os.path.dirname(os.path.abspath(__file__)) + '")
-import threading
-import queue
-import time
-import logging
-logging.basicConfig()
-logging.getLogger("faster_whisper").setLevel(logging.DEBUG)
-
-device = "{device}"
-compute_type = "{compute_type}"
-
-def format_timestamp(seconds):
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    seconds = seconds % 60
-    milliseconds = int((seconds % 1) * 1000)
-    seconds = int(seconds)
-    return f"{{hours:02d}}:{{minutes:02d}}:{{seconds:02d}},{{milliseconds:03d}}"
-
-log_file = r"{log_file}"
-def log_message(msg):
-    timestamp = time.strftime("%Y-%m-%d %H:%M:%S")
-    with open(log_file, "a", encoding="utf-8") as f:
-        f.write(f"[{{timestamp}}] {{msg}}\\n")
-        f.flush()
-    print(msg)
-
-unfinished_srt = r"{srt_file}.unfinished.srt"
-segment_queue = queue.Queue(maxsize=100)
-write_event = threading.Event()
-stop_event = threading.Event()
-loop_window = []
-loop_threshold_seconds = 60.0
-loop_consecutive_required = 5
-loop_detected = False
-loop_detect_file = unfinished_srt.replace(".srt", ".loop_detect")
-
-def write_segments():
-    global loop_detected
-    current_index = 1
-    with open(unfinished_srt, "w", encoding="utf-8") as f:
-        while not stop_event.is_set() or not segment_queue.empty():
-            try:
-                segment = segment_queue.get(timeout=0.5)
-                start_time = format_timestamp(segment.start)
-                end_time = format_timestamp(segment.end)
-
-                text_normalized = segment.text.strip().lower()
-                if text_normalized:
-                    loop_window.append((text_normalized, segment.end))
-                    while len(loop_window) > loop_consecutive_required * 2:
-                        loop_window.pop(0)
-
-                    if len(loop_window) >= loop_consecutive_required:
-                        recent = loop_window[-loop_consecutive_required:]
-                        if all(t == recent[0][0] for t, _ in recent):
-                            first_ts = recent[0][1]
-                            last_ts = recent[-1][1]
-                            if last_ts - first_ts >= loop_threshold_seconds:
-                                loop_detected = True
-                                log_message(f"LOOP DETECTED: same text repeated for {{last_ts - first_ts:.1f}}s from {{first_ts:.1f}}s")
-                                with open(loop_detect_file, "w") as lf:
-                                    lf.write(str(first_ts))
-                                stop_event.set()
-                                break
-
-                f.write(f"{{current_index}}\\n")
-                f.write(f"{{start_time}} --> {{end_time}}\\n")
-                f.write(f"{{segment.text.strip()}}\\n\\n")
-                f.flush()
-
-                current_index += 1
-                segment_queue.task_done()
-                write_event.set()
-
-                if current_index % 10 == 0:
-                    log_message(f"Written {{current_index}} segments")
-
-            except queue.Empty:
-                continue
-            except Exception as e:
-                log_message(f"Error writing segment: {{e}}")
-
-writer_thread = threading.Thread(target=write_segments, daemon=True)
-writer_thread.start()
-
-try:
-    log_message("Starting transcription...")
-    model = faster_whisper.WhisperModel("{model_name}", device=device, compute_type=compute_type)
-
-    segments, info = model.transcribe(r"{file_path}")
-
-    for segment in segments:
-        while segment_queue.full() and not stop_event.is_set():
-            time.sleep(0.1)
-
-        if stop_event.is_set():
-            break
-
-        segment_queue.put(segment)
-
-    write_event.wait(timeout=1.0)
-    write_event.clear()
-
-    stop_event.set()
-    writer_thread.join(timeout=30)
+            def log(message):
+                GLib.idle_add(self.log_callback, message)
 
-    if loop_detected:
-        log_message("Loop detected — stopping transcription. Restart to resume from loop point.")
-        exit(42)
-
-    if os.path.exists(unfinished_srt) and os.path.getsize(unfinished_srt) > 10:
-            if os.path.islink(r"{srt_file}"):
-                os.remove(r"{srt_file}")
-            elif os.path.exists(r"{srt_file}"):
-                os.remove(r"{srt_file}")
-        os.rename(unfinished_srt, r"{srt_file}")
-        log_message("Transcription completed successfully")
-
-        dir_path = os.path.dirname(r"{srt_file}")
-
-        import helper_files as _hf
-        _hf.make_files(r"{srt_file}")
-
-        return True
-    else:
-        log_message("Output file is empty or too small")
-        exit(1)
-
-except Exception as e:
-    log_message(f"Error during transcription: {{str(e)}}")
-    import traceback
-    traceback.print_exc(file=sys.stderr)
-    exit(1)
-finally:
-    stop_event.set()
-    writer_thread.join(timeout=5)
-'''
-
-            sh_file = os.path.join(dir_path, f"{base_name}{file_suffix}.{safe_model}.sh")
-            with open(sh_file, 'w', encoding='utf-8') as f:
-                f.write('#!/bin/bash\n')
-                f.write(f'python3 -c """{script_content}"""\n')
-            os.chmod(sh_file, 0o755)
-
-            bat_file = os.path.join(dir_path, f"{base_name}{file_suffix}.{safe_model}.bat")
-            with open(bat_file, 'w', encoding='utf-8') as f:
-                win_script = script_content.replace('/', '\\')
-                win_script = win_script.replace(r'\\', r'\\\\')
-                if win_script.startswith(r'\home'):
-                    win_script = 'C:\\Users' + win_script[5:]
-                f.write('@echo off\n')
-                f.write(f'python -c """{win_script}"""\n')
-
-            script_file = os.path.join(dir_path, f"temp_whisper_{os.getpid()}.py")
-            with open(script_file, "w", encoding="utf-8") as f:
-                f.write(script_content)
-
-
-            unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
-            try:
-                if os.path.exists(srt_file) or os.path.islink(srt_file):
-                    os.remove(srt_file)
-                os.symlink(os.path.basename(unfinished_srt), srt_file)
-                GLib.idle_add(self.log_callback, f"Created symlink: {srt_file} -> {os.path.basename(unfinished_srt)}")
-            except OSError:
-                GLib.idle_add(self.log_callback, f"Could not create symlink, skipping")
-
-            try:
-                GLib.idle_add(self.log_callback, f"Starting transcription of {file_path}...")
-                process = subprocess.Popen(
-                    [sys.executable, script_file],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    encoding='utf-8',
-                    errors='replace',
-                    text=True
-                )
-
-                while process.poll() is None:
-                    stdout = process.stdout.readline()
-                    if stdout:
-                        GLib.idle_add(self.log_callback, stdout.strip())
-                    stderr = process.stderr.readline()
-                    if stderr:
-                        GLib.idle_add(self.log_callback, f"Error: {stderr.strip()}")
-                    time.sleep(0.1)
-
-                exit_code = process.returncode
-                exit_code = process.returncode
-                if exit_code == 0 and os.path.exists(srt_file):
-                    GLib.idle_add(self.log_callback, f"Successfully created {srt_file}")
-
-                    import helper_files as _hf
-                    _hf.make_files(srt_file)
-
-                    return True
-                GLib.idle_add(self.log_callback, f"Process exited with code {exit_code}")
-                return False
-
-            finally:
-                if os.path.islink(srt_file):
-                    try:
-                        os.remove(srt_file)
-                    except OSError:
-                        pass
-                    unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
-                    if os.path.exists(unfinished_srt):
-                        try:
-                            os.rename(unfinished_srt, srt_file)
-                            GLib.idle_add(self.log_callback, f"Renamed {unfinished_srt} to {srt_file}")
-                            import helper_files as _hf
-                            _hf.cleanup_unfinished(srt_file)
-                        except OSError:
-                            pass
-                try:
-                    os.remove(script_file)
-                except:
-                    pass
+            log(f"Starting transcription of {file_path}...")
+            # Runs on the shared warm-model worker pool (resume, loop recovery, helper files)
+            if transcribe.process_create(file_path, model_name, srt_file, language='none',
+                                         device=device, compute_type=compute_type,
+                                         force_device=True, auto=False, write=log):
+                log(f"Successfully created {srt_file}")
+                return True
+            log(f"Transcription failed for {file_path}")
+            return False
 
         except Exception as e:
             GLib.idle_add(self.log_callback, f"Error processing {file_path}: {str(e)}")
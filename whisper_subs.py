@@ -8,6 +8,8 @@ import os
 import sys
 import json
 import argparse
+import copy
+import functools
 import datetime
 import re
 import subprocess
@@ -20,9 +22,20 @@ import pyperclip
 import yt_dlp
 import hashlib
 from pathlib import Path
-from concurrent.futures import ThreadPoolExecutor, as_completed
 from urllib.parse import urlparse
-from typing import Optional, List, Dict, Any, Tuple, Union
+from typing import Callable, Optional, List, Dict, Any, Tuple, Union
+
+import history_index
+import job_store
+import log_writer
+import metadata_cache
+import subtitle_catalog
+from cancellation import CancelToken, TaskCancelled
+# Jobs live in job_store's SQLite database; these names stay importable from here
+from job_store import (
+    add_job, add_task, get_jobs, get_last_unfinished_job, update_job, update_task_status,
+)
+from pipeline import Pipeline, Stage
 
 # Lazy imports - only import when needed
 _transcribe_module = None
@@ -70,9 +83,11 @@ def _get_livestream_transcriber():
 APP_NAME = "WhisperSubs"
 CONFIG_DIR = os.path.join(os.path.expanduser("~"), ".config", APP_NAME)
 OUTPUT_DIR = os.path.join(os.path.expanduser("~"), "Documents", "Youtube-Subs")
-JOBS_FILE = os.path.join(CONFIG_DIR, "jobs.json")
 HISTORY_FILE = os.path.join(OUTPUT_DIR, "history.txt")
 PROCESS_FILE = os.path.join(OUTPUT_DIR, "process.txt")
+# Worker threads per task stage; downloads for the next tasks overlap transcription
+PIPELINE_WORKERS = {'prepare': 2, 'download': 2, 'transcribe': 1, 'finalize': 1}
+DEFAULT_PREFETCH = 2
 # Ensure config directories exist
 os.makedirs(CONFIG_DIR, exist_ok=True)
 # Ensure OUTPUT_DIR exists (handle case where parent might be a file)
@@ -84,69 +99,8 @@ except (FileNotFoundError, FileExistsError):
     os.makedirs(OUTPUT_DIR, exist_ok=True)
 
 # --- Job Management ---
-def get_jobs():
-    if not os.path.exists(JOBS_FILE): return []
-    try:
-        with open(JOBS_FILE, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (json.JSONDecodeError, IOError):
-        return []
-
-def save_jobs(jobs):
-    with open(JOBS_FILE, 'w', encoding='utf-8') as f:
-        json.dump(jobs, f, indent=4)
-
-def add_job(source, model_name):
-    jobs = get_jobs()
-    job_id = len(jobs) + 1
-    new_job = {
-        "id": job_id,
-        "date": datetime.datetime.now().isoformat(),
-        "model": model_name,
-        "source": source,
-        "status": "initializing",
-        "tasks": []
-    }
-    jobs.append(new_job)
-    save_jobs(jobs)
-    return new_job
-
-def update_job(job_id, updates):
-    jobs = get_jobs()
-    job_updated = False
-    for job in jobs:
-        if job["id"] == job_id:
-            job.update(updates)
-            job_updated = True
-            break
-    if job_updated:
-        save_jobs(jobs)
-
-def update_task_status(job_id, task_source, status, title=None):
-    jobs = get_jobs()
-    job_found = False
-    for job in jobs:
-        if job["id"] == job_id:
-            job_found = True
-            for task in job["tasks"]:
-                if task["source"] == task_source:
-                    task["status"] = status
-                    if title:
-                        task["title"] = title
-                    break
-            break
-    if job_found:
-        save_jobs(jobs)
-
-def get_last_unfinished_job():
-    jobs = get_jobs()
-    for job in reversed(jobs):
-        if job["status"] not in ["completed", "failed"]:
-            return job
-    return None
-
 def list_jobs():
-    jobs = get_jobs()
+    jobs = job_store.job_summaries()
     if not jobs:
         print("No transcription jobs found.")
         return
@@ -156,8 +110,8 @@ def list_jobs():
         date_str = datetime.datetime.fromisoformat(job['date']).strftime('%Y-%m-%d %H:%M')
         source_str = job['source'][:40] + '...' if len(job['source']) > 40 else job['source']
 
-        total_tasks = len(job.get('tasks', []))
-        completed_tasks = len([t for t in job.get('tasks', []) if t.get('status') in ['completed', 'skipped']])
+        total_tasks = job['total_tasks']
+        completed_tasks = job['done_tasks']
         progress_str = f"{completed_tasks}/{total_tasks}" if total_tasks > 0 else "N/A"
 
         print(f"{job['id']:<4} {date_str:<20} {job['model']:<15} {job['status']:<12} {progress_str:<12} {source_str}")
@@ -189,7 +143,12 @@ class WhisperSubs:
         mpv_socket: Optional[str] = None,
         cpu_threads: Optional[int] = None,
         save_video: bool = False,
-        save_thumbnail: bool = True
+        save_thumbnail: bool = True,
+        parallel_chunks: int = 1,
+        stage_workers: Optional[Dict[str, int]] = None,
+        prefetch: int = DEFAULT_PREFETCH,
+        on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+        cancel_token: Optional[CancelToken] = None
     ):
         self.model_name = model_name
         self.device = device
@@ -206,7 +165,8 @@ class WhisperSubs:
         self.save_thumbnail = save_thumbnail
         self.model = None
         self.log_file = os.path.join(os.path.expanduser("~/.config/WhisperSubs"), 'whisper_subs.log')
-        self.info_cache: Dict[str, Tuple[str, str]] = {}  # Cache for video info to avoid re-fetching
+        # One metadata fetch per video, shared by resolution, subtitle check and download
+        self.metadata = metadata_cache.MetadataService(self._extract_info)
         os.makedirs(os.path.dirname(self.log_file), exist_ok=True)
         self.delay = 30
         self.start_delay = 30
@@ -234,6 +194,16 @@ class WhisperSubs:
         self.mpv_socket = mpv_socket or '/tmp/mpvsocket'
         # CPU threads setting
         self.cpu_threads = cpu_threads
+        # Number of concurrent chunks for long local transcriptions
+        self.parallel_chunks = parallel_chunks
+        # Pipeline settings: workers per stage and tasks queued ahead of each stage
+        self.stage_workers = stage_workers
+        self.prefetch = prefetch
+        # Live transcription events (segments, progress) for the API's WebSocket subscribers
+        self.on_event = on_event
+        # Cancelling stops feeding the pipeline and interrupts the download/transcription in progress
+        self.cancel_token = cancel_token or CancelToken()
+        self.cancel_token.on_cancel(self._stop_event.set)
 
     def _get_ytdlp_base_opts(self, **extra_opts) -> Dict[str, Any]:
         """Get base yt-dlp options with cookies from browser (required for YouTube)."""
@@ -249,13 +219,16 @@ class WhisperSubs:
         base_opts.update(extra_opts)
         return base_opts
 
-    def log(self, message: str) -> None:
+    def log(self, message: str, level: Optional[str] = None, **fields) -> None:
+        """Queue a message for the console and whisper_subs.log (JSON lines).
+
+        Also the write callback handed to transcription, so it must stay cheap:
+        the background LogWriter does the printing and file I/O. The task and
+        stage of the calling pipeline thread are added to the record.
+        """
         message_str = str(message)
-        timestamp = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        print(f"[{timestamp}] {message_str}")
-        if self.log_file:
-            with open(self.log_file, 'a', encoding='utf-8') as f:
-                f.write(f"[{timestamp}] {message_str}\n")
+        fields = dict(log_writer.current_context(), **fields)
+        log_writer.get_writer(self.log_file).log(message_str, level or log_writer.level_of(message_str), **fields)
 
     def is_youtube(self, url: str) -> bool:
         return bool(url and 'youtu' in urlparse(url).netloc)
@@ -296,6 +269,16 @@ class WhisperSubs:
                 return path_parts[0]
         return None
 
+    def _extract_info(self, url: str) -> Optional[Dict[str, Any]]:
+        """The one yt-dlp metadata extraction behind self.metadata."""
+        ydl_opts = self._get_ytdlp_base_opts(skip_download=True)
+        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
+            return ydl.extract_info(url, download=False)
+
+    def get_video_metadata(self, url: str) -> Optional[Dict[str, Any]]:
+        """Trimmed yt-dlp info for url, fetched at most once (see metadata_cache)."""
+        return self.metadata.get(self._audio_cache_source(url))
+
     def get_video_info(self, url: str) -> Tuple[str, str]:
         """Get video title and channel name."""
         # For local files, just return the filename
@@ -304,10 +287,7 @@ class WhisperSubs:
         
         # For YouTube/Twitch, fetch info
         try:
-            ydl_opts = self._get_ytdlp_base_opts(skip_download=True)
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+            info = self.get_video_metadata(url)
 
             if not info:
                 return "unknown_title", "unknown_channel"
@@ -320,17 +300,14 @@ class WhisperSubs:
             return os.path.basename(url), "unknown_channel"
 
     def get_video_info_cached(self, url):
-        """Get video info with caching to avoid re-fetching the same URL."""
+        """Get video info; repeated calls for a URL are served by the metadata cache."""
         # Clean URL first for consistent cache keys
         clean_url = self.clean_youtube_url(url) if self.is_youtube(url) else url
+        return self.get_video_info(clean_url)
 
-        if clean_url in self.info_cache:
-            self.log(f"Using cached info for {clean_url[:50]}...")
-            return self.info_cache[clean_url]
-
-        info = self.get_video_info(clean_url)
-        self.info_cache[clean_url] = info
-        return info
+    def _audio_cache_source(self, url: str) -> str:
+        """Key for audio_cache: the cleaned URL, so tracking params share an entry."""
+        return self.clean_youtube_url(url) if self.is_youtube(url) else url
 
     def clean_youtube_url(self, url: str) -> str:
         """Clean YouTube URLs by removing tracking parameters and extracting just the video ID.
@@ -436,8 +413,24 @@ class WhisperSubs:
             filename = 'untitled'
         return filename
 
+    def _flat_entries(self, info):
+        """Video entries of a flat playlist/channel extract, descending into tabs."""
+        for entry in info.get("entries") or []:
+            if not entry:
+                continue
+            if entry.get("entries"):
+                yield from self._flat_entries(entry)
+            elif entry.get("url"):
+                yield entry
+
+    def _already_done(self, url: str) -> bool:
+        """History check for resolution: no network, same rule as the prepare stage."""
+        if self.force_retry:
+            return False
+        return self.is_processed(self.get_unique_id(url)) or self.is_already_processed(url)
+
     def resolve_source_to_tasks_lazy(self, source):
-        """Lazy resolution with parallel metadata fetching for playlists."""
+        """Lazy resolution; playlists and channels are filtered against history without network calls."""
         self.log(f"Resolving source (lazy): {source}")
 
         # Clean YouTube URLs for consistent processing
@@ -453,7 +446,10 @@ class WhisperSubs:
                 if not item.strip():
                     continue
                 try:
-                    if self.is_youtube(item) or self.is_twitch(item):
+                    if self._already_done(item):
+                        # The prepare stage skips it; don't fetch metadata just for a title
+                        title = os.path.basename(item)
+                    elif self.is_youtube(item) or self.is_twitch(item):
                         title, _ = self.get_video_info_cached(item)
                     else:
                         title = os.path.basename(item)
@@ -479,9 +475,8 @@ class WhisperSubs:
         elif self.is_channel_or_playlist_url(source):
             self.log("Source is YouTube channel/playlist (flat extract).")
             
-            # Load history for filtering
             processed_count = 0
-            skipped_count = 0
+            new_count = 0
 
             ydl_opts = self._get_ytdlp_base_opts(extract_flat=True, skip_download=True)
 
@@ -491,47 +486,25 @@ class WhisperSubs:
             if not info or "entries" not in info:
                 return
 
-            urls = [
-                entry.get("url")
-                for entry in info["entries"]
-                if entry and entry.get("url")
-            ]
-            
-            self.log(f"Found {len(urls)} videos in channel/playlist")
+            entries = list(self._flat_entries(info))
+            self.log(f"Found {len(entries)} videos in channel/playlist")
 
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = {
-                    executor.submit(self.get_video_info_cached, url): url
-                    for url in urls
+            # Flat entries carry the URL, id and title; full metadata is fetched
+            # later, by the prepare stage, and only for tasks that actually run
+            for entry in entries:
+                url = entry["url"]
+                if self._already_done(url):
+                    processed_count += 1
+                    continue
+                new_count += 1
+                yield {
+                    "source": url,
+                    "status": "pending",
+                    "title": self.clean_filename(entry.get("title") or os.path.basename(url)),
                 }
 
-                for future in as_completed(futures):
-                    url = futures[future]
-                    try:
-                        # Skip already processed videos
-                        if self.is_already_processed(url):
-                            processed_count += 1
-                            self.log(f"Skipping already processed: {url}")
-                            continue
-                        
-                        title, _ = future.result()
-                        skipped_count += 1
-                        yield {
-                            "source": url,
-                            "status": "pending",
-                            "title": self.clean_filename(title),
-                        }
-                    except Exception:
-                        # Still try to process even if we can't get title
-                        if not self.is_already_processed(url):
-                            yield {
-                                "source": url,
-                                "status": "pending",
-                                "title": os.path.basename(url),
-                            }
-            
             if processed_count > 0:
-                self.log(f"Skipped {processed_count} already processed videos, processing {skipped_count} new ones")
+                self.log(f"Skipped {processed_count} already processed videos, processing {new_count} new ones")
         # Check for Twitch channel videos page specifically
         elif self.is_twitch(source) and '/videos' in source and '/videos/' not in source:
             # This is a Twitch channel videos page (e.g., twitch.tv/channel/videos)
@@ -568,7 +541,7 @@ class WhisperSubs:
                         vod_url = f"https://www.twitch.tv/videos/{vod['id']}"
                         
                         # Skip already processed VODs
-                        if self.is_already_processed(vod_url):
+                        if self._already_done(vod_url):
                             processed_count += 1
                             self.log(f"Skipping already processed VOD: {vod_url}")
                             continue
@@ -604,10 +577,11 @@ class WhisperSubs:
                     yield {"source": source, "status": "pending", "title": os.path.basename(source)}
 
     def _convert_to_audio(self, video_path: str) -> Optional[str]:
-        """Convert video file to audio-only M4A for transcription.
+        """Return decoded 16 kHz mono PCM for a local video file.
 
-        This is needed for time cutting (--start/--end) to work properly,
-        as cutting video files requires video encoding which may fail.
+        Uses the shared PCM store, so the video is decoded once and reused by
+        time cutting, resume, retries and every adapter. Audio files are
+        returned unchanged.
         """
         if not os.path.exists(video_path):
             return None
@@ -616,55 +590,13 @@ class WhisperSubs:
         if os.path.splitext(video_path)[1].lower() not in video_exts:
             return video_path
 
-        audio_path = os.path.splitext(video_path)[0] + ".m4a"
-
-        if os.path.exists(audio_path):
-            self.log(f"Using existing audio file: {os.path.basename(audio_path)}")
-            return audio_path
-
         try:
-            import audio_cache
-            cached = audio_cache.get(video_path)
-            if cached and os.path.exists(cached):
-                import shutil
-                shutil.copy2(cached, audio_path)
-                self.log(f"Using cached conversion: {os.path.basename(audio_path)}")
-                return audio_path
-        except Exception:
-            pass
-
-        self.log(f"Extracting audio from {os.path.basename(video_path)}...")
-
-        import subprocess
-        ffmpeg_cmd = [
-            'ffmpeg', '-y',
-            '-i', video_path,
-            '-vn',
-            '-acodec', 'aac',
-            '-b:a', '128k',
-            '-ac', '1',
-            '-ar', '16000',
-            audio_path
-        ]
-
-        result = subprocess.run(
-            ffmpeg_cmd,
-            stdout=subprocess.DEVNULL,
-            stderr=subprocess.DEVNULL,
-            text=True,
-            check=False
-        )
-
-        if result.returncode == 0 and os.path.exists(audio_path):
-            self.log(f"Audio extracted: {os.path.basename(audio_path)}")
-            try:
-                import audio_cache
-                audio_cache.put(video_path, audio_path)
-            except Exception:
-                pass
+            import pcm_store
+            audio_path = pcm_store.get_wav(video_path, write=self.log)
+            self.log(f"Audio ready: {os.path.basename(audio_path)}")
             return audio_path
-        else:
-            self.log(f"Audio extraction failed, using original file")
+        except Exception as e:
+            self.log(f"Audio extraction failed ({e}), using original file")
             return video_path
 
     def check_and_download_subs(self, url, output_dir, title):
@@ -675,15 +607,7 @@ class WhisperSubs:
         self.log("Checking for existing subtitles...")
 
         try:
-            # Ultra-minimal options for just checking subs
-            ydl_opts = self._get_ytdlp_base_opts(
-                skip_download=True,
-                writesubtitles=False,
-                listsubtitles=False,
-            )
-
-            with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                info = ydl.extract_info(url, download=False)
+            info = self.get_video_metadata(url)
 
             if info is None:
                 return False
@@ -797,34 +721,28 @@ class WhisperSubs:
         # === STEP 1: Check for existing files (fast) ===
         if not self.force:
             try:
-                ydl_opts = self._get_ytdlp_base_opts(
-                    skip_download=True,
-                    socket_timeout=5,
-                )
+                info = self.get_video_metadata(clean_url)
 
-                with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-                    info = ydl.extract_info(clean_url, download=False)
+                if info:
+                    timestamp = info.get('timestamp', '')
+                    if timestamp:
+                        date_time = datetime.datetime.fromtimestamp(timestamp)
+                        timeday = date_time.strftime('%Y-%m-%d_%H-%M')
+                    else:
+                        timeday = ''
 
-                    if info:
-                        timestamp = info.get('timestamp', '')
-                        if timestamp:
-                            date_time = datetime.datetime.fromtimestamp(timestamp)
-                            timeday = date_time.strftime('%Y-%m-%d_%H-%M')
-                        else:
-                            timeday = ''
-
-                        clean_title = self.clean_filename(info.get('title', 'unknown'))
-                        # Strip any existing model suffix to avoid duplicate model names
-                        title_without_model = self._strip_model_from_filename(clean_title)
-                        base_title = f"{timeday}_{title_without_model}" if timeday else title_without_model
-
-                        # Check for existing files with current model name only
-                        for ext in ['.mp3', '.m4a', '.webm', '.ogg']:
-                            pattern = f"{base_title}.{self._safe_model_filename()}{ext}"
-                            existing_file = os.path.join(output_path, pattern)
-                            if os.path.exists(existing_file):
-                                self.log(f"File already exists: {existing_file}")
-                                return existing_file
+                    clean_title = self.clean_filename(info.get('title', 'unknown'))
+                    # Strip any existing model suffix to avoid duplicate model names
+                    title_without_model = self._strip_model_from_filename(clean_title)
+                    base_title = f"{timeday}_{title_without_model}" if timeday else title_without_model
+
+                    # Check for existing files with current model name only
+                    for ext in ['.mp3', '.m4a', '.webm', '.ogg']:
+                        pattern = f"{base_title}.{self._safe_model_filename()}{ext}"
+                        existing_file = os.path.join(output_path, pattern)
+                        if os.path.exists(existing_file):
+                            self.log(f"File already exists: {existing_file}")
+                            return existing_file
             except Exception as e:
                 self.log(f"Quick check failed: {e}")
 
@@ -832,25 +750,21 @@ class WhisperSubs:
         if not self.force:
             try:
                 import audio_cache
-                cached = audio_cache.get(clean_url)
-                if cached and os.path.exists(cached):
+                # Linked, not copied, out of the cache; the task may delete it afterwards
+                cached = audio_cache.fetch(self._audio_cache_source(url), output_path)
+                if cached:
                     self.log(f"Using cached audio: {cached}")
-                    dest = os.path.join(output_path, os.path.basename(cached))
-                    if dest != cached and not os.path.exists(dest):
-                        import shutil
-                        shutil.copy2(cached, dest)
-                        return dest
                     return cached
             except Exception as e:
                 self.log(f"Cache lookup failed: {e}")
 
         # === STEP 2: Download the file ===
-        original_cwd = os.getcwd()
-        os.chdir(output_path)
+        # Downloads run concurrently in the pipeline, so use yt-dlp's output path rather than chdir
 
         # Define progress hook once outside the loop
         def progress_hook(d):
-            """Show clean progress updates."""
+            """Show clean progress updates; raising here is how yt-dlp downloads are aborted."""
+            self.cancel_token.raise_if_cancelled()
             if d['status'] == 'downloading':
                 if 'total_bytes' in d or 'total_bytes_estimate' in d:
                     total = d.get('total_bytes') or d.get('total_bytes_estimate', 0)
@@ -880,13 +794,11 @@ class WhisperSubs:
 
             while attempt < max_attempts:
                 attempt += 1
+                self.cancel_token.raise_if_cancelled()
 
                 try:
-                    # Get video info once
-                    info_opts = self._get_ytdlp_base_opts(skip_download=True)
-
-                    with yt_dlp.YoutubeDL(info_opts) as ydl:
-                        info = ydl.extract_info(clean_url, download=False)
+                    # Get video info once (shared with the quick check and earlier stages)
+                    info = self.get_video_metadata(clean_url)
 
                     if info is None:
                         self.log(f"Failed to get video info for {clean_url}")
@@ -908,6 +820,7 @@ class WhisperSubs:
                     # Download with proper template
                     download_opts = self._get_ytdlp_base_opts(
                         outtmpl=f'{expected_base}.%(ext)s',
+                        paths={'home': output_path},
                         noplaylist=True,
                         writethumbnail=self.save_thumbnail,
                         noprogress=False,
@@ -946,7 +859,16 @@ class WhisperSubs:
 
                     self.log(f"Starting download (attempt {attempt}/{max_attempts})...")
                     with yt_dlp.YoutubeDL(download_opts) as ydl:
-                        ydl.download([clean_url])
+                        full_info = self.metadata.full_info(self._audio_cache_source(clean_url))
+                        if full_info and attempt == 1:
+                            # Fresh from this process's metadata fetch: skip a second extraction
+                            try:
+                                ydl.process_ie_result(copy.deepcopy(full_info), download=True)
+                            except Exception as e:
+                                self.log(f"Reusing fetched info failed ({e}); extracting again...")
+                                ydl.download([clean_url])
+                        else:
+                            ydl.download([clean_url])
 
                     # Find the downloaded file based on expected name
                     for ext in ['.m4a', '.mp4', '.mp3', '.webm', '.ogg']:
@@ -960,12 +882,15 @@ class WhisperSubs:
                     return None
 
                 except Exception as e:
+                    # yt-dlp may wrap the hook's TaskCancelled in a DownloadError
+                    self.cancel_token.raise_if_cancelled()
                     error_str = str(e).lower()
 
                     if ('rate' in error_str or 'unavailable' in error_str or '429' in error_str) and attempt < max_attempts:
                         delay = min(30 * (2 ** attempt), 3600)
                         self.log(f"Rate limited. Retrying in {delay}s... (attempt {attempt}/{max_attempts})")
-                        time.sleep(delay)
+                        if self.cancel_token.wait(delay):
+                            raise TaskCancelled()
                         continue
                     elif ('requested format is not available' in error_str or 'format not available' in error_str) and attempt < max_attempts:
                         self.log(f"Format not available. Trying fallback format... (attempt {attempt}/{max_attempts})")
@@ -981,7 +906,6 @@ class WhisperSubs:
                         return None
 
         finally:
-            os.chdir(original_cwd)
             # Clean up leftover .part files from interrupted/failed downloads
             if expected_base:
                 for part_file in glob.glob(os.path.join(output_path, f"{expected_base}*.part")):
@@ -1090,253 +1014,304 @@ class WhisperSubs:
         - True: Allow cross-tier comparison using normalized indices
         (removes .en offset so large-v3 > medium.en works correctly)
         """
-        if not os.path.exists(HISTORY_FILE):
-            return False
-
         # Get current model info
         current_model_index = _get_model().getIndex(self.model_name)
         if current_model_index == -1:
             return False
 
         current_is_english = '.en' in self.model_name
+        best = history_index.get_index(HISTORY_FILE).best_ranks(unique_id)
+        if not best:
+            return False
 
-        with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-            for line in f:
-                parts = line.strip().split()
-                if len(parts) < 2:
-                    continue
-
-                history_id = parts[0]
-                history_model = parts[1]
-
-                if history_id != unique_id:
-                    continue
-
-                history_model_index = _get_model().getIndex(history_model)
-                if history_model_index == -1:
-                    continue
-
-                history_is_english = '.en' in history_model
-
-                # === IMPROVED CROSS-TIER LOGIC ===
-                if self.strict_language_tier:
-                    # STRICT MODE: Can only compare models of same language type
-                    if current_is_english != history_is_english:
-                        continue
-
-                    # Same tier: Direct comparison
-                    if history_model_index >= current_model_index:
-                        return True
-                else:
-                    # PERMISSIVE MODE: Normalize indices for fair comparison
-                    # Remove the .en offset (indices 7-10 become 0-3)
-                    current_normalized = current_model_index - 7 if current_is_english else current_model_index
-                    history_normalized = history_model_index - 7 if history_is_english else history_model_index
-
-                    # Now compare normalized values
-                    # large-v3 (6) vs medium.en (10 -> 3): 6 >= 3 → large-v3 wins ✅
-                    # medium.en (10 -> 3) vs large-v3 (6): 3 >= 6 → re-process ✅
-                    if history_normalized >= current_normalized:
-                        return True
-                # ==================================
+        # === IMPROVED CROSS-TIER LOGIC ===
+        if self.strict_language_tier:
+            # STRICT MODE: Can only compare models of same language type
+            tier = history_index.ENGLISH if current_is_english else history_index.MULTILINGUAL
+            return best.get(tier, -1) >= current_model_index
+        # PERMISSIVE MODE: Normalize indices for fair comparison
+        # Remove the .en offset (indices 7-10 become 0-3)
+        current_normalized = current_model_index - 7 if current_is_english else current_model_index
+        history_normalized = max(
+            best[tier] - 7 if tier == history_index.ENGLISH else best[tier] for tier in best
+        )
+        # Now compare normalized values
+        # large-v3 (6) vs medium.en (10 -> 3): 6 >= 3 → large-v3 wins ✅
+        # medium.en (10 -> 3) vs large-v3 (6): 3 >= 6 → re-process ✅
+        return history_normalized >= current_normalized
+        # ==================================
 
-        return False
-    
     def mark_as_processed(self, unique_id):
-        with open(HISTORY_FILE, 'a', encoding='utf-8') as f:
-            f.write(f"{unique_id} {self.model_name}\n")
-    
+        history_index.get_index(HISTORY_FILE).add(unique_id, self.model_name)
+
     def is_already_processed(self, url: str) -> bool:
         """Check if a URL has already been processed by checking history file."""
-        if not os.path.exists(HISTORY_FILE):
-            return False
-        
         # Clean URL for consistent comparison
         clean_url = self.clean_youtube_url(url) if self.is_youtube(url) else url
-        
+
         try:
-            with open(HISTORY_FILE, 'r', encoding='utf-8') as f:
-                history = set(line.strip().split()[0] for line in f if line.strip())
-            
+            history = history_index.get_index(HISTORY_FILE)
             # Check both original and cleaned URL
             return url in history or clean_url in history
         except Exception:
             return False
-    
+
     def process_task(self, job_id, task):
+        """Run one task through every stage in turn (see process_with_lazy_resolution)."""
+        ctx = self._new_task_context(job_id, task)
+        try:
+            for stage in self._pipeline_stages():
+                if not stage.func(ctx):
+                    break
+        except Exception as e:
+            self._task_failed('task', ctx, e)
+        finally:
+            self._release_task(ctx)
+
+    def _new_task_context(self, job_id, task) -> Dict[str, Any]:
+        """Per-task state handed from stage to stage."""
         task_source = task['source']
-        unique_id = self.get_unique_id(task_source)
-        if not self.force_retry and self.is_processed(unique_id):
+        is_local = self.is_local_file(task_source)
+        return {
+            'job_id': job_id,
+            'task': task,
+            'source': task_source,
+            'unique_id': self.get_unique_id(task_source),
+            'is_local': is_local,
+            'cache_source': None if is_local else self._audio_cache_source(task_source),
+            'pinned': False,
+            'title': task.get('title'),
+            'channel_dir': None,
+            'audio_file': None,
+            'srt_file': None,
+            'srt_file_secondary': None,
+            'mpv_process': None,
+            'reload_thread': None,
+            'reload_stop_event': threading.Event(),
+        }
+
+    def _stage_prepare(self, ctx) -> bool:
+        """Skip check, metadata and existing subtitles."""
+        job_id, task_source = ctx['job_id'], ctx['source']
+        if not self.force_retry and self.is_processed(ctx['unique_id']):
             self.log(f"Skipping task '{task_source}' - already processed.")
-            update_task_status(job_id, task_source, 'skipped', task['title'])
-            return
+            update_task_status(job_id, task_source, 'skipped', ctx['task']['title'])
+            return False
 
-        audio_file, is_local = None, self.is_local_file(task_source)
-        try:
-            title, self.channel_name = self.get_video_info(task_source)
-            if is_local:
-                self.channel_name = "local_files"
-            update_task_status(job_id, task_source, 'processing', title)
-            self.model_name = _get_model().getName(self.model_name)
-            channel_dir = os.path.join(OUTPUT_DIR, self.clean_filename(self.channel_name))
-            os.makedirs(channel_dir, exist_ok=True)
-
-            if not is_local and self.check_and_download_subs(task_source, channel_dir, title) and not self.force:
-                self.log(f"Downloaded existing subtitle for '{title}'.")
-                self.mark_as_processed(unique_id)
-                update_task_status(job_id, task_source, 'skipped')
-                return
+        if ctx['cache_source']:
+            # Keep a cached copy we may be handed from being evicted mid-task
+            try:
+                import audio_cache
+                audio_cache.pin(ctx['cache_source'])
+                ctx['pinned'] = True
+            except Exception as e:
+                self.log(f"Cache pin failed: {e}")
+        title, channel_name = self.get_video_info(task_source)
+        if ctx['is_local']:
+            channel_name = "local_files"
+        ctx['title'] = title
+        update_task_status(job_id, task_source, 'processing', title)
+        self.model_name = _get_model().getName(self.model_name)
+        channel_dir = os.path.join(OUTPUT_DIR, self.clean_filename(channel_name))
+        os.makedirs(channel_dir, exist_ok=True)
+        ctx['channel_dir'] = channel_dir
+
+        if not ctx['is_local'] and self.check_and_download_subs(task_source, channel_dir, title) and not self.force:
+            self.log(f"Downloaded existing subtitle for '{title}'.")
+            self.mark_as_processed(ctx['unique_id'])
+            update_task_status(job_id, task_source, 'skipped')
+            return False
+        return True
+
+    def _stage_download(self, ctx) -> bool:
+        """Fetch remote audio or decode a local file."""
+        task_source = ctx['source']
+        update_task_status(ctx['job_id'], task_source, 'downloading')
+        if ctx['is_local']:
+            # Convert video to audio if needed (for time cutting to work properly)
+            audio_file = self._convert_to_audio(task_source)
+            if not audio_file:
+                self.log(f"Failed to convert video to audio: {task_source}")
+                return False
+        else:
+            audio_file = self.download_audio(task_source, ctx['channel_dir'])
+        ctx['audio_file'] = audio_file
 
-            # FIX: Just pass the directory, not a template path
-            if is_local:
-                # Convert video to audio if needed (for time cutting to work properly)
-                audio_file = self._convert_to_audio(task_source)
-                if not audio_file:
-                    self.log(f"Failed to convert video to audio: {task_source}")
-                    return
-            else:
-                audio_file = self.download_audio(task_source, channel_dir)
-            
-            if not audio_file or not os.path.exists(audio_file):
-                self.log(f"Audio file not found: {audio_file}")
-                return
+        if not audio_file or not os.path.exists(audio_file):
+            self.log(f"Audio file not found: {audio_file}")
+            return False
+        update_task_status(ctx['job_id'], task_source, 'downloaded')
+        return True
+
+    def _stage_transcribe(self, ctx) -> bool:
+        """Name the outputs and run the transcription."""
+        task_source, audio_file = ctx['source'], ctx['audio_file']
+        update_task_status(ctx['job_id'], task_source, 'transcribing')
+        safe_model = self._safe_model_filename()
+        if ctx['is_local']:
+            # Name after the source; audio_file may be a decoded copy in the PCM store
+            base_name = os.path.splitext(os.path.basename(task_source))[0]
+            if not base_name.endswith(f".{safe_model}"):
+                base_name = f"{base_name}.{safe_model}"
+        else:
+            title_without_model = self._strip_model_from_filename(self.clean_filename(ctx['title']))
+            base_name = f"{title_without_model}.{safe_model}"
+
+        # Write to both locations: video folder AND Documents/Youtube-Subs/local_files
+        if ctx['is_local']:
+            # Primary: video file's folder
+            srt_file = os.path.join(os.path.dirname(task_source), f"{base_name}.srt")
+            # Secondary: Documents/Youtube-Subs/local_files
+            local_files_dir = os.path.join(OUTPUT_DIR, "local_files")
+            os.makedirs(local_files_dir, exist_ok=True)
+            ctx['srt_file_secondary'] = os.path.join(local_files_dir, f"{base_name}.srt")
+
+            # Check for existing unfinished transcription to resume
+            unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
+            if os.path.exists(unfinished_srt) and os.path.getsize(unfinished_srt) > 10:
+                self.log(f"Found unfinished transcription: {unfinished_srt}")
+                self.log("Will resume from where it left off...")
+        else:
+            srt_file = os.path.join(ctx['channel_dir'], f"{base_name}.srt")
+        ctx['srt_file'] = srt_file
 
-            update_task_status(job_id, task_source, 'transcribing')
-            safe_model = self._safe_model_filename()
-            if is_local:
-                base_name = os.path.splitext(os.path.basename(audio_file))[0]
-                if not base_name.endswith(f".{safe_model}"):
-                    base_name = f"{base_name}.{safe_model}"
-            else:
-                title_without_model = self._strip_model_from_filename(self.clean_filename(title))
-                base_name = f"{title_without_model}.{safe_model}"
-
-            # Write to both locations: video folder AND Documents/Youtube-Subs/local_files
-            if is_local:
-                # Primary: video file's folder
-                srt_file = os.path.join(os.path.dirname(audio_file), f"{base_name}.srt")
-                # Secondary: Documents/Youtube-Subs/local_files
-                local_files_dir = os.path.join(OUTPUT_DIR, "local_files")
-                os.makedirs(local_files_dir, exist_ok=True)
-                srt_file_secondary = os.path.join(local_files_dir, f"{base_name}.srt")
-                
-                # Check for existing unfinished transcription to resume
-                unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
-                if os.path.exists(unfinished_srt) and os.path.getsize(unfinished_srt) > 10:
-                    self.log(f"Found unfinished transcription: {unfinished_srt}")
-                    self.log("Will resume from where it left off...")
-            else:
-                channel_dir = os.path.join(OUTPUT_DIR, self.clean_filename(self.channel_name))
-                os.makedirs(channel_dir, exist_ok=True)
-                srt_file = os.path.join(channel_dir, f"{base_name}.srt")
-                srt_file_secondary = None
+        # Create helper files (bash, bat, thumbnail) before transcription
+        unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
+        _get_helper_files().make_files(unfinished_srt, url=task_source)
 
-            # Create helper files (bash, bat, thumbnail) before transcription
-            unfinished_srt = srt_file.replace('.srt', '.unfinished.srt')
-            _get_helper_files().make_files(unfinished_srt, url=task_source)
+        # Create symlink from srt_file -> unfinished_srt so players see in-progress transcription
+        try:
+            if os.path.exists(srt_file) or os.path.islink(srt_file):
+                os.remove(srt_file)
+            os.symlink(os.path.basename(unfinished_srt), srt_file)
+        except OSError:
+            pass
 
-            # Create symlink from srt_file -> unfinished_srt so players see in-progress transcription
+        # Launch mpv FIRST if --run option is specified (before transcription starts)
+        if hasattr(self, 'run_mpv') and self.run_mpv:
+            ctx['mpv_process'] = self.launch_mpv(task_source, srt_file, task_source)
+            # Wait a moment for mpv to start
+            time.sleep(1)
+
+        # Start auto-reload thread if mpv_ipc is enabled
+        if hasattr(self, 'mpv_ipc') and self.mpv_ipc and ctx['mpv_process']:
+            ctx['reload_thread'] = self.start_mpv_auto_reload(srt_file, ctx['reload_stop_event'])
+
+        # Build VAD parameters if enabled
+        vad_params = None
+        if hasattr(self, 'vad_filter') and self.vad_filter:
+            vad_params = dict(min_silence_duration_ms=self.vad_min_silence_duration) if self.vad_min_silence_duration else None
+
+        # Build diarization parameters if enabled
+        diarization_params = None
+        if hasattr(self, 'diarization') and self.diarization:
+            diarization_params = dict(min_speakers=self.min_speakers, max_speakers=self.max_speakers)
+
+        # Worker output is relayed from pool threads; pin this task's context to the callback
+        write = functools.partial(self.log, **log_writer.current_context())
+        if not _get_transcribe().process_create(
+            file=audio_file,
+            model_name=self.model_name,
+            srt_file=srt_file,
+            device=self.device,
+            compute_type=self.compute_type,
+            force_device=False,
+            auto=True,
+            write=write,
+            cpu_threads=getattr(self, 'cpu_threads', None),
+            vad_filter=self.vad_filter if hasattr(self, 'vad_filter') else False,
+            vad_params=vad_params,
+            diarization=self.diarization if hasattr(self, 'diarization') else False,
+            diarization_params=diarization_params,
+            temperature=self.temperature if hasattr(self, 'temperature') else None,
+            merge_lines=self.merge_lines if hasattr(self, 'merge_lines') else False,
+            start_time=getattr(self, 'start_time', None),
+            end_time=getattr(self, 'end_time', None),
+            parallel_chunks=getattr(self, 'parallel_chunks', 1),
+            on_event=getattr(self, 'on_event', None),
+            cancel_token=self.cancel_token
+        ):
+            raise Exception("Transcription process failed.")
+        self.log("Transcription successful.")
+        return True
+
+    def _stage_finalize(self, ctx) -> bool:
+        """Helper files, secondary copy, player reload and bookkeeping."""
+        task_source, srt_file = ctx['source'], ctx['srt_file']
+        # Update the SRT filename in case it was changed during processing
+        if os.path.exists(srt_file):
+            base_name = os.path.splitext(srt_file)[0]
+            new_srt_file = f"{base_name}.srt"
+            if new_srt_file != srt_file and os.path.exists(new_srt_file):
+                srt_file = new_srt_file
+        _get_helper_files().make_files(srt_file, url=task_source)
+
+        # Copy to secondary location if applicable
+        srt_file_secondary = ctx['srt_file_secondary']
+        if srt_file_secondary and os.path.exists(srt_file):
+            try:
+                shutil.copy2(srt_file, srt_file_secondary)
+                self.log(f"Copied subtitle to: {srt_file_secondary}")
+            except Exception as copy_err:
+                self.log(f"Warning: Could not copy to secondary location: {copy_err}")
+
+        # Stop auto-reload thread
+        self._stop_auto_reload(ctx)
+
+        # Final subtitle reload
+        if hasattr(self, 'mpv_ipc') and self.mpv_ipc and ctx['mpv_process']:
+            self.mpv_reload_subtitles(srt_file)
+
+        # Let the API's subtitle catalog (if this process runs one) list it without waiting for a poll
+        subtitle_catalog.notify(srt_file)
+        if srt_file_secondary:
+            subtitle_catalog.notify(srt_file_secondary)
+
+        update_task_status(ctx['job_id'], task_source, 'completed')
+        self.mark_as_processed(ctx['unique_id'])
+        return True
+
+    def _task_failed(self, stage_name, ctx, error):
+        if isinstance(error, TaskCancelled):
+            self.log(f"Cancelled task '{ctx['source']}' ({stage_name})")
+            update_task_status(ctx['job_id'], ctx['source'], 'cancelled')
+            return
+        self.log(f"Error on task '{ctx['source']}' ({stage_name}): {error}")
+        update_task_status(ctx['job_id'], ctx['source'], 'failed')
+
+    def _stop_auto_reload(self, ctx):
+        if ctx['reload_thread']:
+            ctx['reload_stop_event'].set()
+            ctx['reload_thread'].join(timeout=2)
+            ctx['reload_thread'] = None
+
+    def _release_task(self, ctx):
+        """Cleanup that runs once per task however it ended."""
+        self._stop_auto_reload(ctx)
+        cache_source, audio_file = ctx['cache_source'], ctx['audio_file']
+        if cache_source:
+            self.metadata.release(cache_source)
+        if ctx['pinned']:
             try:
-                if os.path.exists(srt_file) or os.path.islink(srt_file):
-                    os.remove(srt_file)
-                os.symlink(os.path.basename(unfinished_srt), srt_file)
-            except OSError:
+                import audio_cache
+                audio_cache.unpin(cache_source)
+            except Exception:
                 pass
-
-            # Launch mpv FIRST if --run option is specified (before transcription starts)
-            mpv_process = None
-            if hasattr(self, 'run_mpv') and self.run_mpv:
-                mpv_process = self.launch_mpv(audio_file if is_local else task_source, srt_file, task_source)
-                # Wait a moment for mpv to start
-                time.sleep(1)
-
-            # Start auto-reload thread if mpv_ipc is enabled
-            reload_stop_event = threading.Event()
-            reload_thread = None
-            if hasattr(self, 'mpv_ipc') and self.mpv_ipc and mpv_process:
-                reload_thread = self.start_mpv_auto_reload(srt_file, reload_stop_event)
-
-            # Build VAD parameters if enabled
-            vad_params = None
-            if hasattr(self, 'vad_filter') and self.vad_filter:
-                vad_params = dict(min_silence_duration_ms=self.vad_min_silence_duration) if self.vad_min_silence_duration else None
-
-            # Build diarization parameters if enabled
-            diarization_params = None
-            if hasattr(self, 'diarization') and self.diarization:
-                diarization_params = dict(min_speakers=self.min_speakers, max_speakers=self.max_speakers)
-
-            if _get_transcribe().process_create(
-                file=audio_file,
-                model_name=self.model_name,
-                srt_file=srt_file,
-                device=self.device,
-                compute_type=self.compute_type,
-                force_device=False,
-                auto=True,
-                write=self.log,
-                cpu_threads=getattr(self, 'cpu_threads', None),
-                vad_filter=self.vad_filter if hasattr(self, 'vad_filter') else False,
-                vad_params=vad_params,
-                diarization=self.diarization if hasattr(self, 'diarization') else False,
-                diarization_params=diarization_params,
-                temperature=self.temperature if hasattr(self, 'temperature') else None,
-                merge_lines=self.merge_lines if hasattr(self, 'merge_lines') else False,
-                start_time=getattr(self, 'start_time', None),
-                end_time=getattr(self, 'end_time', None)
-            ):
-                self.log("Transcription successful.")
-                # Update the SRT filename in case it was changed during processing
-                if os.path.exists(srt_file):
-                    base_name = os.path.splitext(srt_file)[0]
-                    new_srt_file = f"{base_name}.srt"
-                    if new_srt_file != srt_file and os.path.exists(new_srt_file):
-                        srt_file = new_srt_file
-                _get_helper_files().make_files(srt_file, url=task_source)
-
-                # Copy to secondary location if applicable
-                if srt_file_secondary and os.path.exists(srt_file):
-                    try:
-                        import shutil
-                        shutil.copy2(srt_file, srt_file_secondary)
-                        self.log(f"Copied subtitle to: {srt_file_secondary}")
-                    except Exception as copy_err:
-                        self.log(f"Warning: Could not copy to secondary location: {copy_err}")
-
-                # Stop auto-reload thread
-                if reload_thread:
-                    reload_stop_event.set()
-                    reload_thread.join(timeout=2)
-
-                # Final subtitle reload
-                if hasattr(self, 'mpv_ipc') and self.mpv_ipc and mpv_process:
-                    self.mpv_reload_subtitles(srt_file)
-
-                update_task_status(job_id, task_source, 'completed')
-                self.mark_as_processed(unique_id)
+        if audio_file and not ctx['is_local'] and os.path.exists(audio_file):
+            if not self.save_video:
+                try:
+                    import audio_cache
+                    cached_path = audio_cache.put(cache_source, audio_file)
+                    if cached_path:
+                        self.log(f"Cached audio: {cached_path}")
+                except Exception:
+                    pass
+                try:
+                    os.remove(audio_file)
+                except OSError as e:
+                    self.log(f"Error removing temp audio: {e}")
             else:
-                raise Exception("Transcription process failed.")
-
-        except Exception as e:
-            self.log(f"Error on task '{task_source}': {e}")
-            update_task_status(job_id, task_source, 'failed')
-
-        finally:
-            if audio_file and not is_local and os.path.exists(audio_file):
-                if not self.save_video:
-                    try:
-                        import audio_cache
-                        cached_path = audio_cache.put(task_source, audio_file)
-                        if cached_path:
-                            self.log(f"Cached audio: {cached_path}")
-                    except Exception:
-                        pass
-                    try:
-                        os.remove(audio_file)
-                    except OSError as e:
-                        self.log(f"Error removing temp audio: {e}")
-                else:
-                    self.log(f"Keeping media file: {audio_file}")
+                self.log(f"Keeping media file: {audio_file}")
 
     def launch_mpv(self, audio_file, srt_file, task_source):
         """Launch mpv with the audio file, subtitles, and --pause flag."""
@@ -1422,10 +1397,33 @@ class WhisperSubs:
             self.log(f"Error sending MPV IPC command: {e}")
             return False
 
+    def _in_stage(self, name: str, stage: Callable[[Dict[str, Any]], bool]) -> Callable[[Dict[str, Any]], bool]:
+        """Wrap a stage so everything it logs carries the job, task and stage."""
+        def run(ctx):
+            with log_writer.context(job=ctx['job_id'], task=ctx['unique_id'], stage=name):
+                self.cancel_token.raise_if_cancelled()
+                return stage(ctx)
+        return run
+
+    def _pipeline_stages(self) -> List[Stage]:
+        workers = dict(PIPELINE_WORKERS, **(self.stage_workers or {}))
+        return [
+            Stage(name, self._in_stage(name, stage), workers[name])
+            for name, stage in (
+                ('prepare', self._stage_prepare),
+                ('download', self._stage_download),
+                ('transcribe', self._stage_transcribe),
+                ('finalize', self._stage_finalize),
+            )
+        ]
+
     def process_with_lazy_resolution(self, job):
         """Process a job using lazy task resolution.
 
-        Tasks are resolved and processed one at a time, with progress saved after each.
+        Tasks are resolved lazily and fed through the stage pipeline, so the
+        next tasks download while the current one transcribes; each task's
+        status is saved to the job store as it moves between stages. With
+        prefetch=0 tasks run one at a time.
         """
         self.log(f"Starting job {job['id']} with lazy resolution")
 
@@ -1437,45 +1435,62 @@ class WhisperSubs:
         processed_sources = {task['source'] for task in existing_tasks
                            if task['status'] in ['completed', 'skipped', 'failed']}
 
-        total_processed = len(processed_sources)
-        total_discovered = len(existing_tasks)
+        progress = {'processed': len(processed_sources), 'discovered': len(processed_sources)}
+        progress_lock = threading.Lock()
 
         update_job(job['id'], {"status": "processing"})
 
-        # Process each source
-        for source in sources:
-            self.log(f"Processing source: {source}")
-
-            # Use lazy generator to get tasks one by one
-            for task in self.resolve_source_to_tasks_lazy(source):
-                total_discovered += 1
-
-                # Skip if already processed
-                if task['source'] in processed_sources:
-                    self.log(f"Skipping already processed: {task['title']}")
-                    continue
+        def discover():
+            queued = set()
+            for source in sources:
+                self.log(f"Processing source: {source}")
 
-                # Add task to job
-                existing_tasks.append(task)
-                update_job(job['id'], {"tasks": existing_tasks})
-
-                # Process the task
-                self.log(f"Processing [{total_processed + 1}/{total_discovered}]: {task['title']}")
+                # Use lazy generator to get tasks one by one
+                for task in self.resolve_source_to_tasks_lazy(source):
+                    # Skip if already processed
+                    if task['source'] in processed_sources or task['source'] in queued:
+                        self.log(f"Skipping already processed: {task['title']}")
+                        continue
+                    queued.add(task['source'])
+                    with progress_lock:
+                        progress['discovered'] += 1
+
+                    # Add task to job
+                    add_task(job['id'], task)
+                    self.log(f"Queued [{progress['discovered']}]: {task['title']}")
+                    yield task
+
+        def task_done():
+            with progress_lock:
+                progress['processed'] += 1
+                self.log(f"Progress: {progress['processed']}/{progress['discovered']} tasks completed")
+
+        if self.prefetch > 0:
+            def on_exit(ctx):
+                self._release_task(ctx)
+                task_done()
+
+            Pipeline(
+                self._pipeline_stages(),
+                queue_size=self.prefetch,
+                on_error=self._task_failed,
+                on_exit=on_exit,
+                stop_event=self._stop_event,
+            ).run(self._new_task_context(job['id'], task) for task in discover())
+        else:
+            for task in discover():
+                if self.cancel_token.cancelled:
+                    break
                 self.process_task(job['id'], task)
+                task_done()
 
-                # Update progress
-                total_processed += 1
-                processed_sources.add(task['source'])
-
-                # Update job status after each task
-                updated_jobs = get_jobs()
-                current_job = next((j for j in updated_jobs if j['id'] == job['id']), None)
-                if current_job:
-                    self.log(f"Progress: {total_processed}/{total_discovered} tasks completed")
-
-        # Mark job as completed
-        final_status = "completed"
+        # Mark job as completed; a cancelled job keeps its unfinished tasks for resume
+        final_status = "cancelled" if self.cancel_token.cancelled else "completed"
         update_job(job['id'], {"status": final_status})
+        try:
+            job_store.compact()
+        except Exception as e:
+            self.log(f"Job store compaction failed: {e}")
         self.log(f"Job {job['id']} finished with status: {final_status}")
 
     def process(self, job_or_source: Union[Dict[str, Any], str]) -> None:
@@ -1548,6 +1563,18 @@ def read_sources_from_file(filename):
         print(f"Error reading file {filename}: {e}", file=sys.stderr)
         sys.exit(1)
 
+def parse_stage_workers(spec):
+    """Parse 'download=3,transcribe=1' into a stage -> worker count dict."""
+    workers = {}
+    for part in spec.split(','):
+        name, _, count = part.partition('=')
+        name = name.strip()
+        if name not in PIPELINE_WORKERS or not count.strip().isdigit() or int(count) < 1:
+            raise argparse.ArgumentTypeError(
+                f"Invalid stage worker spec '{part}' (stages: {', '.join(PIPELINE_WORKERS)})")
+        workers[name] = int(count)
+    return workers
+
 def main():
     parser = argparse.ArgumentParser(
         description="Transcribe audio from various sources.",
@@ -1623,6 +1650,12 @@ Examples:
                              help="Compute type ('int8', 'float16'). Default: 'int8'")
     process_group.add_argument('--cpu-threads', type=int, default=None,
                              help="Number of CPU threads for transcription (default: auto-detect)")
+    process_group.add_argument('--parallel-chunks', type=int, default=1,
+                             help="Split long audio at silences into N chunks transcribed in parallel (local models only, default: 1)")
+    process_group.add_argument('--prefetch', type=int, default=DEFAULT_PREFETCH,
+                             help=f"Tasks queued ahead of each stage, so downloads overlap transcription; 0 runs tasks one at a time (default: {DEFAULT_PREFETCH})")
+    process_group.add_argument('--stage-workers', type=parse_stage_workers, default=None,
+                             help="Workers per task stage, e.g. 'download=3,transcribe=1' (stages: prepare, download, transcribe, finalize)")
     process_group.add_argument('-f', '--force', action='store_true',
                              help="Force transcription even if already processed.")
     process_group.add_argument('-r', '--force-retry', action='store_true', help="Force retry transcription even if already completed (ignores existing subtitles).")
@@ -1747,7 +1780,10 @@ Examples:
                     mpv_socket=args.mpv_socket,
                     cpu_threads=args.cpu_threads,
                     save_video=args.video,
-                    save_thumbnail=args.save_thumbnail
+                    save_thumbnail=args.save_thumbnail,
+                    parallel_chunks=args.parallel_chunks,
+                    stage_workers=args.stage_workers,
+                    prefetch=args.prefetch
                 )
                 processor.process(source_info['url'])
 
@@ -1917,7 +1953,10 @@ Examples:
             mpv_socket=args.mpv_socket,
             cpu_threads=args.cpu_threads,
             save_video=args.video,
-            save_thumbnail=args.save_thumbnail
+            save_thumbnail=args.save_thumbnail,
+            parallel_chunks=args.parallel_chunks,
+            stage_workers=args.stage_workers,
+            prefetch=args.prefetch
         )
         processor.process(job_or_source)
 
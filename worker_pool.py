@@ -0,0 +1,667 @@
+"""
+WhisperSubs Worker Pool
+
+Long-lived faster-whisper worker processes that keep a WhisperModel resident
+between jobs. Workers are keyed by (model, device, compute_type, cpu_threads);
+consecutive transcriptions with the same key skip interpreter start-up and
+model loading entirely.
+
+Each worker runs this module with ``--serve`` and speaks a JSON-lines
+protocol: one job per line on stdin, and ``log`` / ``progress`` / ``done``
+messages on its protocol pipe. Anything the worker (or CTranslate2) prints
+ends up on stderr and is forwarded as ``Error:`` lines, same as before.
+``segment`` (each SRT entry as it is written), ``stats`` (percent, speed,
+ETA about once a second) and ``truncate`` (entries from an index on were
+dropped by loop recovery) are passed to the caller's on_event callback.
+
+A job run with a cancel token is stopped by killing its worker, which is the
+only way to interrupt CTranslate2 mid-segment and also frees the model; the
+pool then drops the dead worker and the job returns RESULT_CANCELLED.
+
+Result codes match the exit codes of the old generated script:
+    0  - success, SRT finalized
+    1  - transcription error (or the worker died)
+    42 - loop/hallucination detected, timestamp in the .loop_detect file
+   130 - cancelled (the worker was killed)
+
+Loops are normally recovered inside the worker: the SRT is trimmed back to the
+loop point and that window is decoded again without previous-text
+conditioning. 42 is only returned when that keeps failing or the audio can't
+be seeked (it isn't a PCM store file).
+
+This module must stay importable without faster_whisper; the model is only
+imported inside the worker process.
+"""
+import atexit
+import datetime
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, List, NamedTuple, Optional
+
+from cancellation import CancelToken
+
+MAX_IDLE_WORKERS = 2
+IDLE_TIMEOUT_SECONDS = 15 * 60
+SHUTDOWN_TIMEOUT_SECONDS = 10
+
+RESULT_OK = 0
+RESULT_ERROR = 1
+RESULT_LOOP = 42
+RESULT_CANCELLED = 130
+
+# Worker messages handed to on_event(kind, fields) as they arrive
+EVENT_KINDS = ('segment', 'stats', 'truncate')
+
+# In-worker loop recovery: re-decode this much audio from the loop point with
+# recovery settings before going back to the job's own settings
+RECOVERY_WINDOW_SECONDS = 30.0
+MAX_LOOP_RECOVERIES = 3
+RECOVERY_TEMPERATURE_STEP = 0.2
+
+
+class WorkerKey(NamedTuple):
+    model: str
+    device: str
+    compute_type: str
+    cpu_threads: Optional[int] = None
+
+
+class TranscriptionWorker:
+    """Parent-side handle for one worker process."""
+
+    def __init__(self, key: WorkerKey):
+        self.key = key
+        self.jobs_run = 0
+        self.broken = False
+        self.last_used = time.time()
+        self._write: Callable = print
+        self.process = subprocess.Popen(
+            [sys.executable, '-u', os.path.abspath(__file__), '--serve', json.dumps(key._asdict())],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+            encoding='utf-8', errors='replace', text=True, bufsize=1,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+        self._stderr_thread = threading.Thread(target=self._pump_stderr, daemon=True)
+        self._stderr_thread.start()
+
+    def _pump_stderr(self):
+        for line in self.process.stderr:
+            if line := line.strip():
+                try:
+                    self._write(f"Error: {line}")
+                except Exception:
+                    pass
+
+    @property
+    def alive(self) -> bool:
+        return not self.broken and self.process.poll() is None
+
+    def run(self, job: Dict[str, Any], write: Callable = print,
+            on_progress: Optional[Callable[[int], None]] = None,
+            on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+            cancel_token: Optional[CancelToken] = None) -> int:
+        """Send one job to the worker and block until it reports a result code."""
+        self._write = write
+        self.last_used = time.time()
+        if cancel_token is None:
+            return self._run(job, write, on_progress, on_event)
+        unregister = cancel_token.on_cancel(self.kill)
+        try:
+            code = self._run(job, write, on_progress, on_event)
+        finally:
+            unregister()
+        if cancel_token.cancelled:
+            self.kill()
+            return RESULT_CANCELLED
+        return code
+
+    def _run(self, job, write, on_progress, on_event) -> int:
+        if self.broken:
+            return RESULT_CANCELLED
+        try:
+            self.process.stdin.write(json.dumps(job) + '\n')
+            self.process.stdin.flush()
+        except (BrokenPipeError, OSError, ValueError):
+            return self._crashed()
+
+        for line in self.process.stdout:
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                if line := line.strip():
+                    write(f"Out: {line}")
+                continue
+
+            kind = msg.get('type')
+            if kind == 'log':
+                write(f"Out: {msg.get('line', '')}")
+            elif kind == 'progress':
+                if on_progress is not None:
+                    try:
+                        on_progress(msg.get('segments', 0))
+                    except Exception as e:
+                        write(f"Progress callback failed: {e}")
+            elif kind in EVENT_KINDS:
+                if on_event is not None:
+                    try:
+                        on_event(kind, {k: v for k, v in msg.items() if k != 'type'})
+                    except Exception as e:
+                        write(f"Event callback failed: {e}")
+            elif kind == 'done':
+                self.broken = bool(msg.get('fatal'))
+                self.jobs_run += 1
+                self.last_used = time.time()
+                return int(msg.get('code', RESULT_ERROR))
+
+        return self._crashed()
+
+    def _crashed(self) -> int:
+        try:
+            code = self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            code = self.process.wait()
+        if self.broken:
+            # Killed on purpose (cancelled), not a crash
+            return RESULT_CANCELLED
+        self._write(f"Worker for {self.key.model} on {self.key.device} exited unexpectedly (code {code})")
+        # A clean exit without a result still means the job failed
+        return code if code not in (None, RESULT_OK) else RESULT_ERROR
+
+    def kill(self):
+        """Stop the worker now, mid-job if need be; it is not reused."""
+        self.broken = True
+        if self.process.poll() is None:
+            self.process.kill()
+
+    def close(self):
+        if self.process.poll() is not None:
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=SHUTDOWN_TIMEOUT_SECONDS)
+        except (OSError, subprocess.TimeoutExpired):
+            self.process.kill()
+            self.process.wait()
+
+
+class WorkerPool:
+    """Reuses idle workers per key, spawning new ones when none are free."""
+
+    def __init__(self, max_idle_workers: int = MAX_IDLE_WORKERS,
+                 idle_timeout: float = IDLE_TIMEOUT_SECONDS):
+        self.max_idle_workers = max_idle_workers
+        self.idle_timeout = idle_timeout
+        self._idle: List[TranscriptionWorker] = []
+        self._lock = threading.Lock()
+        self.spawned = 0
+        self.reused = 0
+
+    def _reap(self) -> List[TranscriptionWorker]:
+        """Drop dead and expired idle workers. Caller holds the lock."""
+        now = time.time()
+        stale = [w for w in self._idle
+                 if not w.alive or now - w.last_used > self.idle_timeout]
+        self._idle = [w for w in self._idle if w not in stale]
+        while len(self._idle) > self.max_idle_workers:
+            stale.append(self._idle.pop(0))
+        return stale
+
+    def acquire(self, key: WorkerKey) -> TranscriptionWorker:
+        with self._lock:
+            stale = self._reap()
+            worker = None
+            for i in range(len(self._idle) - 1, -1, -1):
+                if self._idle[i].key == key:
+                    worker = self._idle.pop(i)
+                    self.reused += 1
+                    break
+        for w in stale:
+            w.close()
+        if worker is None:
+            worker = TranscriptionWorker(key)
+            self.spawned += 1
+        return worker
+
+    def release(self, worker: TranscriptionWorker):
+        if not worker.alive:
+            worker.close()
+            return
+        with self._lock:
+            self._idle.append(worker)
+            stale = self._reap()
+        for w in stale:
+            w.close()
+
+    def run(self, key: WorkerKey, job: Dict[str, Any], write: Callable = print,
+            on_progress: Optional[Callable[[int], None]] = None,
+            on_event: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+            cancel_token: Optional[CancelToken] = None) -> int:
+        """Run a job on a warm worker for ``key``. A crash only fails this job."""
+        if cancel_token is not None and cancel_token.cancelled:
+            return RESULT_CANCELLED
+        worker = self.acquire(key)
+        try:
+            return worker.run(job, write, on_progress, on_event, cancel_token)
+        finally:
+            self.release(worker)
+
+    def shutdown(self):
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for w in workers:
+            w.close()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "idle_workers": len(self._idle),
+                "idle_keys": [list(w.key) for w in self._idle],
+                "spawned": self.spawned,
+                "reused": self.reused,
+            }
+
+
+_pool: Optional[WorkerPool] = None
+_pool_lock = threading.Lock()
+
+
+def get_pool() -> WorkerPool:
+    """Get or create the global worker pool."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+# ============ WORKER SIDE ============
+
+def _format_timestamp(seconds: float) -> str:
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    seconds_val = seconds % 60
+    milliseconds = int((seconds_val % 1) * 1000)
+    return f"{hours:02d}:{minutes:02d}:{int(seconds_val):02d},{milliseconds:03d}"
+
+
+def _build_transcribe_kwargs(model_name: str, job: Dict[str, Any], log: Callable) -> Dict[str, Any]:
+    kwargs: Dict[str, Any] = {"language": job.get('language')}
+    if job.get('vad_filter') is not None:
+        kwargs["vad_filter"] = job['vad_filter']
+        if job['vad_filter'] and job.get('vad_params'):
+            kwargs["vad_parameters"] = job['vad_params']
+    if job.get('temperature') is not None:
+        kwargs["temperature"] = job['temperature']
+    if job.get('merge_lines'):
+        kwargs["no_speech_threshold"] = 0.6
+        kwargs["compression_ratio_threshold"] = 1.4
+    if 'distil' in model_name.lower():
+        kwargs["condition_on_previous_text"] = False
+        kwargs["max_new_tokens"] = 128
+        kwargs["beam_size"] = 5
+        log("Using distil-whisper optimized parameters")
+    return kwargs
+
+
+def _ends_with_blank_line(path: str) -> bool:
+    """True if path is empty or already ends with the blank line after a block."""
+    size = os.path.getsize(path)
+    if size == 0:
+        return True
+    with open(path, 'rb') as f:
+        f.seek(max(size - 2, 0))
+        return f.read() == b'\n\n'
+
+
+def _load_audio(job: Dict[str, Any], pcm=None):
+    """Audio argument for WhisperModel.transcribe.
+
+    A job with clip_start/clip_end names a store WAV (see pcm_store); the
+    window is read straight from the memory-mapped samples (pcm, if the
+    caller already mapped them), so --start/--end ranges and resumes never
+    re-decode or copy the audio around them.
+    """
+    clip_start = job.get('clip_start') or 0.0
+    clip_end = job.get('clip_end')
+    if clip_start <= 0 and clip_end is None:
+        return job['audio_file']
+    import pcm_store
+    if pcm is not None:
+        return pcm_store.slice_samples(pcm, clip_start, clip_end)
+    return pcm_store.read_samples(job['audio_file'], clip_start, clip_end)
+
+
+def _map_pcm(job: Dict[str, Any]):
+    """Memory-map the job's audio if it is a store WAV we can re-read windows from.
+
+    The mapping is taken once at the start of the job, so loop recovery hours
+    later still reads the samples even if the store has evicted the file.
+    """
+    import pcm_store
+    if not pcm_store.is_pcm_wav(job['audio_file']):
+        return None
+    try:
+        return pcm_store.open_pcm(job['audio_file'])
+    except (OSError, ValueError):
+        return None
+
+
+def _loop_start(window: List) -> float:
+    """Start time of the run of identical lines at the end of a loop window."""
+    text, start, _ = window[-1]
+    for t, st, _ in reversed(window):
+        if t != text:
+            break
+        start = st
+    return start
+
+
+def _recovery_kwargs(kwargs: Dict[str, Any], attempt: int) -> Dict[str, Any]:
+    """Decoding settings for re-decoding a looped window.
+
+    Drops previous-text conditioning (which is what feeds the loop) and raises
+    the temperature a step per attempt.
+    """
+    recovery = dict(kwargs)
+    base = kwargs.get('temperature') or 0.0
+    if isinstance(base, (list, tuple)):
+        base = base[0] if base else 0.0
+    recovery["condition_on_previous_text"] = False
+    recovery["temperature"] = round(min(base + RECOVERY_TEMPERATURE_STEP * attempt, 1.0), 2)
+    return recovery
+
+
+def _run_job(model, key: WorkerKey, job: Dict[str, Any], emit: Callable) -> int:
+    """Transcribe one job into its unfinished SRT and finalize it."""
+    import logging
+
+    def log(line: str):
+        emit('log', line=line)
+
+    srt_file = job['srt_file']
+    unfinished_srt = job['unfinished_srt']
+    open_mode = job.get('open_mode', 'w')
+    start_index = job.get('start_index', 0)
+    resume_offset = job.get('resume_offset', 0.0)
+    start_offset_seconds = job.get('start_offset_seconds', 0.0)
+    loop_detect_file = unfinished_srt.replace('.srt', '.loop_detect')
+
+    whisper_logger = logging.getLogger("faster_whisper")
+    file_handler = None
+    if job.get('whisper_log'):
+        file_handler = logging.FileHandler(job['whisper_log'], mode='w', encoding='utf-8')
+        file_handler.setLevel(logging.DEBUG)
+        file_handler.setFormatter(logging.Formatter('%(asctime)s [%(levelname)s] %(message)s'))
+        whisper_logger.addHandler(file_handler)
+
+    loop_threshold_seconds = 10.0
+    loop_consecutive_required = 10
+    compression_fail_max = 20
+
+    try:
+        os.makedirs(os.path.dirname(srt_file) or '.', exist_ok=True)
+        log(f"Starting transcription with model {key.model} on device {key.device}")
+        if file_handler:
+            log(f"Full log will be written to: {job['whisper_log']}")
+
+        import srt_index
+        kwargs = _build_transcribe_kwargs(key.model, job, log)
+        clip_end = job.get('clip_end')
+        # SRT time of the first sample handed to the model in the current pass
+        time_base = resume_offset + start_offset_seconds
+        initial_base = time_base
+        pcm = _map_pcm(job)
+        segments, info = model.transcribe(_load_audio(job, pcm), **kwargs)
+        audio_duration = getattr(info, 'duration', 0) or 0
+        if audio_duration > 0:
+            log(f"Starting transcription (duration: {datetime.timedelta(seconds=int(audio_duration))})")
+
+        started = time.time()
+        last_progress = 0.0
+        segments_count = 0
+        current_index = start_index + 1
+        last_end = time_base
+        recoveries = 0
+        recovery_until = None  # end of the window being re-decoded with recovery settings
+
+        # Writes go through an append handle so loop trims (truncation) line up
+        if open_mode == 'w':
+            open(unfinished_srt, 'w', encoding='utf-8').close()
+        with open(unfinished_srt, 'a', encoding='utf-8') as f, srt_index.IndexWriter(unfinished_srt) as index:
+            if not _ends_with_blank_line(unfinished_srt):
+                f.write("\n")
+
+            while True:
+                loop_window = []
+                compression_fail_streak = 0
+                compression_fail_first_ts = 0.0
+                loop_ts = None
+
+                for segment in segments:
+                    adjusted_start = segment.start + time_base
+                    adjusted_end = segment.end + time_base
+
+                    seg_cr = getattr(segment, 'compression_ratio', 0.0) or 0.0
+                    if seg_cr > 2.4:
+                        if compression_fail_streak == 0:
+                            compression_fail_first_ts = adjusted_start
+                        compression_fail_streak += 1
+                    else:
+                        compression_fail_streak = 0
+
+                    if compression_fail_streak >= compression_fail_max:
+                        log(f"Hallucination detected: {compression_fail_streak} consecutive compression ratio failures starting from {compression_fail_first_ts:.1f}s")
+                        loop_ts = compression_fail_first_ts
+                        break
+
+                    f.write(f"{current_index}\n")
+                    f.write(f"{_format_timestamp(adjusted_start)} --> {_format_timestamp(adjusted_end)}\n")
+                    f.write(f"{segment.text.strip()}\n\n")
+                    f.flush()
+                    index.update(current_index, adjusted_end, f.tell())
+                    emit('segment', index=current_index, start=round(adjusted_start, 3),
+                         end=round(adjusted_end, 3), text=segment.text.strip())
+                    current_index += 1
+                    segments_count += 1
+                    last_end = adjusted_end
+                    if segments_count % 10 == 0:
+                        emit('progress', segments=segments_count)
+
+                    text_normalized = segment.text.strip().lower()
+                    if text_normalized:
+                        loop_window.append((text_normalized, adjusted_start, adjusted_end))
+                        while len(loop_window) > loop_consecutive_required * 2:
+                            loop_window.pop(0)
+                        if len(loop_window) >= loop_consecutive_required:
+                            recent = loop_window[-loop_consecutive_required:]
+                            if all(t == recent[0][0] for t, _, _ in recent):
+                                first_ts = recent[0][2]
+                                last_ts = recent[-1][2]
+                                if last_ts - first_ts >= loop_threshold_seconds or len(loop_window) >= loop_consecutive_required * 2:
+                                    log(f"Loop detected: '{recent[0][0][:40]}' repeated {loop_consecutive_required}+ times from {first_ts:.1f}s")
+                                    loop_ts = _loop_start(loop_window)
+                                    break
+
+                    if current_index % 10 == 0:
+                        log(f"Written {current_index - start_index - 1} new segments (total {current_index - 1})")
+
+                    now = time.time()
+                    if now - last_progress >= 1.0 and audio_duration > 0:
+                        progress_pct = ((adjusted_end - initial_base) / audio_duration) * 100
+                        elapsed = now - started
+                        if progress_pct > 0 and elapsed > 0:
+                            eta = (elapsed / progress_pct * 100) - elapsed
+                            speed = (adjusted_end - initial_base) / elapsed
+                            log("Progress: %.1f%% | Elapsed: %s | ETA: %s | Speed: %.1fx" % (
+                                progress_pct,
+                                datetime.timedelta(seconds=int(elapsed)),
+                                datetime.timedelta(seconds=int(eta)),
+                                speed
+                            ))
+                            emit('stats', percent=round(progress_pct, 1), elapsed=round(elapsed, 1),
+                                 eta=round(eta, 1), speed=round(speed, 2),
+                                 rtf=round(1 / speed, 3) if speed > 0 else None, segments=segments_count)
+                        last_progress = now
+
+                if loop_ts is None and recovery_until is None:
+                    break
+
+                # Stop the current decoder before starting another pass on the same model
+                close = getattr(segments, 'close', None)
+                if close is not None:
+                    close()
+
+                if loop_ts is None:
+                    # Recovery window done; continue with the normal settings
+                    next_start = last_end if last_end > recovery_until - RECOVERY_WINDOW_SECONDS else recovery_until
+                    pass_kwargs, pass_end, recovery_until = kwargs, clip_end, None
+                    log(f"Recovered past the loop, resuming normal decoding at {next_start:.1f}s")
+                else:
+                    if recoveries >= MAX_LOOP_RECOVERIES or pcm is None:
+                        with open(loop_detect_file, 'w') as lf:
+                            lf.write(str(loop_ts))
+                        return RESULT_LOOP
+                    recoveries += 1
+                    f.flush()
+                    kept = srt_index.truncate_after(unfinished_srt, loop_ts)
+                    current_index = (kept.number if kept else start_index) + 1
+                    emit('truncate', index=current_index)
+                    last_end = kept.end if kept else time_base
+                    next_start = loop_ts
+                    recovery_until = loop_ts + RECOVERY_WINDOW_SECONDS
+                    pass_end = recovery_until if clip_end is None else min(recovery_until, clip_end)
+                    pass_kwargs = _recovery_kwargs(kwargs, recoveries)
+                    log(f"Re-decoding {loop_ts:.1f}s-{pass_end:.1f}s without previous-text conditioning "
+                        f"(temperature {pass_kwargs['temperature']}, recovery {recoveries}/{MAX_LOOP_RECOVERIES})")
+
+                import pcm_store
+                if next_start >= (clip_end if clip_end is not None else len(pcm) / pcm_store.SAMPLE_RATE):
+                    break
+                time_base = next_start
+                segments, _ = model.transcribe(pcm_store.slice_samples(pcm, next_start, pass_end), **pass_kwargs)
+
+        if audio_duration > 0:
+            elapsed = max(time.time() - started, 1e-6)
+            log("Transcription completed in %s (%.1fx real-time)" % (
+                datetime.timedelta(seconds=int(elapsed)), audio_duration / elapsed))
+
+        if not (os.path.exists(unfinished_srt) and os.path.getsize(unfinished_srt) > 10):
+            log("Output file is empty or too small")
+            return RESULT_ERROR
+
+        if os.path.islink(srt_file) or os.path.exists(srt_file):
+            os.remove(srt_file)
+        os.rename(unfinished_srt, srt_file)
+        srt_index.remove(unfinished_srt)
+
+        import helper_files
+        helper_files.make_files(srt_file)
+
+        metadata_file = srt_file.replace('.srt', '.metadata.json')
+        metadata = {
+            "model": key.model,
+            "date": datetime.datetime.now().isoformat(),
+            "source_file": job.get('source_file', job['audio_file']),
+            "language": job.get('language'),
+            "device": key.device,
+            "compute_type": key.compute_type,
+            "cpu_threads": key.cpu_threads,
+            "vad_enabled": job.get('vad_filter', False),
+            "temperature": job.get('temperature'),
+            "segments_count": segments_count
+        }
+        try:
+            with open(metadata_file, 'w', encoding='utf-8') as mf:
+                json.dump(metadata, mf, indent=2, ensure_ascii=False)
+            log(f"Metadata saved to: {metadata_file}")
+        except Exception as e:
+            log(f"Warning: Could not create metadata file: {e}")
+
+        log("Transcription completed successfully")
+        return RESULT_OK
+    except Exception as e:
+        import traceback
+        log(f"Error during transcription: {e}")
+        traceback.print_exc()
+        return RESULT_ERROR
+    finally:
+        if file_handler:
+            file_handler.close()
+            whisper_logger.removeHandler(file_handler)
+
+
+class _LogStream:
+    """File-like stdout replacement that turns print() output into log messages."""
+
+    def __init__(self, emit: Callable):
+        self._emit = emit
+        self._buffer = ''
+
+    def write(self, text: str) -> int:
+        self._buffer += text
+        while '\n' in self._buffer:
+            line, self._buffer = self._buffer.split('\n', 1)
+            if line.strip():
+                self._emit('log', line=line.rstrip())
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def _serve(key: WorkerKey):
+    """Worker main loop: load the model once, then run jobs from stdin until EOF."""
+    import logging
+
+    # Keep the real stdout for the protocol; stray prints go to stderr
+    proto = os.fdopen(os.dup(1), 'w', encoding='utf-8', buffering=1)
+    os.dup2(2, 1)
+
+    def emit(kind: str, **fields):
+        proto.write(json.dumps({"type": kind, **fields}) + '\n')
+        proto.flush()
+
+    sys.stdout = _LogStream(emit)
+
+    logging.basicConfig()
+    logging.getLogger("faster_whisper").setLevel(logging.DEBUG)
+
+    model = None
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            emit('log', line=f"Invalid job: {e}")
+            emit('done', code=RESULT_ERROR)
+            continue
+
+        if model is None:
+            try:
+                import faster_whisper
+                model = faster_whisper.WhisperModel(
+                    key.model, device=key.device, compute_type=key.compute_type,
+                    cpu_threads=key.cpu_threads if key.cpu_threads else os.cpu_count()
+                )
+            except Exception as e:
+                emit('log', line=f"Error loading model {key.model}: {e}")
+                emit('done', code=RESULT_ERROR, fatal=True)
+                # A worker that cannot load its model is useless; let the pool drop it
+                return
+
+        emit('done', code=_run_job(model, key, job, emit))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) >= 3 and sys.argv[1] == '--serve':
+        _serve(WorkerKey(**json.loads(sys.argv[2])))
+    else:
+        print(f"Usage: {sys.argv[0]} --serve '<worker key json>'", file=sys.stderr)
+        sys.exit(2)